@@ -0,0 +1,83 @@
+"""
+This script is for dev/admin to measure the cost of client construction and STS round-trips in src/functions.py.
+Note:
+    no AWS account is needed: every HTTP request is answered locally by a before-send hook on the session,
+    so the numbers only reflect client-side overhead (client construction, signing, parsing).
+    "before" replays the old pattern of one quicksight client, one sts client and one get_caller_identity per call,
+    "after" calls the helpers in src/functions.py which route through the cached session context.
+Usage:
+    python benchmark_session_context.py [iterations]
+"""
+
+"""
+import libraries
+"""
+import json
+import sys
+import time
+import boto3
+from botocore.awsrequest import AWSResponse
+import src.functions as func
+
+ACCOUNT_ID = '123456789012'
+
+STS_BODY = (
+    '<GetCallerIdentityResponse xmlns="https://sts.amazonaws.com/doc/2011-06-15/">'
+    '<GetCallerIdentityResult><Arn>arn:aws:iam::' + ACCOUNT_ID + ':user/bench</Arn>'
+    '<UserId>AIDABENCH</UserId><Account>' + ACCOUNT_ID + '</Account></GetCallerIdentityResult>'
+    '<ResponseMetadata><RequestId>bench</RequestId></ResponseMetadata></GetCallerIdentityResponse>'
+).encode()
+
+QS_BODY = json.dumps({
+    "DataSet": {"DataSetId": "bench", "Name": "bench", "ImportMode": "SPICE",
+                "PhysicalTableMap": {}, "LogicalTableMap": {}},
+    "RequestId": "bench",
+}).encode()
+
+
+class _Raw:
+    def __init__(self, body):
+        self._body = body
+
+    def stream(self, **kwargs):
+        yield self._body
+
+
+def _sts_endpoint(request, **kwargs):
+    return AWSResponse(request.url, 200, {'Content-Type': 'text/xml'}, _Raw(STS_BODY))
+
+
+def _quicksight_endpoint(request, **kwargs):
+    return AWSResponse(request.url, 200, {'Content-Type': 'application/json'}, _Raw(QS_BODY))
+
+
+def stubbed_session():
+    session = boto3.Session(aws_access_key_id='bench', aws_secret_access_key='bench',
+                            aws_session_token='bench', region_name='us-east-1')
+    session.events.register('before-send.sts', _sts_endpoint)
+    session.events.register('before-send.quicksight', _quicksight_endpoint)
+    return session
+
+
+def describe_data_set_uncached(session, DSID):
+    qs = session.client('quicksight')
+    sts_client = session.client("sts")
+    AccountId = sts_client.get_caller_identity()["Account"]
+    return qs.describe_data_set(AwsAccountId=AccountId, DataSetId=DSID)
+
+
+def run(label, fn, session, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(session, 'bench')
+    elapsed = time.perf_counter() - start
+    print(label + ': ' + str(iterations) + ' calls in ' + str(round(elapsed, 3)) + 's, '
+          + str(round(iterations / elapsed, 1)) + ' calls/s')
+    return iterations / elapsed
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    before = run('before (client + sts per call)', describe_data_set_uncached, stubbed_session(), iterations)
+    after = run('after (session context)', func.describe_data_set, stubbed_session(), iterations)
+    print('speedup: ' + str(round(after / before, 1)) + 'x')
@@ -0,0 +1,107 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from . import supportive_functions as s_func
+
+# kind: (list API, summary list key, id key)
+ASSET_KINDS: Dict[str, tuple] = {
+    'dashboard': ('list_dashboards', 'DashboardSummaryList', 'DashboardId'),
+    'analysis': ('list_analyses', 'AnalysisSummaryList', 'AnalysisId'),
+    'dataset': ('list_data_sets', 'DataSetSummaries', 'DataSetId'),
+    'datasource': ('list_data_sources', 'DataSources', 'DataSourceId'),
+}
+
+DEFAULT_TTL_SECONDS = 300
+
+
+class _AssetIndex:
+    def __init__(self, summaries: List[Dict[str, Any]], id_key: str):
+        self.summaries = summaries
+        self.loaded_at = time.monotonic()
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_name: Dict[str, List[str]] = {}
+        self.by_arn: Dict[str, str] = {}
+        for summary in summaries:
+            asset_id = summary[id_key]
+            self.by_id[asset_id] = summary
+            self.by_name.setdefault(summary.get('Name'), []).append(asset_id)
+            if 'Arn' in summary:
+                self.by_arn[summary['Arn']] = asset_id
+
+
+class AssetCatalog:
+    """Name/id/arn indexes over the list APIs of one account.
+
+    Each list API is paged once and kept for ttl seconds; create/delete helpers
+    in functions.py call invalidate() so the next lookup re-reads the account.
+    """
+
+    def __init__(self, ctx: s_func.SessionContext, ttl: float = DEFAULT_TTL_SECONDS):
+        self.ctx = ctx
+        self.ttl = ttl
+        self._indexes: Dict[str, _AssetIndex] = {}
+        self._lock = threading.Lock()
+
+    def _page(self, kind: str) -> List[Dict[str, Any]]:
+        method, key, _ = ASSET_KINDS[kind]
+        call = getattr(self.ctx.qs, method)
+        args: Dict[str, Any] = {"AwsAccountId": self.ctx.account_id}
+        summaries = []
+        while True:
+            response = call(**args)
+            summaries += response[key]
+            next_token = response.get("NextToken", None)
+            if next_token is None:
+                return summaries
+            args["NextToken"] = next_token
+
+    def _index(self, kind: str) -> _AssetIndex:
+        index = self._indexes.get(kind)
+        if index is None or time.monotonic() - index.loaded_at > self.ttl:
+            with self._lock:
+                index = self._indexes.get(kind)
+                if index is None or time.monotonic() - index.loaded_at > self.ttl:
+                    index = _AssetIndex(self._page(kind), ASSET_KINDS[kind][2])
+                    self._indexes[kind] = index
+        return index
+
+    def invalidate(self, kind: Optional[str] = None):
+        with self._lock:
+            if kind is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(kind, None)
+
+    def summaries(self, kind: str) -> List[Dict[str, Any]]:
+        return self._index(kind).summaries
+
+    def summary(self, kind: str, asset_id: str) -> Dict[str, Any]:
+        try:
+            return self._index(kind).by_id[asset_id]
+        except KeyError:
+            raise KeyError(kind + ' ' + asset_id + ' does not exist') from None
+
+    def ids(self, kind: str, name: str) -> List[str]:
+        return list(self._index(kind).by_name.get(name, []))
+
+    def name(self, kind: str, asset_id: str) -> str:
+        return self.summary(kind, asset_id)['Name']
+
+    def id_from_arn(self, kind: str, arn: str) -> str:
+        index = self._index(kind)
+        if arn in index.by_arn:
+            return index.by_arn[arn]
+        return arn.split("/")[-1]
+
+
+def get_catalog(session, ttl: float = DEFAULT_TTL_SECONDS) -> AssetCatalog:
+    ctx = s_func.session_context(session)
+    if ctx.catalog is None:
+        ctx.catalog = AssetCatalog(ctx, ttl)
+    return ctx.catalog
+
+
+def invalidate(session, kind: Optional[str] = None):
+    ctx = s_func.session_context(session)
+    if ctx.catalog is not None:
+        ctx.catalog.invalidate(kind)
@@ -8,6 +8,7 @@ import csv
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 from . import supportive_functions as s_func
+from . import asset_catalog as catalog
 
 
 
@@ -17,9 +18,9 @@ from . import supportive_functions as s_func
 #response = client.create_ingestion(AwsAccountId = account_id, DataSetId=’MyDataSetId’, IngestionId='MyIngestion1')
 
 def list_data_sources(session):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     datasources = []
     response = qs.list_data_sources(AwsAccountId=account_id)
     next_token: str = response.get("NextToken", None)
@@ -32,9 +33,9 @@ def list_data_sources(session):
 
 
 def list_data_sets(session):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     datasets = []
     response = qs.list_data_sets(AwsAccountId=account_id)
     next_token: str = response.get("NextToken", None)
@@ -47,9 +48,9 @@ def list_data_sets(session):
 
 
 def list_templates(session):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     token = None
 
     args: Dict[str, Any] = {
@@ -76,9 +77,9 @@ def list_templates(session):
 
 
 def list_dashboards(session) -> List[Dict[str, Any]]:
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     dashboards = []
     response = qs.list_dashboards(AwsAccountId=account_id)
     next_token: str = response.get("NextToken", None)
@@ -91,9 +92,9 @@ def list_dashboards(session) -> List[Dict[str, Any]]:
 
 
 def list_analysis(session):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     analysis = []
     response = qs.list_analyses(AwsAccountId=account_id)
     next_token: str = response.get("NextToken", None)
@@ -106,9 +107,9 @@ def list_analysis(session):
 
 
 def list_themes(session):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     themes = []
     response = qs.list_themes(AwsAccountId=account_id)
     next_token: str = response.get("NextToken", None)
@@ -121,9 +122,9 @@ def list_themes(session):
 
 
 def describe_data_source(session, DSID):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    AccountId = ctx.account_id
     response = qs.describe_data_source(
         AwsAccountId=AccountId,
         DataSourceId=DSID)
@@ -132,9 +133,9 @@ def describe_data_source(session, DSID):
 
 # Describe a Dataset
 def describe_data_set(session, DSID):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    AccountId = ctx.account_id
     response = qs.describe_data_set(
         AwsAccountId=AccountId,
         DataSetId=DSID)
@@ -142,9 +143,9 @@ def describe_data_set(session, DSID):
 
 
 def describe_dashboard(session, dashboard):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     try:
         response = qs.describe_dashboard(
             AwsAccountId=account_id,
@@ -156,9 +157,9 @@ def describe_dashboard(session, dashboard):
 
 
 def describe_template(session, tid):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     response = qs.describe_template(
         AwsAccountId=account_id,
         TemplateId=tid)
@@ -166,9 +167,9 @@ def describe_template(session, tid):
 
 
 def describe_analysis(session, analysis):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     try:
         response = qs.describe_analysis(
             AwsAccountId=account_id,
@@ -180,18 +181,18 @@ def describe_analysis(session, analysis):
 
 
 def describe_theme(session, THEMEID):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    AccountId = ctx.account_id
     response = qs.describe_theme(
         AwsAccountId=AccountId,
         ThemeId=THEMEID)
     return response
 
 def describe_analysis_definition(session, id):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     try:
         response = qs.describe_analysis_definition(
             AwsAccountId=account_id,
@@ -204,9 +205,9 @@ def describe_analysis_definition(session, id):
         #return response['Analysis']
 
 def describe_dashboard_definition(session, id):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     try:
         response = qs.describe_dashboard_contents(
             AwsAccountId=account_id,
@@ -219,9 +220,9 @@ def describe_dashboard_definition(session, id):
 
 # create objects
 def create_data_source(source, session, target):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     credential = None
 
     # https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/quicksight.html#QuickSight.Client.create_data_source
@@ -294,6 +295,7 @@ def create_data_source(source, session, target):
 
     try:
         NewSource = qs.create_data_source(**args)
+        catalog.invalidate(session, 'datasource')
         return NewSource
     except Exception as e:
         error = {"DataSource": args, "Error": str(e)}
@@ -302,9 +304,9 @@ def create_data_source(source, session, target):
 # AccountId string; DataSetId string; Name string; Physical: json; Logical: json; Mode: string;
 # ColumnGroups: json array; Permissions: json array; RLS: json; Tags: json array
 def create_data_set(session, DataSetId, Name, Physical, Logical, Mode, Permissions, ColumnGroups=None, FieldFolders=None):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    AccountId = ctx.account_id
     args: Dict[str, Any] = {
         "AwsAccountId": AccountId,
         "DataSetId": DataSetId,
@@ -319,12 +321,13 @@ def create_data_set(session, DataSetId, Name, Physical, Logical, Mode, Permissio
     if FieldFolders:
         args["FieldFolders"] = FieldFolders
     response = qs.create_data_set(**args)
+    catalog.invalidate(session, 'dataset')
     return response
 
 def create_template(session, TemplateId, tname, dsref, sourceanalysis, version):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     try:
         delete_template(session, TemplateId)
     except Exception:
@@ -346,9 +349,9 @@ def create_template(session, TemplateId, tname, dsref, sourceanalysis, version):
         return response
 
 def copy_template(session, TemplateId, tname, SourceTemplatearn):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     try:
         delete_template(session, TemplateId)
     except Exception:
@@ -369,9 +372,9 @@ def copy_template(session, TemplateId, tname, SourceTemplatearn):
         return response
 
 def copy_analysis(session, source, Id, Name, principal, Permissions = 'owner', region='us-east-1'):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    AccountId = ctx.account_id
     args: Dict[str, Any] = {
         "AwsAccountId":  AccountId,
         "AnalysisId": Id,
@@ -417,12 +420,13 @@ def copy_analysis(session, source, Id, Name, principal, Permissions = 'owner', r
             ]
     print(args)
     response = qs.create_analysis(**args)
+    catalog.invalidate(session, 'analysis')
     return response
 
 def create_analysis(session, source, Id, Name, principal, Permissions = 'owner', region='us-east-1'):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    AccountId = ctx.account_id
     args: Dict[str, Any] = {
         "AwsAccountId":  AccountId,
         "AnalysisId": Id,
@@ -468,6 +472,7 @@ def create_analysis(session, source, Id, Name, principal, Permissions = 'owner',
             ]
     print(args)
     response = qs.create_analysis(**args)
+    catalog.invalidate(session, 'analysis')
     return response
 
 def incremental_migration(dev_config, prod_config,migrate_p, m_list):
@@ -544,9 +549,9 @@ def process_migration_list(migrate_p, list, dev_config):
 
 def create_dashboard(session, dashboard, name, principal, SourceEntity, version, themearn, filter='ENABLED',
                      csv='ENABLED', sheetcontrol='EXPANDED'):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     if themearn == '':
         response = qs.create_dashboard(
             AwsAccountId=account_id,
@@ -616,14 +621,15 @@ def create_dashboard(session, dashboard, name, principal, SourceEntity, version,
             },
             ThemeArn=themearn
         )
+    catalog.invalidate(session, 'dashboard')
 
     return response
 
 
 def create_analysis_old(session, analysis_id, name, principal, SourceEntity, ThemeArn):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     if ThemeArn != '':
         response = qs.create_analysis(
             AwsAccountId=account_id,
@@ -669,14 +675,15 @@ def create_analysis_old(session, analysis_id, name, principal, SourceEntity, The
             ],
             SourceEntity=SourceEntity
         )
+    catalog.invalidate(session, 'analysis')
 
     return response
 
 
 def create_theme(session, THEMEID, Name, BaseThemeId, Configuration):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    AccountId = ctx.account_id
     response = qs.create_theme(
         AwsAccountId=AccountId,
         ThemeId=THEMEID,
@@ -689,9 +696,9 @@ def create_theme(session, THEMEID, Name, BaseThemeId, Configuration):
 #AccountId string; DataSetId string; Name string; Physical: json; Logical: json; Mode: string;
 #ColumnGroups: json array; Permissions: json array; RLS: json; Tags: json array
 def update_dataset (session, DataSetId, Name, Physical, Logical, Mode, ColumnGroups=None):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    AccountId = ctx.account_id
     args: Dict[str, Any] = {
         "AwsAccountId": AccountId,
         "DataSetId": DataSetId,
@@ -703,13 +710,14 @@ def update_dataset (session, DataSetId, Name, Physical, Logical, Mode, ColumnGro
     if ColumnGroups:
         args["ColumnGroups"] = ColumnGroups
     response = qs.update_data_set(**args)
+    catalog.invalidate(session, 'dataset')
     return response
 
 
 def update_template_permission(session, TemplateId, Principal):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     response = qs.update_template_permissions(
         AwsAccountId=account_id,
         TemplateId=TemplateId,
@@ -727,9 +735,9 @@ def update_template_permission(session, TemplateId, Principal):
 
 def update_dashboard(session, dashboard, name, SourceEntity, version, filter='ENABLED', csv='ENABLED',
                      sheetcontrol='EXPANDED'):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
 
     response = qs.update_dashboard(
         AwsAccountId=account_id,
@@ -748,14 +756,15 @@ def update_dashboard(session, dashboard, name, SourceEntity, version, filter='EN
                 'VisibilityState': sheetcontrol
             }
         })
+    catalog.invalidate(session, 'dashboard')
 
     return response
 
 
 def update_data_source_permissions(session, datasourceid, Principal):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     response = qs.update_data_source_permissions(
         AwsAccountId=account_id,
         DataSourceId=datasourceid,
@@ -775,9 +784,9 @@ def update_data_source_permissions(session, datasourceid, Principal):
 
 
 def update_data_set_permissions(session, datasetid, Principal):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     response = qs.update_data_set_permissions(
         AwsAccountId=account_id,
         DataSetId=datasetid,
@@ -801,9 +810,9 @@ def update_data_set_permissions(session, datasetid, Principal):
 
 
 def update_analysis(session, id, name, source, component_type, component_body):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     args: Dict[str, Any] = {
         "AwsAccountId":  account_id,
         "AnalysisId": id,
@@ -826,13 +835,14 @@ def update_analysis(session, id, name, source, component_type, component_body):
     else:
         args["Definition"][component_type].append(component_body)
         response = qs.update_analysis(**args)
+    catalog.invalidate(session, 'analysis')
     return response
 
 
 def describe_analysis_permissions(session, analysis):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     try:
         response = qs.describe_analysis_permissions(
             AwsAccountId=account_id,
@@ -844,9 +854,9 @@ def describe_analysis_permissions(session, analysis):
 
 
 def update_theme(session, THEMEID, name, BaseThemeId):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
 
     response = qs.update_theme(
         AwsAccountId=account_id,
@@ -858,9 +868,9 @@ def update_theme(session, THEMEID, name, BaseThemeId):
 
 
 def describe_theme_permissions(session, THEMEID):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
 
     response = qs.describe_theme_permissions(
         AwsAccountId=account_id,
@@ -870,9 +880,9 @@ def describe_theme_permissions(session, THEMEID):
 
 
 def update_theme_permissions(session, THEMEID, Principal):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     response = qs.update_theme_permissions(
         AwsAccountId=account_id,
         ThemeId=THEMEID,
@@ -1008,7 +1018,7 @@ def data_sources_ls_of_dashboard(dashboard, sourcesession):
         PT=res['DataSet']['PhysicalTableMap']
         for key, value in PT.items():
             for i,j in value.items():
-                dsid = j['DataSourceArn'].split("/")[1]
+                dsid = catalog.get_catalog(sourcesession).id_from_arn('datasource', j['DataSourceArn'])
                 dsname=get_datasource_name(dsid, sourcesession)
                 if dsname not in sourcedsref:
                     sourcedsref.append(dsname)
@@ -1025,7 +1035,7 @@ def data_sources_ls_of_analysis(analysis, sourcesession):
         PT=res['DataSet']['PhysicalTableMap']
         for key, value in PT.items():
             for i,j in value.items():
-                dsid = j['DataSourceArn'].split("/")[1]
+                dsid = catalog.get_catalog(sourcesession).id_from_arn('datasource', j['DataSourceArn'])
                 dsname=get_datasource_name(dsid, sourcesession)
                 if dsname not in sourcedsref:
                     sourcedsref.append(dsname)
@@ -1033,128 +1043,72 @@ def data_sources_ls_of_analysis(analysis, sourcesession):
 
 
 def get_data_source_migration_list(sourcesession, source_migrate_list):
-    datasources = list_data_sources(sourcesession)  # get data source details with listdatasource API
+    datasources = catalog.get_catalog(sourcesession)  # data source details from the listdatasource API
 
     migration_list = []
     for newsource in source_migrate_list:
         ids = get_datasource_ids(newsource, sourcesession)  # Get id of data sources migration list
-        for datasource in datasources:
-            if ids[0] == datasource["DataSourceId"]:
-                migration_list.append(
-                    datasource)  # migration_list is an array containing data source connection information and etc
+        migration_list.append(
+            datasources.summary('datasource', ids[0]))  # migration_list is an array containing data source connection information and etc
 
     return migration_list
 
 
 #get object ids from name, or get object name from id
 def get_dashboard_ids(name: str, session) -> List[str]:
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
-
-    ids: List[str] = []
-    for dashboard in dashboards(session):
-        if dashboard["Name"] == name:
-            ids.append(dashboard["DashboardId"])
-    return ids
+    return catalog.get_catalog(session).ids('dashboard', name)
 
 
 def get_analysis_ids(name: str, session) -> List[str]:
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
-
-    ids: List[str] = []
-    for analysis_list in analysis(session):
-        if analysis_list["Name"] == name:
-            ids.append(analysis_list["AnalysisId"])
-    return ids
-
-
-def get_dashboard_name(did: str, session) -> List[str]:
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
+    return catalog.get_catalog(session).ids('analysis', name)
 
-    name: str
-    for dashboard in dashboards(session):
-        if dashboard["DashboardId"] == did:
-            name = dashboard["Name"]
-    return name
 
+def get_dashboard_name(did: str, session) -> str:
+    return catalog.get_catalog(session).name('dashboard', did)
 
-def get_dataset_name(did: str, session) -> List[str]:
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
 
-    name: str
-    for dataset in data_sets(session):
-        if dataset["DataSetId"] == did:
-            name = dataset["Name"]
-    return name
+def get_dataset_name(did: str, session) -> str:
+    return catalog.get_catalog(session).name('dataset', did)
 
 
 def get_dataset_ids(name: str, session) -> List[str]:
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
+    return catalog.get_catalog(session).ids('dataset', name)
 
-    ids: List[str] = []
-    for dataset in data_sets(session):
-        if dataset["Name"] == name:
-            ids.append(dataset["DataSetId"])
-    return ids
 
-
-def get_datasource_name(did: str, session) -> List[str]:
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
-
-    name: str
-    for datasource in data_sources(session):
-        if datasource["DataSourceId"] == did:
-            name = datasource["Name"]
-    return name
+def get_datasource_name(did: str, session) -> str:
+    return catalog.get_catalog(session).name('datasource', did)
 
 
 def get_datasource_ids(name: str, session) -> List[str]:
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
-
-    ids: List[str] = []
-    for datasource in data_sources(session):
-        if datasource["Name"] == name:
-            ids.append(datasource["DataSourceId"])
-    return ids
+    return catalog.get_catalog(session).ids('datasource', name)
 
 #delete objects
 def delete_source(session, DataSourceId):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    AccountId = ctx.account_id
     delsource = qs.delete_data_source(
         AwsAccountId=AccountId,
         DataSourceId=DataSourceId)
+    catalog.invalidate(session, 'datasource')
     return delsource
 
 
 def delete_dataset(session, DataSetId):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    AccountId = ctx.account_id
     response = qs.delete_data_set(
         AwsAccountId=AccountId,
         DataSetId=DataSetId)
+    catalog.invalidate(session, 'dataset')
     return response
 
 
 def delete_template(session, tid, version=None):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    AccountId = ctx.account_id
     args: Dict[str, Any] = {
         "AwsAccountId": AccountId,
         "TemplateId": tid,
@@ -1167,29 +1121,31 @@ def delete_template(session, tid, version=None):
 
 
 def delete_dashboard(session, did):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     response = qs.delete_dashboard(
         AwsAccountId=account_id,
         DashboardId=did)
+    catalog.invalidate(session, 'dashboard')
     return response
 
 
 def delete_analysis(session, did):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     response = qs.delete_analysis(
         AwsAccountId=account_id,
         AnalysisId=did)
+    catalog.invalidate(session, 'analysis')
     return response
 
 
 def delete_theme(session, THEMEID):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    AccountId = ctx.account_id
     response = qs.delete_theme(
         AwsAccountId=AccountId,
         ThemeId=THEMEID)
@@ -1213,9 +1169,9 @@ def check_object_status(type, id, session):
         else: raise ValueError("describe analysis status failed")
 
 def locate_folder_of_asset(session, MemberId, FolderId, MemberType):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    account_id = ctx.account_id
     response = qs.create_folder_membership(
         AwsAccountId=account_id,
         FolderId=FolderId,
@@ -1226,9 +1182,9 @@ def locate_folder_of_asset(session, MemberId, FolderId, MemberType):
 
 #update target dataset with folders
 def update_dataset_folders (session, DSID, Folders):
-    qs = session.client('quicksight')
-    sts_client = session.client("sts")
-    AccountId = sts_client.get_caller_identity()["Account"]
+    ctx = s_func.session_context(session)
+    qs = ctx.qs
+    AccountId = ctx.account_id
     response = describe_data_set (session, DSID)
     args: Dict[str, Any] = {
         "AwsAccountId": AccountId,
@@ -1,8 +1,10 @@
 import boto3
 import json
 import time
+import threading
+import weakref
 # from IPython.display import JSON
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 import botocore
 import os
 
@@ -21,6 +23,60 @@ def default_botocore_config() -> botocore.config.Config:
         user_agent_extra=f"qs_sdk_assets_as_code",
     )
 
+# per-session cache of clients, account id and region
+class SessionContext:
+    """Holds the clients and caller identity of one boto3 session.
+
+    Clients are built once per service and the account id is resolved with a
+    single STS call, so helpers can be called in a loop without paying for
+    client construction and get_caller_identity on every call.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.region = session.region_name
+        self._clients: Dict[str, Any] = {}
+        self._account_id: Optional[str] = None
+        self.catalog = None
+        self._lock = threading.Lock()
+
+    def client(self, service: str):
+        client = self._clients.get(service)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(service)
+                if client is None:
+                    client = self.session.client(service, config=default_botocore_config())
+                    self._clients[service] = client
+        return client
+
+    @property
+    def qs(self):
+        return self.client('quicksight')
+
+    @property
+    def account_id(self) -> str:
+        if self._account_id is None:
+            account_id = self.client('sts').get_caller_identity()["Account"]
+            with self._lock:
+                self._account_id = account_id
+        return self._account_id
+
+
+_session_contexts: "weakref.WeakKeyDictionary[Any, SessionContext]" = weakref.WeakKeyDictionary()
+_session_contexts_lock = threading.Lock()
+
+
+def session_context(session) -> SessionContext:
+    """Return the cached SessionContext of a session (e.g. from _assume_role)."""
+    with _session_contexts_lock:
+        ctx = _session_contexts.get(session)
+        if ctx is None:
+            ctx = SessionContext(session)
+            _session_contexts[session] = ctx
+    return ctx
+
+
 # display json string in json format
 def display_json(doc, root='root'):
     print(json.dumps(doc, indent=2))
@@ -47,8 +103,7 @@ def _assume_role(aws_account_number, role_name, aws_region):
 
 # get QS user arn
 def get_user_arn(session, username, region='us-east-1', namespace='default'):
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    account_id = session_context(session).account_id
     if username == 'root':
         arn = 'arn:aws:iam::' + account_id + ':' + username
     else:
@@ -58,15 +113,13 @@ def get_user_arn(session, username, region='us-east-1', namespace='default'):
 
 # get QS asset arn
 def get_asset_arn(session, id, type, region='us-east-1'):
-    sts_client = session.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    account_id = session_context(session).account_id
     arn = "arn:aws:quicksight:" + region + ":" + account_id + ":" + type + "/" + id
     return arn
 
 def get_target(targetsession, rds, redshift, s3Bucket, s3Key, vpc, tag, targetadmin, rdscredential, redshiftcredential,
                region='us-east-1', namespace='default', version='1'):
-    sts_client = targetsession.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
+    account_id = session_context(targetsession).account_id
     target: Dict[str, Any] = {
         "rds": {"rdsinstanceid": ''},
         "s3": {"manifestBucket": '',
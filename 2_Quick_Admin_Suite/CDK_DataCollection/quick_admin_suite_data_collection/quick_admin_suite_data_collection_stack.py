@@ -92,7 +92,8 @@ class QuickAdminSuiteDataCollectionStack(Stack):
             ),
             default_arguments={
                 "--AWS_REGION": self.region,
-                "--S3_OUTPUT_PATH": f"s3://admin-suite-{self.account}/monitoring/quicksight/assets_access"
+                "--S3_OUTPUT_PATH": f"s3://admin-suite-{self.account}/monitoring/quicksight/assets_access",
+                "--extra-py-files": f"s3://{script_bucket_name.value_as_string}/glue/scripts/2025/admin_suite_runtime.py"
             },
             glue_version="5.0",
             execution_property=glue.CfnJob.ExecutionPropertyProperty(max_concurrent_runs=1),
@@ -115,7 +116,8 @@ class QuickAdminSuiteDataCollectionStack(Stack):
             ),
             default_arguments={
                 "--AWS_REGION": self.region,
-                "--S3_OUTPUT_PATH": f"s3://admin-suite-{self.account}/monitoring/quicksight/dataset"
+                "--S3_OUTPUT_PATH": f"s3://admin-suite-{self.account}/monitoring/quicksight/dataset",
+                "--extra-py-files": f"s3://{script_bucket_name.value_as_string}/glue/scripts/2025/admin_suite_runtime.py"
             },
             glue_version="5.0",
             execution_property=glue.CfnJob.ExecutionPropertyProperty(max_concurrent_runs=1),
@@ -138,7 +140,8 @@ class QuickAdminSuiteDataCollectionStack(Stack):
             ),
             default_arguments={
                 "--AWS_REGION": self.region,
-                "--S3_OUTPUT_PATH": f"s3://admin-suite-{self.account}/monitoring/quicksight/folder_assets"
+                "--S3_OUTPUT_PATH": f"s3://admin-suite-{self.account}/monitoring/quicksight/folder_assets",
+                "--extra-py-files": f"s3://{script_bucket_name.value_as_string}/glue/scripts/2025/admin_suite_runtime.py"
             },
             glue_version="5.0",
             execution_property=glue.CfnJob.ExecutionPropertyProperty(max_concurrent_runs=1),
@@ -186,7 +189,8 @@ class QuickAdminSuiteDataCollectionStack(Stack):
             default_arguments={
                 "--AWS_REGION": self.region,
                 "--QUICKSIGHT_IDENTITY_REGION": self.region,
-                "--S3_OUTPUT_PATH": f"s3://admin-suite-{self.account}/monitoring/quicksight/datasource_property"
+                "--S3_OUTPUT_PATH": f"s3://admin-suite-{self.account}/monitoring/quicksight/datasource_property",
+                "--extra-py-files": f"s3://{script_bucket_name.value_as_string}/glue/scripts/2025/admin_suite_runtime.py"
             },
             glue_version="5.0",
             execution_property=glue.CfnJob.ExecutionPropertyProperty(max_concurrent_runs=1),
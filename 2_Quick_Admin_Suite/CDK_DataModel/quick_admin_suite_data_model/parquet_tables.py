@@ -0,0 +1,86 @@
+from aws_cdk import aws_glue as glue
+
+# Columns of the Parquet output of the collectors (OUTPUT_FORMAT=parquet or both).
+# Keep in sync with PARQUET_SCHEMAS in Glue/NewTemplates/admin_suite_runtime.py.
+PARQUET_TABLES = {
+    "group_membership": [
+        ("account_id", "string"), ("namespace", "string"), ("group", "string"), ("user", "string"),
+        ("email", "string"), ("role", "string"), ("identity_type", "string"), ("user_arn", "string")],
+    "object_access": [
+        ("account_id", "string"), ("aws_region", "string"), ("object_type", "string"), ("object_name", "string"),
+        ("object_id", "string"), ("principal_type", "string"), ("principal_name", "string"), ("arn", "string"),
+        ("namespace", "string"), ("permissions", "string")],
+    "datasets_info": [
+        ("aws_region", "string"), ("dashboard_name", "string"), ("dashboardid", "string"), ("analysis", "string"),
+        ("analysis_id", "string"), ("dataset_name", "string"), ("dataset_id", "string"),
+        ("lastupdatedtime", "timestamp"), ("data_source_name", "string"), ("data_source_id", "string"),
+        ("catalog", "string"), ("sqlname_schema", "string"), ("sqlquery_table_name", "string")],
+    "data_dict": [
+        ("datasetname", "string"), ("datasetid", "string"), ("columnname", "string"), ("columntype", "string"),
+        ("columndesc", "string")],
+    "datasets_properties": [
+        ("region", "string"), ("dataset_id", "string"), ("name", "string"), ("last_updated_time", "timestamp"),
+        ("import_mode", "string"), ("consumed_spice_capacity_bytes", "bigint"), ("rows_ingested", "bigint"),
+        ("rows_dropped", "bigint"), ("refresh_triggered_time", "timestamp"), ("refresh_time_seconds", "bigint"),
+        ("request_source", "string"), ("request_type", "string"), ("ingestion_status", "string"),
+        ("error_info_type", "string"), ("error_info_message", "string"), ("is_file", "string")],
+    "folder_assets": [("aws_region", "string"), ("folder_id", "string"), ("member_id", "string")],
+    "folder_lk": [
+        ("account_id", "string"), ("aws_region", "string"), ("object_type", "string"), ("folder_name", "string"),
+        ("folder_id", "string"), ("folder_arn", "string"), ("principal_type", "string"),
+        ("principal_name", "string"), ("additional_info", "string"), ("actions", "string")],
+    "folder_path": [
+        ("aws_region", "string"), ("folder_id", "string"), ("folder_name", "string"), ("folder_path", "string")],
+    "datasource_property": [
+        ("region", "string"), ("datasource_name", "string"), ("datasource_id", "string"), ("dataset_name", "string"),
+        ("datasource_type", "string"), ("dataset_id", "string"), ("dataset_last_updated_time", "timestamp"),
+        ("dataset_created_time", "timestamp")],
+}
+
+def create_parquet_tables(stack, admin_console_db):
+    """Create <table>_parquet tables over the Parquet output of the collectors"""
+
+    tables = {}
+    for name, columns in PARQUET_TABLES.items():
+        location = f"s3://admin-suite-{stack.account}/monitoring/quicksight/parquet/{name}"
+        tables[name] = glue.CfnTable(
+            stack, f"{name.replace('_', '')}parquet",
+            catalog_id=stack.account,
+            database_name=admin_console_db.ref,
+            table_input=glue.CfnTable.TableInputProperty(
+                description=f"{name} written as Parquet by the admin suite glue jobs, one snapshot per region and day",
+                name=f"{name}_parquet",
+                parameters={
+                    "classification": "parquet",
+                    "parquet.compression": "SNAPPY",
+                    "projection.enabled": "true",
+                    "projection.region.type": "injected",
+                    "projection.snapshot_date.type": "date",
+                    "projection.snapshot_date.format": "yyyy-MM-dd",
+                    "projection.snapshot_date.range": "2025-01-01,NOW",
+                    "projection.snapshot_date.interval": "1",
+                    "projection.snapshot_date.interval.unit": "DAYS",
+                    "storage.location.template": f"{location}/region=${{region}}/snapshot_date=${{snapshot_date}}"
+                },
+                storage_descriptor=glue.CfnTable.StorageDescriptorProperty(
+                    columns=[
+                        glue.CfnTable.ColumnProperty(name=column, type=column_type, comment=column)
+                        for column, column_type in columns
+                    ],
+                    compressed=True,
+                    input_format="org.apache.hadoop.hive.ql.io.parquet.MapredParquetInputFormat",
+                    location=location,
+                    output_format="org.apache.hadoop.hive.ql.io.parquet.MapredParquetOutputFormat",
+                    serde_info=glue.CfnTable.SerdeInfoProperty(
+                        serialization_library="org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe"
+                    ),
+                    stored_as_sub_directories=False
+                ),
+                partition_keys=[
+                    glue.CfnTable.ColumnProperty(name="region", type="string", comment="aws region of the collector"),
+                    glue.CfnTable.ColumnProperty(name="snapshot_date", type="string", comment="collection date, yyyy-MM-dd")
+                ],
+                table_type="EXTERNAL_TABLE"
+            )
+        )
+    return tables
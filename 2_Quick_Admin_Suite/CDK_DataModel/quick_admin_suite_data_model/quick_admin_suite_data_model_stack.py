@@ -6,6 +6,7 @@ from aws_cdk import (
 )
 from constructs import Construct
 from .cloudwatch_tables import create_cloudwatch_tables
+from .parquet_tables import create_parquet_tables
 from .crawlers import create_crawlers
 
 class QuickAdminSuiteDataModelStack(Stack):
@@ -499,6 +500,9 @@ class QuickAdminSuiteDataModelStack(Stack):
 
         # Create CloudWatch tables
         cw_tables = create_cloudwatch_tables(self, admin_console_db)
+
+        # Create Parquet tables for collectors run with OUTPUT_FORMAT=parquet or both
+        create_parquet_tables(self, admin_console_db)
         
         # Create crawlers
         crawlers = create_crawlers(self, script_bucket_name)
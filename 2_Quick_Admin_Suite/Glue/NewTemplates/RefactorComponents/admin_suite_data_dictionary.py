@@ -5,41 +5,50 @@ import csv
 import io
 import os
 import tempfile
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List
 import sys
 from awsglue.utils import getResolvedOptions
 import botocore
 
-# Configure botocore and boto3 logging
 def default_botocore_config() -> botocore.config.Config:
     """Botocore configuration."""
-    retries_config: Dict[str, Union[str, int]] = {
+    retries_config: Dict[str, Any] = {
         "max_attempts": int(os.getenv("AWS_MAX_ATTEMPTS", "5")),
     }
-    mode: Optional[str] = os.getenv("AWS_RETRY_MODE")
+    mode = os.getenv("AWS_RETRY_MODE")
     if mode:
         retries_config["mode"] = mode
     return botocore.config.Config(
         retries=retries_config,
         connect_timeout=10,
         max_pool_connections=10,
-        user_agent_extra=f"qs_sdk_admin_console",
+        user_agent_extra="qs_sdk_admin_console",
     )
 
+# This job is deployed without admin_suite_runtime, so it keeps its own clients: one per (service, region)
+_clients: Dict[Any, Any] = {}
+
+def client(service_name: str, region_name: str = None):
+    """boto3 client for service_name in region_name, created on first use and shared afterwards."""
+    key = (service_name, region_name)
+    if key not in _clients:
+        _clients[key] = boto3.client(service_name, region_name=region_name, config=default_botocore_config())
+    return _clients[key]
+
 # Set up client and region
 global sts_client
 global qs_client
 global qs_local_client
 global account_id
 global aws_region
-sts_client = boto3.client("sts", config=default_botocore_config())
+sts_client = client('sts')
 account_id = sts_client.get_caller_identity()["Account"]
 args = getResolvedOptions(sys.argv, ['AWS_REGION', 'S3_OUTPUT_PATH'])
 print('region', args['AWS_REGION'])
 aws_region = args['AWS_REGION']
 s3_output_path = args['S3_OUTPUT_PATH']
-qs_client = boto3.client('quicksight', config=default_botocore_config())
-qs_local_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+qs_client = client('quicksight')
+qs_local_client = client('quicksight', aws_region)
 
 # define the _list function to handle pagination and return a list of resources
 def _list(
@@ -48,7 +57,7 @@ def _list(
         account_id: str,
         aws_region: str,
         **kwargs, ) -> List[Dict[str, Any]]:
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     func: Callable = getattr(qs_client, func_name)
     response = func(AwsAccountId=account_id, **kwargs)
     next_token: str = response.get("NextToken", None)
@@ -134,7 +143,7 @@ def list_ingestions(
 
 # Functions to describe specific QuickSight resources
 def describe_dashboard(account_id, dashboardid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     res = qs_client.describe_dashboard(
         AwsAccountId=account_id,
         DashboardId=dashboardid
@@ -143,7 +152,7 @@ def describe_dashboard(account_id, dashboardid, aws_region):
 
 
 def describe_analysis(account_id, id, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     res = qs_client.describe_analysis(
         AwsAccountId=account_id,
         AnalysisId=id
@@ -152,7 +161,7 @@ def describe_analysis(account_id, id, aws_region):
 
 
 def describe_data_set(account_id, id, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     res = qs_client.describe_data_set(
         AwsAccountId=account_id,
         DataSetId=id
@@ -161,7 +170,7 @@ def describe_data_set(account_id, id, aws_region):
 
 
 def describe_data_source(account_id, id, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     res = qs_client.describe_data_source(
         AwsAccountId=account_id,
         DataSourceId=id
@@ -170,7 +179,7 @@ def describe_data_source(account_id, id, aws_region):
 
 # Functions to describe permissions of specific QuickSight resources
 def describe_dashboard_permissions(account_id, dashboardid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     res = qs_client.describe_dashboard_permissions(
         AwsAccountId=account_id,
         DashboardId=dashboardid
@@ -179,7 +188,7 @@ def describe_dashboard_permissions(account_id, dashboardid, aws_region):
 
 
 def describe_analysis_permissions(account_id, aid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     res = qs_client.describe_analysis_permissions(
         AwsAccountId=account_id,
         AnalysisId=aid
@@ -188,7 +197,7 @@ def describe_analysis_permissions(account_id, aid, aws_region):
 
 
 def describe_theme_permissions(account_id, aid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     res = qs_client.describe_theme_permissions(
         AwsAccountId=account_id,
         ThemeId=aid
@@ -197,7 +206,7 @@ def describe_theme_permissions(account_id, aid, aws_region):
 
 
 def describe_data_set_permissions(account_id, datasetid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     res = qs_client.describe_data_set_permissions(
         AwsAccountId=account_id,
         DataSetId=datasetid
@@ -206,7 +215,7 @@ def describe_data_set_permissions(account_id, datasetid, aws_region):
 
 
 def describe_data_source_permissions(account_id, DataSourceId, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     res = qs_client.describe_data_source_permissions(
         AwsAccountId=account_id,
         DataSourceId=DataSourceId
@@ -218,7 +227,7 @@ def get_s3_bucket_name_from_path(s3_path: str) -> str:
         return s3_path.replace('s3://', '').split('/')[0]
 
 if __name__ == "__main__":
-    #sts_client = boto3.client("sts", region_name=aws_region, config=default_botocore_config())
+    #sts_client = client('sts', aws_region)
     #account_id = sts_client.get_caller_identity()["Account"]
     
     # Create S3 resource
@@ -425,3 +434,5 @@ if __name__ == "__main__":
     outfile.close()
     # upload file from tmp to s3 key
     bucket.upload_file(path3, key3)
+
+    print(f"Clients created: {len(_clients)}")
@@ -11,8 +11,11 @@ import logging
 import csv
 import io
 import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from awsglue.utils import getResolvedOptions
 import botocore
+from boto3.s3.transfer import TransferConfig
 
 # Get AWS region and QuickSight Identity Region from Glue job parameters
 args = getResolvedOptions(sys.argv, ['AWS_REGION', 'QUICKSIGHT_IDENTITY_REGION', 'S3_OUTPUT_PATH'])
@@ -48,25 +51,111 @@ CSV_HEADERS = ['Region','DataSetID', 'Name', 'LastUpdatedTime', 'ImportMode',
                'PrincipalType', 'Principal', 'AdditionalInfo', 'Actions','IsFile']                     
 
 
-def append_to_csv(file_path: str, data: list):
-    with open(file_path, 'a') as file:
-        writer = csv.writer(file)
-        writer.writerow(data)
-    file.close()
+class _CountingFile:
+    """Text file wrapper that counts the characters written through csv.writer."""
 
+    def __init__(self, file):
+        self.file = file
+        self.size = 0
 
-def append_to_partition(root: str, data: list, partition: str):
-    if not os.path.exists(root):
-        os.makedirs(root)
-    part_folder = os.path.join(root, partition)
-    if not os.path.exists(part_folder):
-        os.makedirs(part_folder)
-    local_file_path = os.path.join(part_folder, f'part-{partition}.csv')
-    # Write CSV headers if file does not exist
-    if not os.path.isfile(local_file_path):
-        append_to_csv(local_file_path, CSV_HEADERS)
-    append_to_csv(local_file_path, data)
-    print(f'Append to {local_file_path}')
+    def write(self, text):
+        self.size += len(text)
+        return self.file.write(text)
+
+
+class PartitionedCSVWriter:
+    """Buffered CSV writer for date partitions under root/<partition>/.
+
+    Keeps one open buffered handle per partition (at most max_open_files, the
+    least recently used one is closed and later re-opened in append mode) and
+    writes the header once per part file. When a part file reaches
+    max_part_bytes it is closed and uploaded to S3 in the background, with
+    multipart transfers for large files, while collection continues; the
+    partition continues in a new part file. close() uploads what is left and
+    waits for all uploads.
+    """
+
+    def __init__(self, root: str, headers: list, bucket, key_prefix: str,
+                 max_part_bytes: int = 128 * 1024 * 1024, max_open_files: int = 64,
+                 buffer_size: int = 1024 * 1024, upload_workers: int = 4):
+        self.root = root
+        self.headers = headers
+        self.bucket = bucket
+        self.key_prefix = key_prefix
+        self.max_part_bytes = max_part_bytes
+        self.max_open_files = max_open_files
+        self.buffer_size = buffer_size
+        self.transfer_config = TransferConfig(multipart_threshold=16 * 1024 * 1024,
+                                              multipart_chunksize=16 * 1024 * 1024)
+        self._open = OrderedDict()  # partition -> (file, counting file, csv writer)
+        self._parts = {}            # partition -> (part number, local path, bytes written)
+        self._uploads = []
+        self._executor = ThreadPoolExecutor(max_workers=upload_workers)
+        self.rows = 0
+
+    def _part_name(self, partition: str, number: int) -> str:
+        if number == 0:
+            return f'part-{partition}.csv'
+        return f'part-{partition}-{number}.csv'
+
+    def _handle(self, partition: str):
+        if partition in self._open:
+            self._open.move_to_end(partition)
+            return self._open[partition]
+        if len(self._open) >= self.max_open_files:
+            self._close_handle(next(iter(self._open)))
+        number, path, size = self._parts.get(partition, (0, None, 0))
+        new_file = path is None
+        if new_file:
+            part_folder = os.path.join(self.root, partition)
+            os.makedirs(part_folder, exist_ok=True)
+            path = os.path.join(part_folder, self._part_name(partition, number))
+        file = open(path, 'a', newline='', buffering=self.buffer_size)
+        counter = _CountingFile(file)
+        counter.size = size
+        writer = csv.writer(counter)
+        if new_file:
+            writer.writerow(self.headers)
+        self._parts[partition] = (number, path, counter.size)
+        self._open[partition] = (file, counter, writer)
+        return self._open[partition]
+
+    def _close_handle(self, partition: str):
+        file, counter, writer = self._open.pop(partition)
+        file.close()
+        number, path, _ = self._parts[partition]
+        self._parts[partition] = (number, path, counter.size)
+
+    def _upload(self, partition: str, path: str):
+        key = f'{self.key_prefix}/{partition}/{os.path.basename(path)}'
+        self.bucket.upload_file(path, key, Config=self.transfer_config)
+        os.remove(path)
+
+    def _finish_part(self, partition: str):
+        if partition in self._open:
+            self._close_handle(partition)
+        number, path, _ = self._parts[partition]
+        self._uploads.append(self._executor.submit(self._upload, partition, path))
+        self._parts[partition] = (number + 1, None, 0)
+
+    def writerow(self, row: list, partition: str):
+        file, counter, writer = self._handle(partition)
+        writer.writerow(row)
+        self.rows += 1
+        if counter.size >= self.max_part_bytes:
+            self._finish_part(partition)
+
+    def close(self):
+        for partition, (number, path, size) in list(self._parts.items()):
+            if path is not None:
+                self._finish_part(partition)
+        self._executor.shutdown(wait=True)
+        for upload in self._uploads:
+            upload.result()
+        print(f'Wrote {self.rows} rows to {len(self._uploads)} part files under {self.key_prefix}')
+
+
+partition_writer = PartitionedCSVWriter(LOCAL_ROOT_PATH, CSV_HEADERS, bucket, KEY)
 
 
 # Initialize list to store dataset access information
@@ -142,18 +231,18 @@ while True:
                 additional_info = principal[-2]
                 if len(principal)==4:
                   principal = principal[2]+'/'+principal[3]
-                  append_to_partition(LOCAL_ROOT_PATH, [region,DataSetId,Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, RowsIngested, 
+                  partition_writer.writerow([region,DataSetId,Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, RowsIngested, 
                   RowsDropped, RefreshTriggeredTime, RefreshTimeinSeconds, RequestSource,
                   RequestType,IngestionStatus,'NoErrorInfoType', 'NoErrorInfoMessage',
                   ptype, principal, additional_info, actions,Type], RefreshTriggeredTime.strftime('%Y-%m-%d'))
                 elif len(principal)==3:
                     principal = principal[2]
-                    append_to_partition(LOCAL_ROOT_PATH, [region,DataSetId,Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, RowsIngested, 
+                    partition_writer.writerow([region,DataSetId,Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, RowsIngested, 
                     RowsDropped, RefreshTriggeredTime, RefreshTimeinSeconds, RequestSource,
                     RequestType,IngestionStatus,'NoErrorInfoType', 'NoErrorInfoMessage',
                     ptype, principal, additional_info, actions,Type], RefreshTriggeredTime.strftime('%Y-%m-%d'))
            elif permissions == []:
-                 append_to_partition(LOCAL_ROOT_PATH, [region,DataSetId,Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, RowsIngested, 
+                 partition_writer.writerow([region,DataSetId,Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, RowsIngested, 
                   RowsDropped, RefreshTriggeredTime, RefreshTimeinSeconds, RequestSource,
                   RequestType,IngestionStatus,'NoErrorInfoType', 'NoErrorInfoMessage',
                   '', 'Orphaned', '', '',Type], RefreshTriggeredTime.strftime('%Y-%m-%d'))
@@ -178,34 +267,34 @@ while True:
                 if len(principal)==4:
                   principal = principal[2]+'/'+principal[3]
                   if len(ErrorInfoMessage) <= 100:
-                       append_to_partition(LOCAL_ROOT_PATH, [region,DataSetId, Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, '', 
+                       partition_writer.writerow([region,DataSetId, Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, '', 
                        '', RefreshTriggeredTime, '', RequestSource,
                         RequestType,IngestionStatus,ErrorInfoType,ErrorInfoMessage[0:50]+'-'+ "Please refer dataset refresh summary for complete error",
                         ptype, principal, additional_info, actions,Type], RefreshTriggeredTime.strftime('%Y-%m-%d'))
                   elif len(ErrorInfoMessage) >= 100:
-                        append_to_partition(LOCAL_ROOT_PATH, [region,DataSetId, Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, '', '', RefreshTriggeredTime, '', RequestSource,
+                        partition_writer.writerow([region,DataSetId, Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, '', '', RefreshTriggeredTime, '', RequestSource,
                               RequestType,IngestionStatus,ErrorInfoType, "Please refer dataset refresh summary for complete error",ptype, principal, additional_info, actions,Type], RefreshTriggeredTime.strftime('%Y-%m-%d'))
                 elif len(principal)==3:
                      principal = principal[2]
                      if len(ErrorInfoMessage) <= 100:
-                       append_to_partition(LOCAL_ROOT_PATH, [region,DataSetId, Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, '', 
+                       partition_writer.writerow([region,DataSetId, Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, '', 
                        '', RefreshTriggeredTime, '', RequestSource,
                         RequestType,IngestionStatus,ErrorInfoType,
                         ErrorInfoMessage[0:50]+'-'+ "Please refer dataset refresh summary for complete error",
                         ptype, principal, additional_info, actions,Type], RefreshTriggeredTime.strftime('%Y-%m-%d'))
                      elif len(ErrorInfoMessage) >= 100:
-                        append_to_partition(LOCAL_ROOT_PATH, [region,DataSetId, Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, '', '', RefreshTriggeredTime, '', RequestSource,
+                        partition_writer.writerow([region,DataSetId, Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, '', '', RefreshTriggeredTime, '', RequestSource,
                               RequestType,IngestionStatus,ErrorInfoType, "Please refer dataset refresh summary for complete error",
                               ptype, principal, additional_info, actions,Type], RefreshTriggeredTime.strftime('%Y-%m-%d'))
            elif permissions == []:
                if len(ErrorInfoMessage) <= 100:
-                      append_to_partition(LOCAL_ROOT_PATH, [region,DataSetId, Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, '', 
+                      partition_writer.writerow([region,DataSetId, Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, '', 
                         '', RefreshTriggeredTime, '', RequestSource,
                          RequestType,IngestionStatus,ErrorInfoType,
                          ErrorInfoMessage[0:50]+'-'+ "Please refer dataset refresh summary for complete error",
                          '', 'Orphaned', '', '',Type], RefreshTriggeredTime.strftime('%Y-%m-%d'))
                elif len(ErrorInfoMessage) >= 100:
-                      append_to_partition(LOCAL_ROOT_PATH, [region,DataSetId, Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, '', 
+                      partition_writer.writerow([region,DataSetId, Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, '', 
                            '', RefreshTriggeredTime, '', RequestSource,
                             RequestType,IngestionStatus,ErrorInfoType, 
                             "Please refer dataset refresh summary for complete error",
@@ -222,18 +311,18 @@ while True:
                 additional_info = principal[-2]
                 if len(principal)==4:
                   principal = principal[2]+'/'+principal[3]
-                  append_to_partition(LOCAL_ROOT_PATH, [region,DataSetId,Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, '', 
+                  partition_writer.writerow([region,DataSetId,Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, '', 
                    '', RefreshTriggeredTime, '', RequestSource,
                     RequestType,IngestionStatus,'NoErrorInfoType', 'NoErrorInfoMessage',
                     ptype, principal, additional_info, actions,Type], RefreshTriggeredTime.strftime('%Y-%m-%d'))
                 elif len(principal)==3:
                      principal = principal[2]
-                     append_to_partition(LOCAL_ROOT_PATH, [region,DataSetId,Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, '', 
+                     partition_writer.writerow([region,DataSetId,Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, '', 
                      '', RefreshTriggeredTime, '', RequestSource,
                       RequestType,IngestionStatus,'NoErrorInfoType', 'NoErrorInfoMessage',
                       ptype, principal, additional_info, actions,Type], RefreshTriggeredTime.strftime('%Y-%m-%d'))
           elif permissions == []:
-                 append_to_partition(LOCAL_ROOT_PATH, [region,DataSetId,Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, '', 
+                 partition_writer.writerow([region,DataSetId,Name , LastUpdatedTime, ImportMode,ConsumedSpiceCapacityInBytes, '', 
                       '', RefreshTriggeredTime, '', RequestSource,
                       RequestType,IngestionStatus,'NoErrorInfoType', 'NoErrorInfoMessage',
                       '', 'Orphaned', '', '',Type], RefreshTriggeredTime.strftime('%Y-%m-%d'))
@@ -243,11 +332,5 @@ while True:
    if next_token is None:
     break
 
-# Upload the CSV file to S3
-for part_dir in os.listdir(LOCAL_ROOT_PATH):
-    for file in os.listdir(os.path.join(LOCAL_ROOT_PATH, part_dir)):
-        path = os.path.join(LOCAL_ROOT_PATH, part_dir, file)
-        key = f'{KEY}/{part_dir}/{file}'
-        bucket.upload_file(path, key)   
-
-
+# Upload the remaining part files to S3
+partition_writer.close()
@@ -16,6 +16,7 @@ from awsglue.context import GlueContext
 from pyspark.context import SparkContext
 from awsglue.job import Job
 import botocore
+from admin_suite_runtime import runtime, DescribeCache, optional_job_args, COLLECTOR_OPTIONS, IncrementalSnapshot, TableOutput
 
 # Initialize Spark context and Glue context
 sc = SparkContext()
@@ -28,12 +29,16 @@ job.init(args['JOB_NAME'], args)
 aws_region = args['AWS_REGION']
 quicksight_identity_region = args['QUICKSIGHT_IDENTITY_REGION']
 s3_output_path = args['S3_OUTPUT_PATH']
+job_options = optional_job_args(sys.argv, COLLECTOR_OPTIONS)
+incremental_mode = job_options['COLLECTION_MODE'] == 'incremental'
+output = TableOutput(s3_output_path, aws_region, job_options['OUTPUT_FORMAT'], job_options['PARQUET_OUTPUT_PATH'])
+describe_cache = DescribeCache()
 
 # Initialize AWS service clients for SNS, QuickSight and STS
 client = boto3.client('sns')
 # Use QuickSight Identity Region for QuickSight client
-client1 = boto3.client('quicksight', region_name=aws_region)
-client2 = boto3.client('sts')
+client1 = runtime.client('quicksight', aws_region)
+client2 = runtime.client('sts')
 aws_account_id = client2.get_caller_identity()['Account']
 
 # Initialize S3 resource and set up bucket name
@@ -50,147 +55,110 @@ tmpdir = tempfile.mkdtemp()
 local_file_name = 'qs-datasource-info.csv'
 path = os.path.join(tmpdir, local_file_name)
 
-# Initialize list to store datasource dependencies and pagination token
+def list_all(func, attr_name):
+   # Handle pagination for list APIs
+   response = func(AwsAccountId=aws_account_id)
+   result = response[attr_name]
+   while response.get('NextToken', None) is not None:
+     response = func(AwsAccountId=aws_account_id, NextToken=response['NextToken'])
+     result += response[attr_name]
+   return result
+
+def datasource_row(DataSourceArn, dsname, DataSetId, datasetLastUpdatedTime, datasetCreatedTime):
+   DataSourceid = DataSourceArn.split("/")
+   DataSourceid = DataSourceid[-1]
+   try:
+      datasource = describe_cache.get('describe_data_source', DataSourceid,
+                                      lambda: client1.describe_data_source(AwsAccountId=aws_account_id, DataSourceId=DataSourceid))
+      datasourcename = datasource['DataSource']['Name']
+      Type = datasource['DataSource']['Type']
+      return [aws_region,datasourcename, DataSourceid, dsname,Type, DataSetId, datasetLastUpdatedTime,datasetCreatedTime]
+   except Exception as e:
+      return [aws_region,'Not-found', DataSourceid, dsname, 'Not-found', DataSetId, datasetLastUpdatedTime,datasetCreatedTime]
+
+def collect_dataset(dataset):
+   """Return the datasource rows of one dataset."""
+   rows = []
+   DataSetId = dataset['DataSetId']
+   try:
+      # Get detailed information about the dataset
+      response5 = client1.describe_data_set(AwsAccountId=aws_account_id, DataSetId= DataSetId)
+      dsname = response5['DataSet']['Name']
+      print(dsname)
+      datasetLastUpdatedTime = response5['DataSet']['LastUpdatedTime']
+      datasetCreatedTime = response5['DataSet']['CreatedTime']
+      PhysicalTableMap = response5['DataSet']['PhysicalTableMap']
+
+      # Process each table in the physical table map (RelationalTable, CustomSql and S3Source datasources)
+      for sql in PhysicalTableMap:
+         sql = PhysicalTableMap[sql]
+         for table_type in ('RelationalTable', 'CustomSql', 'S3Source'):
+            if table_type in sql:
+               rows.append(datasource_row(sql[table_type]['DataSourceArn'], dsname, DataSetId,
+                                          datasetLastUpdatedTime, datasetCreatedTime))
+
+   # Handle exceptions for unsupported dataset types
+   except botocore.exceptions.ClientError as error:
+      if error.response['Error']['Code'] == 'InvalidParameterValueException' and 'File source type is not supported' in str(error):
+         rows.append([aws_region,'N/A', 'N/A', dataset['Name'], 'File type', DataSetId, dataset['LastUpdatedTime'],dataset['CreatedTime']])
+      else:
+         raise error
+   except Exception as e:
+      if str(e).find('data set type is not supported') != -1:
+         # Handle file-type datasets from the list_data_sets summary
+         rows.append([aws_region,'N/A', 'N/A', dataset['Name'], 'File type', DataSetId, dataset['LastUpdatedTime'],dataset['CreatedTime']])
+      else:
+         raise e
+   return rows
+
+# Rows of datasets whose own LastUpdatedTime and datasources' LastUpdatedTime did not move are reused in incremental mode
+snapshot = IncrementalSnapshot.load(bucket, s3_prefix, 'datasource_property', incremental_mode,
+                                    float(job_options['INCREMENTAL_MAX_AGE_HOURS']))
+datasource_versions = {datasource['DataSourceId']: str(datasource.get('LastUpdatedTime'))
+                       for datasource in list_all(client1.list_data_sources, 'DataSources')}
+
+# Initialize list to store datasource dependencies
 datasourcedependent = []
-next_token = None
-   
+
 # Main loop to process all datasets
-while True:
-   # Handle pagination for listing datasets
-   if next_token:
-     response4 = client1.list_data_sets(AwsAccountId=aws_account_id,NextToken=next_token)
-   else:
-     response4 = client1.list_data_sets(AwsAccountId=aws_account_id)
-   datasets = response4['DataSetSummaries']
-
-   # Process each dataset
-   for dataset in datasets:
-     DataSetId = dataset['DataSetId']
-     try:
-                # Get detailed information about the dataset
-                response5 = client1.describe_data_set(AwsAccountId=aws_account_id, DataSetId= DataSetId)
-                dsname = response5['DataSet']['Name']
-                print(dsname)
-                datasetLastUpdatedTime = response5['DataSet']['LastUpdatedTime']
-                print(datasetLastUpdatedTime)
-                datasetCreatedTime = response5['DataSet']['CreatedTime']
-                PhysicalTableMap = response5['DataSet']['PhysicalTableMap']
-                print(PhysicalTableMap)
-
-                # Process each table in the physical table map
-                for sql in PhysicalTableMap:
-                    sql = PhysicalTableMap[sql]
-
-                    # Handle RelationalTable type datasource
-                    if 'RelationalTable' in sql:
-                        DataSourceArn = sql['RelationalTable']['DataSourceArn']
-                        DataSourceid = DataSourceArn.split("/")
-                        DataSourceid = DataSourceid[-1]
-                        try:
-                           datasource = client1.describe_data_source(AwsAccountId=aws_account_id, DataSourceId=DataSourceid)
-                           datasourcename = datasource['DataSource']['Name']
-                           Type = datasource['DataSource']['Type']
-                           datasourcedependent.append(
-                            [aws_region,datasourcename, DataSourceid, dsname,Type, DataSetId, datasetLastUpdatedTime,datasetCreatedTime])
-                        except Exception as e:
-                            datasourcedependent.append(
-                            [aws_region,'Not-found', DataSourceid, dsname, 'Not-found', DataSetId, datasetLastUpdatedTime,datasetCreatedTime])
-                        
-                    # Handle CustomSQL type datasource
-                    if 'CustomSql' in sql:
-                        DataSourceArn = sql['CustomSql']['DataSourceArn']
-                        DataSourceid = DataSourceArn.split("/")
-                        DataSourceid = DataSourceid[-1]
-                        try:
-                            datasource = client1.describe_data_source(AwsAccountId=aws_account_id, DataSourceId=DataSourceid)
-                            datasourcename = datasource['DataSource']['Name']
-                            Type = datasource['DataSource']['Type']
-                            datasourcedependent.append(
-                                [aws_region,datasourcename, DataSourceid, dsname,Type, DataSetId, datasetLastUpdatedTime,datasetCreatedTime])
-                        except Exception as e:
-                            datasourcedependent.append(
-                            [aws_region,'Not-found', DataSourceid, dsname, 'Not-found', DataSetId, datasetLastUpdatedTime,datasetCreatedTime])
-                        
-                    # Handle S3Source type datasource
-                    if 'S3Source' in sql:
-                        DataSourceArn = sql['S3Source']['DataSourceArn']
-                        DataSourceid = DataSourceArn.split("/")
-                        DataSourceid = DataSourceid[-1]
-                        try:
-                            datasource = client1.describe_data_source(AwsAccountId=aws_account_id, DataSourceId=DataSourceid)
-                            datasourcename = datasource['DataSource']['Name']
-                            Type = datasource['DataSource']['Type']
- 
-                            datasourcedependent.append(
-                            [aws_region,datasourcename, DataSourceid, dsname,Type, DataSetId, datasetLastUpdatedTime,datasetCreatedTime])
-                        except Exception as e:
-                            datasourcedependent.append(
-                            [aws_region,'Not-found', DataSourceid, dsname, 'Not-found', DataSetId, datasetLastUpdatedTime,datasetCreatedTime])
-                    
-     # Handle exceptions for unsupported dataset types                   
-     except botocore.exceptions.ClientError as error:
-              if error.response['Error']['Code'] == 'InvalidParameterValueException' and 'File source type is not supported' in str(error):
-                dsname = dataset['Name']
-                datasetLastUpdatedTime = dataset['LastUpdatedTime']
-                datasetCreatedTime = dataset['CreatedTime']
-                datasourcedependent.append(
-                 [aws_region,'N/A', 'N/A', dsname, 'File type', DataSetId, datasetLastUpdatedTime,datasetCreatedTime])
-              else:
-                raise error
-     except Exception as e:
-              if str(e).find('data set type is not supported') != -1:
-                pass
-                token = None
-                # Handle file-type datasets
-                while True:
-                   if token:
-                       response00 = client1.list_data_sets(AwsAccountId=aws_account_id,NextToken=token)
-                   else:
-                      response00= client1.list_data_sets(AwsAccountId=aws_account_id)
-                   count = -1
-                   DataSetSummaries = response00["DataSetSummaries"]
-                   for datasetid in DataSetSummaries:
-                         dsid = datasetid["DataSetId"]
-                         count=count+1
-                         if  dsid == DataSetId :
-                           dsname = response00["DataSetSummaries"][count]['Name']
-                           datasetLastUpdatedTime = response00["DataSetSummaries"][count]['LastUpdatedTime']
-                           datasetCreatedTime = response00["DataSetSummaries"][count]['CreatedTime']
-                           count = -1
-                           datasourcedependent.append(
-                            [aws_region,'N/A', 'N/A', dsname, 'File type', DataSetId, datasetLastUpdatedTime,datasetCreatedTime])
-                           break
-                   token = response00.get('NextToken', None)
-                   if token is None:
-                     break
-              else:
-                raise e
-   
-   # Check for more datasets to process (pagination)
-   next_token = response4.get('NextToken', None)
-   if next_token is None:
-    break
-   
+for dataset in list_all(client1.list_data_sets, 'DataSetSummaries'):
+   DataSetId = dataset['DataSetId']
+   version = str(dataset['LastUpdatedTime'])
+   rows = snapshot.lookup(DataSetId, version, datasource_versions)
+   if rows is None:
+      rows = collect_dataset(dataset)
+      snapshot.store(DataSetId, version, rows, {row[2]: datasource_versions.get(row[2]) for row in rows if row[2] != 'N/A'})
+   datasourcedependent += rows
+
 # Define column titles for the CSV output
 column_titles = ['Region', 'DataSourceName', 'DataSourceID', 'DatasetName', 'DataSourceType', 'DatasetID', 'DatasetLastUpdatedTime', 'DatasetCreatedTime']
 
-# Write data to CSV file
-try:
-    with open(path, 'w', newline='') as outfile:
-        writer = csv.writer(outfile, delimiter=',')
-        writer.writerow(column_titles)
-        for line in datasourcedependent:
-            writer.writerow(line)
-except IOError as e:
-    print(f"Error writing CSV file: {e}")
-    raise
-
-# Upload CSV file to S3
-try:
-    bucket.upload_file(path, key)
-except botocore.exceptions.ClientError as e:
-    print(f"Error uploading to S3: {e}")
-    raise
+if output.csv:
+    # Write data to CSV file
+    try:
+        with open(path, 'w', newline='') as outfile:
+            writer = csv.writer(outfile, delimiter=',')
+            writer.writerow(column_titles)
+            for line in datasourcedependent:
+                writer.writerow(line)
+    except IOError as e:
+        print(f"Error writing CSV file: {e}")
+        raise
+
+    # Upload CSV file to S3
+    try:
+        bucket.upload_file(path, key)
+    except botocore.exceptions.ClientError as e:
+        print(f"Error uploading to S3: {e}")
+        raise
+
+output.write('datasource_property', datasourcedependent)
+output.flush()
+
+snapshot.save()
+print(f"Snapshot {snapshot.report()}")
+print(f"Client runtime: {runtime.report()}")
+print(f"Data source {describe_cache.report()}")
 
 # Commit the Glue job
 job.commit()
\ No newline at end of file
@@ -5,35 +5,24 @@ import csv
 import io
 import os
 import tempfile
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional
 import sys
 from awsglue.utils import getResolvedOptions
 from awsglue.context import GlueContext
 from pyspark.context import SparkContext
 from awsglue.job import Job
-import botocore
+from admin_suite_runtime import runtime, call_with_backoff, rate_limiter, optional_job_args, COLLECTOR_OPTIONS, IncrementalSnapshot, TableOutput
+from concurrent.futures import ThreadPoolExecutor
+
+FOLDER_MAX_WORKERS = 8
+runtime.configure(max_workers=FOLDER_MAX_WORKERS)
 
 # Initialize Spark context and Glue context
 sc = SparkContext()
 glueContext = GlueContext(sc)
 job = Job(glueContext)
 
-def default_botocore_config() -> botocore.config.Config:
-    """Botocore configuration."""
-    retries_config: Dict[str, Union[str, int]] = {
-        "max_attempts": int(os.getenv("AWS_MAX_ATTEMPTS", "5")),
-    }
-    mode: Optional[str] = os.getenv("AWS_RETRY_MODE")
-    if mode:
-        retries_config["mode"] = mode
-    return botocore.config.Config(
-        retries=retries_config,
-        connect_timeout=10,
-        max_pool_connections=10,
-        user_agent_extra=f"qs_sdk_admin_console",
-    )
-
-sts_client = boto3.client("sts", config=default_botocore_config())
+sts_client = runtime.client('sts')
 account_id = sts_client.get_caller_identity()["Account"]
 args = getResolvedOptions(sys.argv, ['JOB_NAME', 'AWS_REGION', 'S3_OUTPUT_PATH'])
 job.init(args['JOB_NAME'], args)
@@ -41,8 +30,11 @@ print('region', args['AWS_REGION'])
 aws_region = args['AWS_REGION']
 glue_aws_region = args['AWS_REGION']
 s3_output_path = args['S3_OUTPUT_PATH']
-qs_client = boto3.client('quicksight', config=default_botocore_config())
-qs_local_client = boto3.client('quicksight', region_name=glue_aws_region, config=default_botocore_config())
+job_options = optional_job_args(sys.argv, COLLECTOR_OPTIONS)
+incremental_mode = job_options['COLLECTION_MODE'] == 'incremental'
+output = TableOutput(s3_output_path, glue_aws_region, job_options['OUTPUT_FORMAT'], job_options['PARQUET_OUTPUT_PATH'])
+qs_client = runtime.client('quicksight')
+qs_local_client = runtime.client('quicksight', glue_aws_region)
 
 def _list(
         func_name: str,
@@ -50,7 +42,7 @@ def _list(
         account_id: str,
         aws_region: str,
         **kwargs, ) -> List[Dict[str, Any]]:
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region)
     func: Callable = getattr(qs_client, func_name)
     response = func(AwsAccountId=account_id, **kwargs)
     next_token: str = response.get("NextToken", None)
@@ -144,7 +136,7 @@ def _describe(
         account_id: str,
         aws_region: str,
         **kwargs, ) -> Dict[str, Any]:
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region)
     func: Callable = getattr(qs_client, func_name)
     response = func(AwsAccountId=account_id, **kwargs)
     result = response[attr_name]
@@ -165,7 +157,7 @@ def describe_folder(
 
 
 def describe_dashboard(account_id, dashboardid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region)
     res = qs_client.describe_dashboard(
         AwsAccountId=account_id,
         DashboardId=dashboardid
@@ -174,7 +166,7 @@ def describe_dashboard(account_id, dashboardid, aws_region):
 
 
 def describe_folder_permissions(account_id, folderid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region)
     res = qs_client.describe_folder_permissions(
         AwsAccountId=account_id,
         FolderId=folderid
@@ -183,7 +175,7 @@ def describe_folder_permissions(account_id, folderid, aws_region):
 
 
 def describe_analysis(account_id, id, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region)
     res = qs_client.describe_analysis(
         AwsAccountId=account_id,
         AnalysisId=id
@@ -192,7 +184,7 @@ def describe_analysis(account_id, id, aws_region):
 
 
 def describe_data_set(account_id, id, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region)
     res = qs_client.describe_data_set(
         AwsAccountId=account_id,
         DataSetId=id
@@ -201,7 +193,7 @@ def describe_data_set(account_id, id, aws_region):
 
 
 def describe_data_source(account_id, id, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region)
     res = qs_client.describe_data_source(
         AwsAccountId=account_id,
         DataSourceId=id
@@ -210,7 +202,7 @@ def describe_data_source(account_id, id, aws_region):
 
 
 def describe_dashboard_permissions(account_id, dashboardid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region)
     res = qs_client.describe_dashboard_permissions(
         AwsAccountId=account_id,
         DashboardId=dashboardid
@@ -219,7 +211,7 @@ def describe_dashboard_permissions(account_id, dashboardid, aws_region):
 
 
 def describe_analysis_permissions(account_id, aid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region)
     res = qs_client.describe_analysis_permissions(
         AwsAccountId=account_id,
         AnalysisId=aid
@@ -228,7 +220,7 @@ def describe_analysis_permissions(account_id, aid, aws_region):
 
 
 def describe_theme_permissions(account_id, aid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region)
     res = qs_client.describe_theme_permissions(
         AwsAccountId=account_id,
         ThemeId=aid
@@ -261,7 +253,7 @@ def list_datasources(
 
 
 def describe_data_set_permissions(account_id, datasetid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region)
     res = qs_client.describe_data_set_permissions(
         AwsAccountId=account_id,
         DataSetId=datasetid
@@ -270,7 +262,7 @@ def describe_data_set_permissions(account_id, datasetid, aws_region):
 
 
 def describe_data_source_permissions(account_id, DataSourceId, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region)
     res = qs_client.describe_data_source_permissions(
         AwsAccountId=account_id,
         DataSourceId=DataSourceId
@@ -278,8 +270,58 @@ def describe_data_source_permissions(account_id, DataSourceId, aws_region):
     return res
 
 
+class FolderTree:
+    """In-memory folder hierarchy (id -> name, parent id).
+
+    Built from one describe_folder per folder; full paths are computed by a
+    memoized walk up the parents instead of describing every ancestor again.
+    """
+
+    def __init__(self, describe: Callable[[str], Dict[str, Any]]):
+        self.describe = describe
+        self.nodes: Dict[str, Any] = {}
+        self._paths: Dict[str, str] = {}
+
+    def add(self, folder_details: Dict[str, Any]):
+        ancestors = folder_details.get('FolderPath', [])
+        parent = ancestors[-1].split("/")[-1] if len(ancestors) > 0 else None
+        self.nodes[folder_details['FolderId']] = (folder_details['Name'], parent)
+
+    def _node(self, folderid: str):
+        if folderid not in self.nodes:
+            # ancestor outside list_folders results, e.g. shared from another owner
+            self.add(self.describe(folderid))
+        return self.nodes[folderid]
+
+    def parent(self, folderid: str) -> Optional[str]:
+        return self._node(folderid)[1]
+
+    def path(self, folderid: str) -> str:
+        """Return the folder path in the '\\parent\\child\\' format of folder_path.csv."""
+        if folderid in self._paths:
+            return self._paths[folderid]
+        parent = self.parent(folderid)
+        if parent is None:
+            folderpath = '\\'
+        else:
+            folderpath = self.path(parent) + self._node(parent)[0] + '\\'
+        self._paths[folderid] = folderpath
+        return folderpath
+
+
+def collect_folder(folder):
+    """Fetch details, permissions and members of one folder."""
+    folderid = folder['FolderId']
+    folder_details = call_with_backoff(lambda: describe_folder(account_id, folderid, glue_aws_region))
+    permissions = call_with_backoff(lambda: describe_folder_permissions(account_id, folderid, glue_aws_region))
+    members = call_with_backoff(lambda: list_folder_members(account_id, glue_aws_region, folderid))
+    # keep only what the tree needs, so the result can be stored in the incremental snapshot
+    folder_details = {key: folder_details[key] for key in ('FolderId', 'Name', 'FolderPath') if key in folder_details}
+    return [folder_details, permissions, members]
+
+
 if __name__ == "__main__":
-    sts_client = boto3.client("sts", region_name=aws_region, config=default_botocore_config())
+    sts_client = runtime.client('sts', aws_region)
     account_id = sts_client.get_caller_identity()["Account"]
 
     # call s3 bucket
@@ -307,12 +349,31 @@ if __name__ == "__main__":
     folder_path = []
 
     folders = list_folders(account_id, glue_aws_region)
-
-    for folder in folders:
+    print(f"Found {len(folders)} folders")
+
+    # In incremental mode folders whose LastUpdatedTime did not move reuse the previous run
+    snapshot = IncrementalSnapshot.load(bucket, s3_prefix, 'folder_assets', incremental_mode,
+                                        float(job_options['INCREMENTAL_MAX_AGE_HOURS']))
+    collected = [snapshot.lookup(folder['FolderId'], str(folder['LastUpdatedTime'])) for folder in folders]
+    changed = [folder for folder, result in zip(folders, collected) if result is None]
+
+    # Per-folder calls run in parallel; results keep the list_folders order
+    with ThreadPoolExecutor(max_workers=FOLDER_MAX_WORKERS) as executor:
+        fresh = iter(executor.map(collect_folder, changed))
+        for i, folder in enumerate(folders):
+            if collected[i] is None:
+                collected[i] = next(fresh)
+                snapshot.store(folder['FolderId'], str(folder['LastUpdatedTime']), collected[i])
+    print(f"Folder details collected for {len(changed)} of {len(folders)} folders: {rate_limiter.report()}")
+
+    tree = FolderTree(lambda folderid: call_with_backoff(lambda: describe_folder(account_id, folderid, glue_aws_region)))
+    for folder_details, permissions, members in collected:
+        tree.add(folder_details)
+
+    for folder, (folder_details, permissions, members) in zip(folders, collected):
         folderid = folder['FolderId']
         folderarn = folder['Arn']
         foldername = folder['Name']
-        permissions = describe_folder_permissions(account_id, folderid, glue_aws_region)
         for principal in permissions:
             actions = '|'.join(principal['Actions'])
             principal = principal['Principal'].split("/")
@@ -327,52 +388,51 @@ if __name__ == "__main__":
             access.append(
                 [account_id, glue_aws_region, 'folder', foldername, folderid, folderarn, ptype, principal,
                  additional_info, actions])
-        members = list_folder_members(account_id, glue_aws_region, folderid)
         for member in members:
             memberid = member['MemberId']
             # get member which is not a folder
             folder_assets.append([glue_aws_region, folderid, memberid])
         # get member which is a folder
-        folder_details = describe_folder(account_id, folderid, glue_aws_region)
-        if len(folder_details['FolderPath']) > 0:
-            parent = folder_details['FolderPath'][-1]
-            parent = parent.split("/")[-1]
+        parent = tree.parent(folderid)
+        if parent is not None:
             folder_assets.append([glue_aws_region, parent, folderid])
 
-        folderpath = '\\'
-        if len(folder_details['FolderPath']) > 0:
-            for f in folder_details['FolderPath']:
-                parentid = f.split("/")[-1]
-                parentdeatils = describe_folder(account_id, parentid, glue_aws_region)
-                parentname = parentdeatils['Name']
-                folderpath = folderpath + parentname + '\\'
-
-        folder_path.append([glue_aws_region, folderid, foldername, folderpath])
-
-    with open(path_relation, 'w', newline='') as outfile:
-        writer = csv.writer(outfile, delimiter=',')
-        for line in folder_assets:
-            writer.writerow(line)
-    outfile.close()
-    # upload file from tmp to s3 key
-
-    bucket.upload_file(path_relation, key_relation)
-
-    with open(path_lk, 'w', newline='') as outfile:
-        writer = csv.writer(outfile, delimiter=',')
-        for line in access:
-            writer.writerow(line)
-    outfile.close()
-    # upload file from tmp to s3 key
-    bucket.upload_file(path_lk, key_lk)
-
-    with open(path_path, 'w', newline='') as outfile:
-        writer = csv.writer(outfile, delimiter=',')
-        for line in folder_path:
-            writer.writerow(line)
-    outfile.close()
-    # upload file from tmp to s3 key
-    bucket.upload_file(path_path, key_path)
+        folder_path.append([glue_aws_region, folderid, foldername, tree.path(folderid)])
+
+    if output.csv:
+        with open(path_relation, 'w', newline='') as outfile:
+            writer = csv.writer(outfile, delimiter=',')
+            for line in folder_assets:
+                writer.writerow(line)
+        outfile.close()
+        # upload file from tmp to s3 key
+
+        bucket.upload_file(path_relation, key_relation)
+
+        with open(path_lk, 'w', newline='') as outfile:
+            writer = csv.writer(outfile, delimiter=',')
+            for line in access:
+                writer.writerow(line)
+        outfile.close()
+        # upload file from tmp to s3 key
+        bucket.upload_file(path_lk, key_lk)
+
+        with open(path_path, 'w', newline='') as outfile:
+            writer = csv.writer(outfile, delimiter=',')
+            for line in folder_path:
+                writer.writerow(line)
+        outfile.close()
+        # upload file from tmp to s3 key
+        bucket.upload_file(path_path, key_path)
+
+    output.write('folder_assets', folder_assets)
+    output.write('folder_lk', access)
+    output.write('folder_path', folder_path)
+    output.flush()
+
+    snapshot.save()
+    print(f"Snapshot {snapshot.report()}")
+    print(f"Client runtime: {runtime.report()}")
 
     # Commit the Glue job
     job.commit()
\ No newline at end of file
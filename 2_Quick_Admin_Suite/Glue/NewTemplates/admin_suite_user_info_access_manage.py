@@ -5,49 +5,21 @@ import csv
 import io
 import os
 import tempfile
-import time
-import random
-from typing import Any, Callable, Dict, List, Optional, Union
+import itertools
+from typing import Any, Callable, Dict, List
 import sys
 from awsglue.utils import getResolvedOptions
 from awsglue.context import GlueContext
 from pyspark.context import SparkContext
 from awsglue.job import Job
 import botocore
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import threading
+from admin_suite_runtime import runtime, call_with_backoff, rate_limiter, optional_job_args, COLLECTOR_OPTIONS, IncrementalSnapshot, TableOutput
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
-def call_with_backoff(api_func: Callable, max_retries: int = 10, **kwargs):
-    """Call a boto3 API with exponential backoff + jitter for throttling."""
-    for attempt in range(max_retries):
-        try:
-            return api_func(**kwargs)
-        except botocore.exceptions.ClientError as e:
-            code = e.response['Error']['Code']
-            if code == 'ThrottlingException':
-                delay = min((2 ** attempt) + random.uniform(0, 1), 60)
-                print(f"Throttled on {api_func.__name__}, sleeping {delay:.1f}s (attempt {attempt + 1}/{max_retries})")
-                time.sleep(delay)
-            else:
-                raise
-    raise RuntimeError(f"Failed after {max_retries} retries due to throttling: {api_func.__name__}")
-
-#start-Initial set up for the sdk env#
-def default_botocore_config() -> botocore.config.Config:
-    """Botocore configuration."""
-    retries_config: Dict[str, Union[str, int]] = {
-        "max_attempts": int(os.getenv("AWS_MAX_ATTEMPTS", "5")),
-    }
-    mode: Optional[str] = os.getenv("AWS_RETRY_MODE")
-    if mode:
-        retries_config["mode"] = mode
-    return botocore.config.Config(
-        retries=retries_config,
-        connect_timeout=10,
-        max_pool_connections=10,
-        user_agent_extra=f"qs_sdk_admin_console",
-    )
-#end-Initial set up for the sdk env#
+#start-adaptive rate limiting of qs api calls#
+HARVEST_MAX_WORKERS = 8
+runtime.configure(max_workers=HARVEST_MAX_WORKERS)
+#end-adaptive rate limiting of qs api calls#
 
 #start-Initial set up for the glue and qs client of boto3#
 # Initialize Spark and Glue contexts
@@ -56,7 +28,7 @@ glueContext = GlueContext(sc)
 spark = glueContext.spark_session
 job = Job(glueContext)
 
-sts_client = boto3.client("sts", config=default_botocore_config())
+sts_client = runtime.client('sts')
 account_id = sts_client.get_caller_identity()["Account"]
 args = getResolvedOptions(sys.argv, ['JOB_NAME', 'AWS_REGION', 'S3_OUTPUT_PATH'])
 job.init(args['JOB_NAME'], args)
@@ -64,12 +36,16 @@ print('region', args['AWS_REGION'])
 aws_region = args['AWS_REGION']
 glue_aws_region = args['AWS_REGION']
 s3_output_path = args['S3_OUTPUT_PATH']
-qs_client = boto3.client('quicksight', config=default_botocore_config())
-qs_local_client = boto3.client('quicksight', region_name=glue_aws_region, config=default_botocore_config())
+job_options = optional_job_args(sys.argv, COLLECTOR_OPTIONS)
+incremental_mode = job_options['COLLECTION_MODE'] == 'incremental'
+output = TableOutput(s3_output_path, glue_aws_region, job_options['OUTPUT_FORMAT'], job_options['PARQUET_OUTPUT_PATH'])
+print('collection mode', job_options['COLLECTION_MODE'])
+qs_client = runtime.client('quicksight')
+qs_local_client = runtime.client('quicksight', glue_aws_region)
 
 print(glue_aws_region)
 
-ssm = boto3.client('ssm', region_name=glue_aws_region, config=default_botocore_config())
+ssm = runtime.client('ssm', glue_aws_region)
 #end-Initial set up for the glue and qs client of boto3#
 
 #start-advanced settings for ssm usage of qs-configuration#
@@ -90,19 +66,20 @@ def get_s3_info(account_id, glue_aws_region):
 #end-advanced settings for ssm usage of qs-configuration#
 
 #parent class of list* functions
+#each page takes its own rate_limiter token; throttled pages are retried by call_with_backoff
 def _list(
         func_name: str,
         attr_name: str,
         account_id: str,
         aws_region: str,
         **kwargs, ) -> List[Dict[str, Any]]:
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region, total_max_attempts=1)
     func: Callable = getattr(qs_client, func_name)
-    response = func(AwsAccountId=account_id, **kwargs)
+    response = call_with_backoff(func, AwsAccountId=account_id, **kwargs)
     next_token: str = response.get("NextToken", None)
     result: List[Dict[str, Any]] = response[attr_name]
     while next_token is not None:
-        response = func(AwsAccountId=account_id, NextToken=next_token, **kwargs)
+        response = call_with_backoff(func, AwsAccountId=account_id, NextToken=next_token, **kwargs)
         next_token = response.get("NextToken", None)
         result += response[attr_name]
     return result
@@ -284,7 +261,7 @@ def _describe(
         account_id: str,
         aws_region: str,
         **kwargs, ) -> List[Dict[str, Any]]:
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region)
     func: Callable = getattr(qs_client, func_name)
     response = func(AwsAccountId=account_id, **kwargs)
     result = response[attr_name]
@@ -305,7 +282,7 @@ def describe_folder(
     )
 
 def describe_dashboard(account_id, dashboardid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region)
     res = qs_client.describe_dashboard(
         AwsAccountId=account_id,
         DashboardId=dashboardid
@@ -314,7 +291,7 @@ def describe_dashboard(account_id, dashboardid, aws_region):
 
 
 def describe_analysis(account_id, id, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region)
     res = qs_client.describe_analysis(
         AwsAccountId=account_id,
         AnalysisId=id
@@ -323,7 +300,7 @@ def describe_analysis(account_id, id, aws_region):
 
 
 def describe_data_set(account_id, id, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region)
     res = qs_client.describe_data_set(
         AwsAccountId=account_id,
         DataSetId=id
@@ -332,7 +309,7 @@ def describe_data_set(account_id, id, aws_region):
 
 
 def describe_data_source(account_id, id, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region)
     res = qs_client.describe_data_source(
         AwsAccountId=account_id,
         DataSourceId=id
@@ -358,7 +335,7 @@ def describe_dashboard_permissions(
     account_id,
     dashboardid,
     aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region, total_max_attempts=1)
     res = qs_client.describe_dashboard_permissions(
         AwsAccountId=account_id,
         DashboardId=dashboardid
@@ -366,7 +343,7 @@ def describe_dashboard_permissions(
     return res
 
 def describe_analysis_permissions(account_id, aid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region, total_max_attempts=1)
     res = qs_client.describe_analysis_permissions(
         AwsAccountId=account_id,
         AnalysisId=aid
@@ -374,7 +351,7 @@ def describe_analysis_permissions(account_id, aid, aws_region):
     return res
 
 def describe_theme_permissions(account_id, aid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region, total_max_attempts=1)
     res = qs_client.describe_theme_permissions(
         AwsAccountId=account_id,
         ThemeId=aid
@@ -384,7 +361,7 @@ def describe_theme_permissions(account_id, aid, aws_region):
 
 
 def describe_data_set_permissions(account_id, datasetid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region, total_max_attempts=1)
     res = qs_client.describe_data_set_permissions(
         AwsAccountId=account_id,
         DataSetId=datasetid
@@ -393,7 +370,7 @@ def describe_data_set_permissions(account_id, datasetid, aws_region):
 
 
 def describe_data_source_permissions(account_id, DataSourceId, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = runtime.client('quicksight', aws_region, total_max_attempts=1)
     res = qs_client.describe_data_source_permissions(
         AwsAccountId=account_id,
         DataSourceId=DataSourceId
@@ -574,62 +551,42 @@ def process_user_groups(user_data):
     
     return results
 
-def process_users_parallel(user_list, csv_path, batch_size=30, max_workers=2):
-    """Process users in parallel and write incrementally"""
-    csv_lock = threading.Lock()
-    
-    with open(csv_path, 'w', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        
-        for i in range(0, len(user_list), batch_size):
-            batch = user_list[i:i+batch_size]
-            print(f"Processing user batch {i//batch_size + 1}/{(len(user_list)-1)//batch_size + 1}")
-            
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = {executor.submit(process_user_groups, user_data): user_data for user_data in batch}
-                
-                for future in as_completed(futures):
-                    try:
-                        results = future.result()
-                        if results:
-                            with csv_lock:
-                                for row in results:
-                                    writer.writerow(row)
-                    except Exception as e:
-                        print(f"Error in user parallel processing: {e}")
-            
-            # Small delay between batches
-            time.sleep(1)
-
-def process_assets_parallel(assets, process_func, batch_size=20, max_workers=2):
-    """Process assets in parallel batches and write incrementally"""
-    csv_lock = threading.Lock()
-    
-    with open(path, 'a', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        
-        for i in range(0, len(assets), batch_size):
-            batch = assets[i:i+batch_size]
-            print(f"Processing batch {i//batch_size + 1}/{(len(assets)-1)//batch_size + 1}")
-            
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = {executor.submit(process_func, asset): asset for asset in batch}
-                
-                for future in as_completed(futures):
-                    try:
-                        results = future.result()
-                        if results:
-                            with csv_lock:
-                                for row in results:
-                                    writer.writerow(row)
-                    except Exception as e:
-                        print(f"Error in parallel processing: {e}")
-            
-            # Add delay between batches to avoid throttling
-            time.sleep(2)
+def harvest(tasks, writers, max_workers=HARVEST_MAX_WORKERS):
+    """Run (output, process_func, item) tasks on one bounded pool.
+
+    Rows are written to writers[output] as soon as each task completes; at most
+    max_workers * 4 tasks are queued at once so large accounts stay bounded in
+    memory. Request pacing is left to rate_limiter via call_with_backoff, one
+    token per request (each page of a list); the clients of those requests do
+    not retry in botocore, so throttling reaches the limiter.
+    """
+    tasks = iter(tasks)
+    in_flight = {}
+    done_count = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            for output, process_func, item in tasks:
+                in_flight[executor.submit(process_func, item)] = output
+                if len(in_flight) >= max_workers * 4:
+                    break
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                output = in_flight.pop(future)
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    print(f"Error in parallel processing: {e}")
+                    continue
+                writers[output].writerows(rows)
+                done_count += 1
+                if done_count % 1000 == 0:
+                    print(f"Processed {done_count} items, {rate_limiter.report()}")
+    return done_count
 
 if __name__ == "__main__":
-    sts_client = boto3.client("sts", region_name=aws_region, config=default_botocore_config())
+    sts_client = runtime.client('sts', aws_region)
     account_id = sts_client.get_caller_identity()["Account"]
 
     # call s3 bucket
@@ -667,61 +624,71 @@ if __name__ == "__main__":
             continue
     
     print(f"Total users to process: {len(user_data_list)}")
-    
-    # Process users in parallel
-    try:
-        process_users_parallel(user_data_list, path)
-        print(f"User processing completed. File size: {os.path.getsize(path)} bytes")
-        bucket.upload_file(path, key)
-        print(f"Group membership CSV uploaded to {key}")
-    except Exception as e:
-        print(f"Error in user processing: {e}")
-        raise
 
-    path = os.path.join(tmpdir, local_file_name2)
-    print(f"Starting asset processing. Second CSV path: {path}")
-    
-    # Create empty CSV file first
-    with open(path, 'w', newline='') as csvfile:
-        pass
-    
+    path2 = os.path.join(tmpdir, local_file_name2)
     try:
-        # Process all asset types in parallel with reduced concurrency
-        print("Processing dashboards...")
+        print("Listing assets...")
         dashboards = list_dashboards(account_id, glue_aws_region)
         print(f"Found {len(dashboards)} dashboards")
-        process_assets_parallel(dashboards, process_dashboard_permissions)
-        
-        print("Processing datasets...")
         datasets = list_datasets(account_id, glue_aws_region)
         print(f"Found {len(datasets)} datasets")
-        process_assets_parallel(datasets, process_dataset_permissions)
-        
-        print("Processing datasources...")
         datasources = list_datasources(account_id, glue_aws_region)
         print(f"Found {len(datasources)} datasources")
-        process_assets_parallel(datasources, process_datasource_permissions)
-        
-        print("Processing analyses...")
         analyses = list_analyses(account_id, glue_aws_region)
         print(f"Found {len(analyses)} analyses")
-        process_assets_parallel(analyses, process_analysis_permissions)
-        
-        print("Processing themes...")
         themes = list_themes(account_id, glue_aws_region)
         print(f"Found {len(themes)} themes")
-        process_assets_parallel(themes, process_theme_permissions)
-        
-        print(f"Asset processing completed. File size: {os.path.getsize(path)} bytes")
-        
-        # upload file from tmp to s3 key
-        bucket.upload_file(path, key2)
-        print(f"Object access CSV uploaded to {key2}")
-        
+
+        # Per asset type snapshots; in incremental mode only assets whose LastUpdatedTime
+        # moved are described. Users carry no timestamp, so memberships are always collected.
+        snapshots = {
+            asset_type: IncrementalSnapshot.load(bucket, s3_prefix, f'object_access_{asset_type}', incremental_mode,
+                                                 float(job_options['INCREMENTAL_MAX_AGE_HOURS']))
+            for asset_type in ['dashboard', 'dataset', 'datasource', 'analysis', 'theme']
+        }
+        process_dashboard = snapshots['dashboard'].wrap(process_dashboard_permissions, 'DashboardId')
+        process_dataset = snapshots['dataset'].wrap(process_dataset_permissions, 'DataSetId')
+        process_datasource = snapshots['datasource'].wrap(process_datasource_permissions, 'DataSourceId')
+        process_analysis = snapshots['analysis'].wrap(process_analysis_permissions, 'AnalysisId')
+        process_theme = snapshots['theme'].wrap(process_theme_permissions, 'ThemeId')
+
+        tasks = itertools.chain(
+            (('group_membership', process_user_groups, user_data) for user_data in user_data_list),
+            (('object_access', process_dashboard, asset) for asset in dashboards),
+            (('object_access', process_dataset, asset) for asset in datasets),
+            (('object_access', process_datasource, asset) for asset in datasources),
+            (('object_access', process_analysis, asset) for asset in analyses),
+            (('object_access', process_theme, asset) for asset in themes),
+        )
+
+        # Process users and all asset types on one throttle-aware pool
+        with open(path, 'w', newline='') as membership_file, open(path2, 'w', newline='') as access_file:
+            writers = {'group_membership': output.writer('group_membership', csv.writer(membership_file)),
+                       'object_access': output.writer('object_access', csv.writer(access_file))}
+            processed = harvest(tasks, writers)
+        print(f"Processed {processed} users and assets: {rate_limiter.report()}")
+
+        if output.csv:
+            print(f"User processing completed. File size: {os.path.getsize(path)} bytes")
+            bucket.upload_file(path, key)
+            print(f"Group membership CSV uploaded to {key}")
+
+            print(f"Asset processing completed. File size: {os.path.getsize(path2)} bytes")
+            # upload file from tmp to s3 key
+            bucket.upload_file(path2, key2)
+            print(f"Object access CSV uploaded to {key2}")
+        output.flush()
+
+        for snapshot in snapshots.values():
+            snapshot.save()
+            print(f"Snapshot {snapshot.report()}")
+
     except Exception as e:
-        print(f"Error in asset processing: {e}")
+        print(f"Error in user and asset processing: {e}")
         raise
-    
+
+    print(f"Client runtime: {runtime.report()}")
+
     # Commit the job
     job.commit()
 
@@ -0,0 +1,110 @@
+"""
+This script is for dev/admin to compare the CSV and Parquet output of the collectors.
+Note:
+    no AWS account is needed: a synthetic object_access table is written to a local temp dir, once as the
+    comma-delimited CSV of admin_suite_user_info_access_manage.py and once as snappy Parquet through
+    rows_to_arrow() of admin_suite_runtime.py (OUTPUT_FORMAT=parquet).
+    "scan" is the bytes Athena reads for a query on object_id, principal_name and permissions:
+    the whole file for CSV, the compressed column chunks of those columns for Parquet.
+    requires pyarrow.
+Usage:
+    python benchmark_output_format.py [rows]    (default 5000000)
+"""
+
+"""
+import libraries
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+import pyarrow.parquet as pq
+from admin_suite_runtime import rows_to_arrow
+
+CHUNK_ROWS = 500000
+SCANNED_COLUMNS = ['object_id', 'principal_name', 'permissions']
+
+OBJECT_TYPES = ['dashboard', 'dataset', 'data_source', 'analysis', 'theme']
+PERMISSIONS = [
+    'quicksight:DescribeDashboard|quicksight:ListDashboardVersions|quicksight:QueryDashboard',
+    'quicksight:DescribeDataSet|quicksight:DescribeDataSetPermissions|quicksight:PassDataSet|quicksight:DescribeIngestion|quicksight:ListIngestions',
+    'quicksight:UpdateDashboardPermissions|quicksight:DescribeDashboard|quicksight:DeleteDashboard|quicksight:UpdateDashboard',
+]
+
+
+def synthetic_rows(count, seed=0):
+    rng = random.Random(seed)
+    users = ['user' + str(i) + '@example.com' for i in range(20000)]
+    for i in range(count):
+        object_type = rng.choice(OBJECT_TYPES)
+        object_id = '%08x-0000-4000-8000-%012x' % (i // 20, i // 20)
+        user = rng.choice(users)
+        yield ['123456789012', 'us-east-1', object_type, object_type + ' ' + str(i // 20), object_id, 'user',
+               'default/' + user, 'arn:aws:quicksight:us-east-1:123456789012:user/default/' + user, 'default',
+               rng.choice(PERMISSIONS)]
+
+
+def chunks(count):
+    rows = []
+    for row in synthetic_rows(count):
+        rows.append(row)
+        if len(rows) == CHUNK_ROWS:
+            yield rows
+            rows = []
+    if rows:
+        yield rows
+
+
+def write_csv(path, count):
+    start = time.perf_counter()
+    with open(path, 'w', newline='') as outfile:
+        writer = csv.writer(outfile, delimiter=',')
+        for rows in chunks(count):
+            writer.writerows(rows)
+    return time.perf_counter() - start
+
+
+def write_parquet(path, count):
+    start = time.perf_counter()
+    writer = None
+    for rows in chunks(count):
+        table = rows_to_arrow('object_access', rows)
+        if writer is None:
+            writer = pq.ParquetWriter(path, table.schema, compression='snappy')
+        writer.write_table(table)
+    writer.close()
+    return time.perf_counter() - start
+
+
+def parquet_scan_bytes(path, columns):
+    metadata = pq.ParquetFile(path).metadata
+    names = [metadata.schema.column(i).name for i in range(metadata.num_columns)]
+    scanned = 0
+    for group in range(metadata.num_row_groups):
+        row_group = metadata.row_group(group)
+        for i, name in enumerate(names):
+            if name in columns:
+                scanned += row_group.column(i).total_compressed_size
+    return scanned
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000000
+    tmpdir = tempfile.mkdtemp()
+    csv_path = os.path.join(tmpdir, 'object_access.csv')
+    parquet_path = os.path.join(tmpdir, 'object_access.parquet')
+
+    csv_seconds = write_csv(csv_path, count)
+    parquet_seconds = write_parquet(parquet_path, count)
+    csv_bytes = os.path.getsize(csv_path)
+    parquet_bytes = os.path.getsize(parquet_path)
+    parquet_scan = parquet_scan_bytes(parquet_path, SCANNED_COLUMNS)
+
+    print(str(count) + ' object_access rows')
+    print('csv:     write ' + str(round(csv_seconds, 1)) + 's, size ' + str(csv_bytes) + ' bytes, scan ' + str(csv_bytes) + ' bytes')
+    print('parquet: write ' + str(round(parquet_seconds, 1)) + 's, size ' + str(parquet_bytes) + ' bytes, scan ' + str(parquet_scan) + ' bytes')
+    print('scan reduction: ' + str(round(csv_bytes / max(parquet_scan, 1), 1)) + 'x')
+    os.remove(csv_path)
+    os.remove(parquet_path)
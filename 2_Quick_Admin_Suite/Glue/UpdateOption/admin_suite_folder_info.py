@@ -5,35 +5,45 @@ import csv
 import io
 import os
 import tempfile
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List
 import sys
 from awsglue.utils import getResolvedOptions
 import botocore
 
 def default_botocore_config() -> botocore.config.Config:
     """Botocore configuration."""
-    retries_config: Dict[str, Union[str, int]] = {
+    retries_config: Dict[str, Any] = {
         "max_attempts": int(os.getenv("AWS_MAX_ATTEMPTS", "5")),
     }
-    mode: Optional[str] = os.getenv("AWS_RETRY_MODE")
+    mode = os.getenv("AWS_RETRY_MODE")
     if mode:
         retries_config["mode"] = mode
     return botocore.config.Config(
         retries=retries_config,
         connect_timeout=10,
         max_pool_connections=10,
-        user_agent_extra=f"qs_sdk_admin_console",
+        user_agent_extra="qs_sdk_admin_console",
     )
 
-sts_client = boto3.client("sts", config=default_botocore_config())
+# This job is deployed without admin_suite_runtime, so it keeps its own clients: one per (service, region)
+_clients: Dict[Any, Any] = {}
+
+def client(service_name: str, region_name: str = None):
+    """boto3 client for service_name in region_name, created on first use and shared afterwards."""
+    key = (service_name, region_name)
+    if key not in _clients:
+        _clients[key] = boto3.client(service_name, region_name=region_name, config=default_botocore_config())
+    return _clients[key]
+
+sts_client = client('sts')
 account_id = sts_client.get_caller_identity()["Account"]
 aws_region = 'us-east-1'
 args = getResolvedOptions(sys.argv, ['AWS_REGION', 'S3_OUTPUT_PATH'])
 print('region', args['AWS_REGION'])
 glue_aws_region = args['AWS_REGION']
 s3_output_path = args['S3_OUTPUT_PATH']
-qs_client = boto3.client('quicksight', config=default_botocore_config())
-qs_local_client = boto3.client('quicksight', region_name=glue_aws_region, config=default_botocore_config())
+qs_client = client('quicksight')
+qs_local_client = client('quicksight', glue_aws_region)
 
 def _list(
         func_name: str,
@@ -41,7 +51,7 @@ def _list(
         account_id: str,
         aws_region: str,
         **kwargs, ) -> List[Dict[str, Any]]:
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     func: Callable = getattr(qs_client, func_name)
     response = func(AwsAccountId=account_id, **kwargs)
     next_token: str = response.get("NextToken", None)
@@ -135,7 +145,7 @@ def _describe(
         account_id: str,
         aws_region: str,
         **kwargs, ) -> Dict[str, Any]:
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     func: Callable = getattr(qs_client, func_name)
     response = func(AwsAccountId=account_id, **kwargs)
     result = response[attr_name]
@@ -156,7 +166,7 @@ def describe_folder(
 
 
 def describe_dashboard(account_id, dashboardid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     res = qs_client.describe_dashboard(
         AwsAccountId=account_id,
         DashboardId=dashboardid
@@ -165,7 +175,7 @@ def describe_dashboard(account_id, dashboardid, aws_region):
 
 
 def describe_folder_permissions(account_id, folderid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     res = qs_client.describe_folder_permissions(
         AwsAccountId=account_id,
         FolderId=folderid
@@ -174,7 +184,7 @@ def describe_folder_permissions(account_id, folderid, aws_region):
 
 
 def describe_analysis(account_id, id, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     res = qs_client.describe_analysis(
         AwsAccountId=account_id,
         AnalysisId=id
@@ -183,7 +193,7 @@ def describe_analysis(account_id, id, aws_region):
 
 
 def describe_data_set(account_id, id, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     res = qs_client.describe_data_set(
         AwsAccountId=account_id,
         DataSetId=id
@@ -192,7 +202,7 @@ def describe_data_set(account_id, id, aws_region):
 
 
 def describe_data_source(account_id, id, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     res = qs_client.describe_data_source(
         AwsAccountId=account_id,
         DataSourceId=id
@@ -201,7 +211,7 @@ def describe_data_source(account_id, id, aws_region):
 
 
 def describe_dashboard_permissions(account_id, dashboardid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     res = qs_client.describe_dashboard_permissions(
         AwsAccountId=account_id,
         DashboardId=dashboardid
@@ -210,7 +220,7 @@ def describe_dashboard_permissions(account_id, dashboardid, aws_region):
 
 
 def describe_analysis_permissions(account_id, aid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     res = qs_client.describe_analysis_permissions(
         AwsAccountId=account_id,
         AnalysisId=aid
@@ -219,7 +229,7 @@ def describe_analysis_permissions(account_id, aid, aws_region):
 
 
 def describe_theme_permissions(account_id, aid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     res = qs_client.describe_theme_permissions(
         AwsAccountId=account_id,
         ThemeId=aid
@@ -252,7 +262,7 @@ def list_datasources(
 
 
 def describe_data_set_permissions(account_id, datasetid, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     res = qs_client.describe_data_set_permissions(
         AwsAccountId=account_id,
         DataSetId=datasetid
@@ -261,7 +271,7 @@ def describe_data_set_permissions(account_id, datasetid, aws_region):
 
 
 def describe_data_source_permissions(account_id, DataSourceId, aws_region):
-    qs_client = boto3.client('quicksight', region_name=aws_region, config=default_botocore_config())
+    qs_client = client('quicksight', aws_region)
     res = qs_client.describe_data_source_permissions(
         AwsAccountId=account_id,
         DataSourceId=DataSourceId
@@ -270,7 +280,7 @@ def describe_data_source_permissions(account_id, DataSourceId, aws_region):
 
 
 if __name__ == "__main__":
-    sts_client = boto3.client("sts", region_name=aws_region, config=default_botocore_config())
+    sts_client = client('sts', aws_region)
     account_id = sts_client.get_caller_identity()["Account"]
 
     # call s3 bucket
@@ -363,4 +373,6 @@ if __name__ == "__main__":
             writer.writerow(line)
     outfile.close()
     # upload file from tmp to s3 key
-    bucket.upload_file(path_path, key_path)
\ No newline at end of file
+    bucket.upload_file(path_path, key_path)
+
+    print(f"Clients created: {len(_clients)}")
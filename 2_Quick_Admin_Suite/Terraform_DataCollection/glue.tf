@@ -12,6 +12,7 @@ resource "aws_glue_job" "admin_suite_user_info_access_manage" {
   default_arguments = {
     "--AWS_REGION"     = data.aws_region.current.name
     "--S3_OUTPUT_PATH" = "s3://admin-suite-${data.aws_caller_identity.current.account_id}/monitoring/quicksight/assets_access"
+    "--extra-py-files" = "s3://${var.script_bucket_name}/glue/scripts/2025/admin_suite_runtime.py"
   }
 
   glue_version      = "5.0"
@@ -39,6 +40,7 @@ resource "aws_glue_job" "admin_suite_dataset" {
   default_arguments = {
     "--AWS_REGION"     = data.aws_region.current.name
     "--S3_OUTPUT_PATH" = "s3://admin-suite-${data.aws_caller_identity.current.account_id}/monitoring/quicksight/dataset"
+    "--extra-py-files" = "s3://${var.script_bucket_name}/glue/scripts/2025/admin_suite_runtime.py"
   }
 
   glue_version      = "5.0"
@@ -66,6 +68,7 @@ resource "aws_glue_job" "admin_suite_folder" {
   default_arguments = {
     "--AWS_REGION"     = data.aws_region.current.name
     "--S3_OUTPUT_PATH" = "s3://admin-suite-${data.aws_caller_identity.current.account_id}/monitoring/quicksight/folder_assets"
+    "--extra-py-files" = "s3://${var.script_bucket_name}/glue/scripts/2025/admin_suite_runtime.py"
   }
 
   glue_version      = "5.0"
@@ -122,6 +125,7 @@ resource "aws_glue_job" "admin_suite_datasource" {
     "--AWS_REGION"                 = data.aws_region.current.name
     "--QUICKSIGHT_IDENTITY_REGION" = data.aws_region.current.name
     "--S3_OUTPUT_PATH"             = "s3://admin-suite-${data.aws_caller_identity.current.account_id}/monitoring/quicksight/datasource_property"
+    "--extra-py-files"             = "s3://${var.script_bucket_name}/glue/scripts/2025/admin_suite_runtime.py"
   }
 
   glue_version      = "5.0"
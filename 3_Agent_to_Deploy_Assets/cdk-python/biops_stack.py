@@ -1,9 +1,13 @@
 from aws_cdk import (
     Stack,
+    BundlingOptions,
     Duration,
     RemovalPolicy,
     CfnOutput,
     aws_lambda as _lambda,
+    aws_lambda_destinations as destinations,
+    aws_events as events,
+    aws_events_targets as targets,
     aws_apigateway as apigateway,
     aws_dynamodb as dynamodb,
     aws_iam as iam,
@@ -75,8 +79,24 @@ class BiopsStack(Stack):
             billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
             stream=dynamodb.StreamViewType.NEW_AND_OLD_IMAGES,
             point_in_time_recovery=True,
+            time_to_live_attribute="expiresAt",
             removal_policy=RemovalPolicy.DESTROY
         )
+        # Job listing queries these newest first instead of scanning the table. DynamoDB adds one global
+        # secondary index per table update, so an existing table gets them over several deploys:
+        # cdk deploy -c jobTableIndexes=1, then 2, then a plain cdk deploy (all of them)
+        job_table_indexes = [("status-createdAt-index", "status"),
+                             ("initiatedBy-createdAt-index", "initiatedBy"),
+                             ("jobKind-createdAt-index", "jobKind")]
+        index_count = self.node.try_get_context("jobTableIndexes")
+        if index_count is not None:
+            job_table_indexes = job_table_indexes[:int(index_count)]
+        for index_name, partition_key in job_table_indexes:
+            job_table.add_global_secondary_index(
+                index_name=index_name,
+                partition_key=dynamodb.Attribute(name=partition_key, type=dynamodb.AttributeType.STRING),
+                sort_key=dynamodb.Attribute(name="createdAt", type=dynamodb.AttributeType.STRING)
+            )
 
         # Lambda Layer
         shared_layer = _lambda.LayerVersion(
@@ -105,7 +125,7 @@ class BiopsStack(Stack):
                                 "dynamodb:PutItem",
                                 "dynamodb:UpdateItem",
                                 "dynamodb:GetItem",
-                                "dynamodb:Scan",
+                                "dynamodb:Query",
                                 "lambda:InvokeFunction"
                             ],
                             resources=["*"]
@@ -137,7 +157,12 @@ class BiopsStack(Stack):
             layers=[shared_layer],
             role=lambda_role,
             timeout=Duration.minutes(5),
-            environment={"DYNAMODB_TABLE": job_table.table_name}
+            memory_size=256,
+            environment={
+                "DYNAMODB_TABLE": job_table.table_name,
+                "UPLOAD_PART_SIZE_MB": "8",
+                "UPLOAD_WORKERS": "4"
+            }
         )
 
         import_function = _lambda.Function(
@@ -172,10 +197,26 @@ class BiopsStack(Stack):
             code=_lambda.Code.from_asset("../lambda/orchestrator"),
             layers=[shared_layer],
             role=lambda_role,
-            timeout=Duration.minutes(15),
+            timeout=Duration.minutes(1),
             environment={"DYNAMODB_TABLE": job_table.table_name}
         )
 
+        # Steps report back to the orchestrator through their async invocation destinations
+        for step_function in [export_function, upload_function, import_function, permissions_function]:
+            step_function.configure_async_invoke(
+                on_success=destinations.LambdaDestination(orchestrator_function),
+                on_failure=destinations.LambdaDestination(orchestrator_function),
+                retry_attempts=0
+            )
+
+        # Scheduled poll of jobs waiting on a QuickSight export or import job
+        events.Rule(
+            self, "OrchestratorPollRule",
+            rule_name="biops-orchestrator-poll",
+            schedule=events.Schedule.rate(Duration.minutes(1)),
+            targets=[targets.LambdaFunction(orchestrator_function)]
+        )
+
         job_api_function = _lambda.Function(
             self, "JobApiFunction",
             function_name="biops-job-api",
@@ -199,13 +240,33 @@ class BiopsStack(Stack):
             timeout=Duration.minutes(5)
         )
 
+        # PyJWT and cryptography for the token authorizer, installed from Lambda (manylinux x86_64) wheels at synth time
+        authorizer_layer = _lambda.LayerVersion(
+            self, "AuthorizerDependenciesLayer",
+            code=_lambda.Code.from_asset(
+                "../lambda/authorizer_layer",
+                bundling=BundlingOptions(
+                    image=_lambda.Runtime.PYTHON_3_9.bundling_image,
+                    command=[
+                        "bash", "-c",
+                        "pip install --no-cache-dir -r requirements.txt -t /asset-output/python "
+                        "--platform manylinux2014_x86_64 --implementation cp --python-version 3.9 --only-binary=:all:"
+                    ]
+                )
+            ),
+            compatible_runtimes=[_lambda.Runtime.PYTHON_3_9],
+            description="PyJWT and cryptography for the BIOPS token authorizer"
+        )
+
         # Token Authorizer Lambda Function
         token_authorizer_function = _lambda.Function(
             self, "TokenAuthorizerFunction",
             function_name="biops-token-authorizer",
             runtime=_lambda.Runtime.PYTHON_3_9,
             handler="token_authorizer.lambda_handler",
-            code=_lambda.Code.from_asset("../lambda"),
+            # compiled dependencies come from authorizer_layer; binaries left in lambda/ by a local pip install do not load on Lambda
+            code=_lambda.Code.from_asset("../lambda", exclude=["*.so"]),
+            layers=[authorizer_layer],
             timeout=Duration.seconds(30),
             environment={
                 "USER_POOL_ID": user_pool.user_pool_id,
@@ -287,7 +348,11 @@ class BiopsStack(Stack):
             self, "AssetBucket",
             bucket_name=f"biops-version-control-demo-{self.account}",
             removal_policy=RemovalPolicy.DESTROY,
-            auto_delete_objects=True
+            auto_delete_objects=True,
+            lifecycle_rules=[
+                # cached bundles are only reused while their dashboards are unchanged
+                s3.LifecycleRule(id="ExpireBundleCache", prefix="bundle-cache/", expiration=Duration.days(30))
+            ]
         )
 
         # Amplify App for UI hosting
@@ -52,6 +52,7 @@ aws lambda create-function \
     --handler lambda_function.lambda_handler \
     --zip-file fileb://upload-assets.zip \
     --timeout 300 \
+    --memory-size 256 \
     --layers $LAYER_ARN \
     --region $REGION
 
@@ -96,7 +97,39 @@ aws lambda create-function \
     --role $ROLE_ARN \
     --handler lambda_function.lambda_handler \
     --zip-file fileb://orchestrator.zip \
-    --timeout 900 \
+    --timeout 60 \
+    --layers $LAYER_ARN \
+    --region $REGION
+
+ORCHESTRATOR_ARN=$(aws lambda get-function --function-name biops-orchestrator --region $REGION --query 'Configuration.FunctionArn' --output text)
+
+# Steps report back to the orchestrator through their async invocation destinations
+for FUNCTION in biops-export-assets biops-upload-assets biops-import-assets biops-update-permissions; do
+    aws lambda put-function-event-invoke-config \
+        --function-name $FUNCTION \
+        --maximum-retry-attempts 0 \
+        --destination-config "{\"OnSuccess\":{\"Destination\":\"$ORCHESTRATOR_ARN\"},\"OnFailure\":{\"Destination\":\"$ORCHESTRATOR_ARN\"}}" \
+        --region $REGION
+done
+
+# Scheduled poll of jobs waiting on a QuickSight export or import job
+RULE_ARN=$(aws events put-rule \
+    --name biops-orchestrator-poll \
+    --schedule-expression "rate(1 minute)" \
+    --region $REGION \
+    --query 'RuleArn' --output text)
+
+aws lambda add-permission \
+    --function-name biops-orchestrator \
+    --statement-id biops-orchestrator-poll \
+    --action lambda:InvokeFunction \
+    --principal events.amazonaws.com \
+    --source-arn $RULE_ARN \
+    --region $REGION
+
+aws events put-targets \
+    --rule biops-orchestrator-poll \
+    --targets "Id"="biops-orchestrator","Arn"="$ORCHESTRATOR_ARN" \
     --region $REGION
 
 echo "Deployment complete!"
\ No newline at end of file
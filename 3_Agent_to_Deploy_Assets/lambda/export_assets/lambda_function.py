@@ -1,13 +1,186 @@
 import json
 import boto3
-import time
+import hashlib
 from datetime import datetime
 import sys
 import os
 import random
 
 sys.path.append('/opt/python')
-from shared.utils import assume_role, default_botocore_config
+from shared.utils import assume_role, bundle_cache_s3_key, default_botocore_config
+from shared.waiter import API_GATEWAY_WAIT_SECONDS, Waiter
+
+EXPORT_TERMINAL_STATUSES = ['SUCCESSFUL', 'FAILED']
+
+# StartAssetBundleExportJob accepts at most 100 resource ARNs per job
+MAX_ASSETS_PER_BUNDLE = 100
+
+def dashboard_dependencies(qs_client, account_id, dashboard_ids):
+    """Map each dashboard to the ARNs of the datasets, data sources and theme it would bring into a bundle.
+    
+    Datasets built on other datasets (LogicalTableMap[*].Source.DataSetArn) are followed to the end, so the
+    parent datasets and their data sources are dependencies too. Also returns the version of every dashboard
+    and dependency (VersionNumber and/or LastUpdatedTime), which changes whenever the exported bundle would change.
+    """
+    dependencies = {}
+    versions = {}
+    # dataset ARN -> (parent dataset ARNs, data source ARNs); datasets shared between dashboards are described once
+    dataset_dependencies = {}
+    for dashboard_id in dashboard_ids:
+        dashboard = qs_client.describe_dashboard(
+            AwsAccountId=account_id,
+            DashboardId=dashboard_id
+        )['Dashboard']
+        version = dashboard['Version']
+        versions[dashboard['Arn']] = f"{version.get('VersionNumber')}|{dashboard.get('LastUpdatedTime')}"
+        
+        arns = set()
+        if version.get('ThemeArn'):
+            arns.add(version['ThemeArn'])
+        pending = list(version.get('DataSetArns', []))
+        while pending:
+            dataset_arn = pending.pop()
+            if dataset_arn in arns:
+                continue
+            arns.add(dataset_arn)
+            if dataset_arn not in dataset_dependencies:
+                dataset = qs_client.describe_data_set(
+                    AwsAccountId=account_id,
+                    DataSetId=dataset_arn.split('/')[-1]
+                )['DataSet']
+                versions[dataset_arn] = str(dataset.get('LastUpdatedTime'))
+                dataset_dependencies[dataset_arn] = (
+                    {
+                        parent_arn
+                        for table in dataset.get('LogicalTableMap', {}).values()
+                        for parent_arn in [table.get('Source', {}).get('DataSetArn')] if parent_arn
+                    },
+                    {
+                        source_arn
+                        for table in dataset.get('PhysicalTableMap', {}).values()
+                        for source in table.values()
+                        for source_arn in [source.get('DataSourceArn')] if source_arn
+                    }
+                )
+            parent_arns, source_arns = dataset_dependencies[dataset_arn]
+            arns |= source_arns
+            pending.extend(parent_arns)
+        dependencies[dashboard_id] = arns
+    
+    for arn in set().union(*dependencies.values()) - set(versions):
+        if ':datasource/' in arn:
+            data_source = qs_client.describe_data_source(
+                AwsAccountId=account_id,
+                DataSourceId=arn.split('/')[-1]
+            )['DataSource']
+            versions[arn] = str(data_source.get('LastUpdatedTime'))
+        elif f':{account_id}:theme/' in arn:
+            theme = qs_client.describe_theme(
+                AwsAccountId=account_id,
+                ThemeId=arn.split('/')[-1]
+            )['Theme']
+            versions[arn] = f"{theme.get('Version', {}).get('VersionNumber')}|{theme.get('LastUpdatedTime')}"
+        else:
+            # built-in themes never change
+            versions[arn] = arn
+    return dependencies, versions
+
+def bundle_cache_key(versions, export_format='QUICKSIGHT_JSON'):
+    """Content address of a bundle: a hash of the export options and of every asset version in it."""
+    content = json.dumps({
+        'export_format': export_format,
+        'include_all_dependencies': True,
+        'include_permissions': False,
+        'versions': sorted(versions.items())
+    })
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def find_cached_bundle(bucket_name, cache_key):
+    """Return the S3 URI of the cached bundle for cache_key, or None if it was never uploaded."""
+    s3_client = boto3.client('s3', config=default_botocore_config())
+    s3_key = bundle_cache_s3_key(cache_key)
+    try:
+        s3_client.head_object(Bucket=bucket_name, Key=s3_key)
+    except s3_client.exceptions.ClientError as e:
+        if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+            return None
+        raise
+    return f"s3://{bucket_name}/{s3_key}"
+
+def plan_export_groups(dependencies, max_assets_per_bundle=MAX_ASSETS_PER_BUNDLE):
+    """Group dashboards into as few bundles as possible, such that groups that may run at the same time share no dependency.
+    
+    dependencies holds the full transitive dependency set of every dashboard, as returned by
+    dashboard_dependencies, so dashboards whose datasets only meet in a common parent dataset are linked too.
+    Dashboards sharing any dependency (transitively) form one component and go into the same bundle, so the
+    shared datasets and data sources are exported and imported once. Components are packed first-fit into
+    bundles of at most max_assets_per_bundle dashboards. A component larger than that is split, and each part
+    records the group it must follow ('after') so that two groups never import the same dependency concurrently.
+    """
+    dashboard_ids = list(dependencies)
+    parent = {dashboard_id: dashboard_id for dashboard_id in dashboard_ids}
+    
+    def find(dashboard_id):
+        while parent[dashboard_id] != dashboard_id:
+            parent[dashboard_id] = parent[parent[dashboard_id]]
+            dashboard_id = parent[dashboard_id]
+        return dashboard_id
+    
+    owner = {}
+    for dashboard_id in dashboard_ids:
+        for arn in dependencies[dashboard_id]:
+            if arn in owner:
+                parent[find(dashboard_id)] = find(owner[arn])
+            else:
+                owner[arn] = dashboard_id
+    
+    components = {}
+    for dashboard_id in dashboard_ids:
+        components.setdefault(find(dashboard_id), []).append(dashboard_id)
+    
+    groups = []
+    packable = []
+    for component in sorted(components.values(), key=len, reverse=True):
+        if len(component) > max_assets_per_bundle:
+            for start in range(0, len(component), max_assets_per_bundle):
+                groups.append({
+                    'dashboard_ids': component[start:start + max_assets_per_bundle],
+                    'after': len(groups) - 1 if start else None
+                })
+            continue
+        for index in packable:
+            if len(groups[index]['dashboard_ids']) + len(component) <= max_assets_per_bundle:
+                groups[index]['dashboard_ids'].extend(component)
+                break
+        else:
+            packable.append(len(groups))
+            groups.append({'dashboard_ids': list(component), 'after': None})
+    return groups
+
+def export_status_result(status_response, cache_key=None):
+    """Build the direct-invocation response for the current state of an export job."""
+    job_status = status_response['JobStatus']
+    job_id = status_response['AssetBundleExportJobId']
+    
+    if job_status == 'FAILED':
+        error_details = {'error': 'Export job failed', 'job_id': job_id, 'status': job_status}
+        if 'Errors' in status_response:
+            error_details['errors'] = status_response['Errors']
+        return {
+            'statusCode': 500,
+            'body': json.dumps(error_details)
+        }
+    
+    result = {'job_id': job_id, 'status': job_status}
+    if cache_key:
+        result['cache_key'] = cache_key
+    if job_status == 'SUCCESSFUL':
+        result['download_url'] = status_response['DownloadUrl']
+        result['export_format'] = status_response['ExportFormat']
+    return {
+        'statusCode': 200,
+        'body': json.dumps(result)
+    }
 
 def lambda_handler(event, context):
     """Export QuickSight assets as bundle."""
@@ -24,6 +197,7 @@ def lambda_handler(event, context):
                 source_account_id = body['source_account_id']
                 source_role_name = body['source_role_name']
                 source_asset_id = body['source_asset_id']
+                source_asset_ids = [source_asset_id]
                 aws_region = body.get('aws_region', 'us-east-1')
             
             elif http_method == 'GET' and '/export/' in path:
@@ -58,13 +232,57 @@ def lambda_handler(event, context):
             # Direct Lambda invocation
             source_account_id = event['source_account_id']
             source_role_name = event['source_role_name']
-            source_asset_id = event['source_asset_id']
             aws_region = event.get('aws_region', 'us-east-1')
+            
+            if 'export_job_id' in event:
+                # Status check of an export started with wait=False
+                source_session = assume_role(source_account_id, source_role_name, aws_region)
+                qs_client = source_session.client('quicksight')
+                
+                status_response = qs_client.describe_asset_bundle_export_job(
+                    AwsAccountId=source_account_id,
+                    AssetBundleExportJobId=event['export_job_id']
+                )
+                return export_status_result(status_response, event.get('cache_key'))
+            
+            if event.get('plan'):
+                # Group the dashboards of a batch deployment into export bundles
+                source_session = assume_role(source_account_id, source_role_name, aws_region)
+                qs_client = source_session.client('quicksight')
+                
+                dashboard_ids = list(dict.fromkeys(event['source_asset_ids']))
+                dependencies, _ = dashboard_dependencies(qs_client, source_account_id, dashboard_ids)
+                groups = plan_export_groups(dependencies, event.get('max_assets_per_bundle', MAX_ASSETS_PER_BUNDLE))
+                return {
+                    'statusCode': 200,
+                    'body': json.dumps({'groups': groups})
+                }
+            
+            source_asset_ids = event.get('source_asset_ids') or [event['source_asset_id']]
+            source_asset_id = source_asset_ids[0] if len(source_asset_ids) == 1 else f"{len(source_asset_ids)}-dashboards"
         
         # Assume role in source account
         source_session = assume_role(source_account_id, source_role_name, aws_region)
         qs_client = source_session.client('quicksight')
         
+        # Bundle cache: an unchanged dashboard set was already exported to the tools-account bucket
+        cache_key = None
+        if 'httpMethod' not in event and event.get('bucket_name') and event.get('use_bundle_cache', True):
+            _, versions = dashboard_dependencies(qs_client, source_account_id, source_asset_ids)
+            cache_key = bundle_cache_key(versions)
+            cached_s3_uri = find_cached_bundle(event['bucket_name'], cache_key)
+            if cached_s3_uri:
+                return {
+                    'statusCode': 200,
+                    'body': json.dumps({
+                        'job_id': None,
+                        'status': 'SUCCESSFUL',
+                        'cached': True,
+                        'cache_key': cache_key,
+                        's3_uri': cached_s3_uri
+                    })
+                }
+        
         # Generate job ID with random number
         current_time = datetime.now().date()
         random_number = random.randint(1000, 9999)
@@ -75,24 +293,47 @@ def lambda_handler(event, context):
             AwsAccountId=source_account_id,
             AssetBundleExportJobId=job_id,
             ResourceArns=[
-                f"arn:aws:quicksight:{aws_region}:{source_account_id}:dashboard/{source_asset_id}",
+                f"arn:aws:quicksight:{aws_region}:{source_account_id}:dashboard/{dashboard_id}"
+                for dashboard_id in source_asset_ids
             ],
             IncludeAllDependencies=True,
             IncludePermissions=False,
             ExportFormat='QUICKSIGHT_JSON'
         )
         
-        # Wait for completion
-        while True:
+        # Asynchronous orchestration: return right away, the caller checks back with export_job_id
+        if 'httpMethod' not in event and not event.get('wait', True):
             status_response = qs_client.describe_asset_bundle_export_job(
                 AwsAccountId=source_account_id,
                 AssetBundleExportJobId=job_id
             )
-            
-            job_status = status_response['JobStatus']
-            if job_status in ['SUCCESSFUL', 'FAILED']:
-                break
-            time.sleep(10)
+            return export_status_result(status_response, cache_key)
+        
+        # Wait for completion, backing off between checks
+        def check_export():
+            status_response = qs_client.describe_asset_bundle_export_job(
+                AwsAccountId=source_account_id,
+                AssetBundleExportJobId=job_id
+            )
+            return status_response['JobStatus'] in EXPORT_TERMINAL_STATUSES, status_response
+        
+        waiter = Waiter(context=context, timeout=API_GATEWAY_WAIT_SECONDS if 'httpMethod' in event else None)
+        finished, status_response = waiter.wait(check_export)
+        if not finished:
+            # Out of time before the job finished: hand the job id back with 202, the caller checks on it later
+            result = {'job_id': status_response['AssetBundleExportJobId'], 'status': status_response['JobStatus']}
+            if 'httpMethod' in event:
+                return {
+                    'statusCode': 202,
+                    'headers': {'Content-Type': 'application/json'},
+                    'body': json.dumps(result)
+                }
+            result['cache_key'] = cache_key
+            return {
+                'statusCode': 202,
+                'body': json.dumps(result)
+            }
+        job_status = status_response['JobStatus']
         
         if job_status == 'FAILED':
             return {
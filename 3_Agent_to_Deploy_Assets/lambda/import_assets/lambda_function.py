@@ -1,9 +1,47 @@
 import json
 import boto3
-import time
 from datetime import datetime
 import random
 from shared.utils import assume_role
+from shared.waiter import API_GATEWAY_WAIT_SECONDS, Waiter
+
+IMPORT_TERMINAL_STATUSES = ['SUCCESSFUL', 'FAILED', 'FAILED_ROLLBACK_COMPLETED', 'FAILED_ROLLBACK_ERROR']
+
+def import_error_details(status_response):
+    """Collect the error details of a failed import job."""
+    job_status = status_response['JobStatus']
+    error_details = {
+        'error': f'Import job failed with status: {job_status}',
+        'job_id': status_response['AssetBundleImportJobId'],
+        'status': job_status
+    }
+    
+    # Add error details from QuickSight response
+    if 'Errors' in status_response:
+        error_details['errors'] = status_response['Errors']
+    if 'RollbackErrors' in status_response:
+        error_details['rollback_errors'] = status_response['RollbackErrors']
+    if 'RequestId' in status_response:
+        error_details['request_id'] = status_response['RequestId']
+    return error_details
+
+def import_status_result(status_response):
+    """Build the direct-invocation response for the current state of an import job."""
+    job_status = status_response['JobStatus']
+    
+    if job_status in IMPORT_TERMINAL_STATUSES and job_status != 'SUCCESSFUL':
+        return {
+            'statusCode': 500,
+            'body': json.dumps(import_error_details(status_response))
+        }
+    
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'job_id': status_response['AssetBundleImportJobId'],
+            'status': job_status
+        })
+    }
 
 def lambda_handler(event, context):
     """Import QuickSight assets from S3 bundle."""
@@ -52,11 +90,23 @@ def lambda_handler(event, context):
                 }
         else:
             # Direct Lambda invocation
-            s3_uri = event['s3_uri']
-            source_asset_id = event['source_asset_id']
             target_account_id = event['target_account_id']
             target_role_name = event['target_role_name']
             aws_region = event.get('aws_region', 'us-east-1')
+            
+            if 'import_job_id' in event:
+                # Status check of an import started with wait=False
+                target_session = assume_role(target_account_id, target_role_name, aws_region)
+                qs_client = target_session.client('quicksight')
+                
+                status_response = qs_client.describe_asset_bundle_import_job(
+                    AwsAccountId=target_account_id,
+                    AssetBundleImportJobId=event['import_job_id']
+                )
+                return import_status_result(status_response)
+            
+            s3_uri = event['s3_uri']
+            source_asset_id = event['source_asset_id']
         
         # Assume role in target account
         target_session = assume_role(target_account_id, target_role_name, aws_region)
@@ -77,36 +127,43 @@ def lambda_handler(event, context):
             FailureAction='ROLLBACK'
         )
         
-        # Wait for completion
-        while True:
+        # Asynchronous orchestration: return right away, the caller checks back with import_job_id
+        if 'httpMethod' not in event and not event.get('wait', True):
             status_response = qs_client.describe_asset_bundle_import_job(
                 AwsAccountId=target_account_id,
                 AssetBundleImportJobId=import_job_id
             )
-            
-            job_status = status_response['JobStatus']
-            if job_status in ['SUCCESSFUL', 'FAILED', 'FAILED_ROLLBACK_COMPLETED']:
-                break
-            time.sleep(10)
+            return import_status_result(status_response)
         
-        if job_status != 'SUCCESSFUL':
-            error_details = {
-                'error': f'Import job failed with status: {job_status}',
-                'job_id': import_job_id,
-                'status': job_status
+        # Wait for completion, backing off between checks
+        def check_import():
+            status_response = qs_client.describe_asset_bundle_import_job(
+                AwsAccountId=target_account_id,
+                AssetBundleImportJobId=import_job_id
+            )
+            return status_response['JobStatus'] in IMPORT_TERMINAL_STATUSES, status_response
+        
+        waiter = Waiter(context=context, timeout=API_GATEWAY_WAIT_SECONDS if 'httpMethod' in event else None)
+        finished, status_response = waiter.wait(check_import)
+        if not finished:
+            # Out of time before the job finished: hand the job id back with 202, the caller checks on it later
+            result = {'job_id': status_response['AssetBundleImportJobId'], 'status': status_response['JobStatus']}
+            if 'httpMethod' in event:
+                return {
+                    'statusCode': 202,
+                    'headers': {'Content-Type': 'application/json'},
+                    'body': json.dumps(result)
+                }
+            return {
+                'statusCode': 202,
+                'body': json.dumps(result)
             }
-            
-            # Add error details from QuickSight response
-            if 'Errors' in status_response:
-                error_details['errors'] = status_response['Errors']
-            if 'RollbackErrors' in status_response:
-                error_details['rollback_errors'] = status_response['RollbackErrors']
-            if 'RequestId' in status_response:
-                error_details['request_id'] = status_response['RequestId']
-            
+        job_status = status_response['JobStatus']
+        
+        if job_status != 'SUCCESSFUL':
             return {
                 'statusCode': 500,
-                'body': json.dumps(error_details)
+                'body': json.dumps(import_error_details(status_response))
             }
         
         result = {
@@ -1,7 +1,14 @@
 import json
 import boto3
+from decimal import Decimal
 from shared.dynamodb_utils import JobStatusManager
 
+def json_default(value):
+    """Serialize the Decimal numbers DynamoDB returns."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
 def lambda_handler(event, context):
     """API Gateway handler for job management endpoints."""
     try:
@@ -10,12 +17,25 @@ def lambda_handler(event, context):
         path = event['path']
         
         if http_method == 'GET' and path == '/jobs':
-            # List jobs
-            jobs = job_manager.list_jobs()
+            # List jobs: ?status=&initiated_by=&limit=&next_token=
+            params = event.get('queryStringParameters') or {}
+            try:
+                jobs, next_token = job_manager.list_jobs(
+                    limit=int(params.get('limit', 50)),
+                    status=params.get('status'),
+                    initiated_by=params.get('initiated_by'),
+                    next_token=params.get('next_token')
+                )
+            except ValueError as e:
+                return {
+                    'statusCode': 400,
+                    'headers': {'Content-Type': 'application/json'},
+                    'body': json.dumps({'error': str(e)})
+                }
             return {
                 'statusCode': 200,
                 'headers': {'Content-Type': 'application/json'},
-                'body': json.dumps({'jobs': jobs})
+                'body': json.dumps({'jobs': jobs, 'next_token': next_token}, default=json_default)
             }
         
         elif http_method == 'GET' and '/jobs/' in path:
@@ -33,7 +53,7 @@ def lambda_handler(event, context):
             return {
                 'statusCode': 200,
                 'headers': {'Content-Type': 'application/json'},
-                'body': json.dumps(job)
+                'body': json.dumps(job, default=json_default)
             }
         
         elif http_method == 'POST' and path == '/jobs':
@@ -1,7 +1,7 @@
 import json
 import boto3
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 import sys
 import os
 import random
@@ -9,171 +9,404 @@ import random
 sys.path.append('/opt/python')
 from shared.dynamodb_utils import JobStatusManager
 
-def lambda_handler(event, context):
-    """Orchestrate the complete asset deployment workflow."""
-    try:
-        lambda_client = boto3.client('lambda')
-        job_manager = JobStatusManager()
-        
-        # Generate job ID with random number and create job record
-        random_number = random.randint(1000, 9999)
-        job_id = f"job-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}-{str(uuid.uuid4())[:8]}-{random_number}"
-        initiated_by = event.get('initiated_by', 'system')
-        
-        # Parse configuration
-        config = event['config']
-        
-        # Create job record
-        job_manager.create_job(job_id, config, initiated_by)
-        job_manager.update_job_status(job_id, 'RUNNING', 'biops-export-assets')
-        source_account_id = config['source_account_id']
-        source_role_name = config['source_role_name']
-        source_asset_id = config['source_asset_id']
-        target_account_id = config['target_account_id']
-        target_role_name = config['target_role_name']
-        target_admin_user = config['target_admin_user']
-        bucket_name = config['bucket_name']
-        dashboard_name = config.get('dashboard_name', 'BIOpsDemo')
-        aws_region = config.get('aws_region', 'us-east-1')
-        
-        # Step 1: Export assets
-        export_payload = {
-            'source_account_id': source_account_id,
-            'source_role_name': source_role_name,
-            'source_asset_id': source_asset_id,
-            'aws_region': aws_region
+# Deployment steps in order. Every step is invoked asynchronously (InvocationType='Event') and reports back
+# through its Lambda destination (OnSuccess/OnFailure = biops-orchestrator), so no Lambda waits on another.
+# Export and import only start the QuickSight job; while it runs the job is WAITING and the scheduled poll
+# invokes the step again with the QuickSight job id to check on it.
+# Bundles are cached in the tools bucket by content (versions of the dashboards and their dependencies): when
+# biops-export-assets finds one, no export is started and biops-upload-assets is skipped.
+STEPS = ['biops-export-assets', 'biops-upload-assets', 'biops-import-assets', 'biops-update-permissions']
+
+# Batch deployments (config with source_asset_ids) first let biops-export-assets group the dashboards into
+# bundles (PLAN_STEP), then deploy every group as a child job running STEPS, at most max_parallel_groups at once.
+PLAN_STEP = 'plan-export-groups'
+GROUPS_STEP = 'deploy-groups'
+STEP_FUNCTIONS = {PLAN_STEP: 'biops-export-assets'}
+MAX_PARALLEL_GROUPS = int(os.environ.get('MAX_PARALLEL_GROUPS', '3'))
+
+# Fan-out deployments (config with targets) export and upload the bundle once, then import it into every target
+# account as a child job running the import and permissions steps, at most max_parallel_targets at once.
+TARGETS_STEP = 'deploy-targets'
+TARGET_STEPS = ['biops-import-assets', 'biops-update-permissions']
+TARGET_KEYS = ['target_account_id', 'target_role_name', 'target_admin_user', 'dashboard_name', 'aws_region']
+MAX_PARALLEL_TARGETS = int(os.environ.get('MAX_PARALLEL_TARGETS', '5'))
+# outputs of the parent's export and upload that the target jobs start from
+SHARED_OUTPUTS = ['export_job_id', 'cache_key', 's3_uri', 'bundle_cached']
+
+# A fan-out job with some failed targets finishes as PARTIALLY_COMPLETED
+FINISHED_STATUSES = ['COMPLETED', 'PARTIALLY_COMPLETED', 'FAILED']
+
+# A step invocation that has not reported back after this long is considered lost
+STEP_TIMEOUT_SECONDS = int(os.environ.get('STEP_TIMEOUT_SECONDS', '900'))
+
+def step_payload(step_name, config, outputs, check=False):
+    """Build the direct-invocation payload of a step from the job config and the outputs of earlier steps."""
+    aws_region = config.get('aws_region', 'us-east-1')
+
+    if step_name == PLAN_STEP:
+        return {
+            'source_account_id': config['source_account_id'],
+            'source_role_name': config['source_role_name'],
+            'source_asset_ids': config['source_asset_ids'],
+            'max_assets_per_bundle': config.get('max_assets_per_bundle', 100),
+            'aws_region': aws_region,
+            'plan': True
         }
-        
-        export_response = lambda_client.invoke(
-            FunctionName='biops-export-assets',
-            InvocationType='RequestResponse',
-            Payload=json.dumps(export_payload)
-        )
-        
-        export_result = json.loads(export_response['Payload'].read())
-        if export_result['statusCode'] != 200:
-            job_manager.add_step_result(job_id, 'biops-export-assets', 'FAILED', 
-                                      error_message=export_result.get('body', 'Export failed'))
-            job_manager.update_job_status(job_id, 'FAILED')
-            return export_result
-        
-        export_data = json.loads(export_result['body'])
-        job_manager.add_step_result(job_id, 'biops-export-assets', 'SUCCEEDED', 
-                                  output_s3_key=export_data.get('download_url'))
-        job_manager.update_job_status(job_id, 'RUNNING', 'biops-upload-assets')
-        
-        # Step 2: Upload to S3
-        upload_payload = {
-            'download_url': export_data['download_url'],
-            'job_id': export_data['job_id'],
-            'export_format': export_data['export_format'],
-            'bucket_name': bucket_name,
-            'target_account_id': target_account_id,
-            'target_role_name': target_role_name,
+
+    if step_name == 'biops-export-assets':
+        payload = {
+            'source_account_id': config['source_account_id'],
+            'source_role_name': config['source_role_name'],
             'aws_region': aws_region
         }
-        
-        upload_response = lambda_client.invoke(
-            FunctionName='biops-upload-assets',
-            InvocationType='RequestResponse',
-            Payload=json.dumps(upload_payload)
-        )
-        
-        upload_result = json.loads(upload_response['Payload'].read())
-        if upload_result['statusCode'] != 200:
-            job_manager.add_step_result(job_id, 'biops-upload-assets', 'FAILED',
-                                      error_message=upload_result.get('body', 'Upload failed'))
-            job_manager.update_job_status(job_id, 'FAILED')
-            return upload_result
-        
-        upload_data = json.loads(upload_result['body'])
-        job_manager.add_step_result(job_id, 'biops-upload-assets', 'SUCCEEDED',
-                                  output_s3_key=upload_data.get('s3_uri'))
-        job_manager.update_job_status(job_id, 'RUNNING', 'biops-import-assets')
-        
-        # Step 3: Import assets
-        import_payload = {
-            's3_uri': upload_data['s3_uri'],
-            'source_asset_id': source_asset_id,
-            'target_account_id': target_account_id,
-            'target_role_name': target_role_name,
+        if check:
+            payload['export_job_id'] = outputs['export_job_id']
+            payload['cache_key'] = outputs.get('cache_key')
+            return payload
+        payload['bucket_name'] = config['bucket_name']
+        payload['use_bundle_cache'] = config.get('use_bundle_cache', True)
+        if config.get('source_asset_ids'):
+            payload['source_asset_ids'] = config['source_asset_ids']
+            payload['wait'] = False
+        else:
+            payload['source_asset_id'] = config['source_asset_id']
+            payload['wait'] = False
+        return payload
+
+    if step_name == 'biops-upload-assets':
+        return {
+            'download_url': outputs['download_url'],
+            'cache_key': outputs.get('cache_key'),
+            'job_id': outputs['export_job_id'],
+            'export_format': outputs['export_format'],
+            'bucket_name': config['bucket_name'],
+            'target_account_id': config.get('target_account_id'),
+            'target_role_name': config.get('target_role_name'),
             'aws_region': aws_region
         }
-        
-        import_response = lambda_client.invoke(
-            FunctionName='biops-import-assets',
-            InvocationType='RequestResponse',
-            Payload=json.dumps(import_payload)
-        )
-        
-        import_result = json.loads(import_response['Payload'].read())
-        if import_result['statusCode'] != 200:
-            job_manager.add_step_result(job_id, 'biops-import-assets', 'FAILED',
-                                      error_message=import_result.get('body', 'Import failed'))
-            job_manager.update_job_status(job_id, 'FAILED')
-            return import_result
-        
-        job_manager.add_step_result(job_id, 'biops-import-assets', 'SUCCEEDED')
-        job_manager.update_job_status(job_id, 'RUNNING', 'biops-update-permissions')
-        
-        # Step 4: Update permissions
-        permissions_payload = {
-            'dashboard_name': dashboard_name,
-            'target_account_id': target_account_id,
-            'target_role_name': target_role_name,
-            'target_admin_user': target_admin_user,
+
+    if step_name == 'biops-import-assets':
+        payload = {
+            'target_account_id': config['target_account_id'],
+            'target_role_name': config['target_role_name'],
             'aws_region': aws_region
         }
-        
-        permissions_response = lambda_client.invoke(
-            FunctionName='biops-update-permissions',
-            InvocationType='RequestResponse',
-            Payload=json.dumps(permissions_payload)
-        )
-        
-        permissions_result = json.loads(permissions_response['Payload'].read())
-        
-        if permissions_result['statusCode'] == 200:
-            job_manager.add_step_result(job_id, 'biops-update-permissions', 'SUCCEEDED')
-            job_manager.update_job_status(job_id, 'COMPLETED')
-            
-            # Set final results
-            results = {
-                'export_job_id': export_data['job_id'],
-                'import_job_id': json.loads(import_result['body'])['job_id'],
-                's3_uri': upload_data['s3_uri'],
-                'dashboard_id': json.loads(permissions_result['body']).get('dashboard_id')
-            }
-            job_manager.set_job_results(job_id, results)
+        if check:
+            payload['import_job_id'] = outputs['import_job_id']
         else:
-            job_manager.add_step_result(job_id, 'biops-update-permissions', 'FAILED',
-                                      error_message=permissions_result.get('body', 'Permissions update failed'))
-            job_manager.update_job_status(job_id, 'FAILED')
-        
+            payload['s3_uri'] = outputs['s3_uri']
+            payload['source_asset_id'] = config.get('source_asset_id') or config['source_asset_ids'][0]
+            payload['wait'] = False
+        return payload
+
+    payload = {
+        'target_account_id': config['target_account_id'],
+        'target_role_name': config['target_role_name'],
+        'target_admin_user': config['target_admin_user'],
+        'aws_region': aws_region
+    }
+    if config.get('source_asset_ids'):
+        payload['dashboard_ids'] = config['source_asset_ids']
+    else:
+        payload['dashboard_name'] = config.get('dashboard_name', 'BIOpsDemo')
+    return payload
+
+def step_outputs(step_name, body):
+    """Return (finished, outputs, output_s3_key) for the response body of a step."""
+    if step_name == PLAN_STEP:
+        return True, {'groups': body['groups']}, None
+
+    if step_name == 'biops-export-assets':
+        if body.get('cached'):
+            return True, {'export_job_id': None, 'cache_key': body['cache_key'], 's3_uri': body['s3_uri'],
+                          'bundle_cached': True}, body['s3_uri']
+        if body['status'] != 'SUCCESSFUL':
+            return False, {'export_job_id': body['job_id'], 'cache_key': body.get('cache_key')}, None
+        outputs = {
+            'export_job_id': body['job_id'],
+            'cache_key': body.get('cache_key'),
+            'download_url': body['download_url'],
+            'export_format': body['export_format']
+        }
+        return True, outputs, body['download_url']
+
+    if step_name == 'biops-upload-assets':
+        return True, {'s3_uri': body['s3_uri']}, body['s3_uri']
+
+    if step_name == 'biops-import-assets':
+        return body['status'] == 'SUCCESSFUL', {'import_job_id': body['job_id']}, None
+
+    return True, {'dashboard_id': body.get('dashboard_id')}, None
+
+class DeploymentStateMachine:
+    """Advance deployment jobs one transition per event; all job state lives in the biops-job-runs table.
+
+    Each transition is claimed with a conditional write on the job's stepToken, so duplicate or late
+    completion events and overlapping polls cannot advance a job twice.
+    """
+
+    def __init__(self, job_manager, lambda_client):
+        self.job_manager = job_manager
+        self.lambda_client = lambda_client
+
+    def start(self, config, initiated_by):
+        """Create the job record and invoke the first step (the grouping of dashboards for a batch)."""
+        if 'targets' in config and not config['targets']:
+            raise ValueError('targets must list at least one target account')
+        random_number = random.randint(1000, 9999)
+        job_id = f"job-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}-{str(uuid.uuid4())[:8]}-{random_number}"
+        job = self.job_manager.create_job(job_id, config, initiated_by)
+        self._invoke_step(job, PLAN_STEP if config.get('source_asset_ids') else STEPS[0], job['outputs'])
+        return job_id
+
+    def on_step_completed(self, record):
+        """Handle the Lambda destination record of a step invocation."""
+        request = record['requestPayload']
+        job = self.job_manager.get_job(request['biops_job_id'])
+        if not job or job.get('stepToken') != request['biops_step_token']:
+            # duplicate or superseded event
+            return
+
+        step_name = request['biops_step']
+        response = record.get('responsePayload') or {}
+        if record['requestContext']['condition'] != 'Success':
+            self._fail(job, step_name, f"{step_name} did not complete: {record['requestContext']['condition']}")
+            return
+        if response.get('statusCode') != 200:
+            self._fail(job, step_name, response.get('body', f'{step_name} failed'))
+            return
+
+        finished, outputs, output_s3_key = step_outputs(step_name, json.loads(response['body']))
+        outputs = {**job.get('outputs', {}), **outputs}
+        if not finished:
+            # QuickSight job still running: yield until the next poll
+            self.job_manager.claim_step(job['jobId'], step_name, 'WAITING', job['stepToken'], str(uuid.uuid4()), outputs)
+            return
+
+        # the step result is written together with the next transition, in one conditional write
+        step_results = [self.job_manager.step_result(step_name, 'SUCCEEDED', output_s3_key=output_s3_key,
+                                                     started_at=job.get('stepStartedAt'))]
+        if step_name == PLAN_STEP:
+            # the groups are deployed as child jobs; the batch job only tracks them
+            outputs['child_job_ids'] = [f"{job['jobId']}-group-{index}" for index in range(len(outputs['groups']))]
+            outputs['started'] = []
+            if self.job_manager.claim_step(job['jobId'], GROUPS_STEP, 'CHILDREN', job['stepToken'],
+                                           str(uuid.uuid4()), outputs, step_results):
+                self._advance_children(job['jobId'])
+            return
+
+        next_index = STEPS.index(step_name) + 1
+        if step_name == 'biops-export-assets' and outputs.get('bundle_cached'):
+            # the bundle is already in the tools bucket
+            step_results.append(self.job_manager.step_result(STEPS[next_index], 'SKIPPED', output_s3_key=outputs['s3_uri'],
+                                                             started_at=step_results[0]['endedAt']))
+            next_index += 1
+        if job['payload'].get('targets') and STEPS[next_index] == TARGET_STEPS[0]:
+            # the bundle is in the tools bucket: import it into every target account as a child job
+            outputs['child_job_ids'] = [f"{job['jobId']}-target-{index}" for index in range(len(job['payload']['targets']))]
+            outputs['started'] = []
+            if self.job_manager.claim_step(job['jobId'], TARGETS_STEP, 'CHILDREN', job['stepToken'],
+                                           str(uuid.uuid4()), outputs, step_results):
+                self._advance_children(job['jobId'])
+            return
+        if next_index < len(STEPS):
+            self._invoke_step(job, STEPS[next_index], outputs, step_results=step_results)
+            return
+
+        results = {
+            'export_job_id': outputs['export_job_id'],
+            'import_job_id': outputs['import_job_id'],
+            's3_uri': outputs['s3_uri'],
+            'bundle_cached': bool(outputs.get('bundle_cached')),
+            'dashboard_id': outputs.get('dashboard_id')
+        }
+        if self.job_manager.finish_job(job['jobId'], 'COMPLETED', job['stepToken'], results, step_results):
+            self._notify_parent(job)
+
+    def poll(self):
+        """Check on jobs waiting for a QuickSight job, advance batch and fan-out jobs and fail jobs whose step never reported back."""
+        now = datetime.utcnow()
+        for job in self.job_manager.list_active_jobs():
+            if job.get('stepState') == 'CHILDREN':
+                self._advance_children(job['jobId'])
+            elif job.get('stepState') == 'WAITING':
+                self._invoke_step(job, job['currentStep'], job.get('outputs', {}), check=True)
+            elif job.get('stepState') == 'INVOKED':
+                started_at = datetime.fromisoformat(job['stepStartedAt'].rstrip('Z'))
+                if now - started_at > timedelta(seconds=STEP_TIMEOUT_SECONDS):
+                    self._fail(job, job['currentStep'],
+                               f"{job['currentStep']} did not report back within {STEP_TIMEOUT_SECONDS} seconds")
+
+    def _invoke_step(self, job, step_name, outputs, check=False, step_results=None):
+        token = str(uuid.uuid4())
+        if not self.job_manager.claim_step(job['jobId'], step_name, 'INVOKED', job['stepToken'], token, outputs,
+                                           step_results):
+            return
+
+        payload = step_payload(step_name, job['payload'], outputs, check)
+        payload.update({'biops_job_id': job['jobId'], 'biops_step': step_name, 'biops_step_token': token})
+        try:
+            self.lambda_client.invoke(
+                FunctionName=STEP_FUNCTIONS.get(step_name, step_name),
+                InvocationType='Event',
+                Payload=json.dumps(payload)
+            )
+        except Exception as e:
+            self._fail({**job, 'stepToken': token}, step_name, str(e))
+
+    def _fail(self, job, step_name, error_message):
+        step_result = self.job_manager.step_result(step_name, 'FAILED', error_message=error_message,
+                                                   started_at=job.get('stepStartedAt'))
+        if self.job_manager.finish_job(job['jobId'], 'FAILED', job['stepToken'], step_results=[step_result]):
+            self._notify_parent(job)
+
+    def _notify_parent(self, job):
+        if job.get('parentJobId'):
+            self._advance_children(job['parentJobId'])
+
+    def _advance_children(self, parent_job_id, attempts=10):
+        """Start the next child jobs of a batch or fan-out job within its parallelism cap, or finish it once all are done.
+
+        The set of started children is recorded on the parent job with a conditional write before any child is
+        invoked, so concurrent completions of two children cannot start more children than the cap allows.
+        """
+        for _ in range(attempts):
+            parent = self.job_manager.get_job(parent_job_id)
+            if not parent or parent['status'] in FINISHED_STATUSES:
+                return
+            step_name = parent['currentStep']
+            outputs = parent['outputs']
+            config = parent['payload']
+            children = [self._child_job(parent, index) for index in range(len(outputs['child_job_ids']))]
+            if step_name == GROUPS_STEP:
+                # numbers come back from DynamoDB as Decimal
+                after = [None if group.get('after') is None else int(group['after']) for group in outputs['groups']]
+                max_parallel = int(config.get('max_parallel_groups', MAX_PARALLEL_GROUPS))
+            else:
+                after = [None] * len(children)
+                max_parallel = int(config.get('max_parallel_targets', MAX_PARALLEL_TARGETS))
+
+            # groups that must follow a failed group cannot run
+            for index in range(len(children)):
+                if after[index] is not None and children[after[index]]['status'] in FINISHED_STATUSES \
+                        and children[after[index]]['status'] != 'COMPLETED' and children[index]['status'] == 'PENDING':
+                    step_result = self.job_manager.step_result(GROUPS_STEP, 'FAILED',
+                                                               error_message=f'group {after[index]} failed')
+                    self.job_manager.finish_job(children[index]['jobId'], 'FAILED', '', step_results=[step_result])
+                    children[index] = self.job_manager.get_job(children[index]['jobId'])
+
+            if all(child['status'] in FINISHED_STATUSES for child in children):
+                if self.job_manager.finish_job(parent_job_id, *self._children_result(step_name, parent, children)):
+                    self._notify_parent(parent)
+                return
+
+            started = list(outputs['started'])
+            running = [child for child in children if child['jobId'] in started and child['status'] not in FINISHED_STATUSES]
+            free_slots = max_parallel - len(running)
+            ready = [
+                child for index, child in enumerate(children)
+                if child['jobId'] not in started and child['status'] == 'PENDING'
+                and (after[index] is None or children[after[index]]['status'] == 'COMPLETED')
+            ]
+            to_start = ready[:max(free_slots, 0)]
+            if to_start:
+                if not self.job_manager.claim_step(parent_job_id, step_name, 'CHILDREN', parent['stepToken'],
+                                                   str(uuid.uuid4()),
+                                                   {**outputs, 'started': started + [c['jobId'] for c in to_start]}):
+                    continue
+                running += to_start
+
+            # also picks up children recorded as started whose first step was never invoked
+            for child in running:
+                if child['status'] == 'PENDING' and not child.get('stepToken'):
+                    if step_name == GROUPS_STEP:
+                        self._invoke_step(child, STEPS[0], {})
+                    else:
+                        shared = {key: outputs[key] for key in SHARED_OUTPUTS if key in outputs}
+                        self._invoke_step(child, TARGET_STEPS[0], shared)
+            return
+
+    def _children_result(self, step_name, parent, children):
+        """Return (status, expected_token, results) finishing a parent job whose children are all finished."""
+        if step_name == GROUPS_STEP:
+            results = {'groups': [
+                {'job_id': child['jobId'], 'dashboard_ids': child['payload']['source_asset_ids'],
+                 'status': child['status'], 'results': child.get('results', {})}
+                for child in children
+            ]}
+            status = 'COMPLETED' if all(child['status'] == 'COMPLETED' for child in children) else 'FAILED'
+            return status, parent['stepToken'], results
+
+        targets = []
+        for child in children:
+            target = {'target_account_id': child['payload']['target_account_id'], 'job_id': child['jobId'],
+                      'status': child['status'], 'results': child.get('results', {})}
+            failed_steps = [step for step in child.get('steps', []) if step['status'] == 'FAILED']
+            if failed_steps:
+                target['failed_step'] = failed_steps[-1]['name']
+                target['error'] = failed_steps[-1].get('errorMessage')
+            targets.append(target)
+        succeeded = sum(1 for target in targets if target['status'] == 'COMPLETED')
+        results = {
+            'export_job_id': parent['outputs'].get('export_job_id'),
+            's3_uri': parent['outputs'].get('s3_uri'),
+            'bundle_cached': bool(parent['outputs'].get('bundle_cached')),
+            'targets': targets,
+            'succeeded': succeeded,
+            'failed': len(targets) - succeeded
+        }
+        if succeeded == len(targets):
+            status = 'COMPLETED'
+        elif succeeded:
+            status = 'PARTIALLY_COMPLETED'
+        else:
+            status = 'FAILED'
+        return status, parent['stepToken'], results
+
+    def _child_job(self, parent, index):
+        child_job_id = parent['outputs']['child_job_ids'][index]
+        child = self.job_manager.get_job(child_job_id)
+        if child:
+            return child
+        if parent['currentStep'] == GROUPS_STEP:
+            config = {**parent['payload'], 'source_asset_ids': parent['outputs']['groups'][index]['dashboard_ids']}
+        else:
+            target = parent['payload']['targets'][index]
+            config = {key: value for key, value in parent['payload'].items() if key != 'targets'}
+            config.update({key: target[key] for key in TARGET_KEYS if key in target})
+        try:
+            return self.job_manager.create_job(child_job_id, config, parent['initiatedBy'], parent_job_id=parent['jobId'])
+        except self.job_manager.conditional_check_failed:
+            return self.job_manager.get_job(child_job_id)
+
+def lambda_handler(event, context):
+    """Orchestrate the asset deployment workflow: start jobs, handle step completions and scheduled polls."""
+    try:
+        state_machine = DeploymentStateMachine(JobStatusManager(), boto3.client('lambda'))
+
+        # Completion event from a step's Lambda destination
+        if 'requestPayload' in event and 'requestContext' in event:
+            state_machine.on_step_completed(event)
+            return {'statusCode': 200, 'body': json.dumps({'message': 'Step completion handled'})}
+
+        # Scheduled poll (EventBridge rule)
+        if event.get('source') == 'aws.events' or event.get('action') == 'poll':
+            state_machine.poll()
+            return {'statusCode': 200, 'body': json.dumps({'message': 'Active jobs polled'})}
+
+        # New deployment
+        job_id = state_machine.start(event['config'], event.get('initiated_by', 'system'))
         return {
-            'statusCode': 200,
+            'statusCode': 202,
             'body': json.dumps({
                 'job_id': job_id,
-                'message': 'Asset deployment completed successfully',
-                'export_job_id': export_data['job_id'],
-                'import_job_id': json.loads(import_result['body'])['job_id'],
-                's3_uri': upload_data['s3_uri'],
-                'permissions_status': permissions_result['statusCode']
+                'message': 'Asset deployment started',
+                'status': 'RUNNING'
             })
         }
-        
+
     except Exception as e:
-        # Update job status to failed if job_id exists
-        try:
-            if 'job_id' in locals():
-                job_manager.update_job_status(job_id, 'FAILED')
-        except:
-            pass
-            
         return {
             'statusCode': 500,
-            'body': json.dumps({
-                'error': str(e),
-                'job_id': locals().get('job_id', 'unknown')
-            })
-        }
\ No newline at end of file
+            'body': json.dumps({'error': str(e)})
+        }
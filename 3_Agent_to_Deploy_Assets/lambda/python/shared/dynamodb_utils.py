@@ -1,28 +1,73 @@
+import base64
 import boto3
 import json
+import os
+import time
+from boto3.dynamodb.conditions import Attr, Key
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+
+ACTIVE_JOB_STATUSES = ['PENDING', 'RUNNING']
+
+# Global secondary indexes of biops-job-runs, all sorted by createdAt. jobKind is JOB for the jobs users start
+# and CHILD for the group and target jobs of batch and fan-out jobs, which are listed under their parent.
+JOBS_BY_STATUS_INDEX = 'status-createdAt-index'
+JOBS_BY_INITIATOR_INDEX = 'initiatedBy-createdAt-index'
+JOBS_BY_KIND_INDEX = 'jobKind-createdAt-index'
+MAX_PAGE_SIZE = 100
+
+# Finished jobs expire (DynamoDB TTL on expiresAt) this many days after they end; 0 keeps them forever
+JOB_TTL_DAYS = int(os.getenv('JOB_TTL_DAYS', '90'))
+
+def encode_next_token(last_evaluated_key: Optional[Dict]) -> Optional[str]:
+    """Opaque pagination cursor for a LastEvaluatedKey."""
+    if not last_evaluated_key:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(last_evaluated_key, sort_keys=True).encode()).decode()
+
+def decode_next_token(next_token: str) -> Dict:
+    """ExclusiveStartKey of a cursor returned by encode_next_token; ValueError if it is not one."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(next_token.encode()))
+    except Exception:
+        raise ValueError('Invalid next_token')
+    if not isinstance(key, dict) or 'jobId' not in key:
+        raise ValueError('Invalid next_token')
+    return key
+
+def with_step_list(item: Optional[Dict]) -> Optional[Dict]:
+    """Return the job item with its steps map (keyed by step name) as a list in the order the steps ended."""
+    if item and isinstance(item.get('steps'), dict):
+        item['steps'] = sorted(item['steps'].values(), key=lambda step: (step['endedAt'], step['startedAt']))
+    return item
 
 class JobStatusManager:
     def __init__(self, table_name: str = 'biops-job-runs'):
         self.dynamodb = boto3.resource('dynamodb')
         self.table = self.dynamodb.Table(table_name)
+        self.conditional_check_failed = self.dynamodb.meta.client.exceptions.ConditionalCheckFailedException
     
-    def create_job(self, job_id: str, payload: Dict, initiated_by: str) -> Dict:
-        """Create new job record."""
+    def create_job(self, job_id: str, payload: Dict, initiated_by: str, parent_job_id: str = None) -> Dict:
+        """Create new job record; fails with ConditionalCheckFailedException if the job already exists."""
         item = {
             'jobId': job_id,
             'status': 'PENDING',
             'createdAt': datetime.utcnow().isoformat() + 'Z',
             'updatedAt': datetime.utcnow().isoformat() + 'Z',
             'initiatedBy': initiated_by,
+            'jobKind': 'CHILD' if parent_job_id else 'JOB',
             'payload': payload,
             'currentStep': '',
-            'steps': [],
+            'steps': {},
+            'stepState': '',
+            'stepToken': '',
+            'outputs': {},
             'retryCount': 0
         }
+        if parent_job_id:
+            item['parentJobId'] = parent_job_id
         
-        self.table.put_item(Item=item)
+        self.table.put_item(Item=item, ConditionExpression='attribute_not_exists(jobId)')
         return item
     
     def update_job_status(self, job_id: str, status: str, current_step: str = None) -> None:
@@ -45,44 +90,46 @@ class JobStatusManager:
             ExpressionAttributeNames=expr_names
         )
     
-    def add_step_result(self, job_id: str, step_name: str, status: str, 
-                       output_s3_key: str = None, error_message: str = None) -> None:
-        """Add or update step result."""
+    @staticmethod
+    def step_result(step_name: str, status: str, output_s3_key: str = None, error_message: str = None,
+                    started_at: str = None) -> Dict:
+        """Build the record of a finished step, as stored under steps.<step_name>."""
         step = {
             'name': step_name,
             'status': status,
             'endedAt': datetime.utcnow().isoformat() + 'Z'
         }
+        step['startedAt'] = started_at or step['endedAt']
         
         if output_s3_key:
             step['outputS3Key'] = output_s3_key
         if error_message:
             step['errorMessage'] = error_message
-        
-        # Get current steps and update
-        response = self.table.get_item(Key={'jobId': job_id})
-        item = response.get('Item', {})
-        steps = item.get('steps', [])
-        
-        # Find existing step or add new one
-        step_found = False
-        for i, existing_step in enumerate(steps):
-            if existing_step['name'] == step_name:
-                steps[i].update(step)
-                step_found = True
-                break
-        
-        if not step_found:
-            step['startedAt'] = step['endedAt']
-            steps.append(step)
+        return step
+    
+    @staticmethod
+    def _set_step_results(update_expr: str, expr_values: Dict, expr_names: Dict, step_results: List[Dict] = None) -> str:
+        """Extend update_expr so the same write also records step_results in the steps map."""
+        for index, step in enumerate(step_results or []):
+            update_expr += f', steps.#step{index} = :step{index}'
+            expr_names[f'#step{index}'] = step['name']
+            expr_values[f':step{index}'] = step
+        return update_expr
+    
+    def add_step_result(self, job_id: str, step_name: str, status: str, 
+                       output_s3_key: str = None, error_message: str = None, started_at: str = None) -> None:
+        """Add or update step result with a single write to its entry in the steps map."""
+        step = self.step_result(step_name, status, output_s3_key, error_message, started_at)
+        expr_values = {':updated': step['endedAt']}
+        expr_names = {}
+        update_expr = self._set_step_results('SET updatedAt = :updated', expr_values, expr_names, [step])
         
         self.table.update_item(
             Key={'jobId': job_id},
-            UpdateExpression='SET steps = :steps, updatedAt = :updated',
-            ExpressionAttributeValues={
-                ':steps': steps,
-                ':updated': datetime.utcnow().isoformat() + 'Z'
-            }
+            UpdateExpression=update_expr,
+            ConditionExpression='attribute_exists(jobId)',
+            ExpressionAttributeValues=expr_values,
+            ExpressionAttributeNames=expr_names
         )
     
     def set_job_results(self, job_id: str, results: Dict) -> None:
@@ -96,12 +143,123 @@ class JobStatusManager:
             }
         )
     
+    def claim_step(self, job_id: str, step_name: str, step_state: str, expected_token: str,
+                   new_token: str, outputs: Dict = None, step_results: List[Dict] = None) -> bool:
+        """Move the job to step_name/step_state if nobody advanced it since expected_token was issued.
+        
+        step_results (see step_result) are recorded in the same conditional write.
+        """
+        now = datetime.utcnow().isoformat() + 'Z'
+        update_expr = ('SET #status = :status, currentStep = :step, stepState = :state, stepToken = :token, '
+                       'stepStartedAt = :now, updatedAt = :now')
+        expr_values = {
+            ':status': 'RUNNING',
+            ':step': step_name,
+            ':state': step_state,
+            ':token': new_token,
+            ':expected': expected_token,
+            ':now': now
+        }
+        if outputs is not None:
+            update_expr += ', outputs = :outputs'
+            expr_values[':outputs'] = outputs
+        expr_names = {'#status': 'status'}
+        update_expr = self._set_step_results(update_expr, expr_values, expr_names, step_results)
+        
+        try:
+            self.table.update_item(
+                Key={'jobId': job_id},
+                UpdateExpression=update_expr,
+                ConditionExpression='stepToken = :expected',
+                ExpressionAttributeValues=expr_values,
+                ExpressionAttributeNames=expr_names
+            )
+        except self.conditional_check_failed:
+            return False
+        return True
+    
+    def finish_job(self, job_id: str, status: str, expected_token: str, results: Dict = None,
+                   step_results: List[Dict] = None) -> bool:
+        """Set the final job status (and results and step_results) unless the job was advanced since expected_token was issued."""
+        update_expr = 'SET #status = :status, stepState = :state, stepToken = :token, updatedAt = :updated'
+        expr_values = {
+            ':status': status,
+            ':state': '',
+            ':token': '',
+            ':expected': expected_token,
+            ':updated': datetime.utcnow().isoformat() + 'Z'
+        }
+        if results is not None:
+            update_expr += ', results = :results'
+            expr_values[':results'] = results
+        if JOB_TTL_DAYS > 0:
+            update_expr += ', expiresAt = :expires'
+            expr_values[':expires'] = int(time.time()) + JOB_TTL_DAYS * 86400
+        expr_names = {'#status': 'status'}
+        update_expr = self._set_step_results(update_expr, expr_values, expr_names, step_results)
+        
+        try:
+            self.table.update_item(
+                Key={'jobId': job_id},
+                UpdateExpression=update_expr,
+                ConditionExpression='stepToken = :expected',
+                ExpressionAttributeValues=expr_values,
+                ExpressionAttributeNames=expr_names
+            )
+        except self.conditional_check_failed:
+            return False
+        return True
+    
+    def list_active_jobs(self) -> List[Dict]:
+        """List all jobs that are not finished yet."""
+        jobs = []
+        for status in ACTIVE_JOB_STATUSES:
+            query_kwargs = {'IndexName': JOBS_BY_STATUS_INDEX, 'KeyConditionExpression': Key('status').eq(status)}
+            while True:
+                response = self.table.query(**query_kwargs)
+                jobs.extend(with_step_list(item) for item in response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        return jobs
+    
     def get_job(self, job_id: str) -> Optional[Dict]:
         """Get job by ID."""
         response = self.table.get_item(Key={'jobId': job_id})
-        return response.get('Item')
+        return with_step_list(response.get('Item'))
     
-    def list_jobs(self, limit: int = 50) -> List[Dict]:
-        """List recent jobs."""
-        response = self.table.scan(Limit=limit)
-        return response.get('Items', [])
\ No newline at end of file
+    def list_jobs(self, limit: int = 50, status: str = None, initiated_by: str = None,
+                  next_token: str = None) -> Tuple[List[Dict], Optional[str]]:
+        """List jobs newest first, optionally by status and/or initiator, a page at a time.
+        
+        Returns the page and the next_token of the following page (None on the last page). Only the jobs users
+        started are listed; group and target jobs are found through their parent.
+        """
+        if status:
+            query_kwargs = {'IndexName': JOBS_BY_STATUS_INDEX, 'KeyConditionExpression': Key('status').eq(status)}
+        elif initiated_by:
+            query_kwargs = {'IndexName': JOBS_BY_INITIATOR_INDEX,
+                            'KeyConditionExpression': Key('initiatedBy').eq(initiated_by)}
+        else:
+            query_kwargs = {'IndexName': JOBS_BY_KIND_INDEX, 'KeyConditionExpression': Key('jobKind').eq('JOB')}
+        
+        if status or initiated_by:
+            # ne also matches jobs written before jobKind existed, so they still show up in filtered listings
+            filter_expr = Attr('jobKind').ne('CHILD')
+            if status and initiated_by:
+                filter_expr &= Attr('initiatedBy').eq(initiated_by)
+            query_kwargs['FilterExpression'] = filter_expr
+        query_kwargs['ScanIndexForward'] = False
+        if next_token:
+            query_kwargs['ExclusiveStartKey'] = decode_next_token(next_token)
+        
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        jobs = []
+        while True:
+            # a filtered page may come back short: keep reading until it is full or the index is exhausted
+            response = self.table.query(Limit=limit - len(jobs), **query_kwargs)
+            jobs.extend(with_step_list(item) for item in response.get('Items', []))
+            last_evaluated_key = response.get('LastEvaluatedKey')
+            if len(jobs) >= limit or not last_evaluated_key:
+                return jobs, encode_next_token(last_evaluated_key)
+            query_kwargs['ExclusiveStartKey'] = last_evaluated_key
@@ -1,7 +1,9 @@
 import boto3
 import botocore
 import os
-from typing import Dict, Union, Optional
+import threading
+import time
+from typing import Dict, Tuple, Union, Optional
 
 def default_botocore_config() -> botocore.config.Config:
     """Botocore configuration."""
@@ -18,20 +20,77 @@ def default_botocore_config() -> botocore.config.Config:
         user_agent_extra="qs_sdk_biops",
     )
 
+# Exported bundles are kept in the tools-account bucket under a key derived from the versions of the
+# dashboards and their dependencies, so an unchanged dashboard is never exported twice
+BUNDLE_CACHE_PREFIX = os.getenv("BUNDLE_CACHE_PREFIX", "bundle-cache")
+
+def bundle_cache_s3_key(cache_key: str) -> str:
+    """S3 key of the cached bundle for cache_key."""
+    return f"{BUNDLE_CACHE_PREFIX}/{cache_key}.qs"
+
+# Sessions returned by assume_role are kept per (account, role, region) for the life of the Lambda container
+# and renewed CREDENTIAL_REFRESH_SECONDS before their credentials expire, so warm invocations skip STS
+CREDENTIAL_REFRESH_SECONDS = int(os.getenv("CREDENTIAL_REFRESH_SECONDS", "300"))
+_clock = time.time
+_session_cache: Dict[Tuple[str, str, str], Tuple[boto3.Session, float]] = {}
+_session_cache_lock = threading.Lock()
+# One lock per key, so concurrent callers of the same role share one STS call without blocking other roles
+_session_key_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+_session_cache_stats: Dict[str, int] = {"hits": 0, "misses": 0, "refreshes": 0}
+
+def _cached_session(key: Tuple[str, str, str]) -> Optional[boto3.Session]:
+    """Cached session for key while its credentials are fresh; call with _session_cache_lock held."""
+    cached = _session_cache.get(key)
+    if cached and _clock() < cached[1] - CREDENTIAL_REFRESH_SECONDS:
+        _session_cache_stats["hits"] += 1
+        return cached[0]
+    return None
+
 def assume_role(aws_account_number: str, role_name: str, aws_region: str):
-    """Assume IAM role and return session."""
-    sts_client = boto3.client('sts', config=default_botocore_config())
-    response = sts_client.assume_role(
-        RoleArn=f'arn:aws:iam::{aws_account_number}:role/{role_name}',
-        RoleSessionName='quicksight-lambda'
-    )
+    """Assume IAM role and return session, reusing the cached session while its credentials are fresh."""
+    key = (aws_account_number, role_name, aws_region)
+    with _session_cache_lock:
+        session = _cached_session(key)
+        if session:
+            return session
+        key_lock = _session_key_locks.setdefault(key, threading.Lock())
     
-    return boto3.Session(
-        aws_access_key_id=response['Credentials']['AccessKeyId'],
-        aws_secret_access_key=response['Credentials']['SecretAccessKey'],
-        aws_session_token=response['Credentials']['SessionToken'],
-        region_name=aws_region
-    )
+    with key_lock:
+        # another caller may have renewed the session while this one waited for key_lock
+        with _session_cache_lock:
+            session = _cached_session(key)
+            if session:
+                return session
+            _session_cache_stats["refreshes" if key in _session_cache else "misses"] += 1
+        
+        sts_client = boto3.client('sts', config=default_botocore_config())
+        response = sts_client.assume_role(
+            RoleArn=f'arn:aws:iam::{aws_account_number}:role/{role_name}',
+            RoleSessionName='quicksight-lambda'
+        )
+        
+        session = boto3.Session(
+            aws_access_key_id=response['Credentials']['AccessKeyId'],
+            aws_secret_access_key=response['Credentials']['SecretAccessKey'],
+            aws_session_token=response['Credentials']['SessionToken'],
+            region_name=aws_region
+        )
+        with _session_cache_lock:
+            _session_cache[key] = (session, response['Credentials']['Expiration'].timestamp())
+        return session
+
+def credential_cache_stats() -> Dict[str, int]:
+    """Hits, misses and refreshes (cached credentials about to expire) of the assume_role cache."""
+    with _session_cache_lock:
+        return {**_session_cache_stats, "size": len(_session_cache)}
+
+def clear_credential_cache() -> None:
+    """Drop all cached sessions and reset the counters."""
+    with _session_cache_lock:
+        _session_cache.clear()
+        _session_key_locks.clear()
+        for name in _session_cache_stats:
+            _session_cache_stats[name] = 0
 
 def get_user_arn(session, username: str, region: str = 'us-east-1', namespace: str = 'default'):
     """Get user ARN for QuickSight permissions."""
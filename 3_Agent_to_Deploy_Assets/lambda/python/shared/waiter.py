@@ -0,0 +1,69 @@
+import os
+import random
+import time
+from typing import Any, Callable, Optional, Tuple
+
+WAIT_MIN_INTERVAL_SECONDS = float(os.getenv("WAIT_MIN_INTERVAL_SECONDS", "2"))
+WAIT_MAX_INTERVAL_SECONDS = float(os.getenv("WAIT_MAX_INTERVAL_SECONDS", "30"))
+# Time kept back for the last status check and the response when the Lambda is about to time out
+WAIT_SAFETY_MARGIN_SECONDS = float(os.getenv("WAIT_SAFETY_MARGIN_SECONDS", "10"))
+# API Gateway gives up on an integration after 29 seconds
+API_GATEWAY_WAIT_SECONDS = 25
+
+class Waiter:
+    """Poll a long-running job with exponential backoff and jitter until it finishes or time runs out.
+
+    The first check is immediate; the interval then grows from min_interval by multiplier up to max_interval,
+    each sleep drawn at random between min_interval and the current interval. The wait stops early when the
+    next check would pass the deadline (timeout seconds after the start) or when the Lambda (context) would
+    not have safety_margin seconds left after the sleep; the caller then gets the last result back.
+    """
+
+    def __init__(self, min_interval: float = None, max_interval: float = None, multiplier: float = 2.0,
+                 timeout: Optional[float] = None, context: Any = None, safety_margin: float = None,
+                 sleep: Callable[[float], None] = time.sleep, clock: Callable[[], float] = time.monotonic,
+                 rng: Callable[[], float] = random.random):
+        self.min_interval = WAIT_MIN_INTERVAL_SECONDS if min_interval is None else min_interval
+        self.max_interval = max(self.min_interval, WAIT_MAX_INTERVAL_SECONDS if max_interval is None else max_interval)
+        self.multiplier = multiplier
+        self.timeout = timeout
+        self.context = context
+        self.safety_margin = WAIT_SAFETY_MARGIN_SECONDS if safety_margin is None else safety_margin
+        self.sleep = sleep
+        self.clock = clock
+        self.rng = rng
+        self.checks = 0
+        self.waited = 0.0
+
+    def next_delay(self, attempt: int) -> float:
+        """Jittered sleep before check attempt + 1."""
+        interval = min(self.max_interval, self.min_interval * self.multiplier ** attempt)
+        return self.min_interval + self.rng() * (interval - self.min_interval)
+
+    def time_left(self, started_at: float) -> Optional[float]:
+        """Seconds left before the deadline or the Lambda timeout, whichever comes first; None if unbounded."""
+        limits = []
+        if self.timeout is not None:
+            limits.append(self.timeout - (self.clock() - started_at))
+        if self.context is not None:
+            limits.append(self.context.get_remaining_time_in_millis() / 1000 - self.safety_margin)
+        return min(limits) if limits else None
+
+    def wait(self, check: Callable[[], Tuple[bool, Any]]) -> Tuple[bool, Any]:
+        """Call check() until it returns (True, result); return (finished, last result)."""
+        started_at = self.clock()
+        attempt = 0
+        while True:
+            done, result = check()
+            self.checks += 1
+            if done:
+                return True, result
+
+            delay = self.next_delay(attempt)
+            attempt += 1
+            time_left = self.time_left(started_at)
+            if time_left is not None and delay > time_left:
+                return False, result
+
+            self.sleep(delay)
+            self.waited += delay
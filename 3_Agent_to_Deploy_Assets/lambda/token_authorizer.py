@@ -1,77 +1,179 @@
-import json
-import base64
-import requests
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+import requests
 
 # Cognito configuration
 USER_POOL_ID = os.environ.get('USER_POOL_ID', 'us-east-1_p7YlBR2h9')
 REGION = os.environ.get('REGION', 'us-east-1')
 COGNITO_ISSUER = f"https://cognito-idp.{REGION}.amazonaws.com/{USER_POOL_ID}"
+JWKS_URL = os.environ.get('JWKS_URL', f"{COGNITO_ISSUER}/.well-known/jwks.json")
+
+# An unknown kid (key rotation) refetches the JWKS, but at most once per JWKS_MIN_REFRESH_SECONDS
+JWKS_MIN_REFRESH_SECONDS = float(os.environ.get('JWKS_MIN_REFRESH_SECONDS', '60'))
+JWKS_FETCH_TIMEOUT_SECONDS = float(os.environ.get('JWKS_FETCH_TIMEOUT_SECONDS', '5'))
+# Validated tokens kept until they expire, least recently used dropped first
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', '1024'))
+# Tolerated clock difference with Cognito when checking iat and nbf; exp is strict, as for the token cache
+CLOCK_LEEWAY_SECONDS = 30
+
+# Module-level, so both caches live as long as the Lambda container
+_jwks_lock = threading.Lock()
+_jwks_keys = {}
+_jwks_fetched_at = None
+_token_cache = OrderedDict()
+_cache_stats = {'jwks_fetches': 0, 'token_hits': 0, 'token_misses': 0}
+_clock = time.time
+
 
 def lambda_handler(event, context):
     """
-    Lambda authorizer that validates tokens from Cognito using simple validation.
+    Lambda authorizer that verifies the signature and expiry of Cognito tokens against the user pool JWKS.
     """
     try:
         # Extract token from Authorization header
         token = event['authorizationToken'].replace('Bearer ', '')
-        
-        # Simple token validation - decode without verification for now
-        # In production, you should verify the signature
-        parts = token.split('.')
-        if len(parts) != 3:
-            raise Exception('Invalid token format')
-        
-        # Decode payload (add padding if needed)
-        payload_b64 = parts[1]
-        # Add padding if needed
-        payload_b64 += '=' * (4 - len(payload_b64) % 4)
-        payload_json = base64.urlsafe_b64decode(payload_b64)
-        payload = json.loads(payload_json)
-        
-        # Check issuer
-        if payload.get('iss') != COGNITO_ISSUER:
-            raise Exception('Invalid issuer')
-        
-        # Check token type and validate accordingly
-        token_use = payload.get('token_use')
-        
-        if token_use == 'id':
-            # ID token validation
-            client_id = payload.get('aud')
-            if not client_id:
-                raise Exception('Invalid ID token: missing audience')
-        elif token_use == 'access':
-            # Access token validation
-            client_id = payload.get('client_id')
-            if not client_id:
-                raise Exception('Invalid access token: missing client_id')
-            
-            # Check scopes for API access
-            scope = payload.get('scope', '')
-            if 'biops-api/read' not in scope and 'biops-api/write' not in scope:
-                raise Exception('Insufficient scopes for API access')
-        else:
-            raise Exception(f'Invalid token_use: {token_use}')
-        
+        claims = verify_token(token)
+
         # Generate policy
         policy = generate_policy('user', 'Allow', event['methodArn'])
-        
+
         # Add user context
-        policy['context'] = {
-            'sub': payload.get('sub', ''),
-            'client_id': client_id,
-            'token_use': token_use,
-            'scope': payload.get('scope', '')
-        }
-        
+        policy['context'] = claims
+
         return policy
-        
+
     except Exception as e:
         print(f"Authorization failed: {str(e)}")
         # Return deny policy
         return generate_policy('user', 'Deny', event['methodArn'])
 
+
+def verify_token(token):
+    """Verify a Cognito ID or access token and return the authorizer context; raise if it is not valid.
+
+    A token validated before is answered from the token cache until its exp, without any cryptography.
+    """
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+    now = _clock()
+    with _jwks_lock:
+        cached = _token_cache.get(cache_key)
+        if cached and cached[0] > now:
+            _token_cache.move_to_end(cache_key)
+            _cache_stats['token_hits'] += 1
+            return dict(cached[1])
+        _cache_stats['token_misses'] += 1
+        if cached:
+            del _token_cache[cache_key]
+
+    header = jwt.get_unverified_header(token)
+    if header.get('alg') != 'RS256':
+        raise Exception(f"Unsupported token algorithm: {header.get('alg')}")
+    # exp, iat and nbf are checked against _clock below, the clock of the token cache
+    payload = jwt.decode(token, get_signing_key(header.get('kid')), algorithms=['RS256'], issuer=COGNITO_ISSUER,
+                         options={'require': ['exp', 'iss', 'token_use'], 'verify_aud': False,
+                                  'verify_exp': False, 'verify_iat': False, 'verify_nbf': False})
+    check_token_times(payload, _clock())
+    claims = token_claims(payload)
+
+    if TOKEN_CACHE_SIZE > 0:
+        with _jwks_lock:
+            _token_cache[cache_key] = (payload['exp'], claims)
+            _token_cache.move_to_end(cache_key)
+            while len(_token_cache) > TOKEN_CACHE_SIZE:
+                _token_cache.popitem(last=False)
+    return dict(claims)
+
+
+def check_token_times(payload, now):
+    """Raise if the token has expired or is not valid yet (issued more than CLOCK_LEEWAY_SECONDS ahead of now)."""
+    if not isinstance(payload['exp'], (int, float)) or payload['exp'] <= now:
+        raise Exception('Token has expired')
+    for claim in ('iat', 'nbf'):
+        if claim in payload and (not isinstance(payload[claim], (int, float))
+                                 or payload[claim] > now + CLOCK_LEEWAY_SECONDS):
+            raise Exception(f'Token is not valid yet ({claim})')
+
+
+def token_claims(payload):
+    """Check the token type and scopes of a verified payload and return the authorizer context."""
+    token_use = payload.get('token_use')
+
+    if token_use == 'id':
+        # ID token validation
+        client_id = payload.get('aud')
+        if not client_id:
+            raise Exception('Invalid ID token: missing audience')
+    elif token_use == 'access':
+        # Access token validation
+        client_id = payload.get('client_id')
+        if not client_id:
+            raise Exception('Invalid access token: missing client_id')
+
+        # Check scopes for API access
+        scope = payload.get('scope', '')
+        if 'biops-api/read' not in scope and 'biops-api/write' not in scope:
+            raise Exception('Insufficient scopes for API access')
+    else:
+        raise Exception(f'Invalid token_use: {token_use}')
+
+    return {
+        'sub': payload.get('sub', ''),
+        'client_id': client_id,
+        'token_use': token_use,
+        'scope': payload.get('scope', '')
+    }
+
+
+def get_signing_key(kid):
+    """Public key of the user pool for kid, from the JWKS cache.
+
+    The JWKS is fetched on first use and again when a token names a kid it does not contain, so rotated keys
+    are picked up; unknown kids do not refetch more than once per JWKS_MIN_REFRESH_SECONDS.
+    """
+    global _jwks_keys, _jwks_fetched_at
+    with _jwks_lock:
+        key = _jwks_keys.get(kid)
+        if key is not None:
+            return key
+        if _jwks_fetched_at is not None and _clock() - _jwks_fetched_at < JWKS_MIN_REFRESH_SECONDS:
+            raise Exception(f'Unknown signing key: {kid}')
+
+        # Refresh time is recorded before the request, so a failing endpoint is not retried on every call
+        _jwks_fetched_at = _clock()
+        response = requests.get(JWKS_URL, timeout=JWKS_FETCH_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        _cache_stats['jwks_fetches'] += 1
+        _jwks_keys = {jwk['kid']: jwt.PyJWK(jwk, 'RS256').key for jwk in response.json().get('keys', [])
+                      if jwk.get('kty') == 'RSA' and jwk.get('kid')}
+
+        key = _jwks_keys.get(kid)
+        if key is None:
+            raise Exception(f'Unknown signing key: {kid}')
+        return key
+
+
+def cache_stats():
+    """JWKS fetches, token cache hits and misses since the container started, and the token cache size."""
+    with _jwks_lock:
+        return {**_cache_stats, 'cached_tokens': len(_token_cache), 'signing_keys': len(_jwks_keys)}
+
+
+def clear_caches():
+    """Forget the JWKS, the validated tokens and the counters."""
+    global _jwks_keys, _jwks_fetched_at
+    with _jwks_lock:
+        _jwks_keys = {}
+        _jwks_fetched_at = None
+        _token_cache.clear()
+        for name in _cache_stats:
+            _cache_stats[name] = 0
+
+
 def generate_policy(principal_id, effect, resource):
     """Generate IAM policy for API Gateway."""
     return {
@@ -86,4 +188,4 @@ def generate_policy(principal_id, effect, resource):
                 }
             ]
         }
-    }
\ No newline at end of file
+    }
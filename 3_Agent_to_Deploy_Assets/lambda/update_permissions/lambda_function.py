@@ -15,7 +15,7 @@ def lambda_handler(event, context):
             aws_region = body.get('aws_region', 'us-east-1')
         else:
             # Direct Lambda invocation
-            dashboard_name = event['dashboard_name']
+            dashboard_name = event.get('dashboard_name')
             target_account_id = event['target_account_id']
             target_role_name = event['target_role_name']
             target_admin_user = event['target_admin_user']
@@ -28,56 +28,66 @@ def lambda_handler(event, context):
         # Get admin user ARN
         target_admin_arn = get_user_arn(target_session, target_admin_user, aws_region)
         
-        # Search for dashboard
-        response = qs_client.search_dashboards(
-            AwsAccountId=target_account_id,
-            Filters=[
-                {
-                    'Operator': 'StringLike',
-                    'Name': 'DASHBOARD_NAME',
-                    'Value': dashboard_name
-                },
-            ]
-        )
-        
-        if not response['DashboardSummaryList']:
-            return {
-                'statusCode': 404,
-                'body': json.dumps({'error': f'Dashboard {dashboard_name} not found'})
-            }
-        
-        dashboard_id = response['DashboardSummaryList'][0]['DashboardId']
-        
-        # Update dashboard permissions
-        qs_client.update_dashboard_permissions(
-            AwsAccountId=target_account_id,
-            DashboardId=dashboard_id,
-            GrantPermissions=[
-                {
-                    'Principal': target_admin_arn,
-                    'Actions': [
-                        "quicksight:DescribeDashboard",
-                        "quicksight:ListDashboardVersions",
-                        "quicksight:UpdateDashboardPermissions",
-                        "quicksight:QueryDashboard",
-                        "quicksight:UpdateDashboard",
-                        "quicksight:DeleteDashboard",
-                        "quicksight:DescribeDashboardPermissions",
-                        "quicksight:UpdateDashboardPublishedVersion"
-                    ]
+        if event.get('dashboard_ids'):
+            # Batch deployment: imported dashboards keep their ids
+            dashboard_ids = event['dashboard_ids']
+        else:
+            # Search for dashboard
+            response = qs_client.search_dashboards(
+                AwsAccountId=target_account_id,
+                Filters=[
+                    {
+                        'Operator': 'StringLike',
+                        'Name': 'DASHBOARD_NAME',
+                        'Value': dashboard_name
+                    },
+                ]
+            )
+            
+            if not response['DashboardSummaryList']:
+                return {
+                    'statusCode': 404,
+                    'body': json.dumps({'error': f'Dashboard {dashboard_name} not found'})
                 }
-            ]
-        )
+            
+            dashboard_ids = [response['DashboardSummaryList'][0]['DashboardId']]
         
-        # Get dashboard details and update dataset permissions
-        dashboard_response = qs_client.describe_dashboard(
-            AwsAccountId=target_account_id,
-            DashboardId=dashboard_id
-        )
+        dataset_ids = []
+        for dashboard_id in dashboard_ids:
+            # Update dashboard permissions
+            qs_client.update_dashboard_permissions(
+                AwsAccountId=target_account_id,
+                DashboardId=dashboard_id,
+                GrantPermissions=[
+                    {
+                        'Principal': target_admin_arn,
+                        'Actions': [
+                            "quicksight:DescribeDashboard",
+                            "quicksight:ListDashboardVersions",
+                            "quicksight:UpdateDashboardPermissions",
+                            "quicksight:QueryDashboard",
+                            "quicksight:UpdateDashboard",
+                            "quicksight:DeleteDashboard",
+                            "quicksight:DescribeDashboardPermissions",
+                            "quicksight:UpdateDashboardPublishedVersion"
+                        ]
+                    }
+                ]
+            )
+            
+            # Get dashboard details and collect its datasets
+            dashboard_response = qs_client.describe_dashboard(
+                AwsAccountId=target_account_id,
+                DashboardId=dashboard_id
+            )
+            
+            for dataset in dashboard_response['Dashboard']['Version']['DataSetArns']:
+                dataset_id = dataset.split(":")[-1].split("/")[-1]
+                if dataset_id not in dataset_ids:
+                    dataset_ids.append(dataset_id)
         
-        datasets = dashboard_response['Dashboard']['Version']['DataSetArns']
-        for dataset in datasets:
-            dataset_id = dataset.split(":")[-1].split("/")[-1]
+        # Datasets shared between dashboards are updated once
+        for dataset_id in dataset_ids:
             qs_client.update_data_set_permissions(
                 AwsAccountId=target_account_id,
                 DataSetId=dataset_id,
@@ -101,8 +111,9 @@ def lambda_handler(event, context):
             )
         
         result = {
-            'dashboard_id': dashboard_id,
-            'datasets_updated': len(datasets),
+            'dashboard_id': dashboard_ids[0],
+            'dashboard_ids': dashboard_ids,
+            'datasets_updated': len(dataset_ids),
             'message': 'Permissions updated successfully'
         }
         
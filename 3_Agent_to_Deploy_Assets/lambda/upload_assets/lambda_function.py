@@ -1,7 +1,131 @@
 import json
 import boto3
-import tempfile
+import base64
+import hashlib
+import os
+import threading
+import time
+import sys
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append('/opt/python')
+from shared.utils import bundle_cache_s3_key
+
+# The bundle is streamed into S3 in parts of PART_SIZE bytes; at most UPLOAD_WORKERS parts are uploading while
+# the next one is downloaded, so memory stays below (UPLOAD_WORKERS + 1) * PART_SIZE whatever the bundle size.
+PART_SIZE = int(os.environ.get('UPLOAD_PART_SIZE_MB', '8')) * 1024 * 1024
+UPLOAD_WORKERS = int(os.environ.get('UPLOAD_WORKERS', '4'))
+PART_ATTEMPTS = 3
+
+def sha256_b64(data):
+    """Base64 SHA-256 digest, the form S3 expects in ChecksumSHA256."""
+    return base64.b64encode(hashlib.sha256(data).digest()).decode()
+
+def read_part(stream, size):
+    """Read size bytes from stream; fewer only at the end of the stream."""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return chunks[0] if len(chunks) == 1 else b''.join(chunks)
+
+def upload_part(s3_client, bucket_name, s3_key, upload_id, part_number, data, attempts=PART_ATTEMPTS):
+    """Upload one part with its SHA-256 checksum, retrying only this part when it fails."""
+    checksum = sha256_b64(data)
+    for attempt in range(1, attempts + 1):
+        try:
+            response = s3_client.upload_part(
+                Bucket=bucket_name,
+                Key=s3_key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=data,
+                ChecksumSHA256=checksum
+            )
+            if response.get('ChecksumSHA256', checksum) != checksum:
+                raise ValueError(f'Checksum mismatch for part {part_number}')
+            return {'PartNumber': part_number, 'ETag': response['ETag'], 'ChecksumSHA256': checksum}
+        except Exception:
+            if attempt == attempts:
+                raise
+            time.sleep(0.2 * 2 ** attempt)
+
+def stream_to_s3(download_url, s3_client, bucket_name, s3_key, part_size=None, workers=None):
+    """Copy download_url to s3://bucket_name/s3_key without holding the whole bundle in memory.
+    
+    Bundles smaller than one part are uploaded with a single put_object. Larger ones go through a multipart
+    upload whose parts are uploaded by `workers` threads while the download continues; reading pauses while
+    all workers are busy. S3 verifies the SHA-256 checksum of every part, and the composite checksum of the
+    completed object is checked against the parts. On any failure the multipart upload is aborted.
+    
+    Returns (size, checksum_sha256) of the uploaded object.
+    """
+    part_size = part_size or PART_SIZE
+    workers = workers or UPLOAD_WORKERS
+    with urllib.request.urlopen(download_url) as response:
+        content_length = response.headers.get('Content-Length')
+        data = read_part(response, part_size)
+        
+        if len(data) < part_size:
+            if content_length is not None and int(content_length) != len(data):
+                raise ValueError(f'Download truncated: {len(data)} of {content_length} bytes')
+            checksum = sha256_b64(data)
+            s3_client.put_object(
+                Bucket=bucket_name,
+                Key=s3_key,
+                Body=data,
+                ChecksumSHA256=checksum
+            )
+            return len(data), checksum
+        
+        upload_id = s3_client.create_multipart_upload(
+            Bucket=bucket_name,
+            Key=s3_key,
+            ChecksumAlgorithm='SHA256'
+        )['UploadId']
+        try:
+            size = 0
+            futures = []
+            free_workers = threading.Semaphore(workers)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                while data:
+                    free_workers.acquire()
+                    if any(future.done() and future.exception() for future in futures):
+                        free_workers.release()
+                        break
+                    size += len(data)
+                    future = executor.submit(upload_part, s3_client, bucket_name, s3_key, upload_id,
+                                             len(futures) + 1, data)
+                    future.add_done_callback(lambda _: free_workers.release())
+                    futures.append(future)
+                    # drop this reference so an uploaded part is freed while the next one downloads
+                    data = None
+                    data = read_part(response, part_size)
+            parts = [future.result() for future in futures]
+            
+            if content_length is not None and int(content_length) != size:
+                raise ValueError(f'Download truncated: {size} of {content_length} bytes')
+            
+            result = s3_client.complete_multipart_upload(
+                Bucket=bucket_name,
+                Key=s3_key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+        except BaseException:
+            s3_client.abort_multipart_upload(Bucket=bucket_name, Key=s3_key, UploadId=upload_id)
+            raise
+    
+    digests = b''.join(base64.b64decode(part['ChecksumSHA256']) for part in parts)
+    checksum = f"{sha256_b64(digests)}-{len(parts)}"
+    if result.get('ChecksumSHA256', checksum) != checksum:
+        raise ValueError(f"Checksum mismatch for s3://{bucket_name}/{s3_key}: {result['ChecksumSHA256']} != {checksum}")
+    return size, checksum
 
 def lambda_handler(event, context):
     """Upload exported assets to S3 bucket."""
@@ -21,25 +145,21 @@ def lambda_handler(event, context):
             export_format = event['export_format']
             bucket_name = event['bucket_name']
             aws_region = event.get('aws_region', 'us-east-1')
+        cache_key = (body if 'httpMethod' in event else event).get('cache_key')
         
         # Use tools account S3 client (no role assumption needed)
         s3_client = boto3.client('s3', region_name=aws_region)
         
-        # Download file from URL using urllib
-        with urllib.request.urlopen(download_url) as response:
-            file_data = response.read()
-        
         # Prepare S3 key
         local_path = f"{export_format}_{job_id}"
         local_file_name = f"{local_path}.qs"
         s3_key = f"{local_path}/{local_file_name}"
+        if cache_key:
+            # stored under its content key so that later exports of the same versions reuse it
+            s3_key = bundle_cache_s3_key(cache_key)
         
-        # Upload to S3
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=s3_key,
-            Body=file_data
-        )
+        # Stream the download into S3
+        size, checksum = stream_to_s3(download_url, s3_client, bucket_name, s3_key)
         
         s3_uri = f"s3://{bucket_name}/{s3_key}"
         
@@ -47,7 +167,9 @@ def lambda_handler(event, context):
             'bucket_name': bucket_name,
             's3_key': s3_key,
             's3_uri': s3_uri,
-            'job_id': job_id
+            'job_id': job_id,
+            'size': size,
+            'checksum_sha256': checksum
         }
         
         if 'httpMethod' in event:
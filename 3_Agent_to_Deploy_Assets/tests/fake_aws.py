@@ -0,0 +1,578 @@
+"""
+Offline stand-in for the DynamoDB, Lambda, S3 and STS APIs used by the BIOps deployment Lambdas.
+
+install(session) registers botocore event handlers on a boto3 session so that every client (and DynamoDB
+resource) created from it afterwards is answered in memory instead of by AWS; request parameters are still
+validated against the real service models. FakeDynamoDB keeps tables as items in DynamoDB JSON and evaluates
+the condition, filter and update expressions the Lambdas send. FakeLambda calls registered handlers:
+RequestResponse invocations run immediately, Event invocations are queued until run_pending() and then
+delivered, like Lambda destinations, to the configured OnSuccess/OnFailure function. FakeS3 checks the
+SHA-256 checksums of uploads and, unless keep_data is set, keeps only sizes and checksums so that
+multi-gigabyte uploads can be tested. FakeSTS issues credentials that expire relative to a caller-supplied clock.
+"""
+
+"""
+import libraries
+"""
+import base64
+import hashlib
+import io
+import json
+import re
+import threading
+from collections import Counter, deque
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+from botocore.awsrequest import AWSResponse
+from botocore.response import StreamingBody
+
+
+class _AwsError(Exception):
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+class _FakeService:
+    """botocore before-call short circuit shared by the fakes: operation Foo is answered by _service_Foo."""
+
+    def __init__(self):
+        self.calls = Counter()
+
+    def install(self, session):
+        """Answer every client created from session afterwards from this fake."""
+        session.events.register('before-parameter-build', self._remember_params)
+        session.events.register('before-call', self._before_call)
+        return self
+
+    def _remember_params(self, params, context, **kwargs):
+        context['fake_params'] = params
+
+    def _before_call(self, model, context, **kwargs):
+        service = model.service_model.service_name
+        handler = getattr(self, f'_{service}_{model.name}', None)
+        if handler is None:
+            return None
+        self.calls[f'{service}.{model.name}'] += 1
+        try:
+            body = handler(context.get('fake_params', {}))
+        except _AwsError as e:
+            body = {'Error': {'Code': e.code, 'Message': str(e)},
+                    'ResponseMetadata': {'RequestId': 'fake', 'HTTPStatusCode': e.status}}
+            return AWSResponse('https://fake', e.status, {}, None), body
+        body.setdefault('ResponseMetadata', {'RequestId': 'fake', 'HTTPStatusCode': 200})
+        return AWSResponse('https://fake', 200, {}, None), body
+
+
+# DynamoDB expressions
+
+_TOKEN = re.compile(r'\s*(<>|<=|>=|=|<|>|\(|\)|\[|\]|,|\.|\+|-|#\w+|:\w+|\d+|\w+)')
+_COMPARATORS = ('=', '<>', '<', '<=', '>', '>=')
+
+
+def _tokenize(expression: str) -> List[str]:
+    tokens, position = [], 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _TOKEN.match(expression, position)
+        if not match:
+            raise _AwsError(400, 'ValidationException', f'cannot parse expression at: {expression[position:]}')
+        tokens.append(match.group(1))
+        position = match.end()
+    return tokens
+
+
+def _plain(value: Optional[Dict[str, Any]]) -> Any:
+    """Comparable Python value of an attribute value (S, N and B only)."""
+    if value is None:
+        return None
+    if 'N' in value:
+        return Decimal(value['N'])
+    return value.get('S', value.get('B'))
+
+
+class _Expression:
+    """Recursive-descent evaluation of condition, filter and update expressions on one item."""
+
+    def __init__(self, expression: str, names: Dict[str, str], values: Dict[str, Any]):
+        self.tokens = _tokenize(expression)
+        self.position = 0
+        self.names = names or {}
+        self.values = values or {}
+
+    def _peek(self, offset: int = 0) -> Optional[str]:
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def _take(self, expected: Optional[str] = None) -> str:
+        token = self._peek()
+        if token is None or (expected is not None and token.upper() != expected):
+            raise _AwsError(400, 'ValidationException', f'expected {expected}, got {token}')
+        self.position += 1
+        return token
+
+    def _path(self) -> List[Any]:
+        path = [self._name(self._take())]
+        while self._peek() in ('.', '['):
+            if self._take() == '.':
+                path.append(self._name(self._take()))
+            else:
+                path.append(int(self._take()))
+                self._take(']')
+        return path
+
+    def _name(self, token: str) -> str:
+        return self.names[token] if token.startswith('#') else token
+
+    # reading and writing paths of an item
+
+    @staticmethod
+    def get(item: Dict[str, Any], path: List[Any]) -> Optional[Dict[str, Any]]:
+        value = {'M': item}
+        for part in path:
+            if isinstance(part, int):
+                items = value.get('L') if value else None
+                value = items[part] if items is not None and part < len(items) else None
+            else:
+                value = value.get('M', {}).get(part) if value else None
+            if value is None:
+                return None
+        return value
+
+    @staticmethod
+    def set(item: Dict[str, Any], path: List[Any], new_value: Dict[str, Any]):
+        parent = _Expression.get(item, path[:-1]) if len(path) > 1 else {'M': item}
+        if parent is None:
+            raise _AwsError(400, 'ValidationException', 'The document path provided in the update expression is invalid for update')
+        if isinstance(path[-1], int):
+            items = parent['L']
+            if path[-1] < len(items):
+                items[path[-1]] = new_value
+            else:
+                items.append(new_value)
+        else:
+            parent['M'][path[-1]] = new_value
+
+    @staticmethod
+    def remove(item: Dict[str, Any], path: List[Any]):
+        parent = _Expression.get(item, path[:-1]) if len(path) > 1 else {'M': item}
+        if parent is None:
+            return
+        if isinstance(path[-1], int):
+            if path[-1] < len(parent['L']):
+                del parent['L'][path[-1]]
+        else:
+            parent['M'].pop(path[-1], None)
+
+    # operands
+
+    def _operand(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        token = self._peek()
+        if token.startswith(':'):
+            self._take()
+            value = self.values[token]
+        elif self._peek(1) == '(':
+            value = self._function(item)
+        else:
+            value = self.get(item, self._path())
+        if self._peek() in ('+', '-'):
+            operator = self._take()
+            other = self._operand(item)
+            total = Decimal(value['N']) + (Decimal(other['N']) if operator == '+' else -Decimal(other['N']))
+            value = {'N': str(total)}
+        return value
+
+    def _function(self, item: Dict[str, Any]) -> Any:
+        function = self._take().lower()
+        self._take('(')
+        if function in ('attribute_exists', 'attribute_not_exists'):
+            exists = self.get(item, self._path()) is not None
+            self._take(')')
+            return exists if function == 'attribute_exists' else not exists
+        first = self._operand(item)
+        self._take(',')
+        second = self._operand(item)
+        self._take(')')
+        if function == 'list_append':
+            return {'L': list((first or {'L': []})['L']) + list((second or {'L': []})['L'])}
+        if function == 'if_not_exists':
+            return first if first is not None else second
+        if function == 'begins_with':
+            return first is not None and str(_plain(first)).startswith(str(_plain(second)))
+        if function == 'contains':
+            if first is None:
+                return False
+            if 'L' in first:
+                return second in first['L']
+            return str(_plain(second)) in str(_plain(first))
+        raise _AwsError(400, 'ValidationException', f'unsupported function {function}')
+
+    # conditions
+
+    def evaluate(self, item: Dict[str, Any]) -> bool:
+        result = self._or(item)
+        if self._peek() is not None:
+            raise _AwsError(400, 'ValidationException', f'unexpected token {self._peek()}')
+        return result
+
+    def _or(self, item) -> bool:
+        result = self._and(item)
+        while self._peek() and self._peek().upper() == 'OR':
+            self._take()
+            result = self._and(item) or result
+        return result
+
+    def _and(self, item) -> bool:
+        result = self._not(item)
+        while self._peek() and self._peek().upper() == 'AND':
+            self._take()
+            result = self._not(item) and result
+        return result
+
+    def _not(self, item) -> bool:
+        if self._peek().upper() == 'NOT':
+            self._take()
+            return not self._not(item)
+        if self._peek() == '(':
+            self._take()
+            result = self._or(item)
+            self._take(')')
+            return result
+        if self._peek(1) == '(' and self._peek().lower() in ('attribute_exists', 'attribute_not_exists',
+                                                              'begins_with', 'contains'):
+            return self._function(item)
+        return self._comparison(item)
+
+    def _comparison(self, item) -> bool:
+        left = self._operand(item)
+        operator = self._take().upper()
+        if operator == 'IN':
+            self._take('(')
+            candidates = [self._operand(item)]
+            while self._peek() == ',':
+                self._take()
+                candidates.append(self._operand(item))
+            self._take(')')
+            return left is not None and left in candidates
+        if operator == 'BETWEEN':
+            low = self._operand(item)
+            self._take('AND')
+            high = self._operand(item)
+            return left is not None and _plain(low) <= _plain(left) <= _plain(high)
+        if operator not in _COMPARATORS:
+            raise _AwsError(400, 'ValidationException', f'unsupported operator {operator}')
+        right = self._operand(item)
+        if operator == '=':
+            return left is not None and left == right
+        if operator == '<>':
+            return left != right
+        if left is None or right is None:
+            return False
+        left, right = _plain(left), _plain(right)
+        return {'<': left < right, '<=': left <= right, '>': left > right, '>=': left >= right}[operator]
+
+    # updates
+
+    def update(self, item: Dict[str, Any]):
+        while self._peek() is not None:
+            action = self._take().upper()
+            while True:
+                path = self._path()
+                if action == 'SET':
+                    self._take('=')
+                    self.set(item, path, self._operand(item))
+                elif action == 'REMOVE':
+                    self.remove(item, path)
+                elif action == 'ADD':
+                    current = self.get(item, path)
+                    value = self._operand(item)
+                    if 'N' in value:
+                        value = {'N': str(Decimal(current['N'] if current else '0') + Decimal(value['N']))}
+                    self.set(item, path, value)
+                else:
+                    raise _AwsError(400, 'ValidationException', f'unsupported update action {action}')
+                if self._peek() != ',':
+                    break
+                self._take()
+
+
+def _check(expression: Optional[str], params: Dict[str, Any], item: Dict[str, Any]) -> bool:
+    if not expression:
+        return True
+    return _Expression(expression, params.get('ExpressionAttributeNames'),
+                       params.get('ExpressionAttributeValues')).evaluate(item)
+
+
+class FakeDynamoDB(_FakeService):
+    """In-memory DynamoDB tables keyed by their hash (and range) key attributes.
+
+    indexes maps a global secondary index name to its (hash key, range key); Query reads an index (all
+    attributes projected) or the table itself in range key order.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.tables: Dict[str, Dict[str, Any]] = {}
+
+    def create_table(self, name: str, hash_key: str, range_key: Optional[str] = None,
+                     indexes: Optional[Dict[str, tuple]] = None):
+        self.tables[name] = {'keys': [k for k in (hash_key, range_key) if k], 'items': {},
+                             'indexes': {index: [k for k in keys if k] for index, keys in (indexes or {}).items()}}
+        return self
+
+    def items(self, name: str) -> List[Dict[str, Any]]:
+        """Items of a table in DynamoDB JSON."""
+        return list(self.tables[name]['items'].values())
+
+    def _table(self, params):
+        if params['TableName'] not in self.tables:
+            raise _AwsError(400, 'ResourceNotFoundException', f"Requested resource not found: {params['TableName']}")
+        return self.tables[params['TableName']]
+
+    @staticmethod
+    def _key(table, item) -> str:
+        return json.dumps([item[k] for k in table['keys']], sort_keys=True)
+
+    def _conditional_check_failed(self):
+        return _AwsError(400, 'ConditionalCheckFailedException', 'The conditional request failed')
+
+    def _dynamodb_PutItem(self, params):
+        table = self._table(params)
+        key = self._key(table, params['Item'])
+        if not _check(params.get('ConditionExpression'), params, table['items'].get(key, {})):
+            raise self._conditional_check_failed()
+        table['items'][key] = json.loads(json.dumps(params['Item']))
+        return {}
+
+    def _dynamodb_GetItem(self, params):
+        table = self._table(params)
+        item = table['items'].get(self._key(table, params['Key']))
+        return {'Item': json.loads(json.dumps(item))} if item is not None else {}
+
+    def _dynamodb_UpdateItem(self, params):
+        table = self._table(params)
+        key = self._key(table, params['Key'])
+        current = table['items'].get(key)
+        if not _check(params.get('ConditionExpression'), params, current or {}):
+            raise self._conditional_check_failed()
+        item = json.loads(json.dumps(current if current is not None else params['Key']))
+        _Expression(params['UpdateExpression'], params.get('ExpressionAttributeNames'),
+                    params.get('ExpressionAttributeValues')).update(item)
+        table['items'][key] = item
+        return {'Attributes': json.loads(json.dumps(item))} if params.get('ReturnValues') == 'ALL_NEW' else {}
+
+    def _dynamodb_DeleteItem(self, params):
+        table = self._table(params)
+        key = self._key(table, params['Key'])
+        if not _check(params.get('ConditionExpression'), params, table['items'].get(key, {})):
+            raise self._conditional_check_failed()
+        table['items'].pop(key, None)
+        return {}
+
+    def _dynamodb_Scan(self, params):
+        table = self._table(params)
+        keys = sorted(table['items'])
+        start = keys.index(self._key(table, params['ExclusiveStartKey'])) + 1 if 'ExclusiveStartKey' in params else 0
+        limit = params.get('Limit', len(keys))
+        evaluated = keys[start:start + limit]
+        items = [table['items'][k] for k in evaluated
+                 if _check(params.get('FilterExpression'), params, table['items'][k])]
+        response = {'Items': json.loads(json.dumps(items)), 'Count': len(items), 'ScannedCount': len(evaluated)}
+        if start + limit < len(keys):
+            last = table['items'][evaluated[-1]]
+            response['LastEvaluatedKey'] = {k: last[k] for k in table['keys']}
+        return response
+
+    @staticmethod
+    def _sort_value(value: Dict[str, Any]):
+        return Decimal(value['N']) if 'N' in value else next(iter(value.values()))
+
+    def _dynamodb_Query(self, params):
+        table = self._table(params)
+        if 'IndexName' in params and params['IndexName'] not in table['indexes']:
+            raise _AwsError(400, 'ValidationException', f"The table does not have the specified index: {params['IndexName']}")
+        index_keys = table['indexes'][params['IndexName']] if 'IndexName' in params else table['keys']
+        # items missing an index key attribute are not in the (sparse) index
+        keys = [k for k, item in table['items'].items()
+                if all(key in item for key in index_keys)
+                and _check(params['KeyConditionExpression'], params, item)]
+        if len(index_keys) > 1:
+            keys.sort(key=lambda k: (self._sort_value(table['items'][k][index_keys[1]]), k),
+                      reverse=not params.get('ScanIndexForward', True))
+        start = keys.index(self._key(table, params['ExclusiveStartKey'])) + 1 if 'ExclusiveStartKey' in params else 0
+        limit = params.get('Limit', len(keys))
+        evaluated = keys[start:start + limit]
+        items = [table['items'][k] for k in evaluated
+                 if _check(params.get('FilterExpression'), params, table['items'][k])]
+        response = {'Items': json.loads(json.dumps(items)), 'Count': len(items), 'ScannedCount': len(evaluated)}
+        if start + limit < len(keys):
+            last = table['items'][evaluated[-1]]
+            response['LastEvaluatedKey'] = {k: last[k] for k in dict.fromkeys(table['keys'] + index_keys)}
+        return response
+
+
+class FakeLambda(_FakeService):
+    """Lambda functions backed by Python handlers, with asynchronous invocations and destinations."""
+
+    def __init__(self):
+        super().__init__()
+        self.functions: Dict[str, Callable] = {}
+        self.destinations: Dict[str, Dict[str, str]] = {}
+        self.pending = deque()
+        self.invocations: List[Dict[str, Any]] = []
+
+    def register(self, name: str, handler: Callable, on_success: Optional[str] = None,
+                 on_failure: Optional[str] = None):
+        """Add a function; on_success/on_failure name the destination function of its Event invocations."""
+        self.functions[name] = handler
+        self.destinations[name] = {'Success': on_success, 'RetriesExhausted': on_failure}
+        return self
+
+    def run_pending(self, max_invocations: int = 1000) -> int:
+        """Deliver queued Event invocations (and the destination records they produce) until none are left."""
+        count = 0
+        while self.pending:
+            if count == max_invocations:
+                raise RuntimeError(f'more than {max_invocations} asynchronous invocations, is a job looping?')
+            name, payload = self.pending.popleft()
+            try:
+                response, condition = self._call(name, payload), 'Success'
+            except Exception as e:
+                response, condition = {'errorMessage': str(e), 'errorType': type(e).__name__}, 'RetriesExhausted'
+            destination = self.destinations[name][condition]
+            if destination:
+                self.pending.append((destination, {
+                    'version': '1.0',
+                    'requestContext': {'functionArn': f'arn:aws:lambda:us-east-1:123456789012:function:{name}',
+                                       'condition': condition, 'approximateInvokeCount': 1},
+                    'requestPayload': payload,
+                    'responseContext': {'statusCode': 200, 'executedVersion': '$LATEST'},
+                    'responsePayload': response
+                }))
+            count += 1
+        return count
+
+    def _call(self, name: str, payload: Dict[str, Any]) -> Any:
+        self.invocations.append({'FunctionName': name, 'Payload': payload})
+        return self.functions[name](payload, None)
+
+    def _lambda_Invoke(self, params):
+        name = params['FunctionName'].split(':')[-1]
+        if name not in self.functions:
+            raise _AwsError(404, 'ResourceNotFoundException', f'Function not found: {name}')
+        payload = json.loads(params.get('Payload') or b'{}')
+        if params.get('InvocationType') == 'Event':
+            self.pending.append((name, payload))
+            return {'StatusCode': 202, 'Payload': StreamingBody(io.BytesIO(b''), 0)}
+        body = json.dumps(self._call(name, payload)).encode()
+        return {'StatusCode': 200, 'Payload': StreamingBody(io.BytesIO(body), len(body))}
+
+
+class FakeS3(_FakeService):
+    """S3 objects and multipart uploads; fail_parts maps a part number to how many of its uploads fail."""
+
+    def __init__(self, keep_data: bool = True):
+        super().__init__()
+        self.keep_data = keep_data
+        self.objects: Dict[str, Dict[str, Any]] = {}
+        self.uploads: Dict[str, Dict[str, Any]] = {}
+        self.aborted: List[str] = []
+        self.fail_parts: Dict[int, int] = {}
+        self.part_attempts = Counter()
+        self.max_part_size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _body(params) -> bytes:
+        body = params.get('Body', b'')
+        if hasattr(body, 'read'):
+            body = body.read()
+        return body.encode() if isinstance(body, str) else bytes(body)
+
+    @staticmethod
+    def _checksum(params, body: bytes) -> str:
+        checksum = base64.b64encode(hashlib.sha256(body).digest()).decode()
+        if params.get('ChecksumSHA256', checksum) != checksum:
+            raise _AwsError(400, 'BadDigest', 'The SHA256 you specified did not match the calculated checksum.')
+        return checksum
+
+    def _s3_PutObject(self, params):
+        body = self._body(params)
+        checksum = self._checksum(params, body)
+        self.objects[f"{params['Bucket']}/{params['Key']}"] = {
+            'size': len(body), 'ChecksumSHA256': checksum, 'data': body if self.keep_data else None}
+        return {'ETag': '"' + hashlib.md5(body).hexdigest() + '"', 'ChecksumSHA256': checksum}
+
+    def _s3_HeadObject(self, params):
+        stored = self.objects.get(f"{params['Bucket']}/{params['Key']}")
+        if stored is None:
+            # HEAD responses have no body, so S3 reports the bare status code
+            raise _AwsError(404, '404', 'Not Found')
+        return {'ContentLength': stored['size'], 'ChecksumSHA256': stored['ChecksumSHA256']}
+
+    def _s3_CreateMultipartUpload(self, params):
+        upload_id = f'upload-{len(self.uploads) + 1}'
+        self.uploads[upload_id] = {'key': f"{params['Bucket']}/{params['Key']}", 'parts': {}}
+        return {'Bucket': params['Bucket'], 'Key': params['Key'], 'UploadId': upload_id,
+                'ChecksumAlgorithm': params.get('ChecksumAlgorithm', 'SHA256')}
+
+    def _s3_UploadPart(self, params):
+        upload = self.uploads.get(params['UploadId'])
+        if upload is None:
+            raise _AwsError(404, 'NoSuchUpload', 'The specified upload does not exist.')
+        number = params['PartNumber']
+        with self._lock:
+            self.part_attempts[number] += 1
+            failing = self.fail_parts.get(number, 0) >= self.part_attempts[number]
+        if failing:
+            raise _AwsError(500, 'InternalError', 'We encountered an internal error. Please try again.')
+        body = self._body(params)
+        checksum = self._checksum(params, body)
+        with self._lock:
+            self.max_part_size = max(self.max_part_size, len(body))
+            upload['parts'][number] = {'size': len(body), 'ChecksumSHA256': checksum,
+                                       'data': body if self.keep_data else None}
+        return {'ETag': f'"etag-{number}"', 'ChecksumSHA256': checksum}
+
+    def _s3_CompleteMultipartUpload(self, params):
+        upload = self.uploads.pop(params['UploadId'], None)
+        if upload is None:
+            raise _AwsError(404, 'NoSuchUpload', 'The specified upload does not exist.')
+        numbers = [part['PartNumber'] for part in params['MultipartUpload']['Parts']]
+        if numbers != sorted(upload['parts']):
+            raise _AwsError(400, 'InvalidPart', 'One or more of the specified parts could not be found.')
+        parts = [upload['parts'][number] for number in numbers]
+        digests = b''.join(base64.b64decode(part['ChecksumSHA256']) for part in parts)
+        checksum = base64.b64encode(hashlib.sha256(digests).digest()).decode() + f'-{len(parts)}'
+        self.objects[upload['key']] = {
+            'size': sum(part['size'] for part in parts), 'ChecksumSHA256': checksum,
+            'data': b''.join(part['data'] for part in parts) if self.keep_data else None}
+        return {'Bucket': params['Bucket'], 'Key': params['Key'], 'ETag': f'"etag-{len(parts)}"',
+                'ChecksumSHA256': checksum}
+
+    def _s3_AbortMultipartUpload(self, params):
+        self.uploads.pop(params['UploadId'], None)
+        self.aborted.append(params['UploadId'])
+        return {}
+
+
+class FakeSTS(_FakeService):
+    """AssumeRole answered with numbered credentials valid for DurationSeconds (default 3600) from clock()."""
+
+    def __init__(self, clock: Callable[[], float]):
+        super().__init__()
+        self.clock = clock
+        self.issued: List[str] = []
+
+    def _sts_AssumeRole(self, params):
+        access_key_id = f'ASIAFAKE{len(self.issued) + 1:08d}'
+        self.issued.append(params['RoleArn'])
+        expiration = datetime.fromtimestamp(self.clock() + params.get('DurationSeconds', 3600), tz=timezone.utc)
+        return {
+            'Credentials': {'AccessKeyId': access_key_id, 'SecretAccessKey': 'fake', 'SessionToken': 'fake',
+                            'Expiration': expiration},
+            'AssumedRoleUser': {'AssumedRoleId': f"AROAFAKE:{params['RoleSessionName']}",
+                                'Arn': f"{params['RoleArn']}/{params['RoleSessionName']}"},
+        }
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the assume_role credential cache of lambda/python/shared/utils.py.
+
+STS is answered by fake_aws.FakeSTS and the cache's clock is replaced by a counter the tests advance.
+
+Tests cover:
+  - reuse of the session across calls (warm invocations)
+  - one cache entry per (account, role, region)
+  - proactive refresh shortly before the credentials expire
+  - hit / miss / refresh counters
+  - concurrent callers: one STS call per role, other roles not blocked by it
+"""
+
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import patch
+
+import boto3
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+LAMBDA_DIR = os.path.join(os.path.dirname(TESTS_DIR), 'lambda')
+sys.path[:0] = [TESTS_DIR, os.path.join(LAMBDA_DIR, 'python')]
+
+from fake_aws import FakeSTS
+from shared import utils
+
+
+class TestCredentialCache(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1_700_000_000.0
+        boto3.setup_default_session(aws_access_key_id='fake', aws_secret_access_key='fake', region_name='us-east-1')
+        self.sts = FakeSTS(clock=lambda: self.now).install(boto3.DEFAULT_SESSION)
+        patcher = patch.object(utils, '_clock', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        utils.clear_credential_cache()
+        self.addCleanup(utils.clear_credential_cache)
+
+    def tearDown(self):
+        boto3.DEFAULT_SESSION = None
+
+    def access_key(self, session):
+        return session.get_credentials().access_key
+
+    def test_warm_calls_reuse_the_session(self):
+        first = utils.assume_role('111111111111', 'BiopsSourceAccountRole', 'us-east-1')
+        for _ in range(50):
+            self.assertIs(utils.assume_role('111111111111', 'BiopsSourceAccountRole', 'us-east-1'), first)
+        self.assertEqual(self.sts.calls['sts.AssumeRole'], 1)
+        self.assertEqual(self.access_key(first), 'ASIAFAKE00000001')
+        self.assertEqual(first.region_name, 'us-east-1')
+        self.assertEqual(utils.credential_cache_stats(), {'hits': 50, 'misses': 1, 'refreshes': 0, 'size': 1})
+
+    def test_sessions_are_cached_per_account_role_and_region(self):
+        keys = [('111111111111', 'RoleA', 'us-east-1'), ('111111111111', 'RoleB', 'us-east-1'),
+                ('222222222222', 'RoleA', 'us-east-1'), ('111111111111', 'RoleA', 'eu-west-1')]
+        sessions = [utils.assume_role(*key) for key in keys]
+        again = [utils.assume_role(*key) for key in keys]
+        self.assertEqual(len({self.access_key(session) for session in sessions}), 4)
+        self.assertTrue(all(a is b for a, b in zip(sessions, again)))
+        self.assertEqual(self.sts.issued, [f'arn:aws:iam::{account}:role/{role}' for account, role, _ in keys])
+        self.assertEqual(utils.credential_cache_stats()['size'], 4)
+
+    def test_credentials_are_refreshed_before_they_expire(self):
+        first = utils.assume_role('111111111111', 'BiopsTargetAccountRole', 'us-east-1')
+
+        # one hour credentials: still reused just before the refresh window
+        self.now += 3600 - utils.CREDENTIAL_REFRESH_SECONDS - 1
+        self.assertIs(utils.assume_role('111111111111', 'BiopsTargetAccountRole', 'us-east-1'), first)
+
+        self.now += 1
+        second = utils.assume_role('111111111111', 'BiopsTargetAccountRole', 'us-east-1')
+        self.assertIsNot(second, first)
+        self.assertEqual(self.access_key(second), 'ASIAFAKE00000002')
+        self.assertEqual(utils.credential_cache_stats(), {'hits': 1, 'misses': 1, 'refreshes': 1, 'size': 1})
+
+        self.now += 600
+        self.assertIs(utils.assume_role('111111111111', 'BiopsTargetAccountRole', 'us-east-1'), second)
+        self.assertEqual(self.sts.calls['sts.AssumeRole'], 2)
+
+    def test_sts_call_blocks_only_callers_of_the_same_role(self):
+        in_sts, release = threading.Event(), threading.Event()
+        assume = self.sts._sts_AssumeRole
+
+        def slow_assume(params):
+            if params['RoleArn'].endswith('/RoleA'):
+                in_sts.set()
+                release.wait(5)
+            return assume(params)
+
+        self.sts._sts_AssumeRole = slow_assume
+        sessions = []
+        threads = [threading.Thread(target=lambda: sessions.append(utils.assume_role('111111111111', 'RoleA', 'us-east-1')))
+                   for _ in range(2)]
+        threads[0].start()
+        self.assertTrue(in_sts.wait(5))
+        threads[1].start()
+
+        utils.assume_role('111111111111', 'RoleB', 'us-east-1')
+        self.assertTrue(threads[0].is_alive())
+
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(sessions), 2)
+        self.assertIs(sessions[0], sessions[1])
+        self.assertEqual(self.sts.calls['sts.AssumeRole'], 2)
+
+    def test_clear_resets_cache_and_counters(self):
+        utils.assume_role('111111111111', 'BiopsSourceAccountRole', 'us-east-1')
+        utils.clear_credential_cache()
+        self.assertEqual(utils.credential_cache_stats(), {'hits': 0, 'misses': 0, 'refreshes': 0, 'size': 0})
+        utils.assume_role('111111111111', 'BiopsSourceAccountRole', 'us-east-1')
+        self.assertEqual(self.sts.calls['sts.AssumeRole'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
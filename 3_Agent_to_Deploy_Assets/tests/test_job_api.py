@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Unit tests for GET /jobs of lambda/job_api/lambda_function.py and JobStatusManager.list_jobs.
+
+The job API runs unchanged against fake_aws.FakeDynamoDB with the secondary indexes of biops-job-runs.
+
+Tests cover:
+  - newest-first listing through the jobKind index, without child jobs and without Scan
+  - next_token pagination
+  - status and initiated_by filters, including jobs written before jobKind existed
+  - TTL (expiresAt) on finished jobs
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+import boto3
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+LAMBDA_DIR = os.path.join(os.path.dirname(TESTS_DIR), 'lambda')
+sys.path[:0] = [TESTS_DIR, os.path.join(LAMBDA_DIR, 'python')]
+
+from fake_aws import FakeDynamoDB
+from shared import dynamodb_utils
+from shared.dynamodb_utils import JobStatusManager
+
+spec = importlib.util.spec_from_file_location('job_api_function', os.path.join(LAMBDA_DIR, 'job_api', 'lambda_function.py'))
+job_api = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(job_api)
+
+JOB_RUNS_INDEXES = {
+    dynamodb_utils.JOBS_BY_STATUS_INDEX: ('status', 'createdAt'),
+    dynamodb_utils.JOBS_BY_INITIATOR_INDEX: ('initiatedBy', 'createdAt'),
+    dynamodb_utils.JOBS_BY_KIND_INDEX: ('jobKind', 'createdAt'),
+}
+
+
+class TestJobApi(unittest.TestCase):
+
+    def setUp(self):
+        boto3.setup_default_session(aws_access_key_id='fake', aws_secret_access_key='fake', region_name='us-east-1')
+        self.dynamodb = FakeDynamoDB().create_table('biops-job-runs', 'jobId', indexes=JOB_RUNS_INDEXES).install(
+            boto3.DEFAULT_SESSION)
+        self.manager = JobStatusManager()
+        # job-000 is the oldest; every third job is COMPLETED, jobs alternate between two users
+        for index in range(25):
+            job = self.manager.create_job(f'job-{index:03d}', {'source_asset_id': 'dashboard-1'},
+                                          'alice' if index % 2 else 'bob')
+            self.set_created_at(job['jobId'], f'2025-01-01T00:00:{index:02d}Z')
+            if index % 3 == 0:
+                self.manager.finish_job(job['jobId'], 'COMPLETED', '', {'dashboard_id': 'dashboard-1', 'size': 7})
+        self.manager.create_job('job-024-group-0', {}, 'bob', parent_job_id='job-024')
+        self.dynamodb.calls.clear()
+
+    def tearDown(self):
+        boto3.DEFAULT_SESSION = None
+
+    def set_created_at(self, job_id, created_at):
+        self.manager.table.update_item(Key={'jobId': job_id}, UpdateExpression='SET createdAt = :c',
+                                       ExpressionAttributeValues={':c': created_at})
+
+    def get_jobs(self, **params):
+        event = {'httpMethod': 'GET', 'path': '/jobs', 'queryStringParameters': params or None}
+        response = job_api.lambda_handler(event, None)
+        return response['statusCode'], json.loads(response['body'])
+
+    def test_lists_newest_jobs_first_without_scanning(self):
+        status, body = self.get_jobs(limit='5')
+        self.assertEqual(status, 200)
+        self.assertEqual([job['jobId'] for job in body['jobs']], ['job-024', 'job-023', 'job-022', 'job-021', 'job-020'])
+        self.assertIsNotNone(body['next_token'])
+        self.assertNotIn('dynamodb.Scan', self.dynamodb.calls)
+        # Decimal numbers from DynamoDB are returned as JSON numbers
+        self.assertEqual(body['jobs'][0]['results']['size'], 7)
+
+    def test_next_token_walks_all_jobs_once(self):
+        seen, next_token = [], None
+        while True:
+            params = {'limit': '10', **({'next_token': next_token} if next_token else {})}
+            status, body = self.get_jobs(**params)
+            self.assertEqual(status, 200)
+            seen += [job['jobId'] for job in body['jobs']]
+            next_token = body['next_token']
+            if not next_token:
+                break
+        self.assertEqual(seen, [f'job-{index:03d}' for index in reversed(range(25))])
+
+    def test_filters_by_status_and_initiator(self):
+        _, body = self.get_jobs(status='COMPLETED')
+        self.assertEqual([job['jobId'] for job in body['jobs']],
+                         [f'job-{index:03d}' for index in reversed(range(0, 25, 3))])
+
+        _, body = self.get_jobs(initiated_by='alice', limit='3')
+        self.assertEqual([job['jobId'] for job in body['jobs']], ['job-023', 'job-021', 'job-019'])
+
+        # bob's PENDING jobs, excluding the group job: pages stay full although the filter drops items
+        _, body = self.get_jobs(status='PENDING', initiated_by='bob', limit='4')
+        self.assertEqual([job['jobId'] for job in body['jobs']], ['job-022', 'job-020', 'job-016', 'job-014'])
+        _, body = self.get_jobs(status='PENDING', initiated_by='bob', limit='4', next_token=body['next_token'])
+        self.assertEqual([job['jobId'] for job in body['jobs']], ['job-010', 'job-008', 'job-004', 'job-002'])
+
+    def test_filters_list_jobs_without_job_kind(self):
+        self.manager.table.put_item(Item={'jobId': 'legacy-1', 'status': 'PENDING', 'initiatedBy': 'carol',
+                                          'createdAt': '2025-01-01T00:01:00Z'})
+        _, body = self.get_jobs(status='PENDING', limit='1')
+        self.assertEqual([job['jobId'] for job in body['jobs']], ['legacy-1'])
+        _, body = self.get_jobs(initiated_by='carol')
+        self.assertEqual([job['jobId'] for job in body['jobs']], ['legacy-1'])
+        # the unfiltered listing reads the jobKind index, which legacy jobs are not in
+        _, body = self.get_jobs(limit='1')
+        self.assertEqual([job['jobId'] for job in body['jobs']], ['job-024'])
+
+    def test_invalid_parameters_are_rejected(self):
+        self.assertEqual(self.get_jobs(next_token='not-a-token')[0], 400)
+        self.assertEqual(self.get_jobs(limit='many')[0], 400)
+
+    def test_finished_jobs_expire(self):
+        job = self.manager.get_job('job-003')
+        self.assertAlmostEqual(int(job['expiresAt']), time.time() + dynamodb_utils.JOB_TTL_DAYS * 86400, delta=60)
+        self.assertNotIn('expiresAt', self.manager.get_job('job-001'))
+
+        with patch.object(dynamodb_utils, 'JOB_TTL_DAYS', 0):
+            self.manager.finish_job('job-001', 'FAILED', '')
+        self.assertNotIn('expiresAt', self.manager.get_job('job-001'))
+
+
+if __name__ == '__main__':
+    unittest.main()
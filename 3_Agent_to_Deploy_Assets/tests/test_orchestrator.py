@@ -0,0 +1,611 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the asynchronous deployment orchestrator (lambda/orchestrator/lambda_function.py).
+
+The orchestrator and JobStatusManager run unchanged against fake_aws.FakeDynamoDB and fake_aws.FakeLambda;
+the four step functions are replaced by stubs that answer like the real ones in their non-blocking mode.
+
+Tests cover:
+  - a deployment advancing through all steps on completion events and polls
+  - step failures (error response and crashed invocation)
+  - duplicate completion events
+  - step results stored in a map and written with the transitions
+  - steps that never report back
+  - batch deployments: grouping of dashboards into bundles, parallelism cap, failed groups
+  - the bundle cache: cache keys, cache hits skipping export and upload
+  - fan-out deployments: one export for many targets, parallelism cap, partial failures
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import boto3
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+LAMBDA_DIR = os.path.join(os.path.dirname(TESTS_DIR), 'lambda')
+sys.path[:0] = [TESTS_DIR, os.path.join(LAMBDA_DIR, 'python')]
+
+from fake_aws import FakeDynamoDB, FakeLambda, FakeS3
+from shared import dynamodb_utils
+from shared.dynamodb_utils import JobStatusManager
+
+
+def load_lambda(name):
+    spec = importlib.util.spec_from_file_location(f'{name}_function', os.path.join(LAMBDA_DIR, name, 'lambda_function.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+orchestrator = load_lambda('orchestrator')
+export_assets = load_lambda('export_assets')
+
+JOB_RUNS_INDEXES = {
+    dynamodb_utils.JOBS_BY_STATUS_INDEX: ('status', 'createdAt'),
+    dynamodb_utils.JOBS_BY_INITIATOR_INDEX: ('initiatedBy', 'createdAt'),
+    dynamodb_utils.JOBS_BY_KIND_INDEX: ('jobKind', 'createdAt'),
+}
+
+CONFIG = {
+    'source_account_id': '111111111111',
+    'source_role_name': 'BiopsSourceAccountRole',
+    'source_asset_id': 'dashboard-1',
+    'target_account_id': '222222222222',
+    'target_role_name': 'BiopsTargetAccountRole',
+    'target_admin_user': 'admin',
+    'bucket_name': 'biops-bucket',
+    'aws_region': 'us-east-1',
+}
+
+
+def ok(body):
+    return {'statusCode': 200, 'body': json.dumps(body)}
+
+
+class FakeSteps:
+    """Step functions answering like the real ones; export and import need `checks` status checks to finish."""
+
+    def __init__(self, checks=1):
+        self.checks = checks
+        self.export_checks = 0
+        self.import_checks = 0
+        self.fail_step = None
+        self.groups = []
+        self.cached_s3_uri = None
+        self.fail_targets = set()
+
+    def export(self, event, context):
+        if event.get('plan'):
+            return ok({'groups': self.groups})
+        if self.fail_step == 'biops-export-assets' or self.fail_step in event.get('source_asset_ids', []):
+            return {'statusCode': 500, 'body': json.dumps({'error': 'Export job failed'})}
+        if 'export_job_id' not in event:
+            if self.cached_s3_uri and event['use_bundle_cache']:
+                return ok({'job_id': None, 'status': 'SUCCESSFUL', 'cached': True, 'cache_key': 'key-1',
+                           's3_uri': self.cached_s3_uri})
+            return ok({'job_id': 'export-1', 'status': 'IN_PROGRESS', 'cache_key': 'key-1'})
+        self.export_checks += 1
+        if self.export_checks < self.checks:
+            return ok({'job_id': 'export-1', 'status': 'IN_PROGRESS'})
+        return ok({'job_id': 'export-1', 'status': 'SUCCESSFUL', 'download_url': 'https://bundle',
+                   'export_format': 'QUICKSIGHT_JSON', 'cache_key': event['cache_key']})
+
+    def upload(self, event, context):
+        if self.fail_step == 'biops-upload-assets':
+            raise RuntimeError('Task timed out after 300.00 seconds')
+        return ok({'s3_uri': f"s3://{event['bucket_name']}/QUICKSIGHT_JSON_{event['job_id']}.qs"})
+
+    def import_(self, event, context):
+        if event['target_account_id'] in self.fail_targets:
+            return {'statusCode': 500, 'body': json.dumps({'error': 'Import job failed'})}
+        if 'import_job_id' not in event:
+            return ok({'job_id': 'import-1', 'status': 'QUEUED_FOR_IMMEDIATE_EXECUTION'})
+        self.import_checks += 1
+        status = 'SUCCESSFUL' if self.import_checks >= self.checks else 'IN_PROGRESS'
+        return ok({'job_id': 'import-1', 'status': status})
+
+    def permissions(self, event, context):
+        return ok({'dashboard_id': 'dashboard-1', 'datasets_updated': 2})
+
+
+class OrchestratorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        boto3.setup_default_session(aws_access_key_id='fake', aws_secret_access_key='fake', region_name='us-east-1')
+        self.dynamodb = FakeDynamoDB().create_table('biops-job-runs', 'jobId', indexes=JOB_RUNS_INDEXES).install(
+            boto3.DEFAULT_SESSION)
+        self.lambda_ = FakeLambda().install(boto3.DEFAULT_SESSION)
+        self.steps = FakeSteps()
+        self.lambda_.register('biops-orchestrator', orchestrator.lambda_handler)
+        for name, handler in [('biops-export-assets', self.steps.export),
+                              ('biops-upload-assets', self.steps.upload),
+                              ('biops-import-assets', self.steps.import_),
+                              ('biops-update-permissions', self.steps.permissions)]:
+            self.lambda_.register(name, handler, on_success='biops-orchestrator', on_failure='biops-orchestrator')
+
+    def tearDown(self):
+        boto3.DEFAULT_SESSION = None
+
+    def start(self):
+        response = orchestrator.lambda_handler({'config': CONFIG, 'initiated_by': 'tester'}, None)
+        self.assertEqual(response['statusCode'], 202)
+        return json.loads(response['body'])['job_id']
+
+    def poll(self):
+        orchestrator.lambda_handler({'source': 'aws.events', 'detail-type': 'Scheduled Event'}, None)
+        self.lambda_.run_pending()
+
+    def job(self, job_id):
+        return JobStatusManager().get_job(job_id)
+
+
+class TestOrchestrator(OrchestratorTestCase):
+
+    def test_start_returns_without_waiting_for_steps(self):
+        job_id = self.start()
+        job = self.job(job_id)
+        self.assertEqual(job['status'], 'RUNNING')
+        self.assertEqual(job['currentStep'], 'biops-export-assets')
+        self.assertEqual(job['stepState'], 'INVOKED')
+        self.assertEqual(len(self.lambda_.pending), 1)
+        self.assertEqual(self.lambda_.calls['lambda.Invoke'], 1)
+
+    def test_job_waits_for_export_between_polls(self):
+        self.steps.checks = 2
+        job_id = self.start()
+        self.lambda_.run_pending()
+        job = self.job(job_id)
+        self.assertEqual(job['stepState'], 'WAITING')
+        self.assertEqual(job['outputs']['export_job_id'], 'export-1')
+
+        self.poll()
+        self.assertEqual(self.job(job_id)['stepState'], 'WAITING')
+        self.assertEqual(self.steps.export_checks, 1)
+
+        self.poll()
+        job = self.job(job_id)
+        self.assertEqual(job['currentStep'], 'biops-import-assets')
+        self.assertEqual(job['stepState'], 'WAITING')
+
+    def test_job_completes(self):
+        job_id = self.start()
+        self.lambda_.run_pending()
+        self.poll()
+        self.poll()
+        job = self.job(job_id)
+        self.assertEqual(job['status'], 'COMPLETED')
+        self.assertEqual([step['name'] for step in job['steps']], orchestrator.STEPS)
+        self.assertTrue(all(step['status'] == 'SUCCEEDED' for step in job['steps']))
+        self.assertEqual(job['results'], {
+            'export_job_id': 'export-1',
+            'import_job_id': 'import-1',
+            's3_uri': 's3://biops-bucket/QUICKSIGHT_JSON_export-1.qs',
+            'bundle_cached': False,
+            'dashboard_id': 'dashboard-1',
+        })
+        upload = [i for i in self.lambda_.invocations if i['FunctionName'] == 'biops-upload-assets'][0]
+        self.assertEqual(upload['Payload']['download_url'], 'https://bundle')
+        self.assertEqual(upload['Payload']['cache_key'], 'key-1')
+
+    def test_cached_bundle_skips_export_and_upload(self):
+        self.steps.cached_s3_uri = 's3://biops-bucket/bundle-cache/key-1.qs'
+        job_id = self.start()
+        self.lambda_.run_pending()
+        self.poll()
+        job = self.job(job_id)
+        self.assertEqual(job['status'], 'COMPLETED')
+        self.assertEqual([(step['name'], step['status']) for step in job['steps']], [
+            ('biops-export-assets', 'SUCCEEDED'),
+            ('biops-upload-assets', 'SKIPPED'),
+            ('biops-import-assets', 'SUCCEEDED'),
+            ('biops-update-permissions', 'SUCCEEDED'),
+        ])
+        self.assertEqual(job['results']['s3_uri'], self.steps.cached_s3_uri)
+        self.assertTrue(job['results']['bundle_cached'])
+        self.assertIsNone(job['results']['export_job_id'])
+        functions = [i['FunctionName'] for i in self.lambda_.invocations]
+        self.assertNotIn('biops-upload-assets', functions)
+        self.assertEqual(functions.count('biops-export-assets'), 1)
+        import_ = [i for i in self.lambda_.invocations if i['FunctionName'] == 'biops-import-assets'][0]
+        self.assertEqual(import_['Payload']['s3_uri'], self.steps.cached_s3_uri)
+
+    def test_step_results_are_written_with_transitions(self):
+        with patch.object(JobStatusManager, 'add_step_result', side_effect=AssertionError('separate step write')):
+            job_id = self.start()
+            self.lambda_.run_pending()
+            self.poll()
+            self.poll()
+        item = boto3.resource('dynamodb').Table('biops-job-runs').get_item(Key={'jobId': job_id})['Item']
+        self.assertEqual(item['status'], 'COMPLETED')
+        self.assertEqual(set(item['steps']), set(orchestrator.STEPS))
+        self.assertEqual(item['steps']['biops-upload-assets']['outputS3Key'],
+                         's3://biops-bucket/QUICKSIGHT_JSON_export-1.qs')
+        for step in item['steps'].values():
+            self.assertLessEqual(step['startedAt'], step['endedAt'])
+
+    def test_concurrent_jobs_progress_independently(self):
+        job_ids = [self.start() for _ in range(5)]
+        self.lambda_.run_pending()
+        self.steps.export_checks = -100
+        self.poll()
+        for job_id in job_ids:
+            self.assertEqual(self.job(job_id)['currentStep'], 'biops-export-assets')
+        self.steps.export_checks = 0
+        self.poll()
+        self.poll()
+        self.assertEqual({self.job(job_id)['status'] for job_id in job_ids}, {'COMPLETED'})
+
+    def test_failed_step_response_fails_job(self):
+        self.steps.fail_step = 'biops-export-assets'
+        job_id = self.start()
+        self.lambda_.run_pending()
+        job = self.job(job_id)
+        self.assertEqual(job['status'], 'FAILED')
+        self.assertEqual(job['steps'][-1]['name'], 'biops-export-assets')
+        self.assertIn('Export job failed', job['steps'][-1]['errorMessage'])
+
+    def test_crashed_step_fails_job_through_on_failure(self):
+        self.steps.fail_step = 'biops-upload-assets'
+        job_id = self.start()
+        self.lambda_.run_pending()
+        self.poll()
+        job = self.job(job_id)
+        self.assertEqual(job['status'], 'FAILED')
+        self.assertEqual(job['steps'][-1]['name'], 'biops-upload-assets')
+        self.assertEqual(job['steps'][-1]['status'], 'FAILED')
+
+    def test_duplicate_completion_event_is_ignored(self):
+        job_id = self.start()
+        name, payload = self.lambda_.pending[0]
+        record = {
+            'requestContext': {'condition': 'Success'},
+            'requestPayload': payload,
+            'responsePayload': self.steps.export(payload, None),
+        }
+        orchestrator.lambda_handler(record, None)
+        first = self.job(job_id)
+        orchestrator.lambda_handler(record, None)
+        self.assertEqual(self.job(job_id), first)
+        self.assertEqual(first['stepState'], 'WAITING')
+
+    def test_step_that_never_reports_back_fails_on_poll(self):
+        job_id = self.start()
+        self.lambda_.pending.clear()
+        self.poll()
+        self.assertEqual(self.job(job_id)['status'], 'RUNNING')
+
+        stale = (datetime.utcnow() - timedelta(seconds=orchestrator.STEP_TIMEOUT_SECONDS + 60)).isoformat() + 'Z'
+        boto3.resource('dynamodb').Table('biops-job-runs').update_item(
+            Key={'jobId': job_id}, UpdateExpression='SET stepStartedAt = :t', ExpressionAttributeValues={':t': stale})
+        self.poll()
+        job = self.job(job_id)
+        self.assertEqual(job['status'], 'FAILED')
+        self.assertIn('did not report back', job['steps'][-1]['errorMessage'])
+
+
+class TestJobStatusManagerSteps(unittest.TestCase):
+
+    def setUp(self):
+        boto3.setup_default_session(aws_access_key_id='fake', aws_secret_access_key='fake', region_name='us-east-1')
+        self.dynamodb = FakeDynamoDB().create_table('biops-job-runs', 'jobId', indexes=JOB_RUNS_INDEXES).install(
+            boto3.DEFAULT_SESSION)
+        self.manager = JobStatusManager()
+        self.manager.create_job('job-1', CONFIG, 'tester')
+        self.dynamodb.calls.clear()
+
+    def tearDown(self):
+        boto3.DEFAULT_SESSION = None
+
+    def test_add_step_result_is_one_conditional_write(self):
+        self.manager.add_step_result('job-1', 'biops-export-assets', 'SUCCEEDED', output_s3_key='https://bundle')
+        self.assertEqual(dict(self.dynamodb.calls), {'dynamodb.UpdateItem': 1})
+        self.manager.add_step_result('job-1', 'biops-export-assets', 'FAILED', error_message='boom')
+        steps = self.manager.get_job('job-1')['steps']
+        self.assertEqual([(step['name'], step['status'], step.get('errorMessage')) for step in steps],
+                         [('biops-export-assets', 'FAILED', 'boom')])
+
+    def test_steps_written_by_separate_writers_are_all_kept(self):
+        # each write touches only its own entry of the steps map, so concurrent steps cannot overwrite each other
+        for name in ['biops-import-assets', 'biops-update-permissions']:
+            self.manager.add_step_result('job-1', name, 'SUCCEEDED')
+        self.assertEqual([step['name'] for step in self.manager.get_job('job-1')['steps']],
+                         ['biops-import-assets', 'biops-update-permissions'])
+
+    def test_add_step_result_requires_existing_job(self):
+        with self.assertRaises(self.manager.conditional_check_failed):
+            self.manager.add_step_result('job-missing', 'biops-export-assets', 'SUCCEEDED')
+
+    def test_finish_job_records_step_result_in_the_same_write(self):
+        step = self.manager.step_result('biops-export-assets', 'FAILED', error_message='Export job failed')
+        self.assertTrue(self.manager.finish_job('job-1', 'FAILED', '', step_results=[step]))
+        self.assertFalse(self.manager.finish_job('job-1', 'COMPLETED', 'stale-token', step_results=[step]))
+        self.assertEqual(dict(self.dynamodb.calls), {'dynamodb.UpdateItem': 2})
+        job = self.manager.get_job('job-1')
+        self.assertEqual(job['status'], 'FAILED')
+        self.assertEqual(job['steps'], [step])
+
+
+class TestPlanExportGroups(unittest.TestCase):
+
+    def test_dashboards_sharing_dependencies_share_a_bundle(self):
+        dependencies = {
+            'd1': {'ds-a', 'src-1'},
+            'd2': {'ds-b', 'src-1'},
+            'd3': {'ds-c', 'src-2'},
+            'd4': {'ds-b'},
+        }
+        groups = export_assets.plan_export_groups(dependencies, max_assets_per_bundle=3)
+        self.assertEqual(groups, [
+            {'dashboard_ids': ['d1', 'd2', 'd4'], 'after': None},
+            {'dashboard_ids': ['d3'], 'after': None},
+        ])
+
+    def test_independent_dashboards_are_packed_into_few_bundles(self):
+        dependencies = {f'd{i}': {f'ds-{i}'} for i in range(250)}
+        groups = export_assets.plan_export_groups(dependencies)
+        self.assertEqual([len(group['dashboard_ids']) for group in groups], [100, 100, 50])
+        self.assertTrue(all(group['after'] is None for group in groups))
+
+    def test_oversized_component_is_split_into_sequential_groups(self):
+        dependencies = {f'd{i}': {'ds-shared'} for i in range(5)}
+        dependencies['x'] = {'ds-other'}
+        groups = export_assets.plan_export_groups(dependencies, max_assets_per_bundle=2)
+        self.assertEqual(groups, [
+            {'dashboard_ids': ['d0', 'd1'], 'after': None},
+            {'dashboard_ids': ['d2', 'd3'], 'after': 0},
+            {'dashboard_ids': ['d4'], 'after': 1},
+            {'dashboard_ids': ['x'], 'after': None},
+        ])
+
+    def test_dashboards_sharing_a_parent_dataset_are_grouped(self):
+        arn = 'arn:aws:quicksight:us-east-1:111111111111:'
+        qs = MagicMock()
+        qs.describe_dashboard.side_effect = lambda AwsAccountId, DashboardId: {'Dashboard': {
+            'Arn': f'{arn}dashboard/{DashboardId}',
+            'Version': {'VersionNumber': 1, 'DataSetArns': [f'{arn}dataset/ds-{DashboardId}']}}}
+        datasets = {
+            'ds-d1': {'LogicalTableMap': {'l1': {'Source': {'DataSetArn': f'{arn}dataset/ds-parent'}}}},
+            'ds-d2': {'LogicalTableMap': {'l1': {'Source': {'DataSetArn': f'{arn}dataset/ds-parent'}}}},
+            'ds-d3': {},
+            'ds-parent': {},
+        }
+        qs.describe_data_set.side_effect = lambda AwsAccountId, DataSetId: {'DataSet': datasets[DataSetId]}
+        dependencies, _ = export_assets.dashboard_dependencies(qs, '111111111111', ['d1', 'd2', 'd3'])
+        self.assertEqual(qs.describe_data_set.call_count, 4)
+        groups = export_assets.plan_export_groups(dependencies, max_assets_per_bundle=1)
+        self.assertEqual(groups, [
+            {'dashboard_ids': ['d1'], 'after': None},
+            {'dashboard_ids': ['d2'], 'after': 0},
+            {'dashboard_ids': ['d3'], 'after': None},
+        ])
+
+
+class TestBundleCache(unittest.TestCase):
+    """biops-export-assets against a mocked source QuickSight account and fake_aws.FakeS3 as the tools bucket."""
+
+    def setUp(self):
+        boto3.setup_default_session(aws_access_key_id='fake', aws_secret_access_key='fake', region_name='us-east-1')
+        self.s3 = FakeS3().install(boto3.DEFAULT_SESSION)
+        self.qs = MagicMock()
+        self.dataset_updated = '2024-01-01T00:00:00'
+        self.qs.describe_dashboard.side_effect = lambda AwsAccountId, DashboardId: {'Dashboard': {
+            'Arn': f'arn:aws:quicksight:us-east-1:111111111111:dashboard/{DashboardId}',
+            'LastUpdatedTime': '2024-01-01T00:00:00',
+            'Version': {'VersionNumber': 3, 'DataSetArns': ['arn:aws:quicksight:us-east-1:111111111111:dataset/ds-1'],
+                        'ThemeArn': 'arn:aws:quicksight::aws:theme/MIDNIGHT'}}}
+        self.qs.describe_data_set.side_effect = lambda AwsAccountId, DataSetId: {'DataSet': {
+            'LastUpdatedTime': self.dataset_updated,
+            'PhysicalTableMap': {'t1': {'RelationalTable': {
+                'DataSourceArn': 'arn:aws:quicksight:us-east-1:111111111111:datasource/src-1'}}}}}
+        self.qs.describe_data_source.return_value = {'DataSource': {'LastUpdatedTime': '2023-06-01T00:00:00'}}
+        self.qs.start_asset_bundle_export_job.return_value = {'AssetBundleExportJobId': 'export-1'}
+        self.qs.describe_asset_bundle_export_job.return_value = {'AssetBundleExportJobId': 'export-1',
+                                                                 'JobStatus': 'IN_PROGRESS'}
+        session = MagicMock()
+        session.client.return_value = self.qs
+        patcher = patch.object(export_assets, 'assume_role', return_value=session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        boto3.DEFAULT_SESSION = None
+
+    def export(self, **overrides):
+        event = {**orchestrator.step_payload('biops-export-assets', CONFIG, {}), **overrides}
+        response = export_assets.lambda_handler(event, None)
+        self.assertEqual(response['statusCode'], 200, response['body'])
+        return json.loads(response['body'])
+
+    def test_cache_key_follows_dependency_versions(self):
+        _, versions = export_assets.dashboard_dependencies(self.qs, '111111111111', ['dashboard-1'])
+        self.assertEqual(set(versions), {
+            'arn:aws:quicksight:us-east-1:111111111111:dashboard/dashboard-1',
+            'arn:aws:quicksight:us-east-1:111111111111:dataset/ds-1',
+            'arn:aws:quicksight:us-east-1:111111111111:datasource/src-1',
+            'arn:aws:quicksight::aws:theme/MIDNIGHT',
+        })
+        key = export_assets.bundle_cache_key(versions)
+        self.assertEqual(export_assets.bundle_cache_key(dict(reversed(list(versions.items())))), key)
+
+        self.dataset_updated = '2024-02-01T00:00:00'
+        _, changed = export_assets.dashboard_dependencies(self.qs, '111111111111', ['dashboard-1'])
+        self.assertNotEqual(export_assets.bundle_cache_key(changed), key)
+
+    def test_parent_datasets_are_dependencies(self):
+        arn = 'arn:aws:quicksight:us-east-1:111111111111:'
+        datasets = {
+            'ds-1': {'LastUpdatedTime': '2024-01-01T00:00:00',
+                     'LogicalTableMap': {'l1': {'Source': {'DataSetArn': f'{arn}dataset/ds-parent'}}}},
+            'ds-parent': {'LastUpdatedTime': self.dataset_updated,
+                          'PhysicalTableMap': {'t1': {'CustomSql': {'DataSourceArn': f'{arn}datasource/src-2'}}}},
+        }
+        self.qs.describe_data_set.side_effect = lambda AwsAccountId, DataSetId: {'DataSet': datasets[DataSetId]}
+        dependencies, versions = export_assets.dashboard_dependencies(self.qs, '111111111111', ['dashboard-1'])
+        self.assertEqual(dependencies['dashboard-1'], {
+            f'{arn}dataset/ds-1', f'{arn}dataset/ds-parent', f'{arn}datasource/src-2',
+            'arn:aws:quicksight::aws:theme/MIDNIGHT',
+        })
+        self.assertEqual(versions[f'{arn}dataset/ds-parent'], '2024-01-01T00:00:00')
+        key = export_assets.bundle_cache_key(versions)
+
+        datasets['ds-parent']['LastUpdatedTime'] = '2024-02-01T00:00:00'
+        _, changed = export_assets.dashboard_dependencies(self.qs, '111111111111', ['dashboard-1'])
+        self.assertNotEqual(export_assets.bundle_cache_key(changed), key)
+
+    def test_cache_miss_starts_export(self):
+        body = self.export()
+        self.assertEqual(body['job_id'], 'export-1')
+        self.assertEqual(len(body['cache_key']), 64)
+        self.assertEqual(self.qs.start_asset_bundle_export_job.call_count, 1)
+
+    def test_cache_hit_skips_export(self):
+        key = self.export()['cache_key']
+        boto3.client('s3').put_object(Bucket='biops-bucket', Key=f'bundle-cache/{key}.qs', Body=b'bundle')
+        body = self.export()
+        self.assertTrue(body['cached'])
+        self.assertEqual(body['s3_uri'], f's3://biops-bucket/bundle-cache/{key}.qs')
+        self.assertEqual(self.qs.start_asset_bundle_export_job.call_count, 1)
+
+        self.export(use_bundle_cache=False)
+        self.assertEqual(self.qs.start_asset_bundle_export_job.call_count, 2)
+
+
+class TestBatchDeployment(OrchestratorTestCase):
+
+    def start_batch(self, groups, max_parallel_groups=2):
+        self.steps.groups = groups
+        config = {**CONFIG, 'source_asset_ids': [d for group in groups for d in group['dashboard_ids']],
+                  'max_parallel_groups': max_parallel_groups}
+        config.pop('source_asset_id')
+        response = orchestrator.lambda_handler({'config': config, 'initiated_by': 'tester'}, None)
+        return json.loads(response['body'])['job_id']
+
+    def children(self, job_id):
+        return [self.job(child_id) for child_id in self.job(job_id)['outputs']['child_job_ids']]
+
+    def test_groups_run_within_parallelism_cap(self):
+        groups = [{'dashboard_ids': [f'd{i}'], 'after': None} for i in range(5)]
+        job_id = self.start_batch(groups, max_parallel_groups=2)
+        self.lambda_.run_pending()
+        statuses = [child['status'] for child in self.children(job_id)]
+        self.assertEqual(statuses, ['RUNNING', 'RUNNING', 'PENDING', 'PENDING', 'PENDING'])
+
+        for _ in range(20):
+            self.poll()
+            running = [child for child in self.children(job_id) if child['status'] == 'RUNNING']
+            self.assertLessEqual(len(running), 2)
+            if self.job(job_id)['status'] == 'COMPLETED':
+                break
+        job = self.job(job_id)
+        self.assertEqual(job['status'], 'COMPLETED')
+        self.assertEqual([group['dashboard_ids'] for group in job['results']['groups']],
+                         [[f'd{i}'] for i in range(5)])
+        exports = [i for i in self.lambda_.invocations
+                   if i['FunctionName'] == 'biops-export-assets' and i['Payload'].get('wait') is False]
+        self.assertEqual(len(exports), 5)
+        permissions = [i['Payload'] for i in self.lambda_.invocations if i['FunctionName'] == 'biops-update-permissions']
+        self.assertEqual(sorted(p['dashboard_ids'][0] for p in permissions), [f'd{i}' for i in range(5)])
+
+    def test_failed_group_fails_batch_and_dependent_groups(self):
+        groups = [
+            {'dashboard_ids': ['d0'], 'after': None},
+            {'dashboard_ids': ['d1'], 'after': 0},
+            {'dashboard_ids': ['d2'], 'after': None},
+        ]
+        self.steps.fail_step = 'd0'
+        job_id = self.start_batch(groups, max_parallel_groups=3)
+        self.lambda_.run_pending()
+        for _ in range(5):
+            self.poll()
+        self.assertEqual([child['status'] for child in self.children(job_id)], ['FAILED', 'FAILED', 'COMPLETED'])
+        job = self.job(job_id)
+        self.assertEqual(job['status'], 'FAILED')
+        self.assertEqual([group['status'] for group in job['results']['groups']], ['FAILED', 'FAILED', 'COMPLETED'])
+
+
+
+class TestFanOutDeployment(OrchestratorTestCase):
+
+    def start_fan_out(self, account_ids, max_parallel_targets=2):
+        config = {key: value for key, value in CONFIG.items() if not key.startswith('target_')}
+        config['targets'] = [{'target_account_id': account_id, 'target_role_name': 'BiopsTargetAccountRole',
+                              'target_admin_user': 'admin'} for account_id in account_ids]
+        config['targets'][-1]['aws_region'] = 'eu-west-1'
+        config['max_parallel_targets'] = max_parallel_targets
+        response = orchestrator.lambda_handler({'config': config, 'initiated_by': 'tester'}, None)
+        self.assertEqual(response['statusCode'], 202, response['body'])
+        return json.loads(response['body'])['job_id']
+
+    def invocations(self, function_name):
+        return [i['Payload'] for i in self.lambda_.invocations if i['FunctionName'] == function_name]
+
+    def run_until_finished(self, job_id, max_parallel_targets):
+        self.lambda_.run_pending()
+        for _ in range(20):
+            job = self.job(job_id)
+            if job['status'] in orchestrator.FINISHED_STATUSES:
+                return job
+            if job['currentStep'] == orchestrator.TARGETS_STEP:
+                running = [child_id for child_id in job['outputs']['started']
+                           if self.job(child_id)['status'] not in orchestrator.FINISHED_STATUSES]
+                self.assertLessEqual(len(running), max_parallel_targets)
+            self.poll()
+        self.fail('fan-out job did not finish')
+
+    def test_bundle_is_exported_once_for_all_targets(self):
+        accounts = [f'33333333333{i}' for i in range(5)]
+        job_id = self.start_fan_out(accounts, max_parallel_targets=2)
+        job = self.run_until_finished(job_id, max_parallel_targets=2)
+
+        self.assertEqual(job['status'], 'COMPLETED')
+        self.assertEqual(len([p for p in self.invocations('biops-export-assets') if 'export_job_id' not in p]), 1)
+        self.assertEqual(len(self.invocations('biops-upload-assets')), 1)
+        imports = [p for p in self.invocations('biops-import-assets') if 'import_job_id' not in p]
+        self.assertEqual(sorted(p['target_account_id'] for p in imports), accounts)
+        self.assertEqual({p['s3_uri'] for p in imports}, {'s3://biops-bucket/QUICKSIGHT_JSON_export-1.qs'})
+        self.assertEqual([p['aws_region'] for p in imports if p['target_account_id'] == accounts[-1]], ['eu-west-1'])
+        self.assertEqual(len(self.invocations('biops-update-permissions')), 5)
+
+        self.assertEqual(job['results']['succeeded'], 5)
+        self.assertEqual(job['results']['failed'], 0)
+        for index, target in enumerate(job['results']['targets']):
+            child = self.job(target['job_id'])
+            self.assertEqual(child['jobId'], f'{job_id}-target-{index}')
+            self.assertEqual(child['parentJobId'], job_id)
+            self.assertEqual(child['payload']['target_account_id'], accounts[index])
+            self.assertEqual([step['name'] for step in child['steps']], orchestrator.TARGET_STEPS)
+            self.assertEqual(target['results']['export_job_id'], 'export-1')
+
+    def test_failed_targets_are_reported_as_partial_failure(self):
+        accounts = ['333333333330', '333333333331', '333333333332']
+        self.steps.fail_targets = {'333333333331'}
+        job_id = self.start_fan_out(accounts, max_parallel_targets=3)
+        job = self.run_until_finished(job_id, max_parallel_targets=3)
+
+        self.assertEqual(job['status'], 'PARTIALLY_COMPLETED')
+        self.assertEqual(job['results']['succeeded'], 2)
+        self.assertEqual(job['results']['failed'], 1)
+        failed = job['results']['targets'][1]
+        self.assertEqual(failed['status'], 'FAILED')
+        self.assertEqual(failed['failed_step'], 'biops-import-assets')
+        self.assertIn('Import job failed', failed['error'])
+        self.assertEqual({t['status'] for i, t in enumerate(job['results']['targets']) if i != 1}, {'COMPLETED'})
+
+    def test_all_targets_failing_fails_job(self):
+        self.steps.fail_targets = {'333333333330', '333333333331'}
+        job_id = self.start_fan_out(['333333333330', '333333333331'])
+        self.assertEqual(self.run_until_finished(job_id, max_parallel_targets=2)['status'], 'FAILED')
+
+    def test_empty_target_list_is_rejected(self):
+        response = orchestrator.lambda_handler({'config': {**CONFIG, 'targets': []}}, None)
+        self.assertEqual(response['statusCode'], 500)
+        self.assertEqual(self.dynamodb.items('biops-job-runs'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Unit tests and latency benchmark for lambda/token_authorizer.py.
+
+Tokens are signed with RSA keys generated for the test and the user pool JWKS is served by a local HTTP
+server, which adds JWKS_LATENCY_SECONDS to every response as the Cognito endpoint would. Set
+BIOPS_AUTHORIZER_BENCH_REQUESTS to change the number of requests of the benchmark.
+
+Tests cover:
+  - valid ID and access tokens allowed, with the user context
+  - forged signature, expired token, wrong issuer and missing scope denied
+  - JWKS fetched once, refetched for a rotated key, at most once per refresh interval for unknown kids
+  - validated tokens cached until their exp, least recently used evicted first
+  - per-request latency, cold and warm
+"""
+
+import importlib.util
+import json
+import os
+import statistics
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+LAMBDA_DIR = os.path.join(os.path.dirname(TESTS_DIR), 'lambda')
+
+spec = importlib.util.spec_from_file_location('token_authorizer', os.path.join(LAMBDA_DIR, 'token_authorizer.py'))
+token_authorizer = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(token_authorizer)
+
+METHOD_ARN = 'arn:aws:execute-api:us-east-1:111111111111:api-id/prod/GET/jobs'
+JWKS_LATENCY_SECONDS = 0.05
+BENCH_REQUESTS = int(os.environ.get('BIOPS_AUTHORIZER_BENCH_REQUESTS', '500'))
+
+
+def signing_key(kid):
+    """(kid, private key, public JWK) of a new RSA key."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    return kid, private_key, {**jwk, 'kid': kid, 'alg': 'RS256', 'use': 'sig'}
+
+
+KEY_1 = signing_key('key-1')
+KEY_2 = signing_key('key-2')
+
+
+class JwksHandler(BaseHTTPRequestHandler):
+    """Serves the JWKS held by the server, after JWKS_LATENCY_SECONDS, and counts the requests."""
+
+    def do_GET(self):
+        time.sleep(JWKS_LATENCY_SECONDS)
+        self.server.requests += 1
+        body = json.dumps({'keys': self.server.jwks}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class JwksTestCase(unittest.TestCase):
+    """Authorizer against the local JWKS server, with its caches cleared and its clock at self.now."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), JwksHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.jwks = [KEY_1[2]]
+        self.server.requests = 0
+        self.now = time.time()
+        url = f'http://127.0.0.1:{self.server.server_address[1]}/.well-known/jwks.json'
+        for name, value in [('JWKS_URL', url), ('_clock', lambda: self.now)]:
+            patcher = patch.object(token_authorizer, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        token_authorizer.clear_caches()
+        self.addCleanup(token_authorizer.clear_caches)
+
+    def token(self, key=KEY_1, expires_in=3600, **claims):
+        kid, private_key, _ = key
+        payload = {'iss': token_authorizer.COGNITO_ISSUER, 'sub': 'user-1', 'token_use': 'access',
+                   'client_id': 'client-1', 'scope': 'biops-api/read biops-api/write',
+                   'iat': int(self.now), 'exp': int(self.now) + expires_in, **claims}
+        return jwt.encode(payload, private_key, algorithm='RS256', headers={'kid': kid})
+
+    def authorize(self, token):
+        return token_authorizer.lambda_handler({'type': 'TOKEN', 'authorizationToken': f'Bearer {token}',
+                                                'methodArn': METHOD_ARN}, None)
+
+    def effect(self, token):
+        return self.authorize(token)['policyDocument']['Statement'][0]['Effect']
+
+
+class TestTokenAuthorizer(JwksTestCase):
+
+    def test_valid_tokens_are_allowed_with_user_context(self):
+        policy = self.authorize(self.token())
+        self.assertEqual(policy['policyDocument']['Statement'][0]['Effect'], 'Allow')
+        self.assertEqual(policy['context'], {'sub': 'user-1', 'client_id': 'client-1', 'token_use': 'access',
+                                             'scope': 'biops-api/read biops-api/write'})
+
+        id_token = self.token(token_use='id', aud='client-1', client_id=None, scope=None)
+        self.assertEqual(self.authorize(id_token)['context']['client_id'], 'client-1')
+
+    def test_invalid_tokens_are_denied(self):
+        # signed with key-2 but claiming key-1
+        forged = self.token((KEY_1[0], KEY_2[1], None))
+        unsigned = jwt.encode(jwt.decode(self.token(), options={'verify_signature': False}), None, algorithm='none')
+        for token in [forged, unsigned, self.token(expires_in=-60),
+                      self.token(iss='https://cognito-idp.us-east-1.amazonaws.com/other-pool'),
+                      self.token(scope='openid'), self.token(token_use='refresh'), 'not-a-token']:
+            self.assertEqual(self.effect(token), 'Deny', token)
+        self.assertEqual(token_authorizer.cache_stats()['cached_tokens'], 0)
+
+    def test_jwks_is_fetched_once_and_refetched_for_rotated_keys(self):
+        for index in range(5):
+            self.assertEqual(self.effect(self.token(sub=f'user-{index}')), 'Allow')
+        self.assertEqual(self.server.requests, 1)
+
+        # key-2 appears in the user pool: the first token signed with it refetches the JWKS
+        self.server.jwks = [KEY_1[2], KEY_2[2]]
+        self.now += token_authorizer.JWKS_MIN_REFRESH_SECONDS
+        self.assertEqual(self.effect(self.token(KEY_2)), 'Allow')
+        self.assertEqual(self.effect(self.token(KEY_1, sub='user-9')), 'Allow')
+        self.assertEqual(self.server.requests, 2)
+
+    def test_unknown_kids_refetch_at_most_once_per_interval(self):
+        unknown_keys = [signing_key('unknown-0'), signing_key('unknown-1')]
+        self.assertEqual(self.effect(self.token()), 'Allow')
+        for index in range(20):
+            self.assertEqual(self.effect(self.token(unknown_keys[index % 2], sub=f'user-{index}')), 'Deny')
+        self.assertEqual(self.server.requests, 1)
+
+        self.now += token_authorizer.JWKS_MIN_REFRESH_SECONDS
+        self.assertEqual(self.effect(self.token(unknown_keys[0])), 'Deny')
+        self.assertEqual(self.effect(self.token(unknown_keys[1])), 'Deny')
+        self.assertEqual(self.server.requests, 2)
+
+    def test_validated_tokens_are_cached_until_they_expire(self):
+        token = self.token(expires_in=600)
+        self.assertEqual(self.effect(token), 'Allow')
+        with patch.object(token_authorizer.jwt, 'decode', side_effect=AssertionError('decoded again')):
+            self.assertEqual(self.effect(token), 'Allow')
+        self.assertEqual(token_authorizer.cache_stats()['token_hits'], 1)
+
+        self.now += 600
+        self.assertEqual(self.effect(token), 'Deny')
+        self.assertEqual(token_authorizer.cache_stats()['cached_tokens'], 0)
+
+    def test_token_cache_evicts_least_recently_used(self):
+        with patch.object(token_authorizer, 'TOKEN_CACHE_SIZE', 3):
+            tokens = [self.token(sub=f'user-{index}') for index in range(4)]
+            for token in tokens[:3]:
+                self.authorize(token)
+            self.authorize(tokens[0])
+            self.authorize(tokens[3])
+            stats = token_authorizer.cache_stats()
+            self.assertEqual((stats['cached_tokens'], stats['token_hits']), (3, 1))
+
+            # tokens[1] was evicted, tokens[0] was kept
+            self.authorize(tokens[0])
+            self.authorize(tokens[1])
+            self.assertEqual(token_authorizer.cache_stats()['token_hits'], 2)
+
+
+class TestAuthorizerLatency(JwksTestCase):
+    """Per-request latency of the authorizer: cold container, new tokens, and repeated tokens."""
+
+    def measure(self, tokens):
+        timings = []
+        for token in tokens:
+            started_at = time.perf_counter()
+            self.assertEqual(self.effect(token), 'Allow')
+            timings.append((time.perf_counter() - started_at) * 1000)
+        return timings
+
+    def test_per_request_latency(self):
+        tokens = [self.token(sub=f'user-{index % 50}', jti=str(index % 50)) for index in range(BENCH_REQUESTS)]
+        cold = self.measure(tokens[:1])[0]
+        new_tokens = self.measure(tokens[1:50])
+        repeated = self.measure(tokens[50:])
+
+        report = {'cold_ms': round(cold, 3),
+                  'new_token_median_ms': round(statistics.median(new_tokens), 3),
+                  'cached_token_median_ms': round(statistics.median(repeated), 3),
+                  'cached_token_p99_ms': round(sorted(repeated)[int(len(repeated) * 0.99) - 1], 3),
+                  'jwks_requests': self.server.requests, **token_authorizer.cache_stats()}
+        print(f'\nauthorizer latency over {BENCH_REQUESTS} requests: {json.dumps(report)}')
+
+        # only the cold request pays for the JWKS endpoint; cached tokens skip the RSA verification too
+        self.assertEqual(self.server.requests, 1)
+        self.assertGreater(cold, JWKS_LATENCY_SECONDS * 1000)
+        self.assertLess(statistics.median(new_tokens), JWKS_LATENCY_SECONDS * 1000)
+        self.assertLess(statistics.median(repeated), statistics.median(new_tokens))
+
+
+if __name__ == '__main__':
+    unittest.main()
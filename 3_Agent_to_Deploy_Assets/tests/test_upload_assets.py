@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the streaming bundle transfer of lambda/upload_assets/lambda_function.py.
+
+The bundle is served by a local HTTP server (as the QuickSight DownloadUrl would be) and uploaded to
+fake_aws.FakeS3. The 2 GiB transfer runs in a subprocess so that its peak RSS can be measured on its own;
+set BIOPS_STREAM_TEST_BYTES to change the payload size.
+
+Tests cover:
+  - small bundles (single put_object)
+  - multipart upload with checksums and retry of a failing part
+  - truncated downloads (upload aborted)
+  - bundles uploaded under their bundle cache key
+  - bounded memory for a 2 GiB bundle
+"""
+
+import base64
+import hashlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import boto3
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+LAMBDA_DIR = os.path.join(os.path.dirname(TESTS_DIR), 'lambda')
+sys.path[:0] = [TESTS_DIR, os.path.join(LAMBDA_DIR, 'python')]
+
+from fake_aws import FakeS3
+
+spec = importlib.util.spec_from_file_location('upload_assets_function',
+                                              os.path.join(LAMBDA_DIR, 'upload_assets', 'lambda_function.py'))
+upload_assets = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(upload_assets)
+
+MIB = 1024 * 1024
+BLOCK = hashlib.sha256(b'biops').digest() * (MIB // 32)
+LARGE_PAYLOAD_BYTES = int(os.environ.get('BIOPS_STREAM_TEST_BYTES', str(2 * 1024 * MIB)))
+
+
+def payload_chunks(size):
+    """Deterministic bundle content, produced one MiB at a time."""
+    for offset in range(0, size, MIB):
+        yield (offset.to_bytes(8, 'big') + BLOCK[8:])[:size - offset]
+
+
+class BundleHandler(BaseHTTPRequestHandler):
+    """GET /<size> serves a bundle of that many bytes; /<size>/truncate stops halfway through."""
+
+    def do_GET(self):
+        parts = self.path.strip('/').split('/')
+        size = int(parts[0])
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(size))
+        self.end_headers()
+        sent = 0
+        for chunk in payload_chunks(size):
+            if 'truncate' in parts and sent >= size // 2:
+                break
+            self.wfile.write(chunk)
+            sent += len(chunk)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def upload_event(url):
+    return {'download_url': url, 'job_id': 'export-1', 'export_format': 'QUICKSIGHT_JSON',
+            'bucket_name': 'biops-bucket', 'aws_region': 'us-east-1'}
+
+
+def transfer_in_subprocess(url, part_size, workers):
+    """Entry point of the subprocess: run the Lambda against FakeS3 and print its result and peak RSS."""
+    import resource
+    boto3.setup_default_session(aws_access_key_id='fake', aws_secret_access_key='fake', region_name='us-east-1')
+    s3 = FakeS3(keep_data=False).install(boto3.DEFAULT_SESSION)
+    upload_assets.PART_SIZE = part_size
+    upload_assets.UPLOAD_WORKERS = workers
+    response = upload_assets.lambda_handler(upload_event(url), None)
+    print(json.dumps({'response': response, 'max_part_size': s3.max_part_size,
+                      'max_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}))
+
+
+class TestUploadAssets(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), BundleHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        boto3.setup_default_session(aws_access_key_id='fake', aws_secret_access_key='fake', region_name='us-east-1')
+        self.s3 = FakeS3().install(boto3.DEFAULT_SESSION)
+        self.s3_client = boto3.client('s3', region_name='us-east-1')
+
+    def tearDown(self):
+        boto3.DEFAULT_SESSION = None
+
+    def expected(self, size):
+        return b''.join(payload_chunks(size))
+
+    @staticmethod
+    def expected_checksum(size, part_size):
+        """Composite S3 checksum (SHA-256 of the part SHA-256s) of the bundle, computed part by part."""
+        digests, part, part_hash = [], 0, hashlib.sha256()
+        for chunk in payload_chunks(size):
+            part_hash.update(chunk)
+            part += len(chunk)
+            if part == part_size:
+                digests.append(part_hash.digest())
+                part, part_hash = 0, hashlib.sha256()
+        if part:
+            digests.append(part_hash.digest())
+        composite = base64.b64encode(hashlib.sha256(b''.join(digests)).digest()).decode()
+        return f'{composite}-{len(digests)}'
+
+    def test_small_bundle_is_uploaded_in_one_request(self):
+        size, checksum = upload_assets.stream_to_s3(f'{self.base_url}/{MIB + 5}', self.s3_client,
+                                                    'biops-bucket', 'bundle.qs', part_size=4 * MIB)
+        self.assertEqual(size, MIB + 5)
+        self.assertEqual(self.s3.objects['biops-bucket/bundle.qs']['data'], self.expected(MIB + 5))
+        self.assertEqual(self.s3.objects['biops-bucket/bundle.qs']['ChecksumSHA256'], checksum)
+        self.assertEqual(self.s3.calls['s3.PutObject'], 1)
+        self.assertNotIn('s3.CreateMultipartUpload', self.s3.calls)
+
+    def test_multipart_upload_retries_failing_part(self):
+        self.s3.fail_parts = {3: 2}
+        total = 10 * MIB + 123
+        size, checksum = upload_assets.stream_to_s3(f'{self.base_url}/{total}', self.s3_client,
+                                                    'biops-bucket', 'bundle.qs', part_size=2 * MIB, workers=3)
+        self.assertEqual(size, total)
+        stored = self.s3.objects['biops-bucket/bundle.qs']
+        self.assertEqual(stored['data'], self.expected(total))
+        self.assertEqual(stored['ChecksumSHA256'], checksum)
+        self.assertTrue(checksum.endswith('-6'))
+        self.assertEqual(self.s3.part_attempts[3], 3)
+        self.assertEqual(self.s3.calls['s3.UploadPart'], 8)
+
+    def test_part_failing_every_attempt_aborts_upload(self):
+        self.s3.fail_parts = {2: upload_assets.PART_ATTEMPTS}
+        with self.assertRaises(Exception):
+            upload_assets.stream_to_s3(f'{self.base_url}/{8 * MIB}', self.s3_client,
+                                       'biops-bucket', 'bundle.qs', part_size=2 * MIB, workers=2)
+        self.assertEqual(self.s3.aborted, ['upload-1'])
+        self.assertEqual(self.s3.objects, {})
+
+    def test_truncated_download_aborts_upload(self):
+        response = upload_assets.lambda_handler(upload_event(f'{self.base_url}/{40 * MIB}/truncate'), None)
+        self.assertEqual(response['statusCode'], 500)
+        self.assertEqual(self.s3.aborted, ['upload-1'])
+        self.assertEqual(self.s3.objects, {})
+
+    def test_lambda_reports_size_and_checksum(self):
+        response = upload_assets.lambda_handler(upload_event(f'{self.base_url}/{20 * MIB}'), None)
+        self.assertEqual(response['statusCode'], 200)
+        body = json.loads(response['body'])
+        key = 'QUICKSIGHT_JSON_export-1/QUICKSIGHT_JSON_export-1.qs'
+        self.assertEqual(body['s3_uri'], f's3://biops-bucket/{key}')
+        self.assertEqual(body['size'], 20 * MIB)
+        self.assertEqual(body['checksum_sha256'], self.s3.objects[f'biops-bucket/{key}']['ChecksumSHA256'])
+
+    def test_cached_bundle_is_stored_under_its_content_key(self):
+        event = {**upload_event(f'{self.base_url}/{MIB}'), 'cache_key': 'abc123'}
+        body = json.loads(upload_assets.lambda_handler(event, None)['body'])
+        self.assertEqual(body['s3_uri'], 's3://biops-bucket/bundle-cache/abc123.qs')
+        self.assertIn('biops-bucket/bundle-cache/abc123.qs', self.s3.objects)
+
+    def test_large_bundle_memory_is_bounded(self):
+        part_size, workers = 8 * MIB, 4
+        code = (f'import test_upload_assets as t; '
+                f't.transfer_in_subprocess({self.base_url + "/" + str(LARGE_PAYLOAD_BYTES)!r}, {part_size}, {workers})')
+        result = subprocess.run([sys.executable, '-c', code], cwd=TESTS_DIR, capture_output=True, text=True,
+                                timeout=900)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        output = json.loads(result.stdout.strip().splitlines()[-1])
+        body = json.loads(output['response']['body'])
+        self.assertEqual(output['response']['statusCode'], 200, body)
+        self.assertEqual(body['size'], LARGE_PAYLOAD_BYTES)
+        self.assertEqual(body['checksum_sha256'], self.expected_checksum(LARGE_PAYLOAD_BYTES, part_size))
+        self.assertEqual(output['max_part_size'], part_size)
+
+        # interpreter, boto3 and the fakes take well under 150 MiB; the bundle itself must not count
+        self.assertLess(output['max_rss_bytes'], 150 * MIB + (workers + 2) * part_size)
+
+
+if __name__ == '__main__':
+    unittest.main()
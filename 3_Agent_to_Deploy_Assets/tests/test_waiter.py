@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Unit tests for lambda/python/shared/waiter.py and its use in the blocking mode of export_assets and import_assets.
+
+Sleeping and the clock are simulated, so the tests run instantly.
+
+Tests cover:
+  - immediate first check and early exit
+  - exponential backoff with jitter between min and max interval
+  - deadline and remaining Lambda time, with the hand-off hook
+  - export and import handing the job id back instead of timing out
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+LAMBDA_DIR = os.path.join(os.path.dirname(TESTS_DIR), 'lambda')
+sys.path[:0] = [TESTS_DIR, os.path.join(LAMBDA_DIR, 'python')]
+
+from shared.waiter import Waiter
+
+
+def load_lambda(name):
+    spec = importlib.util.spec_from_file_location(f'{name}_function', os.path.join(LAMBDA_DIR, name, 'lambda_function.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+export_assets = load_lambda('export_assets')
+import_assets = load_lambda('import_assets')
+
+
+class FakeTime:
+    """Clock advanced only by sleep(), and a Lambda context whose deadline follows it."""
+
+    def __init__(self, lambda_seconds=300.0):
+        self.now = 0.0
+        self.sleeps = []
+        self.lambda_seconds = lambda_seconds
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def get_remaining_time_in_millis(self):
+        return int((self.lambda_seconds - self.now) * 1000)
+
+
+def job_finishing_after(checks):
+    """check() reporting done on its checks-th call."""
+    calls = []
+
+    def check():
+        calls.append(1)
+        return len(calls) >= checks, {'JobStatus': 'SUCCESSFUL' if len(calls) >= checks else 'IN_PROGRESS'}
+    return check
+
+
+class TestWaiter(unittest.TestCase):
+
+    def waiter(self, fake_time, **kwargs):
+        return Waiter(sleep=fake_time.sleep, clock=fake_time.clock, **kwargs)
+
+    def test_finished_job_returns_without_sleeping(self):
+        fake_time = FakeTime()
+        waiter = self.waiter(fake_time)
+        self.assertEqual(waiter.wait(job_finishing_after(1)), (True, {'JobStatus': 'SUCCESSFUL'}))
+        self.assertEqual(fake_time.sleeps, [])
+        self.assertEqual(waiter.checks, 1)
+
+    def test_interval_grows_exponentially_up_to_max(self):
+        fake_time = FakeTime()
+        waiter = self.waiter(fake_time, min_interval=1, max_interval=10, rng=lambda: 1.0)
+        finished, _ = waiter.wait(job_finishing_after(7))
+        self.assertTrue(finished)
+        self.assertEqual(fake_time.sleeps, [1, 2, 4, 8, 10, 10])
+
+    def test_jitter_stays_between_min_and_current_interval(self):
+        fake_time = FakeTime()
+        waiter = self.waiter(fake_time, min_interval=2, max_interval=30)
+        waiter.wait(job_finishing_after(30))
+        for attempt, delay in enumerate(fake_time.sleeps):
+            self.assertGreaterEqual(delay, 2)
+            self.assertLessEqual(delay, min(30, 2 * 2 ** attempt))
+        self.assertAlmostEqual(waiter.waited, sum(fake_time.sleeps))
+
+    def test_small_jobs_finish_sooner_and_large_jobs_check_less_than_fixed_interval(self):
+        # polled every 10 seconds, a 5-second job is seen finished after 10 seconds and a 10-minute job takes 61 checks
+        fake_time = FakeTime()
+        self.waiter(fake_time, min_interval=2, max_interval=30, rng=lambda: 0.5).wait(lambda: (fake_time.now >= 5, None))
+        self.assertEqual(fake_time.now, 5)
+
+        fake_time = FakeTime()
+        waiter = self.waiter(fake_time, min_interval=2, max_interval=30, rng=lambda: 0.5)
+        waiter.wait(lambda: (fake_time.now >= 600, None))
+        self.assertLess(waiter.checks, 45)
+
+    def test_deadline_stops_wait_with_last_result(self):
+        fake_time = FakeTime()
+        waiter = self.waiter(fake_time, min_interval=1, max_interval=10, rng=lambda: 1.0, timeout=20)
+        finished, result = waiter.wait(lambda: (False, 'IN_PROGRESS'))
+        self.assertFalse(finished)
+        self.assertEqual(result, 'IN_PROGRESS')
+        self.assertEqual(fake_time.sleeps, [1, 2, 4, 8])
+        self.assertLessEqual(fake_time.now, 20)
+
+    def test_stops_before_lambda_timeout(self):
+        fake_time = FakeTime(lambda_seconds=60)
+        waiter = self.waiter(fake_time, context=fake_time, min_interval=5, max_interval=5, safety_margin=10)
+        finished, _ = waiter.wait(lambda: (False, None))
+        self.assertFalse(finished)
+        # the last check happens with at least the safety margin left
+        self.assertEqual(fake_time.now, 50)
+        self.assertGreaterEqual(fake_time.get_remaining_time_in_millis(), 10_000)
+
+
+class TestBlockingStepsHandOff(unittest.TestCase):
+    """export_assets and import_assets in their blocking mode (no "wait": false) with a short Lambda timeout."""
+
+    def setUp(self):
+        self.qs = MagicMock()
+        self.qs.start_asset_bundle_export_job.return_value = {'AssetBundleExportJobId': 'export-1'}
+        self.qs.describe_asset_bundle_export_job.return_value = {'AssetBundleExportJobId': 'export-1',
+                                                                 'JobStatus': 'IN_PROGRESS'}
+        self.qs.describe_asset_bundle_import_job.return_value = {'AssetBundleImportJobId': 'import-1',
+                                                                 'JobStatus': 'IN_PROGRESS'}
+        session = MagicMock()
+        session.client.return_value = self.qs
+        self.fake_time = FakeTime(lambda_seconds=40)
+        for module in (export_assets, import_assets):
+            for name, value in [('assume_role', MagicMock(return_value=session)),
+                                ('Waiter', self.fake_waiter)]:
+                patcher = patch.object(module, name, value)
+                patcher.start()
+                self.addCleanup(patcher.stop)
+
+    def fake_waiter(self, **kwargs):
+        return Waiter(sleep=self.fake_time.sleep, clock=self.fake_time.clock, **kwargs)
+
+    def test_export_returns_job_id_before_lambda_times_out(self):
+        event = {'source_account_id': '111111111111', 'source_role_name': 'BiopsSourceAccountRole',
+                 'source_asset_id': 'dashboard-1'}
+        response = export_assets.lambda_handler(event, self.fake_time)
+        self.assertEqual(response['statusCode'], 202)
+        body = json.loads(response['body'])
+        self.assertEqual({key: body[key] for key in ('job_id', 'status')}, {'job_id': 'export-1', 'status': 'IN_PROGRESS'})
+        self.assertLessEqual(self.fake_time.now, 30)
+
+    def test_import_api_request_returns_202_within_api_gateway_limit(self):
+        self.fake_time.lambda_seconds = 300
+        event = {'httpMethod': 'POST', 'path': '/import', 'body': json.dumps({
+            's3_uri': 's3://biops-bucket/bundle.qs', 'source_asset_id': 'dashboard-1',
+            'target_account_id': '222222222222', 'target_role_name': 'BiopsTargetAccountRole'})}
+        response = import_assets.lambda_handler(event, self.fake_time)
+        self.assertEqual(response['statusCode'], 202)
+        self.assertEqual(json.loads(response['body'])['status'], 'IN_PROGRESS')
+        self.assertLessEqual(self.fake_time.now, 25)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -39,8 +39,8 @@ export const jobsAPI = {
   createJob: (config, initiatedBy) => 
     api.post('/jobs', { config, initiated_by: initiatedBy }),
   
-  getJobs: () => 
-    api.get('/jobs'),
+  getJobs: (params = {}) => 
+    api.get('/jobs', { params }),
   
   getJob: (jobId) => 
     api.get(`/jobs/${jobId}`),
@@ -55,29 +55,97 @@ def snowflake_type_to_qs(data_type: str, numeric_scale: Optional[int]) -> str:
     return 'STRING'
 
 
-def _extract_section(ddl: str, keyword: str, terminators: List[str]) -> Optional[str]:
+# Sections of a semantic view, each a parenthesised, comma-separated list of items
+DDL_SECTIONS = ('tables', 'relationships', 'facts', 'dimensions', 'metrics')
+
+# One token per match: quoted strings and identifiers, comments, parentheses, commas, or a run of other text
+_DDL_TOKEN = re.compile(r"""
+      (?P<string>'[^']*(?:''[^']*)*'?)
+    | (?P<ident>"[^"]*(?:""[^"]*)*"?)
+    | (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+    | (?P<open>\()
+    | (?P<close>\))
+    | (?P<comma>,)
+    | (?P<text>[^'"()/,-]+|[/-])
+""", re.VERBOSE | re.DOTALL)
+_LAST_WORD = re.compile(r'(\w+)\s*$')
+
+# Patterns applied to one section item
+_TABLE_ALIAS = re.compile(r'(\w+)\s+as\s+([\w.]+)', re.IGNORECASE)
+_TABLE_BARE = re.compile(r'([\w.]+)')
+_PRIMARY_KEY = re.compile(r'primary\s+key\s*\(([^)]+)\)', re.IGNORECASE)
+_RELATIONSHIP = re.compile(r'(\w+)\s+as\s+(\w+)\s*\(([^)]+)\)\s+references\s+(\w+)\s*\(([^)]+)\)', re.IGNORECASE)
+_FACT = re.compile(r'([\w.]+)\s+as\s+([\w.]+)')
+# ALIAS as EXPRESSION [with synonyms=(...)] [comment='...'], for dimensions and metrics
+_NAMED_EXPRESSION = re.compile(r'([\w.]+)\s+as\s+(.+?)(?:\s+with\s+synonyms|\s+comment\s*=|\s*$)', re.DOTALL)
+_COMMENT = re.compile(r"comment\s*=\s*'([^']+)'")
+_SYNONYMS = re.compile(r"with\s+synonyms\s*=\s*\(([^)]+)\)", re.IGNORECASE)
+_QUALIFIED_COLUMN = re.compile(r'(\w+)\.(\w+)')
+_BARE_COLUMN = re.compile(r'^\w+$')
+
+
+def _split_sections(ddl: str) -> Dict[str, List[str]]:
     """
-    Extract the content of a named DDL section, e.g. 'tables', 'dimensions'.
-    Stops at the first matching terminator keyword or end-of-string.
-    """
-    kw_pat = rf'\b{re.escape(keyword)}\s*\('
-    m = re.search(kw_pat, ddl, re.IGNORECASE)
-    if not m:
-        return None
+    Tokenize semantic view DDL once and return the items of each section, e.g.
+    {'tables': ['MOVIES as MOVIES.PUBLIC.MOVIES_CURATED primary key (MOVIEID) ...', ...], ...}.
 
-    # Walk forward from the opening '(' to find the matching ')'
+    A section starts at a top-level keyword of DDL_SECTIONS followed by '(' and ends at the matching ')';
+    its items are split on the commas directly inside it. Quotes and nested parentheses never split an
+    item and comments are dropped. Only the first occurrence of a section is kept; missing sections are
+    absent from the result.
+    """
+    sections: Dict[str, List[str]] = {}
+    section = None      # name of the section being read, None between sections
+    item: List[str] = []
     depth = 0
-    start = m.end() - 1  # position of '('
-    i = start
-    while i < len(ddl):
-        if ddl[i] == '(':
+    last_word = ''      # last word of the text at depth 0, to recognise a section keyword before '('
+
+    def _end_item():
+        text = ''.join(item).strip()
+        if text:
+            sections[section].append(text)
+        item.clear()
+
+    for m in _DDL_TOKEN.finditer(ddl):
+        kind, token = m.lastgroup, m.group()
+        if kind == 'comment':
+            if section:
+                item.append(' ')
+            continue
+        if depth == 0:
+            if kind == 'open':
+                keyword = last_word.lower()
+                if keyword in DDL_SECTIONS and keyword not in sections:
+                    section = keyword
+                    sections[section] = []
+                depth = 1
+            elif kind == 'text':
+                word = _LAST_WORD.search(token)
+                last_word = word.group(1) if word else ('' if token.strip() else last_word)
+            else:
+                last_word = ''
+            continue
+
+        if kind == 'open':
             depth += 1
-        elif ddl[i] == ')':
+        elif kind == 'close':
             depth -= 1
             if depth == 0:
-                return ddl[start + 1:i]
-        i += 1
-    return ddl[start + 1:]
+                if section:
+                    _end_item()
+                section = None
+                last_word = ''
+                continue
+        elif kind == 'comma' and depth == 1:
+            if section:
+                _end_item()
+            continue
+        if section:
+            item.append(token)
+
+    if section:
+        _end_item()
+    return sections
 
 
 def _infer_qs_type(col_name: str, expression: str) -> str:
@@ -139,6 +207,8 @@ class SnowflakeDDLParser:
         self.facts: List[Dict] = []
         self.dimensions: List[Dict] = []
         self.metrics: List[Dict] = []
+        self._sections: Optional[Dict[str, List[str]]] = None
+        self._sections_ddl: Optional[str] = None
 
     # ── Loaders ───────────────────────────────────────────────────────────────
 
@@ -158,24 +228,23 @@ class SnowflakeDDLParser:
 
     # ── Section parsers ───────────────────────────────────────────────────────
 
-    def parse_tables(self) -> List[Dict]:
-        content = _extract_section(self.ddl_content, 'tables', ['relationships'])
-        if not content:
-            return self.tables
-
-        for raw_line in content.split('\n'):
-            line = raw_line.strip().rstrip(',').strip()
-            if not line or line.startswith('--'):
-                continue
+    def _section_items(self, section: str) -> List[str]:
+        """Items of a DDL section; the DDL is tokenized once, on first use after it is loaded."""
+        if self._sections is None or self._sections_ddl is not self.ddl_content:
+            self._sections = _split_sections(self.ddl_content)
+            self._sections_ddl = self.ddl_content
+        return self._sections.get(section, [])
 
+    def parse_tables(self) -> List[Dict]:
+        for line in self._section_items('tables'):
             # --- Try format 1: ALIAS as DB.SCHEMA.TABLE ...
-            m_alias = re.match(r'(\w+)\s+as\s+([\w.]+)', line, re.IGNORECASE)
+            m_alias = _TABLE_ALIAS.match(line)
             if m_alias:
                 alias     = m_alias.group(1)
                 full_name = m_alias.group(2)
             else:
                 # --- Format 2/3: DB.SCHEMA.TABLE ... (no alias)
-                m_bare = re.match(r'([\w.]+)', line)
+                m_bare = _TABLE_BARE.match(line)
                 if not m_bare:
                     continue
                 full_name = m_bare.group(1)
@@ -187,7 +256,7 @@ class SnowflakeDDLParser:
             schema     = parts[-2]             if len(parts) >= 2 else 'PUBLIC'
             table_name = parts[-1]
 
-            pk_m        = re.search(r'primary\s+key\s*\(([^)]+)\)', line, re.IGNORECASE)
+            pk_m        = _PRIMARY_KEY.search(line)
             primary_keys = [k.strip() for k in pk_m.group(1).split(',')] if pk_m else []
 
             self.tables.append({
@@ -202,12 +271,10 @@ class SnowflakeDDLParser:
         return self.tables
 
     def parse_relationships(self) -> List[Dict]:
-        content = _extract_section(self.ddl_content, 'relationships', ['facts', 'dimensions'])
-        if not content:
-            return self.relationships
-
-        pattern = r'(\w+)\s+as\s+(\w+)\s*\(([^)]+)\)\s+references\s+(\w+)\s*\(([^)]+)\)'
-        for m in re.finditer(pattern, content, re.IGNORECASE):
+        for line in self._section_items('relationships'):
+            m = _RELATIONSHIP.match(line)
+            if not m:
+                continue
             self.relationships.append({
                 'name':        m.group(1),
                 'from_table':  m.group(2),
@@ -219,12 +286,11 @@ class SnowflakeDDLParser:
         return self.relationships
 
     def parse_facts(self) -> List[Dict]:
-        content = _extract_section(self.ddl_content, 'facts', ['dimensions'])
-        if not content:
-            return self.facts
-
-        # Match: LEFT as RIGHT  (both may or may not have TABLE. prefix)
-        for m in re.finditer(r'([\w.]+)\s+as\s+([\w.]+)', content):
+        for line in self._section_items('facts'):
+            # Match: LEFT as RIGHT  (both may or may not have TABLE. prefix)
+            m = _FACT.match(line)
+            if not m:
+                continue
             left  = m.group(1)   # exposed name side
             right = m.group(2)   # physical / alias side
 
@@ -252,28 +318,14 @@ class SnowflakeDDLParser:
         return self.facts
 
     def parse_dimensions(self) -> List[Dict]:
-        content = _extract_section(
-            self.ddl_content, 'dimensions',
-            ['metrics', 'with', ';']
-        )
-        if not content:
-            return self.dimensions
-
-        for raw_line in content.split('\n'):
-            line = raw_line.strip()
-            if not line or line.startswith('--'):
-                continue
-
+        for line in self._section_items('dimensions'):
             # Match: ALIAS as EXPRESSION [with synonyms=(...)] [comment='...']
-            m = re.match(
-                r'([\w.]+)\s+as\s+(.+?)(?:\s+with\s+synonyms|\s+comment\s*=|,?\s*$)',
-                line
-            )
+            m = _NAMED_EXPRESSION.match(line)
             if not m:
                 continue
 
             alias      = m.group(1)
-            expression = m.group(2).strip().rstrip(',').strip()
+            expression = m.group(2).strip()
 
             # Parse alias → table + column
             if '.' in alias:
@@ -282,11 +334,11 @@ class SnowflakeDDLParser:
                 table_alias = renamed_col = alias
 
             # Extract comment
-            comment_m = re.search(r"comment\s*=\s*'([^']+)'", line)
+            comment_m = _COMMENT.search(line)
             comment   = comment_m.group(1) if comment_m else ''
 
             # Extract synonyms  →  used as column description in QuickSight
-            syn_m    = re.search(r"with\s+synonyms\s*=\s*\(([^)]+)\)", line, re.IGNORECASE)
+            syn_m    = _SYNONYMS.search(line)
             synonyms = []
             if syn_m:
                 synonyms = [
@@ -298,7 +350,7 @@ class SnowflakeDDLParser:
             # Extract physical columns mentioned in the expression (TABLE.COL pattern)
             physical_columns = [
                 {'table': t, 'column': c.upper()}
-                for t, c in re.findall(r'(\w+)\.(\w+)', expression)
+                for t, c in _QUALIFIED_COLUMN.findall(expression)
             ]
 
             # Detect calculated expressions (functions)
@@ -310,9 +362,8 @@ class SnowflakeDDLParser:
             # If expression is a bare column name (no TABLE. prefix, not a function),
             # infer the physical source: same table as alias, column = expression
             if not physical_columns and not is_calculated and table_alias:
-                bare = expression.rstrip(',').strip()
-                if re.match(r'^\w+$', bare):
-                    physical_columns = [{'table': table_alias, 'column': bare.upper()}]
+                if _BARE_COLUMN.match(expression):
+                    physical_columns = [{'table': table_alias, 'column': expression.upper()}]
 
             self.dimensions.append({
                 'alias':           alias,
@@ -329,31 +380,19 @@ class SnowflakeDDLParser:
         return self.dimensions
 
     def parse_metrics(self) -> List[Dict]:
-        content = _extract_section(
-            self.ddl_content, 'metrics',
-            ['with', ';', 'comment']
-        )
-        if not content:
-            return self.metrics
-
-        pattern = r'([\w.]+)\s+as\s+(.+?)\s+with\s+synonyms'
-        for m in re.findall(pattern, content, re.DOTALL):
-            alias      = m[0].strip()
-            expression = m[1].strip()
-
-            # Find comment in the containing line
-            comment = ''
-            for line in content.split('\n'):
-                if alias in line and ' as ' in line:
-                    cm = re.search(r"comment\s*=\s*'([^']+)'", line)
-                    comment = cm.group(1) if cm else ''
-                    break
+        for line in self._section_items('metrics'):
+            m = _NAMED_EXPRESSION.match(line)
+            if not m:
+                continue
+            alias      = m.group(1)
+            expression = m.group(2).strip()
 
+            comment_m = _COMMENT.search(line)
             self.metrics.append({
                 'alias':      alias,
                 'expression': expression,
                 'type':       'INTEGER' if 'COUNT' in expression.upper() else 'DECIMAL',
-                'comment':    comment,
+                'comment':    comment_m.group(1) if comment_m else '',
             })
 
         return self.metrics
@@ -935,6 +974,134 @@ class QuickSightSchemaGenerator:
         }
 
 
+# ── Dataset diff ──────────────────────────────────────────────────────────────
+
+# Kinds of difference between a generated schema and the live dataset. Metadata-only changes (dataset
+# name, table aliases, column descriptions, usage configuration) leave the SPICE data as it is; anything
+# else, including transforms this module does not know, is structural and needs a FULL_REFRESH.
+METADATA_ONLY = 'metadata'
+STRUCTURAL    = 'structural'
+
+
+def _physical_table_spec(table: Dict) -> Dict:
+    """Comparable form of a PhysicalTableMap entry: InputColumns reduced to (Name, Type)."""
+    spec = {}
+    for source_type, source in table.items():
+        spec[source_type] = {k: v for k, v in source.items() if k != 'InputColumns'}
+        if 'InputColumns' in source:
+            spec[source_type]['InputColumns'] = [(c['Name'], c['Type']) for c in source['InputColumns']]
+    return spec
+
+
+def _input_column_changes(live: Dict, generated: Dict) -> str:
+    """Added / removed / retyped input columns of two PhysicalTableMap entries, as text."""
+    def _columns(table):
+        return {c['Name']: c['Type'] for source in table.values() for c in source.get('InputColumns', [])}
+
+    old, new = _columns(live), _columns(generated)
+    parts = []
+    for label, names in [('added',   [n for n in new if n not in old]),
+                         ('removed', [n for n in old if n not in new]),
+                         ('retyped', [n for n in new if n in old and old[n] != new[n]])]:
+        if names:
+            parts.append(f"{label} {', '.join(names)}")
+    return '; '.join(parts) or 'source changed'
+
+
+def _split_transforms(transforms: List[Dict]) -> Tuple[List[Dict], Dict[str, List[Dict]]]:
+    """(data transforms with calculated-field ColumnIds dropped, {column: tags of its TagColumnOperations})."""
+    data: List[Dict] = []
+    tags: Dict[str, List[Dict]] = {}
+    for transform in transforms:
+        if 'TagColumnOperation' in transform:
+            op = transform['TagColumnOperation']
+            tags.setdefault(op['ColumnName'], []).extend(op['Tags'])
+        elif 'CreateColumnsOperation' in transform:
+            columns = [{k: v for k, v in c.items() if k != 'ColumnId'}
+                       for c in transform['CreateColumnsOperation']['Columns']]
+            data.append({'CreateColumnsOperation': {'Columns': columns}})
+        else:
+            data.append(transform)
+    return data, tags
+
+
+def diff_dataset_schema(live: Dict, generated: Dict) -> List[Dict]:
+    """
+    Compare a generated schema with the live dataset (describe_data_set()['DataSet']).
+
+    Returns one {'kind', 'path', 'detail'} per difference, kind METADATA_ONLY or STRUCTURAL; an empty
+    list means the dataset is up to date. Calculated-field ColumnIds (new on every generation) and
+    attributes only QuickSight sets (Arn, OutputColumns, input column SubType, …) are ignored.
+    """
+    changes: List[Dict] = []
+
+    def _change(kind: str, path: str, detail: str):
+        changes.append({'kind': kind, 'path': path, 'detail': detail})
+
+    for key, kind in [('Name', METADATA_ONLY), ('ImportMode', STRUCTURAL),
+                      ('DataSetUsageConfiguration', METADATA_ONLY)]:
+        if key in generated and live.get(key, generated[key]) != generated[key]:
+            _change(kind, key, f"{live.get(key)!r} → {generated[key]!r}")
+
+    live_tables, new_tables = live.get('PhysicalTableMap', {}), generated.get('PhysicalTableMap', {})
+    for table_id in sorted(live_tables.keys() | new_tables.keys()):
+        path = f'PhysicalTableMap.{table_id}'
+        if table_id not in live_tables:
+            _change(STRUCTURAL, path, 'table added')
+        elif table_id not in new_tables:
+            _change(STRUCTURAL, path, 'table removed')
+        elif _physical_table_spec(live_tables[table_id]) != _physical_table_spec(new_tables[table_id]):
+            _change(STRUCTURAL, path, _input_column_changes(live_tables[table_id], new_tables[table_id]))
+
+    live_nodes, new_nodes = live.get('LogicalTableMap', {}), generated.get('LogicalTableMap', {})
+    for node_id in sorted(live_nodes.keys() | new_nodes.keys()):
+        path = f'LogicalTableMap.{node_id}'
+        if node_id not in live_nodes:
+            _change(STRUCTURAL, path, 'node added')
+            continue
+        if node_id not in new_nodes:
+            _change(STRUCTURAL, path, 'node removed')
+            continue
+        live_node, new_node = live_nodes[node_id], new_nodes[node_id]
+        if live_node.get('Source') != new_node.get('Source'):
+            _change(STRUCTURAL, f'{path}.Source', 'source or join changed')
+        if live_node.get('Alias') != new_node.get('Alias'):
+            _change(METADATA_ONLY, f'{path}.Alias', f"{live_node.get('Alias')!r} → {new_node.get('Alias')!r}")
+
+        live_data, live_tags = _split_transforms(live_node.get('DataTransforms', []))
+        new_data, new_tags   = _split_transforms(new_node.get('DataTransforms', []))
+        if live_data != new_data:
+            _change(STRUCTURAL, f'{path}.DataTransforms', 'renames, calculated fields or projection changed')
+        for column in sorted(live_tags.keys() | new_tags.keys()):
+            if live_tags.get(column) != new_tags.get(column):
+                _change(METADATA_ONLY, f'{path}.DataTransforms', f'description of {column} changed')
+    return changes
+
+
+def dataset_change_kind(changes: List[Dict]) -> Optional[str]:
+    """STRUCTURAL if any change is structural, METADATA_ONLY if all are, None if there are none."""
+    if not changes:
+        return None
+    return STRUCTURAL if any(c['kind'] == STRUCTURAL for c in changes) else METADATA_ONLY
+
+
+def reuse_column_ids(live: Dict, generated: Dict) -> Dict:
+    """Give the calculated fields of generated the ColumnIds they have in the live dataset (in place)."""
+    live_ids = {
+        column['ColumnName']: column['ColumnId']
+        for node in live.get('LogicalTableMap', {}).values()
+        for transform in node.get('DataTransforms', [])
+        for column in transform.get('CreateColumnsOperation', {}).get('Columns', [])
+        if 'ColumnId' in column
+    }
+    for node in generated.get('LogicalTableMap', {}).values():
+        for transform in node.get('DataTransforms', []):
+            for column in transform.get('CreateColumnsOperation', {}).get('Columns', []):
+                if column['ColumnName'] in live_ids:
+                    column['ColumnId'] = live_ids[column['ColumnName']]
+    return generated
+
+
 # ── CLI ───────────────────────────────────────────────────────────────────────
 
 def main():
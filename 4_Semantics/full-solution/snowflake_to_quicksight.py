@@ -11,24 +11,43 @@ Workflow:
   6. Parse DDL and display summary
   7. List QuickSight Snowflake data sources → user selects or creates new
   8. Configure dataset (ID, name) — SPICE by default
-  9. Create/replace QuickSight dataset
- 10. Trigger SPICE ingestion and monitor progress
+  9. Create/replace QuickSight dataset, or write only what differs from the live dataset
+ 10. Trigger SPICE ingestion and monitor progress (skipped when no data changed)
  11. Share dataset with selected admins/authors
 
+Batch mode (non-interactive) converts many semantic views in one run, from a manifest or from
+every view in the given databases; see run_batch().
+
 Usage:
     python snowflake_to_quicksight.py [--profile PROFILE] [--region REGION]
+    python snowflake_to_quicksight.py --batch-manifest views.json --secret-name NAME --datasource-arn ARN
+    python snowflake_to_quicksight.py --batch-database DB [--batch-database DB2] --secret-name NAME --datasource-arn ARN
 """
 
 import boto3
 import json
+import math
+import os
 import sys
 import time
 import getpass
+import random
 import re
 import argparse
+import atexit
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 
-from schema_generator import SnowflakeDDLParser, QuickSightSchemaGenerator, snowflake_type_to_qs
+from schema_generator import (
+    SnowflakeDDLParser,
+    QuickSightSchemaGenerator,
+    METADATA_ONLY,
+    dataset_change_kind,
+    diff_dataset_schema,
+    reuse_column_ids,
+    snowflake_type_to_qs,
+)
 
 # ── ANSI colours ──────────────────────────────────────────────────────────────
 GREEN  = '\033[0;32m'
@@ -94,6 +113,22 @@ def save_secret(session: boto3.Session, region: str, secret_name: str, creds: Di
 
 # ── Snowflake credentials ─────────────────────────────────────────────────────
 
+def load_snowflake_credentials(session: boto3.Session, region: str, secret_name: str) -> Dict:
+    """Load Snowflake credentials from a Secrets Manager secret, without prompting."""
+    creds = load_secret(session, region, secret_name)
+    required = ['account', 'user', 'password', 'warehouse', 'database']
+    missing = [k for k in required if k not in creds]
+    if missing:
+        err(f"Secret is missing required fields: {', '.join(missing)}")
+        sys.exit(1)
+    ok(f"Credentials loaded from secret '{secret_name}'")
+    ok(f"Account:   {creds['account']}")
+    ok(f"User:      {creds['user']}")
+    ok(f"Database:  {creds.get('database', '(not set)')}")
+    ok(f"Warehouse: {creds.get('warehouse', '(not set)')}")
+    return creds
+
+
 def collect_snowflake_credentials(session: boto3.Session, region: str) -> Dict:
     """Prompt for Snowflake credentials; optionally load from Secrets Manager."""
     hdr("Snowflake Credentials")
@@ -103,18 +138,7 @@ def collect_snowflake_credentials(session: boto3.Session, region: str) -> Dict:
 
     if choice == '2':
         secret_name = ask("Secret name", "snowflake-credentials")
-        creds = load_secret(session, region, secret_name)
-        required = ['account', 'user', 'password', 'warehouse', 'database']
-        missing = [k for k in required if k not in creds]
-        if missing:
-            err(f"Secret is missing required fields: {', '.join(missing)}")
-            sys.exit(1)
-        ok(f"Credentials loaded from secret '{secret_name}'")
-        ok(f"Account:   {creds['account']}")
-        ok(f"User:      {creds['user']}")
-        ok(f"Database:  {creds.get('database', '(not set)')}")
-        ok(f"Warehouse: {creds.get('warehouse', '(not set)')}")
-        return creds
+        return load_snowflake_credentials(session, region, secret_name)
 
     # Manual entry
     creds = {
@@ -156,15 +180,44 @@ def _sf_connect(creds: Dict):
     )
 
 
+# One connection per set of credentials, shared by every Snowflake query of the run
+_sf_connections: Dict[Tuple, object] = {}
+_sf_connections_lock = threading.Lock()
+
+
+def _sf_connection(creds: Dict):
+    """Return the run's connection for these credentials, connecting on first use (or if it was closed)."""
+    key = (creds.get('account'), creds.get('user'), creds.get('warehouse'), creds.get('database'))
+    with _sf_connections_lock:
+        conn = _sf_connections.get(key)
+        if conn is None or getattr(conn, 'is_closed', lambda: False)():
+            conn = _sf_connect(creds)
+            _sf_connections[key] = conn
+        return conn
+
+
+def close_snowflake_connections():
+    """Close the shared Snowflake connections; called at exit."""
+    with _sf_connections_lock:
+        for conn in _sf_connections.values():
+            try:
+                conn.close()
+            except Exception:
+                pass
+        _sf_connections.clear()
+
+
+atexit.register(close_snowflake_connections)
+
+
 def validate_snowflake_connection(creds: Dict) -> bool:
     hdr("Validate Snowflake Connectivity")
     try:
-        conn = _sf_connect(creds)
+        conn = _sf_connection(creds)
         cur = conn.cursor()
         cur.execute("SELECT CURRENT_USER(), CURRENT_ACCOUNT(), CURRENT_DATABASE(), CURRENT_WAREHOUSE()")
         row = cur.fetchone()
         cur.close()
-        conn.close()
         ok(f"User:      {row[0]}")
         ok(f"Account:   {row[1]}")
         ok(f"Database:  {row[2]}")
@@ -177,7 +230,7 @@ def validate_snowflake_connection(creds: Dict) -> bool:
 
 def list_semantic_views(creds: Dict, database: Optional[str] = None) -> List[Dict]:
     """Return list of semantic view dicts from Snowflake."""
-    conn = _sf_connect(creds)
+    conn = _sf_connection(creds)
     cur = conn.cursor()
     try:
         if database:
@@ -191,49 +244,191 @@ def list_semantic_views(creds: Dict, database: Optional[str] = None) -> List[Dic
         return []
     finally:
         cur.close()
-        conn.close()
 
 
-def fetch_column_types(creds: Dict, tables: List[Dict]) -> Dict[str, Dict[str, str]]:
+def _table_key(creds: Dict, table: Dict) -> Tuple[str, str, str]:
+    """(DATABASE, SCHEMA, TABLE) of a parsed DDL table, upper-case."""
+    db = table.get('database') or creds.get('database', '')
+    return db.upper(), table.get('schema', 'PUBLIC').upper(), table['table_name'].upper()
+
+
+# Caches kept between runs, under ~/.cache unless overridden
+_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'snowflake-to-quicksight')
+# INFORMATION_SCHEMA rows per table; SF_COLUMN_CACHE='' disables the default cache
+COLUMN_CACHE_PATH = os.environ.get('SF_COLUMN_CACHE', os.path.join(_CACHE_DIR, 'column_types.json'))
+# Table names per IN (...) list of the INFORMATION_SCHEMA queries
+_TABLES_PER_QUERY = 500
+
+
+class _VersionedFileCache:
+    """
+    JSON file of {key: {VERSION_FIELD: version, VALUE_FIELD: value}}, loaded when created. An entry is
+    valid while the version it was stored with is the current one; save() writes the file atomically,
+    so an interrupted run leaves the old file. No path means an in-memory cache.
     """
-    Query INFORMATION_SCHEMA.COLUMNS for each table and return actual Snowflake types
-    as QuickSight type strings.
+
+    DESCRIPTION   = 'cache'
+    VERSION_FIELD = 'version'
+    VALUE_FIELD   = 'value'
+
+    def __init__(self, path: Optional[str]):
+        self.path    = path
+        self.entries: Dict[str, Dict] = {}
+        self.hits    = 0
+        self.misses  = 0
+        self._dirty  = False
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as fh:
+                    self.entries = json.load(fh)
+            except (OSError, ValueError) as e:
+                warn(f"Ignoring unreadable {self.DESCRIPTION} {path}: {e}")
+
+    def get(self, key: str, version: str):
+        """Cached value, or None if missing or stored for another version."""
+        entry = self.entries.get(key)
+        if entry and entry.get(self.VERSION_FIELD) == version:
+            self.hits += 1
+            return entry[self.VALUE_FIELD]
+        self.misses += 1
+        return None
+
+    def put(self, key: str, version: str, value):
+        self.entries[key] = {self.VERSION_FIELD: version, self.VALUE_FIELD: value}
+        self._dirty = True
+
+    def save(self):
+        """Write the cache if it changed."""
+        if not self._dirty or not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(self.entries, fh)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+class ColumnTypeCache(_VersionedFileCache):
+    """
+    Cached INFORMATION_SCHEMA.COLUMNS rows ([COLUMN_NAME, DATA_TYPE, NUMERIC_SCALE]), keyed by account
+    and table and valid while the table's LAST_ALTERED is unchanged. Raw types are kept, so changes to
+    snowflake_type_to_qs apply to cached tables too.
+    """
+
+    DESCRIPTION   = 'column type cache'
+    VERSION_FIELD = 'last_altered'
+    VALUE_FIELD   = 'columns'
+
+    def __init__(self, path: Optional[str] = COLUMN_CACHE_PATH):
+        super().__init__(path)
+
+    @staticmethod
+    def key(account: str, table: Tuple[str, str, str]) -> str:
+        return f"{account}/{'.'.join(table)}"
+
+
+def fetch_table_column_types(
+    creds: Dict, tables: List[Dict], cache: Optional[ColumnTypeCache] = None
+) -> Dict[Tuple[str, str, str], Dict[str, str]]:
+    """
+    Return actual Snowflake column types, as QuickSight type strings, for each distinct table.
+
+    One set-based INFORMATION_SCHEMA.COLUMNS query per (database, schema) covers all its tables. With
+    a cache, one INFORMATION_SCHEMA.TABLES query first reads LAST_ALTERED, and only tables that are
+    new or changed since they were cached are queried for their columns.
 
     Returns:
-        {TABLE_ALIAS_UPPER: {COL_NAME_UPPER: qs_type}}
+        {(DATABASE, SCHEMA, TABLE): {COL_NAME_UPPER: qs_type}}
     """
-    conn = _sf_connect(creds)
+    by_schema: Dict[Tuple[str, str], List[str]] = {}
+    for db, schema, tname in dict.fromkeys(_table_key(creds, t) for t in tables):
+        by_schema.setdefault((db, schema), []).append(tname)
+    result: Dict[Tuple[str, str, str], Dict[str, str]] = {}
+    if not by_schema:
+        return result
+
+    def _qs_types(rows) -> Dict[str, str]:
+        return {row[0].upper(): snowflake_type_to_qs(row[1], row[2]) for row in rows}
+
+    conn = _sf_connection(creds)
     cur  = conn.cursor()
-    result: Dict[str, Dict[str, str]] = {}
     try:
-        for table in tables:
-            db     = table.get('database') or creds.get('database', '')
-            schema = table.get('schema', 'PUBLIC')
-            tname  = table['table_name']
-            alias  = table['alias'].upper()
+        for (db, schema), names in by_schema.items():
+            for start in range(0, len(names), _TABLES_PER_QUERY):
+                chunk = names[start:start + _TABLES_PER_QUERY]
+                in_list = ', '.join(f"'{name}'" for name in chunk)
+                try:
+                    to_fetch, last_altered = chunk, {}
+                    if cache is not None:
+                        cur.execute(f"""
+                            SELECT TABLE_NAME, LAST_ALTERED
+                            FROM {db}.INFORMATION_SCHEMA.TABLES
+                            WHERE TABLE_SCHEMA = '{schema}' AND TABLE_NAME IN ({in_list})
+                        """)
+                        last_altered = {row[0].upper(): str(row[1]) for row in cur.fetchall()}
+                        to_fetch = []
+                        for name in chunk:
+                            if name not in last_altered:  # no such table: no columns
+                                result[(db, schema, name)] = {}
+                                continue
+                            cached = cache.get(ColumnTypeCache.key(creds.get('account', ''), (db, schema, name)),
+                                               last_altered[name])
+                            if cached is None:
+                                to_fetch.append(name)
+                            else:
+                                result[(db, schema, name)] = _qs_types(cached)
+                    if not to_fetch:
+                        continue
 
-            try:
-                cur.execute(f"""
-                    SELECT COLUMN_NAME, DATA_TYPE, NUMERIC_SCALE
-                    FROM {db}.INFORMATION_SCHEMA.COLUMNS
-                    WHERE TABLE_SCHEMA = '{schema}' AND TABLE_NAME = '{tname}'
-                """)
-                rows = cur.fetchall()
-                result[alias] = {
-                    row[0].upper(): snowflake_type_to_qs(row[1], row[2])
-                    for row in rows
-                }
-            except Exception as e:
-                warn(f"Could not fetch types for {tname}: {e}")
+                    in_list = ', '.join(f"'{name}'" for name in to_fetch)
+                    cur.execute(f"""
+                        SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, NUMERIC_SCALE
+                        FROM {db}.INFORMATION_SCHEMA.COLUMNS
+                        WHERE TABLE_SCHEMA = '{schema}' AND TABLE_NAME IN ({in_list})
+                        ORDER BY TABLE_NAME, ORDINAL_POSITION
+                    """)
+                    rows_by_table: Dict[str, List[List]] = {name: [] for name in to_fetch}
+                    for row in cur.fetchall():
+                        scale = int(row[3]) if row[3] is not None else None
+                        rows_by_table.setdefault(row[0].upper(), []).append([row[1], row[2], scale])
+                    for name in to_fetch:
+                        result[(db, schema, name)] = _qs_types(rows_by_table[name])
+                        if cache is not None:
+                            cache.put(ColumnTypeCache.key(creds.get('account', ''), (db, schema, name)),
+                                      last_altered[name], rows_by_table[name])
+                except Exception as e:
+                    warn(f"Could not fetch types for {db}.{schema}: {e}")
     finally:
         cur.close()
-        conn.close()
+        if cache is not None:
+            try:
+                cache.save()
+            except OSError as e:
+                warn(f"Could not save column type cache {cache.path}: {e}")
     return result
 
 
+def fetch_column_types(
+    creds: Dict, tables: List[Dict], cache: Optional[ColumnTypeCache] = None
+) -> Dict[str, Dict[str, str]]:
+    """
+    Query INFORMATION_SCHEMA.COLUMNS for the tables (see fetch_table_column_types) and return actual
+    Snowflake types as QuickSight type strings.
+
+    Returns:
+        {TABLE_ALIAS_UPPER: {COL_NAME_UPPER: qs_type}}
+    """
+    by_table = fetch_table_column_types(creds, tables, cache)
+    return {
+        t['alias'].upper(): by_table[_table_key(creds, t)]
+        for t in tables if _table_key(creds, t) in by_table
+    }
+
+
 def fetch_semantic_view_ddl(creds: Dict, database: str, schema: str, view_name: str) -> str:
     """Fetch DDL for a semantic view using GET_DDL."""
-    conn = _sf_connect(creds)
+    conn = _sf_connection(creds)
     cur = conn.cursor()
     try:
         sql = f"SELECT TO_VARCHAR(GET_DDL('SEMANTIC_VIEW', '{database}.{schema}.{view_name}'))"
@@ -242,7 +437,51 @@ def fetch_semantic_view_ddl(creds: Dict, database: str, schema: str, view_name:
         return row[0] if row else ''
     finally:
         cur.close()
-        conn.close()
+
+
+def fetch_semantic_view_ddls(
+    creds: Dict, views: List[Tuple[str, str, str]], chunk_size: int = 50
+) -> Tuple[Dict[Tuple[str, str, str], str], Dict[Tuple[str, str, str], str]]:
+    """
+    Fetch the DDL of many semantic views over one connection, chunk_size views per query
+    (one GET_DDL per view, combined with UNION ALL).
+
+    A chunk whose query fails (e.g. one view was dropped) is fetched again view by view, so only
+    the failing views are reported.
+
+    Returns:
+        ({(db, schema, view): ddl}, {(db, schema, view): error message})
+    """
+    ddls: Dict[Tuple[str, str, str], str] = {}
+    errors: Dict[Tuple[str, str, str], str] = {}
+    if not views:
+        return ddls, errors
+
+    def _ddl_select(index: int, view: Tuple[str, str, str]) -> str:
+        return f"SELECT {index}, TO_VARCHAR(GET_DDL('SEMANTIC_VIEW', '{'.'.join(view)}'))"
+
+    conn = _sf_connection(creds)
+    cur  = conn.cursor()
+    try:
+        for start in range(0, len(views), chunk_size):
+            chunk = views[start:start + chunk_size]
+            try:
+                cur.execute(' UNION ALL '.join(_ddl_select(i, v) for i, v in enumerate(chunk)))
+                for index, ddl in cur.fetchall():
+                    ddls[chunk[index]] = ddl or ''
+                continue
+            except Exception:
+                pass
+            for view in chunk:
+                try:
+                    cur.execute(_ddl_select(0, view))
+                    row = cur.fetchone()
+                    ddls[view] = row[1] if row else ''
+                except Exception as e:
+                    errors[view] = str(e)
+    finally:
+        cur.close()
+    return ddls, errors
 
 
 def select_semantic_view(creds: Dict, database: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
@@ -422,28 +661,119 @@ def list_quicksight_datasets(qs, account_id: str) -> List[Dict]:
     return datasets
 
 
-def _dataset_uses_datasource(qs, account_id: str, dataset_id: str, datasource_arn: str) -> bool:
-    """Return True if any physical table in the dataset references the given datasource ARN."""
-    try:
-        resp = qs.describe_data_set(AwsAccountId=account_id, DataSetId=dataset_id)
-        physical_tables = resp.get('DataSet', {}).get('PhysicalTableMap', {})
-        for table in physical_tables.values():
-            for source_type in ('RelationalTable', 'CustomSql', 'S3Source'):
-                if table.get(source_type, {}).get('DataSourceArn') == datasource_arn:
-                    return True
-    except Exception:
-        pass
-    return False
+# Datasource ARNs of each dataset; QS_DATASET_SOURCE_CACHE='' disables the default cache
+DATASET_SOURCE_CACHE_PATH = os.environ.get('QS_DATASET_SOURCE_CACHE',
+                                           os.path.join(_CACHE_DIR, 'dataset_sources.json'))
+# describe_data_set calls in flight while filtering datasets by data source
+DESCRIBE_WORKERS = 8
+
+
+class DatasetSourceCache(_VersionedFileCache):
+    """
+    Cached datasource ARNs of each dataset's physical tables, keyed by dataset ARN and valid while the
+    LastUpdatedTime of the dataset summary (list_data_sets) is unchanged.
+    """
+
+    DESCRIPTION   = 'dataset source cache'
+    VERSION_FIELD = 'last_updated'
+    VALUE_FIELD   = 'datasource_arns'
+
+    def __init__(self, path: Optional[str] = DATASET_SOURCE_CACHE_PATH):
+        super().__init__(path)
+
+    @staticmethod
+    def key(account_id: str, summary: Dict) -> str:
+        return summary.get('Arn') or f"{account_id}/{summary['DataSetId']}"
+
+    @staticmethod
+    def version(summary: Dict) -> Optional[str]:
+        updated = summary.get('LastUpdatedTime')
+        if updated is None:
+            return None
+        return updated.isoformat() if hasattr(updated, 'isoformat') else str(updated)
+
+
+def _is_throttled(e: Exception) -> bool:
+    code = (getattr(e, 'response', None) or {}).get('Error', {}).get('Code', '')
+    return 'Throttling' in code or code == 'TooManyRequestsException' or 'Throttling' in type(e).__name__
+
+
+def _call_with_backoff(call, attempts: int = 6, sleep=time.sleep):
+    """Return call(), retried through wait_with_backoff while throttled; other errors are raised."""
+    def check():
+        try:
+            return True, call()
+        except Exception as e:
+            if not _is_throttled(e):
+                raise
+            return False, e
+
+    done, result, _ = wait_with_backoff(check, math.inf, min_interval=0.5, max_interval=8.0,
+                                        max_checks=attempts, sleep=sleep)
+    if not done:
+        raise result
+    return result
+
+
+def _dataset_datasource_arns(qs, account_id: str, dataset_id: str, sleep=time.sleep) -> List[str]:
+    """Datasource ARNs referenced by the physical tables of the dataset (one describe_data_set)."""
+    resp = _call_with_backoff(
+        lambda: qs.describe_data_set(AwsAccountId=account_id, DataSetId=dataset_id), sleep=sleep)
+    physical_tables = resp.get('DataSet', {}).get('PhysicalTableMap', {})
+    return sorted({
+        table[source_type]['DataSourceArn']
+        for table in physical_tables.values()
+        for source_type in ('RelationalTable', 'CustomSql', 'S3Source')
+        if table.get(source_type, {}).get('DataSourceArn')
+    })
 
 
 def filter_datasets_by_datasource(
-    qs, account_id: str, datasets: List[Dict], datasource_arn: str
+    qs, account_id: str, datasets: List[Dict], datasource_arn: str,
+    cache: Optional[DatasetSourceCache] = None, max_workers: int = DESCRIBE_WORKERS, sleep=time.sleep,
 ) -> List[Dict]:
-    """Return only datasets whose physical tables use the given datasource ARN."""
-    return [
-        ds for ds in datasets
-        if _dataset_uses_datasource(qs, account_id, ds['DataSetId'], datasource_arn)
-    ]
+    """
+    Return only datasets whose physical tables use the given datasource ARN, in their original order.
+
+    A dataset whose summary LastUpdatedTime matches its cache entry is answered from the summary alone;
+    the others are described on up to max_workers threads, with throttled calls retried with backoff.
+    Datasets that cannot be described are left out.
+    """
+    sources: Dict[str, List[str]] = {}
+    to_describe: List[Dict] = []
+    for ds in datasets:
+        version = DatasetSourceCache.version(ds) if cache is not None else None
+        cached = cache.get(DatasetSourceCache.key(account_id, ds), version) if version else None
+        if cached is None:
+            to_describe.append(ds)
+        else:
+            sources[ds['DataSetId']] = cached
+
+    def _describe(ds: Dict):
+        try:
+            return _dataset_datasource_arns(qs, account_id, ds['DataSetId'], sleep=sleep)
+        except Exception:
+            return None
+
+    failed = 0
+    if to_describe:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(to_describe)))) as pool:
+            for ds, arns in zip(to_describe, pool.map(_describe, to_describe)):
+                if arns is None:
+                    failed += 1
+                    continue
+                sources[ds['DataSetId']] = arns
+                version = DatasetSourceCache.version(ds) if cache is not None else None
+                if version:
+                    cache.put(DatasetSourceCache.key(account_id, ds), version, arns)
+    if failed:
+        warn(f"{failed} datasets could not be described and are not listed.")
+    if cache is not None:
+        try:
+            cache.save()
+        except OSError as e:
+            warn(f"Could not save dataset source cache {cache.path}: {e}")
+    return [ds for ds in datasets if datasource_arn in sources.get(ds['DataSetId'], ())]
 
 
 def _search_datasets(datasets: List[Dict], term: str) -> List[Dict]:
@@ -469,7 +799,7 @@ def _display_dataset_list(datasets: List[Dict]):
 
 
 def _pick_dataset_from_list(
-    qs, account_id: str, datasource_arn: str
+    qs, account_id: str, datasource_arn: str, source_cache: Optional[DatasetSourceCache] = None
 ) -> Optional[Tuple[str, str]]:
     """
     Show datasets filtered by datasource ARN.
@@ -481,7 +811,9 @@ def _pick_dataset_from_list(
 
     if datasource_arn:
         info("Filtering by selected Snowflake data source (this may take a moment)…")
-        filtered = filter_datasets_by_datasource(qs, account_id, all_datasets, datasource_arn)
+        filtered = filter_datasets_by_datasource(qs, account_id, all_datasets, datasource_arn, source_cache)
+        if filtered:
+            ok(f"{len(filtered)} of {len(all_datasets)} datasets use this data source")
     else:
         filtered = all_datasets
 
@@ -527,7 +859,7 @@ def _pick_dataset_from_list(
 
 
 def select_dataset_mode(
-    qs, account_id: str, datasource_arn: str = ''
+    qs, account_id: str, datasource_arn: str = '', source_cache: Optional[DatasetSourceCache] = None
 ) -> Tuple[str, str, str]:
     """
     Ask whether to create a new dataset or update an existing one.
@@ -563,7 +895,7 @@ def select_dataset_mode(
                 sub = ask("Select", "A").strip().upper()
 
                 if sub == 'A':
-                    result = _pick_dataset_from_list(qs, account_id, datasource_arn)
+                    result = _pick_dataset_from_list(qs, account_id, datasource_arn, source_cache)
                     if result is None:
                         break   # user pressed B inside — re-show outer sub-menu
                     dataset_id, dataset_name = result
@@ -612,6 +944,51 @@ def update_existing_dataset(qs, account_id: str, schema: Dict) -> Dict:
     return response
 
 
+# Dataset writes that change the SPICE data, so are followed by a FULL_REFRESH ingestion
+INGESTION_ACTIONS = ('created', 'replaced', 'updated')
+
+
+def describe_live_dataset(qs, account_id: str, dataset_id: str) -> Optional[Dict]:
+    """Return the dataset as described by QuickSight, or None if it does not exist."""
+    try:
+        return qs.describe_data_set(AwsAccountId=account_id, DataSetId=dataset_id)['DataSet']
+    except qs.exceptions.ResourceNotFoundException:
+        return None
+
+
+def plan_dataset_write(live: Optional[Dict], schema: Dict, mode: str) -> Tuple[str, List[Dict]]:
+    """
+    Decide how to bring the live dataset in line with schema; return (action, changes).
+
+    Actions:
+        created           no live dataset (mode 'update' raises ValueError instead)
+        unchanged         diff_dataset_schema finds no difference — nothing to write
+        metadata-updated  only metadata changed — update in place, no ingestion needed
+        replaced          structural changes in mode 'create' — delete and recreate
+        updated           structural changes in the other modes — update in place
+
+    The calculated fields of schema take the ColumnIds they have in the live dataset.
+    """
+    if live is None:
+        if mode == 'update':
+            raise ValueError(f"Dataset {schema['DataSetId']} does not exist")
+        return 'created', []
+    reuse_column_ids(live, schema)
+    changes = diff_dataset_schema(live, schema)
+    kind = dataset_change_kind(changes)
+    if kind is None:
+        return 'unchanged', changes
+    if kind == METADATA_ONLY:
+        return 'metadata-updated', changes
+    return ('replaced' if mode == 'create' else 'updated'), changes
+
+
+def print_dataset_changes(changes: List[Dict]):
+    for change in changes:
+        label = 'metadata  ' if change['kind'] == METADATA_ONLY else 'structural'
+        info(f"{label}  {change['path']}: {change['detail']}")
+
+
 # ── SPICE ingestion ───────────────────────────────────────────────────────────
 
 def trigger_ingestion(qs, account_id: str, dataset_id: str) -> str:
@@ -627,32 +1004,59 @@ def trigger_ingestion(qs, account_id: str, dataset_id: str) -> str:
     return ingestion_id
 
 
-def monitor_ingestion(qs, account_id: str, dataset_id: str, ingestion_id: str):
+def wait_with_backoff(check, timeout: float, min_interval: float = 2.0, max_interval: float = 20.0,
+                      on_timeout=None, max_checks: Optional[int] = None, sleep=time.sleep, clock=time.monotonic):
+    """Call check() -> (done, result) until done, sleeping with exponential backoff and jitter in between.
+
+    Returns (done, result, checks). Stops after max_checks checks, or before a sleep that would pass timeout
+    seconds; on_timeout is then called with the last result.
+    """
+    started_at = clock()
+    interval = min_interval
+    checks = 0
+    while True:
+        done, result = check()
+        checks += 1
+        if done:
+            return True, result, checks
+        delay = random.uniform(min_interval, interval)
+        if checks == max_checks or clock() - started_at + delay > timeout:
+            if on_timeout:
+                on_timeout(result)
+            return False, result, checks
+        sleep(delay)
+        interval = min(max_interval, interval * 2)
+
+
+def monitor_ingestion(qs, account_id: str, dataset_id: str, ingestion_id: str, timeout: float = 300,
+                      sleep=time.sleep, clock=time.monotonic):
     """Poll until ingestion completes, fails, or times out (5 minutes)."""
     info("Waiting for SPICE ingestion to complete…")
-    max_checks = 30
-    for attempt in range(1, max_checks + 1):
-        time.sleep(10)
-        try:
-            resp   = qs.describe_ingestion(
-                AwsAccountId=account_id,
-                DataSetId=dataset_id,
-                IngestionId=ingestion_id,
-            )
-            status = resp['Ingestion']['IngestionStatus']
-            if status == 'COMPLETED':
-                rows = resp['Ingestion'].get('RowInfo', {}).get('RowsIngested', '?')
-                ok(f"Ingestion completed — rows ingested: {rows}")
-                return
-            if status == 'FAILED':
-                error_info = resp['Ingestion'].get('ErrorInfo', {})
-                err(f"Ingestion failed: {error_info.get('Message', 'unknown error')}")
-                return
-            print(f"    {status} (check {attempt}/{max_checks})…", end='\r', flush=True)
-        except Exception as e:
-            warn(f"Could not check ingestion status: {e}")
-            return
-    warn("Ingestion verification timed out. Check the QuickSight console.")
+
+    def check():
+        resp   = qs.describe_ingestion(
+            AwsAccountId=account_id,
+            DataSetId=dataset_id,
+            IngestionId=ingestion_id,
+        )
+        status = resp['Ingestion']['IngestionStatus']
+        if status not in ('COMPLETED', 'FAILED', 'CANCELLED'):
+            print(f"    {status}…", end='\r', flush=True)
+        return status in ('COMPLETED', 'FAILED', 'CANCELLED'), resp['Ingestion']
+
+    try:
+        done, ingestion, _ = wait_with_backoff(check, timeout, max_interval=30, sleep=sleep, clock=clock)
+    except Exception as e:
+        warn(f"Could not check ingestion status: {e}")
+        return
+    if not done:
+        warn("Ingestion verification timed out. Check the QuickSight console.")
+    elif ingestion['IngestionStatus'] == 'COMPLETED':
+        rows = ingestion.get('RowInfo', {}).get('RowsIngested', '?')
+        ok(f"Ingestion completed — rows ingested: {rows}")
+    else:
+        error_info = ingestion.get('ErrorInfo', {})
+        err(f"Ingestion failed: {error_info.get('Message', 'unknown error')}")
 
 
 # ── User sharing ──────────────────────────────────────────────────────────────
@@ -831,6 +1235,434 @@ def share_dataset(qs, account_id: str, dataset_id: str, users: List[Dict], regio
             err(f"Failed to share with {u['UserName']}: {e}")
 
 
+# ── Batch conversion ──────────────────────────────────────────────────────────
+
+# upsert: update the dataset, or create it if it does not exist; create: delete and recreate; update: update only
+BATCH_MODES = ('upsert', 'create', 'update')
+
+
+class RateLimiter:
+    """Token bucket shared by threads: acquire() blocks until a call fits in rate calls per second."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None, sleep=time.sleep, clock=time.monotonic):
+        self.rate     = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens   = float(self.capacity)
+        self.sleep    = sleep
+        self.clock    = clock
+        self.updated  = clock()
+        self.calls    = 0
+        self._lock    = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                if self.rate <= 0:
+                    self.calls += 1
+                    return
+                now = self.clock()
+                self.tokens  = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                # tolerance: float refills can stop just short of a whole token
+                if self.tokens >= 1 - 1e-9:
+                    self.tokens = max(0.0, self.tokens - 1)
+                    self.calls  += 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+
+class _RateLimitedClient:
+    """boto3 client proxy whose API calls wait for the RateLimiter; exceptions and other attributes pass through."""
+
+    def __init__(self, client, limiter: RateLimiter):
+        self._client  = client
+        self._limiter = limiter
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name in ('exceptions', 'meta') or not callable(attr):
+            return attr
+
+        def _call(*args, **kwargs):
+            self._limiter.acquire()
+            return attr(*args, **kwargs)
+        return _call
+
+
+def default_dataset_id(database: str, schema: str, view: str) -> str:
+    """Dataset ID derived from the view's full name, e.g. movies-public-movie_analytics_sv."""
+    return re.sub(r'[^a-z0-9_-]+', '-', f"{database}-{schema}-{view}".lower()).strip('-')
+
+
+def batch_entry(spec) -> Dict:
+    """
+    Normalise one manifest entry: "DB.SCHEMA.VIEW", or
+    {"view": "DB.SCHEMA.VIEW", "dataset_id": ..., "dataset_name": ..., "mode": "upsert" | "create" | "update"}.
+    """
+    if isinstance(spec, str):
+        spec = {'view': spec}
+    parts = spec.get('view', '').split('.')
+    if len(parts) != 3 or not all(parts):
+        raise ValueError(f"View must be DATABASE.SCHEMA.VIEW: {spec.get('view')!r}")
+    database, schema, view = parts
+    mode = spec.get('mode', 'upsert')
+    if mode not in BATCH_MODES:
+        raise ValueError(f"Invalid mode {mode!r} for {spec['view']} (expected one of {', '.join(BATCH_MODES)})")
+    return {
+        'database':     database,
+        'schema':       schema,
+        'view':         view,
+        'dataset_id':   spec.get('dataset_id') or default_dataset_id(database, schema, view),
+        'dataset_name': spec.get('dataset_name') or view,
+        'mode':         mode,
+    }
+
+
+def load_batch_manifest(path: str) -> List[Dict]:
+    """Read a JSON manifest: a list of entries (see batch_entry), or {"views": [...]}."""
+    with open(path, 'r', encoding='utf-8') as fh:
+        manifest = json.load(fh)
+    if isinstance(manifest, dict):
+        manifest = manifest.get('views', [])
+    return [batch_entry(spec) for spec in manifest]
+
+
+def list_batch_entries(creds: Dict, database: str) -> List[Dict]:
+    """One upsert entry per semantic view in the database, with the default dataset ID and name."""
+    entries = []
+    for v in list_semantic_views(creds, database):
+        name = v.get('name', v.get('Name'))
+        db   = v.get('database_name', v.get('database', database))
+        sch  = v.get('schema_name',   v.get('schema', 'PUBLIC'))
+        entries.append(batch_entry(f"{db}.{sch}.{name}"))
+    return entries
+
+
+def _generate_batch_schema(task: Dict) -> Dict:
+    """Process-pool worker: generate the dataset schema of one parsed view."""
+    started = time.perf_counter()
+    schema = QuickSightSchemaGenerator(task['parsed']).generate_complete_schema(
+        datasource_arn=task['datasource_arn'],
+        database=task['database'],
+        dataset_id=task['dataset_id'],
+        dataset_name=task['dataset_name'],
+        column_type_overrides=task['column_type_overrides'],
+    )
+    return {'schema': schema, 'seconds': time.perf_counter() - started}
+
+
+def _apply_batch_dataset(qs, account_id: str, schema: Dict, mode: str,
+                         sleep=time.sleep) -> Tuple[str, List[Dict]]:
+    """Bring one dataset in line with its schema (plan_dataset_write); return (action, changes)."""
+    dataset_id = schema['DataSetId']
+    action, changes = plan_dataset_write(describe_live_dataset(qs, account_id, dataset_id), schema, mode)
+    if action in ('updated', 'metadata-updated'):
+        qs.update_data_set(AwsAccountId=account_id, **schema)
+    elif action in ('created', 'replaced'):
+        if action == 'replaced':
+            qs.delete_data_set(AwsAccountId=account_id, DataSetId=dataset_id)
+            sleep(5)
+        qs.create_data_set(AwsAccountId=account_id, **schema)
+    return action, changes
+
+
+def _run_batch_ingestion(qs, account_id: str, dataset_id: str, timeout: float,
+                         sleep=time.sleep, clock=time.monotonic) -> Dict:
+    """Start a FULL_REFRESH ingestion and wait for it quietly; return its final status and row count."""
+    ingestion_id = f"ingestion-{int(time.time())}"
+    qs.create_ingestion(
+        AwsAccountId=account_id,
+        DataSetId=dataset_id,
+        IngestionId=ingestion_id,
+        IngestionType='FULL_REFRESH',
+    )
+
+    def check():
+        ingestion = qs.describe_ingestion(
+            AwsAccountId=account_id,
+            DataSetId=dataset_id,
+            IngestionId=ingestion_id,
+        )['Ingestion']
+        return ingestion['IngestionStatus'] in ('COMPLETED', 'FAILED', 'CANCELLED'), ingestion
+
+    done, ingestion, _ = wait_with_backoff(check, timeout, max_interval=30, sleep=sleep, clock=clock)
+    return {
+        'ingestion_id': ingestion_id,
+        'status':       ingestion['IngestionStatus'] if done else 'TIMED_OUT',
+        'rows':         ingestion.get('RowInfo', {}).get('RowsIngested'),
+        'error':        ingestion.get('ErrorInfo', {}).get('Message') if done else None,
+    }
+
+
+def run_batch(
+    qs,
+    account_id: str,
+    creds: Dict,
+    entries: List[Dict],
+    datasource_arn: str,
+    workers: Optional[int] = None,
+    concurrency: int = 8,
+    rate_limit: float = 5.0,
+    ingest: bool = True,
+    ingestion_timeout: float = 300,
+    report_path: Optional[str] = 'batch_report.json',
+    schema_dir: Optional[str] = None,
+    column_cache: Optional[ColumnTypeCache] = None,
+    sleep=time.sleep,
+    clock=time.monotonic,
+) -> Dict:
+    """
+    Convert many semantic views into QuickSight datasets without prompting.
+
+    Phases: fetch all DDLs over one Snowflake connection, parse them, fetch the column types of all
+    distinct tables (one query per database schema, unchanged tables from column_cache), generate the
+    schemas in a process pool of `workers` (inline when 1), then bring the datasets in line with them
+    and run their ingestions on `concurrency` threads, with every QuickSight call limited to
+    `rate_limit` per second. Each dataset is diffed with its live version (plan_dataset_write): an
+    unchanged one is not written, and only data changes are followed by an ingestion. A failing view is reported and does not stop the others.
+
+    Returns the report (also written to report_path): per-phase and per-view timings and outcomes.
+    """
+    run_started = time.perf_counter()
+    phases: Dict[str, float] = {}
+    results: Dict[str, Dict] = {}
+    for entry in entries:
+        if entry['dataset_id'] in results:
+            warn(f"Skipping {entry['database']}.{entry['schema']}.{entry['view']} — "
+                 f"dataset ID {entry['dataset_id']} is already in the batch")
+            continue
+        results[entry['dataset_id']] = {
+            **entry, 'status': 'PENDING', 'action': None, 'ingestion': None, 'rows': None,
+            'changes': [], 'error': None, 'failed_stage': None, 'timings': {},
+        }
+    pending = list(results.values())
+
+    def _fail(result: Dict, stage: str, error):
+        result.update(status='FAILED', failed_stage=stage, error=str(error))
+
+    def _view_key(result: Dict) -> Tuple[str, str, str]:
+        return result['database'], result['schema'], result['view']
+
+    # ── DDLs ──────────────────────────────────────────────────────────────────
+    hdr(f"Batch: fetch {len(pending)} semantic view DDLs")
+    started = time.perf_counter()
+    ddls, errors = fetch_semantic_view_ddls(creds, [_view_key(r) for r in pending])
+    phases['fetch_ddl'] = time.perf_counter() - started
+    for result in pending:
+        if _view_key(result) in errors:
+            _fail(result, 'fetch_ddl', errors[_view_key(result)])
+        elif not ddls.get(_view_key(result)):
+            _fail(result, 'fetch_ddl', 'GET_DDL returned empty content')
+    pending = [r for r in pending if r['status'] == 'PENDING']
+    ok(f"{len(pending)} DDLs fetched in {phases['fetch_ddl']:.1f}s")
+
+    # ── Parse ─────────────────────────────────────────────────────────────────
+    started = time.perf_counter()
+    parsed_views: Dict[str, Dict] = {}
+    for result in pending:
+        view_started = time.perf_counter()
+        try:
+            parsed_views[result['dataset_id']] = SnowflakeDDLParser().load_from_string(
+                ddls[_view_key(result)]).parse_all()
+        except Exception as e:
+            _fail(result, 'parse', e)
+        result['timings']['parse'] = time.perf_counter() - view_started
+    phases['parse'] = time.perf_counter() - started
+    pending = [r for r in pending if r['status'] == 'PENDING']
+
+    # ── Column types ──────────────────────────────────────────────────────────
+    started = time.perf_counter()
+    view_creds = {r['dataset_id']: {**creds, 'database': r['database']} for r in pending}
+    all_tables = [
+        {**t, 'database': t.get('database') or r['database']}
+        for r in pending for t in parsed_views[r['dataset_id']]['tables']
+    ]
+    try:
+        column_types = fetch_table_column_types(creds, all_tables, column_cache)
+        ok(f"Fetched actual column types for {len(column_types)} distinct tables"
+           + (f" ({column_cache.hits} from cache)" if column_cache is not None else ""))
+    except Exception as e:
+        warn(f"Could not fetch column types (using inferred types): {e}")
+        column_types = {}
+    phases['column_types'] = time.perf_counter() - started
+
+    # ── Schemas ───────────────────────────────────────────────────────────────
+    hdr(f"Batch: generate {len(pending)} schemas")
+    started = time.perf_counter()
+    tasks = []
+    for result in pending:
+        parsed = parsed_views[result['dataset_id']]
+        tables = parsed['tables']
+        keys = {t['alias'].upper(): _table_key(view_creds[result['dataset_id']], t) for t in tables}
+        tasks.append({
+            'parsed':                parsed,
+            'datasource_arn':        datasource_arn,
+            'database':              result['database'],
+            'dataset_id':            result['dataset_id'],
+            'dataset_name':          result['dataset_name'],
+            'column_type_overrides': {a: column_types[k] for a, k in keys.items() if k in column_types} or None,
+        })
+    schemas: Dict[str, Dict] = {}
+    if workers == 1 or len(tasks) <= 1:
+        outcomes = []
+        for task in tasks:
+            try:
+                outcomes.append(_generate_batch_schema(task))
+            except Exception as e:
+                outcomes.append(e)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_generate_batch_schema, task) for task in tasks]
+            outcomes = []
+            for future in futures:
+                try:
+                    outcomes.append(future.result())
+                except Exception as e:
+                    outcomes.append(e)
+    for result, outcome in zip(pending, outcomes):
+        if isinstance(outcome, Exception):
+            _fail(result, 'generate', outcome)
+            continue
+        result['timings']['generate'] = outcome['seconds']
+        schemas[result['dataset_id']] = outcome['schema']
+        if schema_dir:
+            os.makedirs(schema_dir, exist_ok=True)
+            with open(os.path.join(schema_dir, f"{result['dataset_id']}_schema.json"), 'w') as fh:
+                json.dump(outcome['schema'], fh, indent=2)
+    phases['generate'] = time.perf_counter() - started
+    pending = [r for r in pending if r['status'] == 'PENDING']
+    ok(f"{len(schemas)} schemas generated in {phases['generate']:.1f}s")
+
+    # ── Datasets and ingestions ───────────────────────────────────────────────
+    hdr(f"Batch: {'create/update and ingest' if ingest else 'create/update'} {len(pending)} datasets")
+    limiter = RateLimiter(rate_limit, clock=clock, sleep=sleep)
+    limited_qs = _RateLimitedClient(qs, limiter)
+
+    def _apply(result: Dict):
+        dataset_id = result['dataset_id']
+        view_name  = '.'.join(_view_key(result))
+        view_started = time.perf_counter()
+        try:
+            result['action'], changes = _apply_batch_dataset(limited_qs, account_id, schemas[dataset_id],
+                                                             result['mode'], sleep=sleep)
+            result['changes'] = [f"{c['kind']} {c['path']}: {c['detail']}" for c in changes]
+        except Exception as e:
+            _fail(result, 'dataset', e)
+            result['timings']['dataset'] = time.perf_counter() - view_started
+            err(f"{view_name} → {dataset_id}: dataset {result['mode']} failed: {e}")
+            return
+        result['timings']['dataset'] = time.perf_counter() - view_started
+
+        if ingest and result['action'] in INGESTION_ACTIONS:
+            ingestion_started = time.perf_counter()
+            try:
+                ingestion = _run_batch_ingestion(limited_qs, account_id, dataset_id, ingestion_timeout,
+                                                 sleep=sleep, clock=clock)
+                result['ingestion'] = ingestion['status']
+                result['rows']      = ingestion['rows']
+                if ingestion['status'] in ('FAILED', 'CANCELLED'):
+                    _fail(result, 'ingestion', ingestion['error'] or ingestion['status'])
+            except Exception as e:
+                _fail(result, 'ingestion', e)
+            result['timings']['ingestion'] = time.perf_counter() - ingestion_started
+
+        if result['status'] == 'PENDING':
+            result['status'] = 'SUCCEEDED'
+            ok(f"{view_name} → {dataset_id}: {result['action']}"
+               + (f", ingestion {result['ingestion']}" if result['ingestion'] else ''))
+        else:
+            err(f"{view_name} → {dataset_id}: {result['failed_stage']} failed: {result['error']}")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        list(pool.map(_apply, pending))
+    phases['apply'] = time.perf_counter() - started
+
+    # ── Report ────────────────────────────────────────────────────────────────
+    views = list(results.values())
+    for result in views:
+        result['timings'] = {k: round(v, 3) for k, v in result['timings'].items()}
+        result['timings']['total'] = round(sum(result['timings'].values()), 3)
+    report = {
+        'account_id':       account_id,
+        'datasource_arn':   datasource_arn,
+        'views':            len(views),
+        'succeeded':        sum(r['status'] == 'SUCCEEDED' for r in views),
+        'failed':           sum(r['status'] == 'FAILED' for r in views),
+        'phases':           {k: round(v, 3) for k, v in phases.items()},
+        'total_seconds':    round(time.perf_counter() - run_started, 3),
+        'quicksight_calls': limiter.calls,
+        'results':          views,
+    }
+    if report_path:
+        with open(report_path, 'w') as fh:
+            json.dump(report, fh, indent=2, default=str)
+    print_batch_summary(report, report_path)
+    return report
+
+
+def print_batch_summary(report: Dict, report_path: Optional[str] = None):
+    hdr("Batch Summary")
+    for r in report['results']:
+        name = f"{r['database']}.{r['schema']}.{r['view']}"
+        if r['status'] == 'SUCCEEDED':
+            ingestion = f"  ingestion {r['ingestion']}" if r['ingestion'] else ''
+            ok(f"{name} → {r['dataset_id']}  {r['action']}{ingestion}  ({r['timings']['total']:.1f}s)")
+        else:
+            err(f"{name} → {r['dataset_id']}  {r['failed_stage']}: {r['error']}")
+    print()
+    ok(f"Succeeded: {report['succeeded']}/{report['views']}  in {report['total_seconds']:.1f}s "
+       f"({report['quicksight_calls']} QuickSight calls)")
+    if report['failed']:
+        err(f"Failed:    {report['failed']}")
+    if report_path:
+        ok(f"Report saved to: {report_path}")
+
+
+def main_batch(args, session: boto3.Session, qs, account_id: str, region: str) -> int:
+    """Batch mode of main(): no prompts when --secret-name is given. Returns the process exit code."""
+    if not args.datasource_arn:
+        err("--datasource-arn is required in batch mode.")
+        return 1
+    if args.secret_name:
+        hdr("Snowflake Credentials")
+        creds = load_snowflake_credentials(session, region, args.secret_name)
+    else:
+        creds = collect_snowflake_credentials(session, region)
+    if not validate_snowflake_connection(creds):
+        err("Cannot continue without a valid Snowflake connection.")
+        return 1
+
+    hdr("Batch: resolve semantic views")
+    try:
+        entries = load_batch_manifest(args.batch_manifest) if args.batch_manifest else []
+    except (OSError, ValueError) as e:
+        err(f"Invalid manifest: {e}")
+        return 1
+    for database in args.batch_database or []:
+        found = list_batch_entries(creds, database)
+        ok(f"{len(found)} semantic views in {database}")
+        entries.extend(found)
+    if not entries:
+        err("No semantic views to convert.")
+        return 1
+    ok(f"{len(entries)} semantic views to convert")
+
+    report = run_batch(
+        qs, account_id, creds, entries, args.datasource_arn,
+        workers=args.workers,
+        concurrency=args.concurrency,
+        rate_limit=args.rate_limit,
+        ingest=not args.no_ingest,
+        ingestion_timeout=args.ingestion_timeout,
+        report_path=args.report,
+        schema_dir=args.schema_dir,
+        column_cache=None if args.no_column_cache else ColumnTypeCache(),
+    )
+    return 0 if report['failed'] == 0 else 1
+
+
 # ── Main ──────────────────────────────────────────────────────────────────────
 
 def print_banner():
@@ -847,6 +1679,26 @@ def main():
     )
     arg_parser.add_argument('--profile', help='AWS profile name (optional)')
     arg_parser.add_argument('--region',  default='us-east-1', help='AWS region (default: us-east-1)')
+    batch = arg_parser.add_argument_group('batch mode (non-interactive)')
+    batch.add_argument('--batch-manifest', help='JSON manifest of semantic views to convert')
+    batch.add_argument('--batch-database', action='append',
+                       help='Convert every semantic view in this database (repeatable)')
+    batch.add_argument('--secret-name',    help='Secrets Manager secret with the Snowflake credentials')
+    batch.add_argument('--datasource-arn', help='QuickSight Snowflake data source ARN for all datasets')
+    batch.add_argument('--workers',        type=int, default=None,
+                       help='Schema generation processes (default: CPU count)')
+    batch.add_argument('--concurrency',    type=int, default=8,
+                       help='Datasets created/updated and ingested at a time (default: 8)')
+    batch.add_argument('--rate-limit',     type=float, default=5.0,
+                       help='QuickSight API calls per second (default: 5)')
+    batch.add_argument('--no-ingest',      action='store_true', help='Do not start SPICE ingestions')
+    batch.add_argument('--ingestion-timeout', type=float, default=300,
+                       help='Seconds to wait for each ingestion (default: 300)')
+    batch.add_argument('--report',         default='batch_report.json',
+                       help='Summary report path (default: batch_report.json)')
+    batch.add_argument('--schema-dir',     help='Also save each generated schema in this directory')
+    batch.add_argument('--no-column-cache', action='store_true',
+                       help='Query all column types instead of reusing those cached for unchanged tables')
     args = arg_parser.parse_args()
 
     print_banner()
@@ -867,6 +1719,9 @@ def main():
 
     qs = session.client('quicksight', region_name=region)
 
+    if args.batch_manifest or args.batch_database:
+        sys.exit(main_batch(args, session, qs, account_id, region))
+
     # ── Snowflake credentials ─────────────────────────────────────────────────
     creds = collect_snowflake_credentials(session, region)
 
@@ -916,7 +1771,8 @@ def main():
 
     # ── Dataset configuration ─────────────────────────────────────────────────
     hdr("Dataset Configuration")
-    dataset_mode, dataset_id, dataset_name = select_dataset_mode(qs, account_id, datasource_arn)
+    dataset_mode, dataset_id, dataset_name = select_dataset_mode(qs, account_id, datasource_arn,
+                                                                 DatasetSourceCache())
     ok("Import mode: SPICE (default)")
 
     # ── Generate schema ───────────────────────────────────────────────────────
@@ -926,7 +1782,7 @@ def main():
         col_type_overrides: Optional[Dict] = None
         if sf_view is not None:  # skip when DDL was loaded from local CSV
             try:
-                col_type_overrides = fetch_column_types(creds, parsed['tables'])
+                col_type_overrides = fetch_column_types(creds, parsed['tables'], ColumnTypeCache())
                 ok(f"Fetched actual column types from Snowflake for {len(col_type_overrides)} tables")
             except Exception as e:
                 warn(f"Could not fetch column types (using inferred types): {e}")
@@ -951,25 +1807,29 @@ def main():
     ok(f"Logical tables:  {len(schema['LogicalTableMap'])}")
 
     # ── Create or update dataset ──────────────────────────────────────────────
-    if dataset_mode == 'create':
-        hdr("Create QuickSight Dataset")
-        try:
+    # Only what differs from the live dataset is written (see plan_dataset_write)
+    hdr("Create QuickSight Dataset" if dataset_mode == 'create' else "Update QuickSight Dataset")
+    try:
+        live = describe_live_dataset(qs, account_id, dataset_id)
+        action, changes = plan_dataset_write(live, schema, dataset_mode)
+        print_dataset_changes(changes)
+        if action == 'unchanged':
+            ok("Dataset is up to date — nothing to write")
+        elif action in ('created', 'replaced'):
             create_or_replace_dataset(qs, account_id, schema)
-        except Exception as e:
-            err(f"Dataset creation failed: {e}")
-            sys.exit(1)
-    else:
-        hdr("Update QuickSight Dataset")
-        try:
+        else:
             update_existing_dataset(qs, account_id, schema)
-        except Exception as e:
-            err(f"Dataset update failed: {e}")
-            sys.exit(1)
+    except Exception as e:
+        err(f"Dataset {'creation' if dataset_mode == 'create' else 'update'} failed: {e}")
+        sys.exit(1)
 
     # ── Trigger SPICE ingestion ───────────────────────────────────────────────
     hdr("SPICE Ingestion")
-    ingestion_id = trigger_ingestion(qs, account_id, dataset_id)
-    monitor_ingestion(qs, account_id, dataset_id, ingestion_id)
+    if action in INGESTION_ACTIONS:
+        ingestion_id = trigger_ingestion(qs, account_id, dataset_id)
+        monitor_ingestion(qs, account_id, dataset_id, ingestion_id)
+    else:
+        info("Skipped — the data of the dataset did not change")
 
     # ── Share dataset ─────────────────────────────────────────────────────────
     selected_users = select_users_to_share(qs, account_id)
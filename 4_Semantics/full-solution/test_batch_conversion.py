@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the batch mode of snowflake_to_quicksight.py.
+
+Snowflake is replaced by a stub connection answering GET_DDL and SHOW SEMANTIC VIEWS, with
+INFORMATION_SCHEMA.TABLES / COLUMNS queries run against an in-memory sqlite copy; QuickSight by a
+MagicMock client.
+
+Tests cover:
+  - RateLimiter                   (token bucket spacing)
+  - batch_entry / manifests       (defaults, validation)
+  - fetch_semantic_view_ddls      (chunked UNION ALL queries, failing views isolated)
+  - fetch_table_column_types      (one query per schema, ColumnTypeCache by LAST_ALTERED)
+  - run_batch                     (process pool, upsert, failures, ingestion, report; reruns write
+                                   and ingest only what changed in the live datasets)
+"""
+
+import copy
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, __file__.rsplit('/', 1)[0])
+
+import snowflake_to_quicksight as s2q
+from schema_generator import SnowflakeDDLParser
+from snowflake_to_quicksight import (
+    ColumnTypeCache,
+    RateLimiter,
+    batch_entry,
+    load_batch_manifest,
+    list_batch_entries,
+    fetch_semantic_view_ddls,
+    fetch_table_column_types,
+    run_batch,
+)
+
+ACCOUNT = '123456789012'
+DS_ARN = 'arn:aws:quicksight:us-east-1:123:datasource/sf-ds'
+SAMPLE_DDL = SnowflakeDDLParser().load_from_csv(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'SF_DDL.csv')).ddl_content
+SAMPLE_COLUMNS = {
+    ('MOVIES', 'PUBLIC', 'MOVIES_CURATED'):  [('MOVIEID', 'NUMBER', 0), ('TITLE', 'TEXT', None),
+                                              ('RELEASE', 'NUMBER', 0)],
+    ('MOVIES', 'PUBLIC', 'USERS_CURATED'):   [('USERID', 'NUMBER', 0), ('FIRSTNAME', 'TEXT', None)],
+    ('MOVIES', 'PUBLIC', 'RATINGS_CURATED'): [('RATING', 'FLOAT', None), ('TIMESTAMP', 'TIMESTAMP_NTZ', None)],
+}
+
+
+# ── helpers ───────────────────────────────────────────────────────────────────
+
+class _FakeClock:
+    """time.monotonic / time.sleep stand-ins."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class _StubSnowflake:
+    """Stand-in for _sf_connect(): every connection shares the views, tables and query log of the stub."""
+
+    def __init__(self, ddls=None, columns=None, views_by_database=None):
+        self.ddls = ddls or {}
+        self.views_by_database = views_by_database or {}
+        self.queries = []
+        self.connections = 0
+        self.information_schema = sqlite3.connect(':memory:')
+        self.information_schema.executescript("""
+            CREATE TABLE TABLES (TABLE_CATALOG, TABLE_SCHEMA, TABLE_NAME, LAST_ALTERED);
+            CREATE TABLE COLUMNS (TABLE_CATALOG, TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, ORDINAL_POSITION,
+                                  DATA_TYPE, NUMERIC_SCALE);
+        """)
+        for (db, schema, table), table_columns in (columns or {}).items():
+            self.information_schema.execute('INSERT INTO TABLES VALUES (?, ?, ?, ?)',
+                                            (db, schema, table, '2026-01-01 00:00:00.000 -0800'))
+            self.information_schema.executemany(
+                'INSERT INTO COLUMNS VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(db, schema, table, name, position, data_type, scale)
+                 for position, (name, data_type, scale) in enumerate(table_columns, 1)])
+
+    def connect(self, creds):
+        self.connections += 1
+        return _StubConnection(self)
+
+    def alter(self, table, last_altered, columns):
+        """Replace the columns of table (DATABASE, SCHEMA, TABLE), as an ALTER TABLE would."""
+        db, schema, name = table
+        self.information_schema.execute(
+            'UPDATE TABLES SET LAST_ALTERED = ? WHERE TABLE_CATALOG = ? AND TABLE_SCHEMA = ? AND TABLE_NAME = ?',
+            (last_altered, db, schema, name))
+        self.information_schema.execute(
+            'DELETE FROM COLUMNS WHERE TABLE_CATALOG = ? AND TABLE_SCHEMA = ? AND TABLE_NAME = ?', (db, schema, name))
+        self.information_schema.executemany(
+            'INSERT INTO COLUMNS VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [(db, schema, name, column, position, data_type, scale)
+             for position, (column, data_type, scale) in enumerate(columns, 1)])
+
+    def patch(self, test):
+        """Patch _sf_connect with this stub for the test, without connections pooled by other tests."""
+        s2q.close_snowflake_connections()
+        patcher = patch.object(s2q, '_sf_connect', self.connect)
+        patcher.start()
+        test.addCleanup(patcher.stop)
+        test.addCleanup(s2q.close_snowflake_connections)
+
+
+class _StubConnection:
+
+    def __init__(self, stub):
+        self.stub = stub
+
+    def cursor(self):
+        return _StubCursor(self.stub)
+
+    def close(self):
+        pass
+
+
+class _StubCursor:
+
+    def __init__(self, stub):
+        self.stub = stub
+        self.rows = []
+        self.description = []
+
+    def execute(self, sql):
+        self.stub.queries.append(sql)
+        if 'GET_DDL' in sql:
+            self.rows = []
+            for index, name in re.findall(r"SELECT (\d+), TO_VARCHAR\(GET_DDL\('SEMANTIC_VIEW', '([^']+)'\)\)", sql):
+                if name not in self.stub.ddls:
+                    raise Exception(f"Semantic view '{name}' does not exist or not authorized.")
+                self.rows.append((int(index), self.stub.ddls[name]))
+        elif 'INFORMATION_SCHEMA' in sql:
+            # FROM DB.INFORMATION_SCHEMA.T WHERE ...  ->  FROM T WHERE TABLE_CATALOG = 'DB' AND ...
+            query = re.sub(r"FROM (\w+)\.INFORMATION_SCHEMA\.(\w+)\s+WHERE", r"FROM \2 WHERE TABLE_CATALOG = '\1' AND",
+                           sql)
+            self.rows = self.stub.information_schema.execute(query).fetchall()
+        elif sql.startswith('SHOW SEMANTIC VIEWS IN DATABASE'):
+            db = sql.split()[-1]
+            self.description = [('name',), ('database_name',), ('schema_name',)]
+            self.rows = [(view, db, schema) for schema, view in self.stub.views_by_database.get(db, [])]
+        else:
+            raise Exception(f'Unexpected query: {sql}')
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def close(self):
+        pass
+
+
+def _batch_qs(existing=(), failing_updates=(), ingestion_status='COMPLETED'):
+    """
+    MagicMock QuickSight client that keeps the datasets it creates and updates, as describe_data_set
+    returns them. The `existing` datasets start out with no tables.
+    """
+    qs = MagicMock()
+    not_found = type('ResourceNotFoundException', (Exception,), {})
+    qs.exceptions.ResourceNotFoundException = not_found
+    qs.datasets = {}
+
+    def _store(dataset_id, schema):
+        qs.datasets[dataset_id] = copy.deepcopy({
+            **schema, 'DataSetId': dataset_id, 'Arn': f'arn:aws:quicksight:us-east-1:{ACCOUNT}:dataset/{dataset_id}',
+            'OutputColumns': [], 'ConsumedSpiceCapacityInBytes': 1024})
+
+    for dataset_id in existing:
+        _store(dataset_id, {'Name': dataset_id, 'PhysicalTableMap': {}, 'LogicalTableMap': {}, 'ImportMode': 'SPICE'})
+
+    def describe_data_set(AwsAccountId, DataSetId):
+        if DataSetId not in qs.datasets:
+            raise not_found(DataSetId)
+        return {'DataSet': copy.deepcopy(qs.datasets[DataSetId]), 'Status': 200}
+
+    def update_data_set(AwsAccountId, DataSetId, **schema):
+        if DataSetId in failing_updates:
+            raise Exception('InvalidParameterValueException: bad column')
+        if DataSetId not in qs.datasets:
+            raise not_found(DataSetId)
+        _store(DataSetId, schema)
+        return {'DataSetId': DataSetId, 'Status': 200}
+
+    def create_data_set(AwsAccountId, DataSetId, **schema):
+        _store(DataSetId, schema)
+        return {'DataSetId': DataSetId, 'Status': 201}
+
+    def delete_data_set(AwsAccountId, DataSetId):
+        if qs.datasets.pop(DataSetId, None) is None:
+            raise not_found(DataSetId)
+        return {'DataSetId': DataSetId, 'Status': 200}
+
+    qs.describe_data_set.side_effect = describe_data_set
+    qs.update_data_set.side_effect = update_data_set
+    qs.create_data_set.side_effect = create_data_set
+    qs.delete_data_set.side_effect = delete_data_set
+    qs.describe_ingestion.return_value = {'Ingestion': {
+        'IngestionStatus': ingestion_status, 'RowInfo': {'RowsIngested': 42}, 'ErrorInfo': {'Message': 'no access'}}}
+    return qs
+
+
+# ── RateLimiter ───────────────────────────────────────────────────────────────
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_burst_then_spaced_calls(self):
+        clock = _FakeClock()
+        limiter = RateLimiter(2, sleep=clock.sleep, clock=clock.clock)
+        for _ in range(10):
+            limiter.acquire()
+        # two calls from the initial burst, then one every half second
+        self.assertAlmostEqual(clock.now, 4.0)
+        self.assertEqual(limiter.calls, 10)
+
+    def test_zero_rate_is_unlimited(self):
+        clock = _FakeClock()
+        limiter = RateLimiter(0, sleep=clock.sleep, clock=clock.clock)
+        for _ in range(100):
+            limiter.acquire()
+        self.assertEqual(clock.sleeps, [])
+
+
+# ── batch_entry / manifests ───────────────────────────────────────────────────
+
+class TestBatchEntries(unittest.TestCase):
+
+    def test_string_entry_gets_defaults(self):
+        self.assertEqual(batch_entry('MOVIES.PUBLIC.Movie Analytics'), {
+            'database': 'MOVIES', 'schema': 'PUBLIC', 'view': 'Movie Analytics',
+            'dataset_id': 'movies-public-movie-analytics', 'dataset_name': 'Movie Analytics', 'mode': 'upsert'})
+
+    def test_invalid_entries_raise(self):
+        for spec in ['MOVIE_ANALYTICS_SV', {'view': 'A.B.C', 'mode': 'replace'}, {'dataset_id': 'x'}]:
+            with self.assertRaises(ValueError):
+                batch_entry(spec)
+
+    def test_manifest_list_or_object(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'views.json')
+            with open(path, 'w') as fh:
+                json.dump({'views': ['A.B.C', {'view': 'A.B.D', 'dataset_id': 'd', 'mode': 'create'}]}, fh)
+            entries = load_batch_manifest(path)
+        self.assertEqual([(e['dataset_id'], e['mode']) for e in entries], [('a-b-c', 'upsert'), ('d', 'create')])
+
+    def test_all_views_in_database(self):
+        stub = _StubSnowflake(views_by_database={'SALES': [('PUBLIC', 'ORDERS_SV'), ('EU', 'ORDERS_SV')]})
+        stub.patch(self)
+        entries = list_batch_entries({}, 'SALES')
+        self.assertEqual([e['dataset_id'] for e in entries], ['sales-public-orders_sv', 'sales-eu-orders_sv'])
+
+
+# ── fetch_semantic_view_ddls ──────────────────────────────────────────────────
+
+class TestFetchSemanticViewDdls(unittest.TestCase):
+
+    def test_chunks_share_one_connection(self):
+        views = [('DB', 'S', f'V{i}') for i in range(120)]
+        stub = _StubSnowflake(ddls={f'DB.S.V{i}': f'ddl {i}' for i in range(120)})
+        stub.patch(self)
+        ddls, errors = fetch_semantic_view_ddls({}, views)
+        self.assertEqual(ddls[('DB', 'S', 'V119')], 'ddl 119')
+        self.assertEqual((len(ddls), errors), (120, {}))
+        self.assertEqual((stub.connections, len(stub.queries)), (1, 3))
+
+    def test_failing_view_only_fails_itself(self):
+        views = [('DB', 'S', f'V{i}') for i in range(10)]
+        stub = _StubSnowflake(ddls={f'DB.S.V{i}': f'ddl {i}' for i in range(10) if i != 7})
+        stub.patch(self)
+        ddls, errors = fetch_semantic_view_ddls({}, views, chunk_size=5)
+        self.assertEqual(len(ddls), 9)
+        self.assertEqual(list(errors), [('DB', 'S', 'V7')])
+        # first chunk in one query; second chunk once combined, then view by view
+        self.assertEqual(len(stub.queries), 1 + 1 + 5)
+
+
+# ── fetch_table_column_types ──────────────────────────────────────────────────
+
+class TestFetchTableColumnTypes(unittest.TestCase):
+
+    def setUp(self):
+        columns = {**SAMPLE_COLUMNS, ('MOVIES', 'STAGE', 'MOVIES_RAW'): [('MOVIEID', 'TEXT', None)],
+                   ('SALES', 'PUBLIC', 'ORDERS'): [('AMOUNT', 'NUMBER', 2)]}
+        self.stub = _StubSnowflake(columns=columns)
+        self.stub.patch(self)
+        self.tables = [{'table_name': t, 'schema': s, 'database': d} for d, s, t in columns]
+        self.tables.append({'table_name': 'DROPPED', 'schema': 'PUBLIC', 'database': 'MOVIES'})
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache_path = os.path.join(self.tmp.name, 'cache', 'column_types.json')
+        for name in ('warn', 'ok'):
+            patcher = patch.object(s2q, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def column_queries(self):
+        return [q for q in self.stub.queries if 'INFORMATION_SCHEMA.COLUMNS' in q]
+
+    def test_one_query_per_schema(self):
+        types = fetch_table_column_types({'account': 'acct'}, self.tables * 2)
+        self.assertEqual(types[('MOVIES', 'PUBLIC', 'MOVIES_CURATED')],
+                         {'MOVIEID': 'INTEGER', 'TITLE': 'STRING', 'RELEASE': 'INTEGER'})
+        self.assertEqual(types[('SALES', 'PUBLIC', 'ORDERS')], {'AMOUNT': 'DECIMAL'})
+        self.assertEqual(types[('MOVIES', 'PUBLIC', 'DROPPED')], {})
+        self.assertEqual(len(types), 6)
+        self.assertEqual((self.stub.connections, len(self.stub.queries)), (1, 3))
+
+    def test_cache_serves_unchanged_tables(self):
+        first = fetch_table_column_types({'account': 'acct'}, self.tables, ColumnTypeCache(self.cache_path))
+        self.assertEqual(len(self.column_queries()), 3)
+
+        # a new process: same types from the file, only LAST_ALTERED is queried
+        self.stub.queries.clear()
+        cache = ColumnTypeCache(self.cache_path)
+        self.assertEqual(fetch_table_column_types({'account': 'acct'}, self.tables, cache), first)
+        self.assertEqual(self.column_queries(), [])
+        self.assertEqual((cache.hits, cache.misses), (5, 0))
+
+        # an altered table is the only one queried again
+        self.stub.queries.clear()
+        self.stub.alter(('MOVIES', 'PUBLIC', 'USERS_CURATED'), '2026-02-01 00:00:00.000 -0800',
+                        [('USERID', 'TEXT', None)])
+        types = fetch_table_column_types({'account': 'acct'}, self.tables, ColumnTypeCache(self.cache_path))
+        self.assertEqual(types[('MOVIES', 'PUBLIC', 'USERS_CURATED')], {'USERID': 'STRING'})
+        self.assertEqual(types[('MOVIES', 'PUBLIC', 'MOVIES_CURATED')], first[('MOVIES', 'PUBLIC', 'MOVIES_CURATED')])
+        self.assertEqual(len(self.column_queries()), 1)
+        self.assertIn("TABLE_NAME IN ('USERS_CURATED')", self.column_queries()[0])
+
+    def test_cache_is_per_account(self):
+        fetch_table_column_types({'account': 'acct'}, self.tables, ColumnTypeCache(self.cache_path))
+        self.stub.queries.clear()
+        fetch_table_column_types({'account': 'other'}, self.tables, ColumnTypeCache(self.cache_path))
+        self.assertEqual(len(self.column_queries()), 3)
+
+
+# ── run_batch ─────────────────────────────────────────────────────────────────
+
+@patch('builtins.print')
+class TestRunBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.stub = _StubSnowflake(ddls={f'MOVIES.PUBLIC.SV{i}': SAMPLE_DDL for i in range(6)},
+                                   columns=SAMPLE_COLUMNS)
+        self.stub.patch(self)
+        self.clock = _FakeClock()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.report_path = os.path.join(self.tmp.name, 'report.json')
+
+    def run_batch(self, qs, entries, **kwargs):
+        return run_batch(qs, ACCOUNT, {'database': 'MOVIES'}, entries, DS_ARN, report_path=self.report_path,
+                         sleep=self.clock.sleep, clock=self.clock.clock, **kwargs)
+
+    @staticmethod
+    def calculated_column_ids(dataset):
+        return {column['ColumnName']: column['ColumnId']
+                for node in dataset['LogicalTableMap'].values() for transform in node.get('DataTransforms', [])
+                for column in transform.get('CreateColumnsOperation', {}).get('Columns', [])}
+
+    def test_converts_views_in_process_pool(self, _):
+        entries = [batch_entry(f'MOVIES.PUBLIC.SV{i}') for i in range(6)]
+        qs = _batch_qs(existing={'movies-public-sv0', 'movies-public-sv1'})
+        report = self.run_batch(qs, entries, workers=2, concurrency=3,
+                                schema_dir=os.path.join(self.tmp.name, 'schemas'))
+
+        self.assertEqual((report['views'], report['succeeded'], report['failed']), (6, 6, 0))
+        self.assertEqual([r['action'] for r in report['results']], ['updated'] * 2 + ['created'] * 4)
+        self.assertEqual({r['ingestion'] for r in report['results']}, {'COMPLETED'})
+        self.assertEqual(qs.create_ingestion.call_count, 6)
+
+        # one connection for the DDLs (one query) and the columns of the 3 distinct tables of all 6 views (one query)
+        self.assertEqual(self.stub.connections, 1)
+        self.assertEqual(sum('INFORMATION_SCHEMA' in q for q in self.stub.queries), 1)
+        schema = qs.create_data_set.call_args.kwargs
+        input_columns = schema['PhysicalTableMap'][next(iter(schema['PhysicalTableMap']))]['RelationalTable']
+        self.assertIn({'Name': 'MOVIEID', 'Type': 'INTEGER'}, input_columns['InputColumns'])
+
+        with open(self.report_path) as fh:
+            saved = json.load(fh)
+        self.assertEqual(saved['succeeded'], 6)
+        self.assertEqual(set(saved['phases']), {'fetch_ddl', 'parse', 'column_types', 'generate', 'apply'})
+        self.assertTrue({'parse', 'generate', 'dataset', 'ingestion', 'total'} <= set(saved['results'][0]['timings']))
+        self.assertEqual(len(os.listdir(os.path.join(self.tmp.name, 'schemas'))), 6)
+
+    def test_failures_are_reported_per_view(self, _):
+        entries = [batch_entry('MOVIES.PUBLIC.SV0'), batch_entry('MOVIES.PUBLIC.MISSING'),
+                   batch_entry({'view': 'MOVIES.PUBLIC.SV1', 'mode': 'update'}),
+                   batch_entry({'view': 'MOVIES.PUBLIC.SV2', 'dataset_id': 'movies-public-sv0'})]
+        qs = _batch_qs(existing={'movies-public-sv1'}, failing_updates={'movies-public-sv1'})
+        report = self.run_batch(qs, entries, workers=1)
+
+        by_id = {r['dataset_id']: r for r in report['results']}
+        self.assertEqual(len(by_id), 3)  # duplicate dataset ID skipped
+        self.assertEqual(by_id['movies-public-sv0']['status'], 'SUCCEEDED')
+        self.assertEqual(by_id['movies-public-missing']['failed_stage'], 'fetch_ddl')
+        self.assertEqual(by_id['movies-public-sv1']['failed_stage'], 'dataset')
+        self.assertIn('bad column', by_id['movies-public-sv1']['error'])
+        self.assertEqual((report['succeeded'], report['failed']), (1, 2))
+
+    def test_failed_ingestion_fails_view(self, _):
+        qs = _batch_qs(ingestion_status='FAILED')
+        report = self.run_batch(qs, [batch_entry('MOVIES.PUBLIC.SV0')], workers=1)
+        result = report['results'][0]
+        self.assertEqual((result['status'], result['failed_stage'], result['error']), ('FAILED', 'ingestion', 'no access'))
+
+    def test_quicksight_calls_are_rate_limited(self, _):
+        entries = [batch_entry(f'MOVIES.PUBLIC.SV{i}') for i in range(6)]
+        qs = _batch_qs()
+        report = self.run_batch(qs, entries, workers=1, rate_limit=2, ingest=False)
+        # describe (not found) + create per view
+        self.assertEqual(report['quicksight_calls'], 12)
+        self.assertEqual(qs.create_ingestion.call_count, 0)
+        self.assertAlmostEqual(self.clock.now, (12 - 2) / 2)
+
+    def test_rerun_writes_only_what_changed(self, _):
+        entries = [batch_entry(f'MOVIES.PUBLIC.SV{i}') for i in range(3)]
+        qs = _batch_qs()
+        self.run_batch(qs, entries, workers=1)
+        self.assertEqual((qs.create_data_set.call_count, qs.create_ingestion.call_count), (3, 3))
+
+        # nothing changed: describe only
+        qs.reset_mock()
+        report = self.run_batch(qs, entries, workers=1)
+        self.assertEqual([r['action'] for r in report['results']], ['unchanged'] * 3)
+        self.assertEqual(report['quicksight_calls'], 3)
+        self.assertEqual([r['ingestion'] for r in report['results']], [None] * 3)
+
+        # a new comment is a metadata-only update; another ratings table, with other types, needs an ingestion
+        qs.reset_mock()
+        column_ids = self.calculated_column_ids(qs.datasets['movies-public-sv1'])
+        self.stub.ddls['MOVIES.PUBLIC.SV1'] = SAMPLE_DDL.replace("'Title of the movie'", "'Movie title'")
+        self.stub.ddls['MOVIES.PUBLIC.SV2'] = SAMPLE_DDL.replace('MOVIES.PUBLIC.RATINGS_CURATED', 'MOVIES.PUBLIC.RATINGS_V2')
+        self.stub.alter(('MOVIES', 'PUBLIC', 'RATINGS_V2'), '2026-02-01 00:00:00.000 -0800',
+                        [('RATING', 'NUMBER', 0), ('TIMESTAMP', 'TIMESTAMP_NTZ', None)])
+        report = self.run_batch(qs, entries, workers=1)
+        by_id = {r['dataset_id']: r for r in report['results']}
+        self.assertEqual([r['action'] for r in report['results']], ['unchanged', 'metadata-updated', 'updated'])
+        self.assertEqual(by_id['movies-public-sv1']['changes'],
+                         ['metadata LogicalTableMap.join-2.DataTransforms: description of MOVIE_TITLE changed'])
+        self.assertEqual(by_id['movies-public-sv1']['ingestion'], None)
+        self.assertEqual(by_id['movies-public-sv2']['ingestion'], 'COMPLETED')
+        self.assertEqual((qs.update_data_set.call_count, qs.create_ingestion.call_count), (2, 1))
+        qs.delete_data_set.assert_not_called()
+        # calculated fields keep their ColumnIds across updates
+        self.assertEqual(self.calculated_column_ids(qs.datasets['movies-public-sv1']), column_ids)
+
+    def test_create_mode_replaces_only_structural_changes(self, _):
+        qs = _batch_qs(existing={'movies-public-sv0'})
+        entry = batch_entry({'view': 'MOVIES.PUBLIC.SV0', 'mode': 'create'})
+        self.assertEqual(self.run_batch(qs, [entry], workers=1)['results'][0]['action'], 'replaced')
+        self.assertEqual(self.run_batch(qs, [entry], workers=1)['results'][0]['action'], 'unchanged')
+        self.assertEqual(qs.delete_data_set.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
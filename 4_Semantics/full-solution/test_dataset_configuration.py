@@ -4,30 +4,45 @@ Unit tests for the Dataset Configuration section of snowflake_to_quicksight.py.
 
 Tests cover:
   - list_quicksight_datasets       (pagination)
-  - _dataset_uses_datasource       (physical-table inspection)
-  - filter_datasets_by_datasource  (datasource filter)
+  - _dataset_datasource_arns       (physical-table inspection, throttling retries)
+  - filter_datasets_by_datasource  (datasource filter; bounded concurrency, throttling backoff,
+                                    DatasetSourceCache by LastUpdatedTime)
   - _search_datasets               (case-insensitive substring search)
   - _pick_dataset_from_list        (interactive list + search)
   - select_dataset_mode            (create / update / sub-menu)
   - create_or_replace_dataset
   - update_existing_dataset
+  - plan_dataset_write             (no-op, metadata-only and structural changes per mode)
+  - monitor_ingestion              (backoff polling with a deadline)
 """
 
+import copy
+import datetime
+import os
 import sys
+import tempfile
+import threading
+import time
 import unittest
 from unittest.mock import MagicMock, patch, call
 
+from botocore.exceptions import ClientError
+
 sys.path.insert(0, __file__.rsplit('/', 1)[0])
 
 from snowflake_to_quicksight import (
     list_quicksight_datasets,
-    _dataset_uses_datasource,
+    _dataset_datasource_arns,
     filter_datasets_by_datasource,
+    DatasetSourceCache,
     _search_datasets,
     _pick_dataset_from_list,
     select_dataset_mode,
     create_or_replace_dataset,
     update_existing_dataset,
+    describe_live_dataset,
+    plan_dataset_write,
+    monitor_ingestion,
 )
 
 DS_ARN = 'arn:aws:quicksight:us-east-1:123:datasource/sf-ds'
@@ -107,9 +122,9 @@ class TestListQuickSightDatasets(unittest.TestCase):
         self.assertEqual(second_call_kwargs.get('NextToken'), 'tok1')
 
 
-# ── _dataset_uses_datasource ──────────────────────────────────────────────────
+# ── _dataset_datasource_arns ──────────────────────────────────────────────────
 
-class TestDatasetUsesDatasource(unittest.TestCase):
+class TestDatasetDatasourceArns(unittest.TestCase):
 
     def _make_describe(self, datasource_arn):
         return lambda AwsAccountId, DataSetId: {
@@ -120,20 +135,42 @@ class TestDatasetUsesDatasource(unittest.TestCase):
             }
         }
 
-    def test_returns_true_when_matching(self):
+    def test_returns_relational_table_datasource(self):
         qs = MagicMock()
         qs.describe_data_set.side_effect = self._make_describe(DS_ARN)
-        self.assertTrue(_dataset_uses_datasource(qs, ACCOUNT, 'ds-001', DS_ARN))
+        self.assertEqual(_dataset_datasource_arns(qs, ACCOUNT, 'ds-001'), [DS_ARN])
 
-    def test_returns_false_when_not_matching(self):
+    def test_returns_other_datasource(self):
         qs = MagicMock()
         qs.describe_data_set.side_effect = self._make_describe('arn:aws:qs:::datasource/other')
-        self.assertFalse(_dataset_uses_datasource(qs, ACCOUNT, 'ds-002', DS_ARN))
+        self.assertEqual(_dataset_datasource_arns(qs, ACCOUNT, 'ds-002'), ['arn:aws:qs:::datasource/other'])
 
-    def test_returns_false_on_api_error(self):
+    def test_raises_api_error_without_retry(self):
         qs = MagicMock()
         qs.describe_data_set.side_effect = Exception("Access denied")
-        self.assertFalse(_dataset_uses_datasource(qs, ACCOUNT, 'ds-x', DS_ARN))
+        sleeps = []
+        with self.assertRaises(Exception):
+            _dataset_datasource_arns(qs, ACCOUNT, 'ds-x', sleep=sleeps.append)
+        self.assertEqual((qs.describe_data_set.call_count, sleeps), (1, []))
+
+    def test_retries_throttled_describe(self):
+        qs = MagicMock()
+        throttled = ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}},
+                                'DescribeDataSet')
+        qs.describe_data_set.side_effect = [throttled, throttled, self._make_describe(DS_ARN)(ACCOUNT, 'ds-001')]
+        sleeps = []
+        self.assertEqual(_dataset_datasource_arns(qs, ACCOUNT, 'ds-001', sleep=sleeps.append), [DS_ARN])
+        self.assertEqual(len(sleeps), 2)
+
+    def test_gives_up_after_six_throttled_attempts(self):
+        qs = MagicMock()
+        qs.describe_data_set.side_effect = ClientError(
+            {'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}}, 'DescribeDataSet')
+        sleeps = []
+        with self.assertRaises(ClientError):
+            _dataset_datasource_arns(qs, ACCOUNT, 'ds-001', sleep=sleeps.append)
+        self.assertEqual((qs.describe_data_set.call_count, len(sleeps)), (6, 5))
+        self.assertTrue(all(0.5 <= s <= 8.0 for s in sleeps))
 
     def test_checks_custom_sql_datasource(self):
         qs = MagicMock()
@@ -144,7 +181,7 @@ class TestDatasetUsesDatasource(unittest.TestCase):
                 }
             }
         }
-        self.assertTrue(_dataset_uses_datasource(qs, ACCOUNT, 'ds-001', DS_ARN))
+        self.assertEqual(_dataset_datasource_arns(qs, ACCOUNT, 'ds-001'), [DS_ARN])
 
 
 # ── filter_datasets_by_datasource ─────────────────────────────────────────────
@@ -168,6 +205,89 @@ class TestFilterDatasetsByDatasource(unittest.TestCase):
         self.assertEqual(result, [])
 
 
+class TestFilterDatasetsConcurrently(unittest.TestCase):
+    """Many datasets: describe_data_set takes DESCRIBE_LATENCY and every third dataset uses DS_ARN."""
+
+    DESCRIBE_LATENCY = 0.02
+
+    def setUp(self):
+        updated = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+        self.datasets = [{'Arn': f'arn:aws:quicksight:us-east-1:{ACCOUNT}:dataset/ds-{i}', 'DataSetId': f'ds-{i}',
+                          'Name': f'Dataset {i}', 'ImportMode': 'SPICE', 'LastUpdatedTime': updated}
+                         for i in range(48)]
+        self.throttle = {}
+        self.described = []
+        self.in_flight = self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.qs = MagicMock()
+        self.qs.describe_data_set.side_effect = self._describe
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_path = os.path.join(tmp.name, 'dataset_sources.json')
+
+    def _describe(self, AwsAccountId, DataSetId):
+        with self.lock:
+            self.described.append(DataSetId)
+            if self.throttle.get(DataSetId):
+                self.throttle[DataSetId] -= 1
+                raise ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}},
+                                  'DescribeDataSet')
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.DESCRIBE_LATENCY)
+        with self.lock:
+            self.in_flight -= 1
+        arn = DS_ARN if int(DataSetId.split('-')[1]) % 3 == 0 else 'arn:aws:quicksight:us-east-1:123:datasource/other'
+        return {'DataSet': {'PhysicalTableMap': {'t1': {'CustomSql': {'DataSourceArn': arn}}}}}
+
+    def filter(self, cache=None, **kwargs):
+        return [ds['DataSetId'] for ds in
+                filter_datasets_by_datasource(self.qs, ACCOUNT, self.datasets, DS_ARN, cache, **kwargs)]
+
+    def test_describes_on_bounded_thread_pool(self):
+        started = time.perf_counter()
+        ids = self.filter(max_workers=8)
+        elapsed = time.perf_counter() - started
+        self.assertEqual(ids, [f'ds-{i}' for i in range(0, 48, 3)])
+        self.assertEqual(self.max_in_flight, 8)
+        # 48 describes of 20 ms take about 1 s one at a time
+        self.assertLess(elapsed, len(self.datasets) * self.DESCRIBE_LATENCY / 3)
+
+    def test_throttled_describes_are_retried(self):
+        self.throttle = {'ds-3': 2, 'ds-4': 1}
+        sleeps = []
+        with patch('snowflake_to_quicksight.warn') as warn:
+            ids = self.filter(sleep=sleeps.append)
+        self.assertIn('ds-3', ids)
+        self.assertEqual((len(sleeps), self.described.count('ds-3')), (3, 3))
+        warn.assert_not_called()
+
+        # a dataset still throttled after the last attempt is left out
+        self.throttle = {'ds-6': 10}
+        with patch('snowflake_to_quicksight.warn') as warn:
+            ids = self.filter(sleep=lambda _: None)
+        self.assertNotIn('ds-6', ids)
+        warn.assert_called_once()
+
+    def test_cache_skips_unchanged_datasets(self):
+        first = self.filter(DatasetSourceCache(self.cache_path))
+        self.assertEqual(len(self.described), 48)
+
+        # a new run: only the dataset updated since is described
+        self.described.clear()
+        self.datasets[4]['LastUpdatedTime'] = datetime.datetime(2026, 2, 1, tzinfo=datetime.timezone.utc)
+        cache = DatasetSourceCache(self.cache_path)
+        self.assertEqual(self.filter(cache), first)
+        self.assertEqual(self.described, ['ds-4'])
+        self.assertEqual((cache.hits, cache.misses), (47, 1))
+
+        # summaries without LastUpdatedTime are always described
+        self.described.clear()
+        del self.datasets[5]['LastUpdatedTime']
+        self.filter(DatasetSourceCache(self.cache_path))
+        self.assertEqual(self.described, ['ds-5'])
+
+
 # ── _search_datasets ──────────────────────────────────────────────────────────
 
 class TestSearchDatasets(unittest.TestCase):
@@ -372,5 +492,123 @@ class TestUpdateExistingDataset(unittest.TestCase):
         qs.create_data_set.assert_not_called()
 
 
+# ── plan_dataset_write ────────────────────────────────────────────────────────
+
+def _live_schema(**overrides):
+    schema = {
+        'DataSetId': 'ds-001', 'Name': 'Movies', 'ImportMode': 'SPICE',
+        'PhysicalTableMap': {'movies': {'RelationalTable': {
+            'DataSourceArn': DS_ARN, 'Schema': 'PUBLIC', 'Name': 'MOVIES',
+            'InputColumns': [{'Name': 'MOVIEID', 'Type': 'INTEGER'}, {'Name': 'TITLE', 'Type': 'STRING'}]}}},
+        'LogicalTableMap': {'movies': {'Alias': 'MOVIES', 'Source': {'PhysicalTableId': 'movies'}, 'DataTransforms': [
+            {'CreateColumnsOperation': {'Columns': [
+                {'ColumnName': 'TITLE_UPPER', 'ColumnId': 'id-1', 'Expression': 'toUpper({TITLE})'}]}},
+            {'TagColumnOperation': {'ColumnName': 'TITLE', 'Tags': [{'ColumnDescription': {'Text': 'Title'}}]}},
+        ]}},
+    }
+    schema.update(overrides)
+    return schema
+
+
+class TestPlanDatasetWrite(unittest.TestCase):
+
+    def test_missing_dataset(self):
+        self.assertEqual(plan_dataset_write(None, _live_schema(), 'upsert'), ('created', []))
+        self.assertEqual(plan_dataset_write(None, _live_schema(), 'create'), ('created', []))
+        with self.assertRaises(ValueError):
+            plan_dataset_write(None, _live_schema(), 'update')
+
+    def test_unchanged_dataset_keeps_column_ids(self):
+        generated = _live_schema()
+        generated['LogicalTableMap']['movies']['DataTransforms'][0]['CreateColumnsOperation']['Columns'][0]['ColumnId'] = 'new'
+        self.assertEqual(plan_dataset_write(_live_schema(Arn='arn:x'), generated, 'update'), ('unchanged', []))
+        self.assertEqual(generated, _live_schema())
+
+    def test_metadata_changes_are_applied_in_place(self):
+        generated = _live_schema(Name='Movie Analytics')
+        generated['LogicalTableMap']['movies']['DataTransforms'][1]['TagColumnOperation']['Tags'] = []
+        for mode in ('update', 'create'):
+            action, changes = plan_dataset_write(_live_schema(), copy.deepcopy(generated), mode)
+            self.assertEqual((action, len(changes)), ('metadata-updated', 2))
+
+    def test_structural_changes(self):
+        generated = _live_schema()
+        generated['PhysicalTableMap']['movies']['RelationalTable']['InputColumns'].pop()
+        self.assertEqual(plan_dataset_write(_live_schema(), copy.deepcopy(generated), 'update')[0], 'updated')
+        self.assertEqual(plan_dataset_write(_live_schema(), copy.deepcopy(generated), 'create')[0], 'replaced')
+
+    def test_describe_live_dataset(self):
+        qs = _make_qs()
+        qs.describe_data_set.return_value = {'DataSet': _live_schema(), 'Status': 200}
+        self.assertEqual(describe_live_dataset(qs, ACCOUNT, 'ds-001')['Name'], 'Movies')
+        qs.describe_data_set.side_effect = qs.exceptions.ResourceNotFoundException('gone')
+        self.assertIsNone(describe_live_dataset(qs, ACCOUNT, 'ds-001'))
+
+
+# ── monitor_ingestion ─────────────────────────────────────────────────────────
+
+class _FakeClock:
+    """time.monotonic / time.sleep stand-ins; describe_ingestion reports COMPLETED from done_at on."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _ingestion_qs(clock, done_at, final_status='COMPLETED'):
+    qs = MagicMock()
+    qs.describe_ingestion.side_effect = lambda **_: {'Ingestion': {
+        'IngestionStatus': final_status if clock.now >= done_at else 'RUNNING',
+        'RowInfo': {'RowsIngested': 42},
+        'ErrorInfo': {'Message': 'bad credentials'},
+    }}
+    return qs
+
+
+class TestMonitorIngestion(unittest.TestCase):
+
+    @patch('builtins.print')
+    def test_quick_ingestion_is_seen_within_seconds(self, mock_print):
+        clock = _FakeClock()
+        monitor_ingestion(_ingestion_qs(clock, done_at=3), ACCOUNT, 'ds-001', 'ing-1',
+                          sleep=clock.sleep, clock=clock.clock)
+        self.assertLess(clock.now, 10)
+        self.assertTrue(any('rows ingested: 42' in str(c) for c in mock_print.call_args_list))
+
+    @patch('builtins.print')
+    @patch('snowflake_to_quicksight.random.uniform', side_effect=lambda low, high: (low + high) / 2)
+    def test_backs_off_between_checks(self, _, __):
+        clock = _FakeClock()
+        qs = _ingestion_qs(clock, done_at=280)
+        monitor_ingestion(qs, ACCOUNT, 'ds-001', 'ing-1', sleep=clock.sleep, clock=clock.clock)
+        self.assertEqual(clock.sleeps[:5], [2, 3, 5, 9, 16])
+        self.assertEqual(max(clock.sleeps), 16)
+        # polling every 10 seconds took 28 checks
+        self.assertLess(qs.describe_ingestion.call_count, 28)
+
+    @patch('builtins.print')
+    def test_stops_at_deadline(self, mock_print):
+        clock = _FakeClock()
+        monitor_ingestion(_ingestion_qs(clock, done_at=10_000), ACCOUNT, 'ds-001', 'ing-1', timeout=60,
+                          sleep=clock.sleep, clock=clock.clock)
+        self.assertLessEqual(clock.now, 60)
+        self.assertTrue(any('timed out' in str(c) for c in mock_print.call_args_list))
+
+    @patch('builtins.print')
+    def test_reports_failed_ingestion(self, mock_print):
+        clock = _FakeClock()
+        monitor_ingestion(_ingestion_qs(clock, done_at=0, final_status='FAILED'), ACCOUNT, 'ds-001', 'ing-1',
+                          sleep=clock.sleep, clock=clock.clock)
+        self.assertTrue(any('bad credentials' in str(c) for c in mock_print.call_args_list))
+        self.assertEqual(clock.sleeps, [])
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SnowflakeDDLParser of schema_generator.py.
+
+Tests cover:
+  - _split_sections               (quotes, comments, nested parentheses, multi-line items)
+  - parse_all                     (SF_DDL.csv sample; per-item comments and metrics)
+  - parse time                    (linear in the size of generated semantic views, up to
+                                   500 tables / 20k dimensions / 5k metrics)
+  - diff_dataset_schema           (metadata-only vs structural changes, ignored QuickSight attributes)
+"""
+
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, __file__.rsplit('/', 1)[0])
+
+from schema_generator import (
+    METADATA_ONLY,
+    STRUCTURAL,
+    QuickSightSchemaGenerator,
+    SnowflakeDDLParser,
+    _split_sections,
+    dataset_change_kind,
+    diff_dataset_schema,
+    reuse_column_ids,
+)
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'SF_DDL.csv')
+
+
+# ── helpers ───────────────────────────────────────────────────────────────────
+
+def _semantic_view_ddl(tables: int, dimensions: int, metrics: int) -> str:
+    """Semantic view DDL in the GET_DDL layout, with items spread evenly over the tables."""
+    table_lines = [
+        f"\t\tT{t} as DB.PUBLIC.TABLE_{t} primary key (ID_{t}) with synonyms=('t{t}','table {t}') comment='Table {t}'"
+        for t in range(tables)
+    ]
+    relationship_lines = [
+        f'\t\tT{t}_TO_T0 as T{t}(PARENT_ID) references T0(ID_0)' for t in range(1, tables)
+    ]
+    fact_lines = [f'\t\tT{t}.AMOUNT_{t} as T{t}.AMOUNT' for t in range(tables)]
+    dimension_lines = []
+    for d in range(dimensions):
+        t = d % tables
+        if d % 10 == 0:
+            expression = f"CONCAT(T{t}.FIRST_{d}, ' (', T{t}.LAST_{d}, ')')"
+        else:
+            expression = f'T{t}.COL_{d}'
+        dimension_lines.append(
+            f"\t\tT{t}.DIM_{d} as {expression} with synonyms=('dim {d}','d, {d}') comment='Dimension {d}'"
+        )
+    metric_lines = [
+        f"\t\tT{m % tables}.METRIC_{m} as SUM(T{m % tables}.amount_{m % tables}) "
+        f"with synonyms=('metric {m}') comment='Metric {m}'"
+        for m in range(metrics)
+    ]
+    sections = [('tables', table_lines), ('relationships', relationship_lines), ('facts', fact_lines),
+                ('dimensions', dimension_lines), ('metrics', metric_lines)]
+    body = '\n'.join(f'\t{name} (\n' + ',\n'.join(lines) + '\n\t)' for name, lines in sections)
+    return f"create or replace semantic view GENERATED_SV\n{body}\n\tcomment='Generated semantic view';"
+
+
+# ── _split_sections ───────────────────────────────────────────────────────────
+
+class TestSplitSections(unittest.TestCase):
+
+    def test_items_are_split_on_top_level_commas_only(self):
+        ddl = """create semantic view SV
+            tables ( A as DB.S.A primary key (X, Y), B as DB.S.B )
+            dimensions (
+                A.NAME as CONCAT(A.FIRST, ', ', A.LAST) comment='Name, with (parens)',
+                A.CITY as A.CITY
+            )"""
+        sections = _split_sections(ddl)
+        self.assertEqual(sections['tables'], ['A as DB.S.A primary key (X, Y)', 'B as DB.S.B'])
+        self.assertEqual(sections['dimensions'], ["A.NAME as CONCAT(A.FIRST, ', ', A.LAST) comment='Name, with (parens)'",
+                                                  'A.CITY as A.CITY'])
+        self.assertNotIn('metrics', sections)
+
+    def test_comments_and_quoted_keywords_are_ignored(self):
+        ddl = """create semantic view SV comment='no metrics ( here'
+            -- facts ( commented out )
+            tables ( A as DB.S.A, /* B as DB.S.B, */ C as DB.S.C )
+            metrics ( -- first metric
+                A.TOTAL as SUM(A.X) comment='it''s a total, really'
+            )"""
+        sections = _split_sections(ddl)
+        self.assertEqual(sorted(sections), ['metrics', 'tables'])
+        self.assertEqual(sections['tables'], ['A as DB.S.A', 'C as DB.S.C'])
+        self.assertEqual(sections['metrics'], ["A.TOTAL as SUM(A.X) comment='it''s a total, really'"])
+
+    def test_multi_line_items_and_unterminated_section(self):
+        sections = _split_sections('metrics (\n  A.M as SUM(\n    A.X\n  ) comment=\'m\',\n  A.N as COUNT(A.Y)')
+        self.assertEqual(sections['metrics'], ["A.M as SUM(\n    A.X\n  ) comment='m'", 'A.N as COUNT(A.Y)'])
+
+
+# ── parse_all ─────────────────────────────────────────────────────────────────
+
+class TestParseAll(unittest.TestCase):
+
+    def test_parses_sample_ddl(self):
+        parsed = SnowflakeDDLParser().load_from_csv(SAMPLE_CSV).parse_all()
+        self.assertEqual({name: len(items) for name, items in parsed.items()},
+                         {'tables': 3, 'relationships': 2, 'facts': 1, 'dimensions': 17, 'metrics': 7})
+        self.assertEqual(parsed['tables'][2]['primary_keys'], ['USERID', 'MOVIEID'])
+        full_name = next(d for d in parsed['dimensions'] if d['alias'] == 'USERS.USER_FULL_NAME')
+        self.assertEqual(full_name['expression'], "CONCAT(USERS.FIRSTNAME, ' ', USERS.LASTNAME)")
+        self.assertEqual(full_name['synonyms'], ['audience name', 'viewer name'])
+        self.assertEqual(parsed['metrics'][4]['alias'], 'RATINGS.DISTINCT_USERS')
+        self.assertEqual(parsed['metrics'][4]['comment'], 'Count of distinct user IDs from the ratings table')
+
+    def test_each_item_keeps_its_own_comment(self):
+        ddl = """tables ( A as DB.S.A )
+            metrics (
+                A.TOTAL_X as SUM(A.X) with synonyms=('x') comment='first',
+                B.TOTAL_X as SUM(B.X) comment='second',
+                A.TOTAL as COUNT(A.Y)
+            )"""
+        metrics = SnowflakeDDLParser().load_from_string(ddl).parse_all()['metrics']
+        self.assertEqual([(m['alias'], m['expression'], m['comment']) for m in metrics],
+                         [('A.TOTAL_X', 'SUM(A.X)', 'first'), ('B.TOTAL_X', 'SUM(B.X)', 'second'),
+                          ('A.TOTAL', 'COUNT(A.Y)', '')])
+
+    def test_parses_generated_view(self):
+        parsed = SnowflakeDDLParser().load_from_string(_semantic_view_ddl(5, 40, 10)).parse_all()
+        self.assertEqual({name: len(items) for name, items in parsed.items()},
+                         {'tables': 5, 'relationships': 4, 'facts': 5, 'dimensions': 40, 'metrics': 10})
+        self.assertEqual(parsed['dimensions'][10]['physical_columns'],
+                         [{'table': 'T0', 'column': 'FIRST_10'}, {'table': 'T0', 'column': 'LAST_10'}])
+        self.assertEqual(parsed['dimensions'][11]['synonyms'], ['dim 11', 'd', '11'])
+        self.assertEqual(parsed['metrics'][9]['comment'], 'Metric 9')
+
+
+# ── parse time ────────────────────────────────────────────────────────────────
+
+class TestParseScaling(unittest.TestCase):
+
+    @staticmethod
+    def _parse_seconds(ddl: str) -> float:
+        best = float('inf')
+        for _ in range(3):
+            started = time.perf_counter()
+            SnowflakeDDLParser().load_from_string(ddl).parse_all()
+            best = min(best, time.perf_counter() - started)
+        return best
+
+    def test_parse_time_is_linear_in_view_size(self):
+        timings = []
+        for fraction in (8, 4, 2, 1):
+            ddl = _semantic_view_ddl(500 // fraction, 20_000 // fraction, 5_000 // fraction)
+            timings.append((fraction, len(ddl), self._parse_seconds(ddl)))
+        for fraction, size, seconds in timings:
+            print(f'\n1/{fraction} view: {size / 1e6:.1f} MB parsed in {seconds * 1000:.0f} ms '
+                  f'({seconds / size * 1e9:.0f} ns/byte)', end='')
+        print()
+
+        # 8 times the DDL takes about 8 times as long; a quadratic parser would take 64 times
+        smallest, largest = timings[0], timings[-1]
+        self.assertLess(largest[2] / smallest[2], 3 * largest[1] / smallest[1])
+
+
+# ── diff_dataset_schema ───────────────────────────────────────────────────────
+
+class TestDiffDatasetSchema(unittest.TestCase):
+
+    def setUp(self):
+        # as describe_data_set returns it
+        self.live = {**self.regenerate(), 'Arn': 'arn:aws:quicksight:us-east-1:123:dataset/movies',
+                     'OutputColumns': [{'Name': 'TITLE', 'Type': 'STRING'}]}
+        for table in self.live['PhysicalTableMap'].values():
+            for column in table['RelationalTable']['InputColumns']:
+                if column['Type'] == 'DECIMAL':
+                    column['SubType'] = 'FLOAT'
+
+    def regenerate(self):
+        parsed = SnowflakeDDLParser().load_from_csv(SAMPLE_CSV).parse_all()
+        return QuickSightSchemaGenerator(parsed).generate_complete_schema(
+            'arn:aws:quicksight:us-east-1:123:datasource/sf', 'MOVIES', 'movies', 'Movies')
+
+    def test_regenerated_schema_has_no_changes(self):
+        # calculated fields get new ColumnIds on every generation
+        self.assertEqual(diff_dataset_schema(self.live, self.regenerate()), [])
+
+    def test_names_and_descriptions_are_metadata_only(self):
+        schema = self.regenerate()
+        schema['Name'] = 'Movie Analytics'
+        schema['LogicalTableMap']['movies']['Alias'] = 'MOVIES'
+        final_node = next(n for n in schema['LogicalTableMap'].values() if 'DataTransforms' in n
+                          and any('TagColumnOperation' in t for t in n['DataTransforms']))
+        final_node['DataTransforms'] = [t for t in final_node['DataTransforms']
+                                        if t.get('TagColumnOperation', {}).get('ColumnName') != 'RELEASE_YEAR']
+        changes = diff_dataset_schema(self.live, schema)
+        self.assertEqual([(c['kind'], c['path']) for c in changes],
+                         [(METADATA_ONLY, 'Name'), (METADATA_ONLY, 'LogicalTableMap.join-2.DataTransforms'),
+                          (METADATA_ONLY, 'LogicalTableMap.movies.Alias')])
+        self.assertEqual(changes[1]['detail'], 'description of RELEASE_YEAR changed')
+        self.assertEqual(dataset_change_kind(changes), METADATA_ONLY)
+
+    def test_columns_joins_and_calculations_are_structural(self):
+        schema = self.regenerate()
+        columns = schema['PhysicalTableMap']['movies']['RelationalTable']['InputColumns']
+        columns[0]['Type'] = 'STRING'
+        columns.append({'Name': 'GENRE', 'Type': 'STRING'})
+        schema['LogicalTableMap']['join-1']['Source']['JoinInstruction']['Type'] = 'INNER'
+        changes = diff_dataset_schema(self.live, schema)
+        self.assertEqual([(c['kind'], c['path'], c['detail']) for c in changes],
+                         [(STRUCTURAL, 'PhysicalTableMap.movies', 'added GENRE; retyped MOVIEID'),
+                          (STRUCTURAL, 'LogicalTableMap.join-1.Source', 'source or join changed')])
+
+        schema = self.regenerate()
+        create = next(t for n in schema['LogicalTableMap'].values() for t in n.get('DataTransforms', [])
+                      if 'CreateColumnsOperation' in t)
+        create['CreateColumnsOperation']['Columns'][0]['Expression'] += ' + 1'
+        self.assertEqual(dataset_change_kind(diff_dataset_schema(self.live, schema)), STRUCTURAL)
+
+    def test_reuse_column_ids(self):
+        schema = reuse_column_ids(self.live, self.regenerate())
+        self.assertEqual(schema['LogicalTableMap'], self.live['LogicalTableMap'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,447 @@
+"""
+Offline stand-in for the QuickSight, STS and S3 APIs used by the Admin Suite collectors and the BIOps library.
+
+install(session) registers botocore event handlers on a boto3 session so that every client created from it
+afterwards is answered from an in-memory account instead of AWS: request parameters are still validated
+against the real service models, but nothing is signed or sent. The account is synthesized from a
+FakeAccountSpec (users, groups, folders, dashboards, analyses, datasets, data sources, themes), and each call
+can be slowed down (latency), paginated (page_size) or rejected with ThrottlingException (throttle_rate).
+Throttled QuickSight calls are answered at before-send with an HTTP 400, so botocore parses and retries them
+exactly as it would a throttle from AWS.
+"""
+
+"""
+import libraries
+"""
+import datetime
+import io
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from botocore.awsrequest import AWSResponse
+from botocore.response import StreamingBody
+
+BASE_TIME = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+DASHBOARD_ACTIONS = ['quicksight:DescribeDashboard', 'quicksight:ListDashboardVersions', 'quicksight:QueryDashboard']
+DATASET_ACTIONS = ['quicksight:DescribeDataSet', 'quicksight:DescribeDataSetPermissions', 'quicksight:PassDataSet']
+
+
+@dataclass
+class FakeAccountSpec:
+    users: int = 200
+    groups: int = 20
+    folders: int = 50
+    dashboards: int = 100
+    datasets: int = 100
+    data_sources: int = 20
+    themes: int = 5
+    principals_per_asset: int = 3
+    page_size: int = 100
+    latency: float = 0.0
+    throttle_rate: float = 0.0
+    seed: int = 0
+    account_id: str = '123456789012'
+    region: str = 'us-east-1'
+
+
+class _NotFound(Exception):
+    pass
+
+
+class _RawBody:
+    """The part of a urllib3 response that AWSResponse reads the body from."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def stream(self, **kwargs):
+        yield self.data
+
+
+class FakeQuickSight:
+    """In-memory account plus the botocore event handlers that serve it."""
+
+    def __init__(self, spec: Optional[FakeAccountSpec] = None):
+        self.spec = spec or FakeAccountSpec()
+        self.calls: Counter = Counter()
+        self.throttled = 0
+        self.objects: Dict[Tuple[str, str], bytes] = {}
+        self._multipart: Dict[str, Dict[int, bytes]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._random = random.Random(self.spec.seed)
+        self._build()
+
+    # account model
+
+    def arn(self, resource: str) -> str:
+        return f'arn:aws:quicksight:{self.spec.region}:{self.spec.account_id}:{resource}'
+
+    def _time(self, i: int) -> datetime.datetime:
+        return BASE_TIME + datetime.timedelta(minutes=i)
+
+    def _permissions(self, i: int, actions: List[str]) -> List[Dict[str, Any]]:
+        permissions = []
+        for n in range(self.spec.principals_per_asset):
+            if n % 2 == 0 and self.spec.users:
+                principal = self.arn(f'user/default/user{(i + n) % self.spec.users}')
+            elif self.spec.groups:
+                principal = self.arn(f'group/default/group{(i + n) % self.spec.groups}')
+            else:
+                continue
+            permissions.append({'Principal': principal, 'Actions': list(actions)})
+        return permissions
+
+    def _build(self):
+        spec = self.spec
+        roles = ['ADMIN', 'AUTHOR', 'READER', 'READER']
+        self.users = [{
+            'Arn': self.arn(f'user/default/user{i}'), 'UserName': f'user{i}', 'Email': f'user{i}@example.com',
+            'Role': roles[i % len(roles)], 'IdentityType': 'QUICKSIGHT', 'Active': True, 'PrincipalId': f'p{i}',
+        } for i in range(spec.users)]
+        self.groups = [{
+            'Arn': self.arn(f'group/default/group{j}'), 'GroupName': f'group{j}', 'PrincipalId': f'g{j}',
+        } for j in range(spec.groups)]
+        # every user is in one group, every third user in a second one
+        self.user_groups = {user['UserName']: [] for user in self.users}
+        if spec.groups:
+            for i, user in enumerate(self.users):
+                self.user_groups[user['UserName']].append(self.groups[i % spec.groups])
+                if i % 3 == 0 and spec.groups > 1:
+                    self.user_groups[user['UserName']].append(self.groups[(i + 1) % spec.groups])
+
+        self.data_sources = {}
+        for k in range(spec.data_sources):
+            source_id = f'datasource-{k}'
+            self.data_sources[source_id] = {
+                'Arn': self.arn(f'datasource/{source_id}'), 'DataSourceId': source_id, 'Name': f'Data source {k}',
+                'Type': 'ATHENA', 'Status': 'CREATION_SUCCESSFUL', 'CreatedTime': self._time(k),
+                'LastUpdatedTime': self._time(k), 'DataSourceParameters': {'AthenaParameters': {'WorkGroup': 'primary'}},
+                'Permissions': self._permissions(k, DATASET_ACTIONS),
+            }
+
+        self.data_sets = {}
+        self.ingestions = {}
+        for k in range(spec.datasets):
+            dataset_id = f'dataset-{k}'
+            source_arn = self.arn(f'datasource/datasource-{k % spec.data_sources}') if spec.data_sources else ''
+            import_mode = 'SPICE' if k % 2 == 0 else 'DIRECT_QUERY'
+            if k % 3 == 0:
+                table = {'CustomSql': {'DataSourceArn': source_arn, 'Name': f'query {k}',
+                                       'SqlQuery': f'select * from sales_{k}', 'Columns': []}}
+            else:
+                table = {'RelationalTable': {'DataSourceArn': source_arn, 'Catalog': 'AwsDataCatalog',
+                                             'Schema': 'sales', 'Name': f'table_{k}', 'InputColumns': []}}
+            self.data_sets[dataset_id] = {
+                'Arn': self.arn(f'dataset/{dataset_id}'), 'DataSetId': dataset_id, 'Name': f'Dataset {k}',
+                'CreatedTime': self._time(k), 'LastUpdatedTime': self._time(k), 'ImportMode': import_mode,
+                'PhysicalTableMap': {f'table-{k}': table}, 'LogicalTableMap': {},
+                'OutputColumns': [{'Name': f'column_{c}', 'Type': 'STRING', 'Description': f'column {c}'}
+                                  for c in range(5)],
+                'ConsumedSpiceCapacityInBytes': 1024 * (k + 1) if import_mode == 'SPICE' else 0,
+                'Permissions': self._permissions(k, DATASET_ACTIONS),
+            }
+            if import_mode == 'SPICE':
+                self.ingestions[dataset_id] = [{
+                    'Arn': self.arn(f'dataset/{dataset_id}/ingestion/ingestion-{k}'), 'IngestionId': f'ingestion-{k}',
+                    'IngestionStatus': 'COMPLETED', 'CreatedTime': self._time(k), 'IngestionTimeInSeconds': 30,
+                    'IngestionSizeInBytes': 1024 * (k + 1), 'RequestSource': 'MANUAL', 'RequestType': 'FULL_REFRESH',
+                    'RowInfo': {'RowsIngested': 1000 + k, 'RowsDropped': 0, 'TotalRowsInDataset': 1000 + k},
+                }]
+
+        self.analyses = {}
+        self.dashboards = {}
+        for k in range(spec.dashboards):
+            dataset_arns = [self.data_sets[f'dataset-{(k + n) % spec.datasets}']['Arn']
+                            for n in range(min(2, spec.datasets))]
+            analysis_id = f'analysis-{k}'
+            self.analyses[analysis_id] = {
+                'Arn': self.arn(f'analysis/{analysis_id}'), 'AnalysisId': analysis_id, 'Name': f'Analysis {k}',
+                'Status': 'CREATION_SUCCESSFUL', 'DataSetArns': dataset_arns, 'CreatedTime': self._time(k),
+                'LastUpdatedTime': self._time(k), 'Sheets': [],
+                'Permissions': self._permissions(k, DASHBOARD_ACTIONS),
+            }
+            dashboard_id = f'dashboard-{k}'
+            self.dashboards[dashboard_id] = {
+                'Arn': self.arn(f'dashboard/{dashboard_id}'), 'DashboardId': dashboard_id, 'Name': f'Dashboard {k}',
+                'Version': {'VersionNumber': 1, 'Status': 'CREATION_SUCCESSFUL', 'DataSetArns': dataset_arns,
+                            'SourceEntityArn': self.arn(f'analysis/{analysis_id}'), 'Sheets': []},
+                'CreatedTime': self._time(k), 'LastUpdatedTime': self._time(k), 'LastPublishedTime': self._time(k),
+                'Permissions': self._permissions(k, DASHBOARD_ACTIONS),
+            }
+
+        self.themes = {}
+        for k in range(spec.themes):
+            theme_id = f'theme-{k}'
+            self.themes[theme_id] = {
+                'Arn': self.arn(f'theme/{theme_id}'), 'ThemeId': theme_id, 'Name': f'Theme {k}',
+                'LatestVersionNumber': 1, 'CreatedTime': self._time(k), 'LastUpdatedTime': self._time(k),
+                'Permissions': self._permissions(k, ['quicksight:DescribeTheme']),
+            }
+
+        # folders form a tree with three children per folder; dashboards are spread over them
+        self.folders = {}
+        for k in range(spec.folders):
+            folder_id = f'folder-{k}'
+            ancestors = []
+            parent = (k - 1) // 3 if k > 0 else None
+            while parent is not None:
+                ancestors.insert(0, self.arn(f'folder/folder-{parent}'))
+                parent = (parent - 1) // 3 if parent > 0 else None
+            self.folders[folder_id] = {
+                'Arn': self.arn(f'folder/{folder_id}'), 'FolderId': folder_id, 'Name': f'Folder {k}',
+                'FolderType': 'SHARED', 'FolderPath': ancestors, 'CreatedTime': self._time(k),
+                'LastUpdatedTime': self._time(k), 'Permissions': self._permissions(k, ['quicksight:DescribeFolder']),
+                'Members': [],
+            }
+        if spec.folders:
+            for k, dashboard in enumerate(self.dashboards.values()):
+                self.folders[f'folder-{k % spec.folders}']['Members'].append(
+                    {'MemberId': dashboard['DashboardId'], 'MemberArn': dashboard['Arn']})
+
+    # request handling
+
+    def install(self, session):
+        """Answer every client created from session afterwards from this fake."""
+        session.events.register('before-parameter-build', self._remember_params)
+        session.events.register('before-call', self._before_call)
+        session.events.register('before-send.quicksight', self._before_send)
+        session.events.register('before-parse.quicksight', self._before_parse)
+        return self
+
+    def api_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def _remember_params(self, params, context, **kwargs):
+        context['fake_params'] = params
+
+    def _throttle(self, service: str) -> bool:
+        with self._lock:
+            throttle = service == 'quicksight' and self._random.random() < self.spec.throttle_rate
+            if throttle:
+                self.throttled += 1
+        return throttle
+
+    def _handle(self, service: str, operation: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        handler = getattr(self, f'_{service}_{operation}', None)
+        if handler is None:
+            raise NotImplementedError(f'fake_quicksight does not implement {service}.{operation}')
+        return handler(params)
+
+    def _before_call(self, model, context, **kwargs):
+        service = model.service_model.service_name
+        operation = model.name
+        params = context.get('fake_params', {})
+        self._local.pending = None
+        with self._lock:
+            self.calls[f'{service}.{operation}'] += 1
+        if self.spec.latency:
+            time.sleep(self.spec.latency)
+        if self._throttle(service):
+            # let botocore send the call, so the throttle reaches its retry handler
+            self._local.pending = {'operation': operation, 'params': params, 'throttle': True}
+            return None
+        try:
+            return self._response(200, self._handle(service, operation, params))
+        except _NotFound as e:
+            code = 'NoSuchKey' if service == 's3' else 'ResourceNotFoundException'
+            return self._error(404, code, str(e))
+
+    def _before_send(self, request, **kwargs):
+        """Answer a throttled QuickSight call and its retries on the wire, as AWS would."""
+        pending = self._local.pending
+        if pending['throttle']:
+            pending['throttle'] = False
+            return self._raw_error(400, 'ThrottlingException', 'Rate exceeded')
+        if self.spec.latency:
+            time.sleep(self.spec.latency)
+        if self._throttle('quicksight'):
+            return self._raw_error(400, 'ThrottlingException', 'Rate exceeded')
+        try:
+            pending['result'] = self._handle('quicksight', pending['operation'], pending['params'])
+        except _NotFound as e:
+            return self._raw_error(404, 'ResourceNotFoundException', str(e))
+        return AWSResponse(request.url, 200, {}, _RawBody(b'{}'))
+
+    def _before_parse(self, customized_response_dict, **kwargs):
+        pending = getattr(self._local, 'pending', None)
+        if pending and 'result' in pending:
+            customized_response_dict.update(pending.pop('result'))
+
+    def _response(self, status: int, body: Dict[str, Any]):
+        body.setdefault('ResponseMetadata', {'RequestId': 'fake', 'HTTPStatusCode': status})
+        body.setdefault('Status', status)
+        return AWSResponse('https://fake', status, {}, None), body
+
+    def _error(self, status: int, code: str, message: str):
+        body = {'Error': {'Code': code, 'Message': message},
+                'ResponseMetadata': {'RequestId': 'fake', 'HTTPStatusCode': status}}
+        return AWSResponse('https://fake', status, {}, None), body
+
+    def _raw_error(self, status: int, code: str, message: str):
+        body = json.dumps({'message': message}).encode('utf-8')
+        return AWSResponse('https://fake', status, {'x-amzn-ErrorType': code}, _RawBody(body))
+
+    def _page(self, params: Dict[str, Any], key: str, items: List[Any]) -> Dict[str, Any]:
+        start = int(params.get('NextToken') or 0)
+        page_size = min(params.get('MaxResults') or self.spec.page_size, self.spec.page_size)
+        response = {key: [dict(item) for item in items[start:start + page_size]]}
+        if start + page_size < len(items):
+            response['NextToken'] = str(start + page_size)
+        return response
+
+    @staticmethod
+    def _lookup(table: Dict[str, Any], key: str, kind: str) -> Dict[str, Any]:
+        if key not in table:
+            raise _NotFound(f'{kind} {key} not found')
+        return table[key]
+
+    @staticmethod
+    def _public(item: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in item.items() if k not in ('Permissions', 'Members')}
+
+    # sts / s3
+
+    def _sts_GetCallerIdentity(self, params):
+        return {'Account': self.spec.account_id, 'UserId': 'FAKE', 'Arn': f'arn:aws:iam::{self.spec.account_id}:user/fake'}
+
+    def _s3_ListBuckets(self, params):
+        return {'Buckets': [{'Name': bucket} for bucket in sorted({b for b, _ in self.objects} | {'admin-suite-fake'})]}
+
+    def _s3_HeadBucket(self, params):
+        return {}
+
+    def _s3_PutObject(self, params):
+        body = params.get('Body', b'')
+        data = body.read() if hasattr(body, 'read') else body
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        with self._lock:
+            self.objects[(params['Bucket'], params['Key'])] = data
+        return {'ETag': '"fake"'}
+
+    def _s3_GetObject(self, params):
+        data = self.objects.get((params['Bucket'], params['Key']))
+        if data is None:
+            raise _NotFound(params['Key'])
+        return {'Body': StreamingBody(io.BytesIO(data), len(data)), 'ContentLength': len(data)}
+
+    def _s3_CreateMultipartUpload(self, params):
+        upload_id = f"{params['Bucket']}/{params['Key']}"
+        with self._lock:
+            self._multipart[upload_id] = {}
+        return {'UploadId': upload_id, 'Bucket': params['Bucket'], 'Key': params['Key']}
+
+    def _s3_UploadPart(self, params):
+        body = params['Body']
+        with self._lock:
+            self._multipart[params['UploadId']][params['PartNumber']] = body.read()
+        return {'ETag': f'"part{params["PartNumber"]}"'}
+
+    def _s3_CompleteMultipartUpload(self, params):
+        with self._lock:
+            parts = self._multipart.pop(params['UploadId'])
+            self.objects[(params['Bucket'], params['Key'])] = b''.join(parts[n] for n in sorted(parts))
+        return {'Bucket': params['Bucket'], 'Key': params['Key'], 'ETag': '"fake"'}
+
+    # quicksight lists
+
+    def _quicksight_ListNamespaces(self, params):
+        return self._page(params, 'Namespaces', [{'Name': 'default', 'CapacityRegion': self.spec.region,
+                                                  'CreationStatus': 'CREATED', 'IdentityStore': 'QUICKSIGHT'}])
+
+    def _quicksight_ListUsers(self, params):
+        return self._page(params, 'UserList', self.users)
+
+    def _quicksight_ListGroups(self, params):
+        return self._page(params, 'GroupList', self.groups)
+
+    def _quicksight_ListUserGroups(self, params):
+        return self._page(params, 'GroupList', self._lookup(self.user_groups, params['UserName'], 'user'))
+
+    def _quicksight_ListGroupMemberships(self, params):
+        members = [{'MemberName': name, 'Arn': self.arn(f'user/default/{name}')}
+                   for name, groups in self.user_groups.items()
+                   if any(group['GroupName'] == params['GroupName'] for group in groups)]
+        return self._page(params, 'GroupMemberList', members)
+
+    def _summaries(self, table: Dict[str, Any], keys: Tuple[str, ...]) -> List[Dict[str, Any]]:
+        return [{k: item[k] for k in keys if k in item} for item in table.values()]
+
+    def _quicksight_ListDashboards(self, params):
+        return self._page(params, 'DashboardSummaryList', self._summaries(
+            self.dashboards, ('Arn', 'DashboardId', 'Name', 'CreatedTime', 'LastUpdatedTime', 'LastPublishedTime')))
+
+    def _quicksight_ListAnalyses(self, params):
+        return self._page(params, 'AnalysisSummaryList', self._summaries(
+            self.analyses, ('Arn', 'AnalysisId', 'Name', 'Status', 'CreatedTime', 'LastUpdatedTime')))
+
+    def _quicksight_ListDataSets(self, params):
+        return self._page(params, 'DataSetSummaries', self._summaries(
+            self.data_sets, ('Arn', 'DataSetId', 'Name', 'CreatedTime', 'LastUpdatedTime', 'ImportMode')))
+
+    def _quicksight_ListDataSources(self, params):
+        return self._page(params, 'DataSources', [self._public(item) for item in self.data_sources.values()])
+
+    def _quicksight_ListThemes(self, params):
+        return self._page(params, 'ThemeSummaryList', self._summaries(
+            self.themes, ('Arn', 'ThemeId', 'Name', 'LatestVersionNumber', 'CreatedTime', 'LastUpdatedTime')))
+
+    def _quicksight_ListFolders(self, params):
+        return self._page(params, 'FolderSummaryList', self._summaries(
+            self.folders, ('Arn', 'FolderId', 'Name', 'FolderType', 'CreatedTime', 'LastUpdatedTime')))
+
+    def _quicksight_ListFolderMembers(self, params):
+        return self._page(params, 'FolderMemberList', self._lookup(self.folders, params['FolderId'], 'folder')['Members'])
+
+    def _quicksight_ListIngestions(self, params):
+        self._lookup(self.data_sets, params['DataSetId'], 'dataset')
+        return self._page(params, 'Ingestions', self.ingestions.get(params['DataSetId'], []))
+
+    def _quicksight_ListTopics(self, params):
+        return self._page(params, 'TopicsSummaries', [])
+
+    # quicksight describes
+
+    def _quicksight_DescribeDashboard(self, params):
+        return {'Dashboard': self._public(self._lookup(self.dashboards, params['DashboardId'], 'dashboard'))}
+
+    def _quicksight_DescribeAnalysis(self, params):
+        return {'Analysis': self._public(self._lookup(self.analyses, params['AnalysisId'], 'analysis'))}
+
+    def _quicksight_DescribeDataSet(self, params):
+        return {'DataSet': self._public(self._lookup(self.data_sets, params['DataSetId'], 'dataset'))}
+
+    def _quicksight_DescribeDataSource(self, params):
+        return {'DataSource': self._public(self._lookup(self.data_sources, params['DataSourceId'], 'datasource'))}
+
+    def _quicksight_DescribeFolder(self, params):
+        return {'Folder': self._public(self._lookup(self.folders, params['FolderId'], 'folder'))}
+
+    def _quicksight_DescribeDashboardPermissions(self, params):
+        item = self._lookup(self.dashboards, params['DashboardId'], 'dashboard')
+        return {'DashboardId': item['DashboardId'], 'DashboardArn': item['Arn'], 'Permissions': item['Permissions']}
+
+    def _quicksight_DescribeAnalysisPermissions(self, params):
+        item = self._lookup(self.analyses, params['AnalysisId'], 'analysis')
+        return {'AnalysisId': item['AnalysisId'], 'AnalysisArn': item['Arn'], 'Permissions': item['Permissions']}
+
+    def _quicksight_DescribeDataSetPermissions(self, params):
+        item = self._lookup(self.data_sets, params['DataSetId'], 'dataset')
+        return {'DataSetId': item['DataSetId'], 'DataSetArn': item['Arn'], 'Permissions': item['Permissions']}
+
+    def _quicksight_DescribeDataSourcePermissions(self, params):
+        item = self._lookup(self.data_sources, params['DataSourceId'], 'datasource')
+        return {'DataSourceId': item['DataSourceId'], 'DataSourceArn': item['Arn'], 'Permissions': item['Permissions']}
+
+    def _quicksight_DescribeThemePermissions(self, params):
+        item = self._lookup(self.themes, params['ThemeId'], 'theme')
+        return {'ThemeId': item['ThemeId'], 'ThemeArn': item['Arn'], 'Permissions': item['Permissions']}
+
+    def _quicksight_DescribeFolderPermissions(self, params):
+        item = self._lookup(self.folders, params['FolderId'], 'folder')
+        return {'FolderId': item['FolderId'], 'Arn': item['Arn'], 'Permissions': item['Permissions']}
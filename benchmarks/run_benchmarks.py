@@ -0,0 +1,190 @@
+"""
+This script is for dev/admin to measure the Admin Suite Glue collectors and the BIOps helpers without an AWS account.
+Note:
+    every scenario runs against a fresh fake_quicksight.FakeQuickSight account; the Glue job scripts are run
+    unchanged as __main__ with the job arguments they get in Glue. awsglue and pyspark only exist inside Glue, so
+    when they are not installed the few names the scripts import from them are provided by this script.
+    reported per scenario: API calls (and how many were throttled), wall time and peak Python memory (tracemalloc).
+Usage:
+    python run_benchmarks.py [--scale small|medium|large] [--latency SECONDS] [--throttle-rate RATE]
+                             [--page-size N] [--scenario NAME ...] [--verbose]
+"""
+
+"""
+import libraries
+"""
+import argparse
+import contextlib
+import dataclasses
+import importlib.util
+import io
+import os
+import runpy
+import sys
+import time
+import tracemalloc
+import types
+import boto3
+from fake_quicksight import FakeAccountSpec, FakeQuickSight
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GLUE_DIR = os.path.join(REPO_ROOT, '2_Quick_Admin_Suite', 'Glue', 'NewTemplates')
+BIOPS_DIR = os.path.join(REPO_ROOT, '1_BIOps', 'Assets_as_Code')
+OUTPUT_BUCKET = 'admin-suite-fake'
+
+SCALES = {
+    'small': dict(users=50, groups=5, folders=20, dashboards=30, datasets=30, data_sources=10, themes=3),
+    'medium': dict(users=500, groups=20, folders=100, dashboards=200, datasets=200, data_sources=40, themes=5),
+    'large': dict(users=3000, groups=100, folders=500, dashboards=1000, datasets=1000, data_sources=100, themes=10),
+}
+
+
+def get_resolved_options(argv, options):
+    resolved = {}
+    for name in options:
+        flag = '--' + name
+        if flag not in argv:
+            raise RuntimeError('missing job argument ' + flag)
+        resolved[name] = argv[argv.index(flag) + 1]
+    return resolved
+
+
+class _GlueContext:
+    def __init__(self, spark_context):
+        self.spark_session = None
+
+
+class _Job:
+    def __init__(self, glue_context):
+        pass
+
+    def init(self, name, args):
+        pass
+
+    def commit(self):
+        pass
+
+
+def install_glue_shims():
+    """Provide getResolvedOptions, GlueContext, Job and SparkContext when running outside Glue."""
+    if importlib.util.find_spec('awsglue') is None:
+        modules = {name: types.ModuleType(name) for name in ('awsglue', 'awsglue.utils', 'awsglue.context', 'awsglue.job')}
+        modules['awsglue.utils'].getResolvedOptions = get_resolved_options
+        modules['awsglue.context'].GlueContext = _GlueContext
+        modules['awsglue.job'].Job = _Job
+        sys.modules.update(modules)
+    if importlib.util.find_spec('pyspark') is None:
+        modules = {name: types.ModuleType(name) for name in ('pyspark', 'pyspark.context')}
+        modules['pyspark.context'].SparkContext = type('SparkContext', (), {})
+        sys.modules.update(modules)
+
+
+def fake_session(fake, default=False):
+    kwargs = dict(aws_access_key_id='fake', aws_secret_access_key='fake', region_name=fake.spec.region)
+    if default:
+        boto3.setup_default_session(**kwargs)
+        session = boto3.DEFAULT_SESSION
+    else:
+        session = boto3.Session(**kwargs)
+    fake.install(session)
+    return session
+
+
+def run_glue_job(fake, script, output_folder, extra_args=()):
+    """Run a collector script as __main__ with clients of the default session answered by fake."""
+    fake_session(fake, default=True)
+    # the shared runtime caches clients, so give every run a fresh one bound to this fake
+    sys.modules.pop('admin_suite_runtime', None)
+    argv = [script, '--JOB_NAME', script, '--AWS_REGION', fake.spec.region,
+            '--QUICKSIGHT_IDENTITY_REGION', fake.spec.region,
+            '--S3_OUTPUT_PATH', f's3://{OUTPUT_BUCKET}/monitoring/quicksight/{output_folder}'] + list(extra_args)
+    saved_argv = sys.argv
+    sys.argv = argv
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            runpy.run_path(os.path.join(GLUE_DIR, script), run_name='__main__')
+    finally:
+        sys.argv = saved_argv
+
+
+def glue_scenario(script, output_folder, extra_args=(), runs=1):
+    def scenario(fake):
+        for _ in range(runs - 1):
+            run_glue_job(fake, script, output_folder, extra_args)
+            fake.calls.clear()
+            fake.throttled = 0
+        run_glue_job(fake, script, output_folder, extra_args)
+    return scenario
+
+
+def biops_lineage(fake):
+    """Data sources of every dashboard, as resolved by the migration scenarios."""
+    import src.functions as func
+    session = fake_session(fake)
+    for dashboard in fake.dashboards.values():
+        func.data_sources_ls_of_dashboard(dashboard['Name'], session)
+
+
+def biops_migration_list(fake):
+    """Connection details of every data source, by name."""
+    import src.functions as func
+    session = fake_session(fake)
+    names = [source['Name'] for source in fake.data_sources.values()]
+    func.get_data_source_migration_list(session, names)
+
+
+SCENARIOS = {
+    'glue_user_info_access_manage': glue_scenario('admin_suite_user_info_access_manage.py', 'assets_access'),
+    'glue_folder': glue_scenario('admin_suite_folder.py', 'folder_assets'),
+    'glue_dataset': glue_scenario('admin_suite_dataset.py', 'dataset'),
+    'glue_dataset_incremental_rerun': glue_scenario('admin_suite_dataset.py', 'dataset',
+                                                    ['--COLLECTION_MODE', 'incremental'], runs=2),
+    'glue_datasource': glue_scenario('admin_suite_datasource.py', 'datasource_property'),
+    'biops_lineage': biops_lineage,
+    'biops_migration_list': biops_migration_list,
+}
+
+
+def run_scenario(name, spec, verbose=False):
+    """Run one scenario and print its row; a failing scenario is reported as FAILED and returns False."""
+    fake = FakeQuickSight(spec)
+    tracemalloc.start()
+    start = time.perf_counter()
+    error = None
+    try:
+        SCENARIOS[name](fake)
+    except Exception as e:
+        error = e
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    row = f'{name:<34} {fake.api_calls():>8} {fake.throttled:>9} {elapsed:>9.2f} {peak / 1024 / 1024:>10.1f}'
+    if error is not None:
+        row += f'  FAILED: {type(error).__name__}: {error}'
+    print(row)
+    if verbose:
+        for operation, count in fake.calls.most_common():
+            print(f'    {operation:<50} {count:>8}')
+    return error is None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the collectors and BIOps helpers against a fake QuickSight account.')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every API call')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of QuickSight calls throttled')
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS))
+    parser.add_argument('--verbose', action='store_true', help='also print calls per operation')
+    options = parser.parse_args()
+
+    install_glue_shims()
+    sys.path[:0] = [GLUE_DIR, BIOPS_DIR]
+    spec = FakeAccountSpec(latency=options.latency, throttle_rate=options.throttle_rate,
+                           page_size=options.page_size, **SCALES[options.scale])
+    print(f'scale {options.scale}: ' + ', '.join(f'{k}={v}' for k, v in dataclasses.asdict(spec).items()))
+    print(f'{"scenario":<34} {"api calls":>8} {"throttled":>9} {"wall s":>9} {"peak MB":>10}')
+    failed = [name for name in options.scenario or list(SCENARIOS) if not run_scenario(name, spec, options.verbose)]
+    if failed:
+        sys.exit(f'{len(failed)} scenario(s) failed: ' + ', '.join(failed))